@@ -22,7 +22,8 @@ sys.path.insert(0, str(project_root))
 from service.chunk.chunk_splitter import ChunkSplitter
 from service.chunk.hierarchical_splitter import HierarchicalChunkSplitter
 from service.markdown_integrate.unified_converter import UnifiedMarkdownConverter
-from service.serialization import ConversionSerializer, ConversionDeserializer
+from service.markdown_integrate.conversion_server import ConversionClient
+from service.serialization import ConversionSerializer, ConversionDeserializer, ConversionCache
 
 # 設定日誌
 logging.basicConfig(
@@ -42,7 +43,10 @@ class DocumentAnalyzer:
                  chunk_overlap: int = 200,  # 父層重疊，保持中文語義連貫性
                  use_hierarchical: bool = True,
                  child_chunk_size: int = 350,  # 子層chunk大小，約100-150 tokens，適合中文rerank 512
-                 child_chunk_overlap: int = 50):  # 子層重疊，保持中文語義連貫性
+                 child_chunk_overlap: int = 50,  # 子層重疊，保持中文語義連貫性
+                 use_cache: bool = True,
+                 cache_dir: str = "service/serialization/cache",
+                 server_socket: Optional[str] = None):
         """
         初始化分析器 - 針對中文優化
         
@@ -54,6 +58,9 @@ class DocumentAnalyzer:
             use_hierarchical: 是否使用分層分割
             child_chunk_size: 子chunk大小 (預設350字，約100-150 tokens，適合中文rerank 512)
             child_chunk_overlap: 子chunk重疊大小 (預設50字，保持中文語義連貫性)
+            use_cache: 是否使用以檔案內容定址的轉換快取
+            cache_dir: 轉換快取目錄（可由多個輸出目錄共用）
+            server_socket: 常駐轉換服務的 Unix socket 路徑，設定時優先交由服務轉換
         """
         # 設定預設的 raw_docs 目錄
         if raw_docs_dir is None:
@@ -77,8 +84,18 @@ class DocumentAnalyzer:
         self.child_chunk_size = child_chunk_size
         self.child_chunk_overlap = child_chunk_overlap
         
+        # 初始化轉換快取（以檔案內容 + 轉換器配置為鍵，不受檔名和輸出目錄影響）
+        self.cache = None
+        if use_cache:
+            if not Path(cache_dir).is_absolute():
+                cache_dir = Path(__file__).parent.parent.parent.parent / cache_dir
+            self.cache = ConversionCache(cache_dir=str(cache_dir))
+        
         # 初始化轉換器
-        self.converter = UnifiedMarkdownConverter()
+        self.converter = UnifiedMarkdownConverter(cache=self.cache)
+        
+        # 常駐轉換服務客戶端（模型已在服務中載入，不需每次執行重新載入）
+        self.conversion_client = ConversionClient(server_socket) if server_socket else None
         
         # 根據設定選擇分割器
         if use_hierarchical:
@@ -250,6 +267,23 @@ class DocumentAnalyzer:
             logger.error(f"Failed to copy original file {source_path.name}: {e}")
             return False
     
+    def convert_file(self, file_path: Path):
+        """
+        轉換文件，設定常駐轉換服務時優先交由服務轉換
+        
+        Args:
+            file_path: 文件路徑
+            
+        Returns:
+            ConversionResult: 轉換結果
+        """
+        if self.conversion_client is not None:
+            if self.conversion_client.is_available():
+                return self.conversion_client.convert_file(str(file_path))
+            logger.warning(f"Conversion server not available at {self.conversion_client.socket_path}, converting locally")
+        
+        return self.converter.convert_file(str(file_path))
+    
     def process_single_file(self, file_path: Path) -> Dict[str, Any]:
         """
         處理單個文件
@@ -273,15 +307,15 @@ class DocumentAnalyzer:
             conversion_result = None
             used_serialization = False
             
-            if self.check_serialization_exists(file_path):
-                # 從序列化文件載入
+            if self.cache is None and self.check_serialization_exists(file_path):
+                # 未啟用快取時，沿用輸出目錄中的序列化文件
                 logger.info(f"Using existing serialization for {file_path.name}")
                 conversion_result = self.load_from_serialization(file_path)
                 used_serialization = True
             else:
-                # 轉換文件為 Markdown
+                # 轉換文件為 Markdown（啟用快取時由轉換器依檔案內容自動重用結果）
                 logger.info(f"Converting {file_path.name} to Markdown...")
-                conversion_result = self.converter.convert_file(str(file_path))
+                conversion_result = self.convert_file(file_path)
                 
                 if not conversion_result or not conversion_result.content:
                     logger.error(f"Failed to convert {file_path.name}")
@@ -292,6 +326,9 @@ class DocumentAnalyzer:
                         'output_paths': output_paths
                     }
                 
+                cache_info = conversion_result.metadata.additional_info.get('conversion_cache') or {}
+                used_serialization = bool(cache_info.get('hit'))
+                
                 # 保存序列化文件
                 logger.info(f"Saving ConversionResult to serialization for {file_path.name}")
                 self.save_to_serialization(conversion_result, file_path)
@@ -353,7 +390,7 @@ class DocumentAnalyzer:
                 'chunks_count': len(chunks),
                 'statistics': stats,
                 'used_serialization': used_serialization,
-                'serialization_path': str(self.get_serialization_path(file_path)) if used_serialization else None,
+                'serialization_path': str(self.get_serialization_path(file_path)),
                 'conversion_metadata': {
                     'file_type': conversion_result.metadata.file_type,
                     'total_pages': conversion_result.metadata.total_pages,
@@ -384,10 +421,59 @@ class DocumentAnalyzer:
                 'output_paths': output_paths_str
             }
     
-    def analyze_all_files(self) -> Dict[str, Any]:
+    def preconvert_files(self, files: List[Path], max_workers: Optional[int] = None,
+                         max_memory_mb: Optional[int] = None,
+                         max_tasks_per_child: Optional[int] = None) -> int:
+        """
+        使用進程池預先轉換尚未序列化（啟用快取時為尚未快取）的文件
+        
+        Args:
+            files: 文件路徑列表
+            max_workers: 工作進程數量
+            max_memory_mb: 每個工作進程的記憶體上限（MB）
+            max_tasks_per_child: 每個工作進程處理多少個文件後重啟
+            
+        Returns:
+            int: 成功轉換並序列化的文件數量
+        """
+        if self.cache is None:
+            files_to_convert = [f for f in files if not self.check_serialization_exists(f)]
+        else:
+            # 啟用快取時由轉換器依檔案內容判斷是否需要重新轉換（同名但內容已修改的文件也會轉換）
+            files_to_convert = list(files)
+        if not files_to_convert:
+            return 0
+        
+        logger.info(f"Pre-converting {len(files_to_convert)} files with {max_workers} workers")
+        path_map = {str(f): f for f in files_to_convert}
+        converted_count = 0
+        
+        # 啟用快取時工作進程會直接寫入共用快取，否則在此保存序列化文件
+        for conversion_result in self.converter.convert_many(
+                list(path_map.keys()),
+                max_workers=max_workers,
+                max_memory_mb=max_memory_mb,
+                max_tasks_per_child=max_tasks_per_child):
+            file_path = path_map.get(conversion_result.metadata.file_path)
+            if file_path is None or not conversion_result.content:
+                continue
+            if self.cache is None:
+                self.save_to_serialization(conversion_result, file_path)
+            converted_count += 1
+        
+        return converted_count
+    
+    def analyze_all_files(self, max_workers: Optional[int] = None,
+                          max_memory_mb: Optional[int] = None,
+                          max_tasks_per_child: Optional[int] = None) -> Dict[str, Any]:
         """
         分析所有文件
         
+        Args:
+            max_workers: 轉換用的工作進程數量，大於 1 時先以進程池平行轉換所有文件
+            max_memory_mb: 每個工作進程的記憶體上限（MB）
+            max_tasks_per_child: 每個工作進程處理多少個文件後重啟
+        
         Returns:
             Dict[str, Any]: 分析結果摘要
         """
@@ -405,6 +491,10 @@ class DocumentAnalyzer:
                 'results': []
             }
         
+        # 平行預先轉換，之後的逐一處理會直接使用序列化結果
+        if max_workers and max_workers > 1:
+            self.preconvert_files(files_to_process, max_workers, max_memory_mb, max_tasks_per_child)
+        
         # 處理每個文件
         results = []
         successful_count = 0
@@ -477,6 +567,12 @@ def main():
     parser.add_argument('--no-hierarchical', action='store_true', help='Disable hierarchical splitting')
     parser.add_argument('--child-chunk-size', type=int, default=350, help='Child chunk size (default: 350, ~100-150 tokens for Chinese rerank 512)')
     parser.add_argument('--child-chunk-overlap', type=int, default=50, help='Child chunk overlap (default: 50 for Chinese semantic continuity)')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the content-addressed conversion cache')
+    parser.add_argument('--cache-dir', type=str, default='service/serialization/cache', help='Conversion cache directory')
+    parser.add_argument('--server-socket', type=str, default=None, help='Unix socket of a running conversion server (python -m service.markdown_integrate.conversion_server)')
+    parser.add_argument('--workers', type=int, default=None, help='Number of conversion worker processes (default: convert serially)')
+    parser.add_argument('--worker-memory-mb', type=int, default=None, help='Memory limit per conversion worker in MB')
+    parser.add_argument('--max-tasks-per-child', type=int, default=None, help='Restart each conversion worker after this many files')
     
     args = parser.parse_args()
     
@@ -496,7 +592,10 @@ def main():
         chunk_overlap=args.chunk_overlap,
         use_hierarchical=use_hierarchical,
         child_chunk_size=args.child_chunk_size,
-        child_chunk_overlap=args.child_chunk_overlap
+        child_chunk_overlap=args.child_chunk_overlap,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        server_socket=args.server_socket
     )
     
     if args.file:
@@ -507,7 +606,11 @@ def main():
     else:
         # 分析所有文件
         logger.info("Analyzing all files...")
-        summary = analyzer.analyze_all_files()
+        summary = analyzer.analyze_all_files(
+            max_workers=args.workers,
+            max_memory_mb=args.worker_memory_mb,
+            max_tasks_per_child=args.max_tasks_per_child
+        )
         print(f"Analysis summary: {summary}")
 
 
@@ -0,0 +1,103 @@
+"""
+確定性 chunk ID 與分割結果差異
+
+chunk ID 由「文件識別 + 結構位置 + 內容」計算 blake2b 雜湊值（64 位元），取代隨機的 8 位 UUID 前綴：
+相同文件以相同配置重新分割時得到相同的 ID，只有內容或位置改變的 chunk 才會得到新的 ID。
+32 位元的隨機 ID 在數十萬個 chunk 的語料中就可能碰撞，64 位元雜湊在同一份文件內實際上不會重複。
+
+diff 比較前後兩次分割結果的 ID，向量資料庫只需要寫入新增的 chunk、刪除移除的 chunk，
+不必因為文件的一小部分變動而重建整份文件的索引。
+"""
+
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence
+
+from .hierarchical_models import HierarchicalSplitDiff, HierarchicalSplitResult
+
+# chunk ID 雜湊值的位元組數（64 位元）
+CHUNK_ID_DIGEST_SIZE = 8
+
+# 雜湊各欄位之間的分隔字元（避免 ("ab", "c") 與 ("a", "bc") 得到相同的雜湊值）
+_FIELD_SEPARATOR = b"\x1f"
+
+
+def document_key(metadata: Dict[str, Any]) -> str:
+    """
+    文件識別（優先使用來源路徑，沒有時使用文件名稱）
+    
+    Args:
+        metadata: chunk 或文件的元數據
+    
+    Returns:
+        str: 文件識別字串
+    """
+    return str(metadata.get('source') or metadata.get('file_name') or "")
+
+
+def make_chunk_id(prefix: str, document: str, position: Sequence[Any], content: str) -> str:
+    """
+    計算確定性的 chunk ID
+    
+    Args:
+        prefix: ID 前綴（例如 "parent_3_0"、"child"）
+        document: 文件識別（父 chunk 使用 document_key，子 chunk 使用父 chunk ID）
+        position: 結構位置（頁碼、父 chunk 索引、子 chunk 索引等）
+        content: chunk 內容
+    
+    Returns:
+        str: "<prefix>_<16 位十六進位雜湊值>"
+    """
+    hasher = hashlib.blake2b(digest_size=CHUNK_ID_DIGEST_SIZE)
+    for part in (document, *position):
+        hasher.update(str(part).encode('utf-8'))
+        hasher.update(_FIELD_SEPARATOR)
+    hasher.update(content.encode('utf-8'))
+    return f"{prefix}_{hasher.hexdigest()}"
+
+
+def _chunk_ids(result: HierarchicalSplitResult, is_parent: bool) -> List[str]:
+    """取得分割結果的 chunk ID（儲存的結果只讀取 ID 欄位，不載入內容）"""
+    columns = getattr(result, 'parent_columns' if is_parent else 'child_columns', None)
+    if columns is not None:
+        return list(columns['chunk_id'])
+    chunks = result.parent_chunks if is_parent else result.child_chunks
+    return [chunk.chunk_id for chunk in chunks]
+
+
+def diff(previous_result: Optional[HierarchicalSplitResult],
+         new_result: HierarchicalSplitResult) -> HierarchicalSplitDiff:
+    """
+    比較前後兩次分割結果
+    
+    ID 包含內容雜湊值，ID 相同的 chunk 內容一定相同，不需要比較內容。
+    
+    Args:
+        previous_result: 上一次的分割結果（None 表示第一次索引，全部視為新增）
+        new_result: 這一次的分割結果
+    
+    Returns:
+        HierarchicalSplitDiff: 新增的 chunk（依新結果的順序）、移除與未變動的 chunk ID
+    """
+    previous_parent_ids = set(_chunk_ids(previous_result, True)) if previous_result is not None else set()
+    previous_child_ids = set(_chunk_ids(previous_result, False)) if previous_result is not None else set()
+    new_parent_ids = set(_chunk_ids(new_result, True))
+    new_child_ids = set(_chunk_ids(new_result, False))
+    
+    result_diff = HierarchicalSplitDiff()
+    for chunk in new_result.parent_chunks:
+        if chunk.chunk_id in previous_parent_ids:
+            result_diff.unchanged_parent_ids.append(chunk.chunk_id)
+        else:
+            result_diff.added_parents.append(chunk)
+    for chunk in new_result.child_chunks:
+        if chunk.chunk_id in previous_child_ids:
+            result_diff.unchanged_child_ids.append(chunk.chunk_id)
+        else:
+            result_diff.added_children.append(chunk)
+    
+    if previous_result is not None:
+        result_diff.removed_parent_ids = [chunk_id for chunk_id in _chunk_ids(previous_result, True)
+                                          if chunk_id not in new_parent_ids]
+        result_diff.removed_child_ids = [chunk_id for chunk_id in _chunk_ids(previous_result, False)
+                                         if chunk_id not in new_child_ids]
+    return result_diff
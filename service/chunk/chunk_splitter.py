@@ -1,20 +1,23 @@
 """
 Chunk 分割器
 
-基於 LangChain 的 MarkdownHeaderTextSplitter 和 RecursiveCharacterTextSplitter
-實現智能的 Markdown 分割功能。
+以 MarkdownSpanSplitter 對正規化後的文字做一次標題與大小分割（結果為偏移區段），
+只有在產生 Document 時才切出字串，實現智能的 Markdown 分割功能。
 """
 
 import os
 import re
 import logging
 from pathlib import Path
-from typing import List, Union, Optional, Dict, Any
-from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
+from typing import List, Union, Optional, Dict, Any, Callable, Iterator
 from langchain_core.documents import Document
 
-from ..markdown_integrate.data_models import ConversionResult
+from ..markdown_integrate.data_models import (
+    ConversionResult, ConversionMetadata, PageInfo, PageOffsetIndex, join_pages
+)
 from ..serialization import ConversionDeserializer
+from .markdown_span_splitter import MarkdownSpanSplitter
+from .page_executor import DEFAULT_PARALLEL_PAGE_THRESHOLD, iter_pages, map_pages
 from .table_handler import TableHandler
 from .markdown_normalizer import MarkdownNormalizer
 from .excel_exporter import ExcelExporter
@@ -31,20 +34,33 @@ class ChunkSplitter:
                  headers_to_split_on: Optional[List[tuple]] = None,
                  keep_tables_together: bool = True,
                  normalize_output: bool = True,
-                 output_base_dir: str = "service/output"):
+                 output_base_dir: str = "service/output",
+                 length_function: Optional[Callable[[str], int]] = None,
+                 max_workers: Optional[int] = 1,
+                 parallel_page_threshold: int = DEFAULT_PARALLEL_PAGE_THRESHOLD,
+                 split_across_pages: bool = False):
         """
         初始化分割器
         
         Args:
-            chunk_size: 每個 chunk 的最大字符數
-            chunk_overlap: chunk 之間的重疊字符數
+            chunk_size: 每個 chunk 的最大長度（預設為字符數）
+            chunk_overlap: chunk 之間的重疊長度
             headers_to_split_on: 要分割的標題層級
             keep_tables_together: 是否保持表格完整性
             normalize_output: 是否正規化輸出內容
             output_base_dir: 輸出基礎目錄
+            length_function: 長度函數，None 使用字符數；傳入 TokenLengthFunction 時 chunk_size 與 chunk_overlap 以 token 計算
+            max_workers: 頁面分割的工作進程數量，1 表示逐頁處理，None 表示使用 CPU 核心數
+            parallel_page_threshold: 頁數達到此值才使用進程池
+            split_across_pages: 有頁面信息時是否將整份文件當作連續文字分割（跨頁的段落不會在頁面邊界被切開），
+                                chunk 的頁碼依其在合併內容中的偏移對應
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.length_function = length_function or len
+        self.max_workers = max_workers
+        self.parallel_page_threshold = parallel_page_threshold
+        self.split_across_pages = split_across_pages
         self.keep_tables_together = keep_tables_together
         self.normalize_output = normalize_output
         self.output_base_dir = output_base_dir
@@ -60,16 +76,13 @@ class ChunkSplitter:
         else:
             self.headers_to_split_on = headers_to_split_on
         
-        # 初始化分割器
-        self.markdown_splitter = MarkdownHeaderTextSplitter(
+        # 初始化分割器（標題分割保留標題用於上下文，超過 chunk_size 的區段再依大小分割）
+        self.span_splitter = MarkdownSpanSplitter(
             headers_to_split_on=self.headers_to_split_on,
-            strip_headers=False  # 保留標題用於上下文
-        )
-        
-        self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", " ", ""]
+            separators=["\n\n", "\n", " ", ""],
+            length_function=self.length_function
         )
         
         # 初始化表格處理器
@@ -110,6 +123,9 @@ class ChunkSplitter:
         if isinstance(input_data, ConversionResult):
             # 檢查是否有頁面信息
             if input_data.pages and len(input_data.pages) > 0:
+                if self.split_across_pages:
+                    # 整份文件連續分割，依偏移對應頁碼
+                    return self._split_across_pages(input_data, output_excel, output_path, md_output_path)
                 # 有頁面信息，使用頁面分割
                 return self._split_by_pages(input_data, output_excel, output_path, md_output_path)
             else:
@@ -133,22 +149,13 @@ class ChunkSplitter:
         if self.keep_tables_together:
             markdown_content = self.table_handler.mark_tables(markdown_content)
         
-        # 使用 MarkdownHeaderTextSplitter 進行初步分割
-        header_splits = self.markdown_splitter.split_text(markdown_content)
+        # 標題分割與大小分割（區段是 markdown_content 上的偏移範圍）
+        spans = self.span_splitter.split(markdown_content)
         
-        # 對每個分割後的文檔進行進一步分割
-        final_chunks = []
-        for doc in header_splits:
-            # 如果文檔太大，使用 RecursiveCharacterTextSplitter 進一步分割
-            if len(doc.page_content) > self.chunk_size:
-                sub_chunks = self.text_splitter.split_documents([doc])
-                # 為每個子 chunk 添加檔名和頁碼信息
-                enhanced_sub_chunks = self._enhance_chunks_with_metadata(sub_chunks, metadata)
-                final_chunks.extend(enhanced_sub_chunks)
-            else:
-                # 為單個 chunk 添加檔名和頁碼信息
-                enhanced_chunk = self._enhance_chunk_with_metadata(doc, metadata)
-                final_chunks.append(enhanced_chunk)
+        # 為每個 chunk 添加檔名和頁碼信息
+        final_chunks = self._enhance_chunks_with_metadata(
+            self.span_splitter.to_documents(markdown_content, spans), metadata
+        )
         
         # 後處理：確保表格完整性
         if self.keep_tables_together:
@@ -165,6 +172,55 @@ class ChunkSplitter:
         
         return final_chunks
     
+    def iter_chunks(self,
+                    input_data: Union[str, Path, ConversionResult],
+                    from_serialization: bool = False,
+                    lookahead: Optional[int] = None) -> Iterator[Document]:
+        """
+        依頁面串流產生分割後的 chunks
+        
+        每處理完一頁就返回該頁完成後處理的 chunks（表格合併、短 chunk 合併、排序與全局編號），
+        不需要等待整份文件分割完成，記憶體中只保留處理中的頁面。
+        短 chunk 只與同一頁的下一個 chunk 合併，因此每頁的後處理只需要該頁的 chunks，
+        結果與 split_markdown 相同（表格跨頁未閉合的特殊情況除外，串流時在頁面邊界結束）。
+        沒有頁面信息的輸入或啟用 split_across_pages 時無法分段，整份分割後再逐一返回。
+        
+        Args:
+            input_data: 輸入數據（MD文件 路徑、ConversionResult 對象或序列化文件路徑）
+            from_serialization: 是否從序列化文件載入 ConversionResult
+            lookahead: 使用進程池時同時處理中的頁面數量上限
+            
+        Yields:
+            Document: 依頁碼與頁面內順序排列的 chunk
+        """
+        if from_serialization and isinstance(input_data, (str, Path)):
+            input_data = self._load_from_serialization(input_data)
+        
+        if not (isinstance(input_data, ConversionResult) and input_data.pages) or self.split_across_pages:
+            yield from self.split_markdown(input_data)
+            return
+        
+        page_results = iter_pages(
+            self, '_split_page',
+            [(page, input_data.metadata) for page in input_data.pages],
+            max_workers=self.max_workers,
+            parallel_threshold=self.parallel_page_threshold,
+            lookahead=lookahead
+        )
+        
+        chunk_number = 0
+        for page_chunks, _ in page_results:
+            # 頁面內的後處理（與 _split_by_pages 的全域後處理相同的步驟）
+            if self.keep_tables_together:
+                page_chunks = self._postprocess_tables(page_chunks)
+            page_chunks = self._merge_short_chunks(page_chunks)
+            page_chunks = self._sort_chunks_by_page_and_order(page_chunks)
+            
+            for chunk in page_chunks:
+                chunk_number += 1
+                chunk.metadata['global_chunk_number'] = chunk_number
+                yield chunk
+    
     def _split_by_pages(self, 
                        conversion_result: ConversionResult,
                        output_excel: bool = False,
@@ -185,48 +241,21 @@ class ChunkSplitter:
         all_chunks = []
         page_chunks_info = []  # 儲存每頁的 chunks 信息
         
-        # 為每個頁面分割內容
-        for page in conversion_result.pages:
-            page_content = page.content
-            original_page_content = page_content  # 保存原始頁面內容
-            
-            # 正規化頁面內容
-            normalized_page_content = None
-            if self.normalize_output and self.normalizer:
-                normalized_page_content = self.normalizer.normalize_text(page_content)
-                page_content = normalized_page_content
-            
-            # 標記表格
-            if self.keep_tables_together:
-                page_content = self.table_handler.mark_tables(page_content)
-            
-            # 使用 MarkdownHeaderTextSplitter 分割頁面
-            page_splits = self.markdown_splitter.split_text(page_content)
+        # 為每個頁面分割內容（頁數足夠時分派到進程池，結果依頁面順序返回）
+        page_results = map_pages(
+            self, '_split_page',
+            [(page, conversion_result.metadata) for page in conversion_result.pages],
+            max_workers=self.max_workers,
+            parallel_threshold=self.parallel_page_threshold
+        )
             
-            # 對頁面分割結果進行進一步處理
-            page_chunks = []
-            chunk_order = 0  # 頁面內chunk順序
-            for doc in page_splits:
-                if len(doc.page_content) > self.chunk_size:
-                    # 如果太大，進一步分割
-                    sub_chunks = self.text_splitter.split_documents([doc])
-                    for sub_chunk in sub_chunks:
-                        # 為每個子 chunk 添加頁碼信息
-                        enhanced_chunk = self._enhance_chunk_with_page_info(sub_chunk, page, conversion_result, chunk_order)
-                        all_chunks.append(enhanced_chunk)
-                        page_chunks.append(enhanced_chunk)
-                        chunk_order += 1
-                else:
-                    # 直接添加頁碼信息
-                    enhanced_chunk = self._enhance_chunk_with_page_info(doc, page, conversion_result, chunk_order)
-                    all_chunks.append(enhanced_chunk)
-                    page_chunks.append(enhanced_chunk)
-                    chunk_order += 1
+        for page, (page_chunks, normalized_page_content) in zip(conversion_result.pages, page_results):
+            all_chunks.extend(page_chunks)
             
             # 儲存頁面 chunks 信息
             page_chunks_info.append({
                 'page_number': page.page_number,
-                'original_content': original_page_content,
+                'original_content': page.content,
                 'normalized_content': normalized_page_content,
                 'chunks': page_chunks
             })
@@ -289,6 +318,12 @@ class ChunkSplitter:
                         elif key.startswith('Header') and value and not merged_metadata[key]:
                             merged_metadata[key] = value
                     
+                    # 跨頁分割時合併兩者涵蓋的頁碼
+                    if 'page_numbers' in next_chunk.metadata:
+                        merged_metadata['page_numbers'] = sorted(
+                            set(merged_metadata.get('page_numbers', [])) | set(next_chunk.metadata['page_numbers'])
+                        )
+                    
                     # 創建合併後的 chunk
                     merged_chunk = Document(
                         page_content=merged_content,
@@ -308,7 +343,40 @@ class ChunkSplitter:
         logger.info(f"Merged short chunks: {len(chunks)} -> {len(merged_chunks)}")
         return merged_chunks
     
-    def _enhance_chunk_with_page_info(self, chunk: Document, page, conversion_result: ConversionResult, chunk_order: int = 0) -> Document:
+    def _split_page(self, page: PageInfo, file_metadata: ConversionMetadata) -> tuple[List[Document], Optional[str]]:
+        """
+        分割單一頁面（可在工作進程中執行）
+        
+        Args:
+            page: 頁面信息
+            file_metadata: 文件的轉換元數據
+            
+        Returns:
+            tuple[List[Document], Optional[str]]: (頁面的 chunks, 正規化後的頁面內容)
+        """
+        page_content = page.content
+        
+        # 正規化頁面內容
+        normalized_page_content = None
+        if self.normalize_output and self.normalizer:
+            normalized_page_content = self.normalizer.normalize_text(page_content)
+            page_content = normalized_page_content
+        
+        # 標記表格
+        if self.keep_tables_together:
+            page_content = self.table_handler.mark_tables(page_content)
+        
+        # 分割頁面（標題分割，過大的區段再依大小分割）
+        page_spans = self.span_splitter.split(page_content)
+        
+        # 為每個 chunk 添加頁碼信息（chunk_order 為頁面內 chunk 順序）
+        page_chunks = [
+            self._enhance_chunk_with_page_info(doc, page, file_metadata, chunk_order)
+            for chunk_order, doc in enumerate(self.span_splitter.to_documents(page_content, page_spans))
+        ]
+        return page_chunks, normalized_page_content
+    
+    def _enhance_chunk_with_page_info(self, chunk: Document, page, file_metadata: ConversionMetadata, chunk_order: int = 0) -> Document:
         """為 chunk 添加頁碼、頁面標題和文件信息"""
         enhanced_metadata = chunk.metadata.copy()
         
@@ -323,14 +391,14 @@ class ChunkSplitter:
         
         # 添加文件信息
         enhanced_metadata.update({
-            'file_name': conversion_result.metadata.file_name,
-            'file_type': conversion_result.metadata.file_type,
-            'source': conversion_result.metadata.file_path,
-            'converter_used': conversion_result.metadata.converter_used,
-            'total_pages': conversion_result.metadata.total_pages,
-            'total_tables': conversion_result.metadata.total_tables,
-            'file_size': conversion_result.metadata.file_size,
-            'conversion_timestamp': conversion_result.metadata.conversion_timestamp
+            'file_name': file_metadata.file_name,
+            'file_type': file_metadata.file_type,
+            'source': file_metadata.file_path,
+            'converter_used': file_metadata.converter_used,
+            'total_pages': file_metadata.total_pages,
+            'total_tables': file_metadata.total_tables,
+            'file_size': file_metadata.file_size,
+            'conversion_timestamp': file_metadata.conversion_timestamp
         })
         
         return Document(page_content=chunk.page_content, metadata=enhanced_metadata)
@@ -379,16 +447,13 @@ class ChunkSplitter:
                 'file_size': input_data.metadata.file_size,
                 'conversion_timestamp': input_data.metadata.conversion_timestamp
             }
-            
-            # 保存 ConversionResult 對象以便後續使用
-            self._conversion_result = input_data
         else:
             raise ValueError(f"Unsupported input type: {type(input_data)}")
         
         return content, metadata
     
     def _enhance_chunk_with_metadata(self, chunk: Document, base_metadata: Dict[str, Any]) -> Document:
-        """為單個 chunk 添加檔名和頁碼信息"""
+        """為單個 chunk 添加檔名信息（文件路徑輸入沒有頁面信息，不標記頁碼）"""
         enhanced_metadata = chunk.metadata.copy()
         
         # 添加檔名和基本信息
@@ -401,72 +466,99 @@ class ChunkSplitter:
             'total_tables': base_metadata.get('total_tables', 0)
         })
         
-        # 如果有 ConversionResult，嘗試推斷頁碼
-        if hasattr(self, '_conversion_result') and self._conversion_result:
-            page_number = self._estimate_page_number(chunk.page_content)
-            if page_number:
-                enhanced_metadata['page_number'] = page_number
-        
         return Document(page_content=chunk.page_content, metadata=enhanced_metadata)
     
     def _enhance_chunks_with_metadata(self, chunks: List[Document], base_metadata: Dict[str, Any]) -> List[Document]:
-        """為多個 chunks 添加檔名和頁碼信息"""
+        """為多個 chunks 添加檔名信息"""
         enhanced_chunks = []
         for chunk in chunks:
             enhanced_chunk = self._enhance_chunk_with_metadata(chunk, base_metadata)
             enhanced_chunks.append(enhanced_chunk)
         return enhanced_chunks
     
-    def _estimate_page_number(self, content: str) -> Optional[int]:
-        """根據內容推斷頁碼"""
-        if not hasattr(self, '_conversion_result') or not self._conversion_result:
-            return None
-        
-        # 如果有頁面信息，嘗試匹配內容
-        if self._conversion_result.pages:
-            best_match = None
-            best_score = 0
+    def _split_across_pages(self,
+                            conversion_result: ConversionResult,
+                            output_excel: bool = False,
+                            output_path: Optional[str] = None,
+                            md_output_path: Optional[str] = None) -> List[Document]:
+        """
+        將有頁面信息的 ConversionResult 當作連續文字分割
+        
+        各頁面先分別正規化與標記表格，再以頁面分隔字串合併並記錄每頁的起始偏移；
+        不需要轉換時直接使用轉換時記錄的偏移。分割後以二分搜尋將每個 chunk 的偏移範圍對應到頁碼，
+        跨頁的 chunk 以第一頁為 page_number，並在 page_numbers 列出所有涵蓋的頁面。
             
-            for page in self._conversion_result.pages:
-                # 計算內容相似度
-                score = self._calculate_content_similarity(content, page.content)
-                if score > best_score and score > 0.3:  # 閾值設為30%
-                    best_score = score
-                    best_match = page.page_number
+        Args:
+            conversion_result: ConversionResult 對象
+            output_excel: 是否輸出 Excel 文件
+            output_path: Excel 輸出路徑
+            md_output_path: Markdown 輸出路徑
             
-            return best_match
+        Returns:
+            List[Document]: 分割後的文檔列表
+        """
+        pages = conversion_result.pages
+        page_index = None
+        
+        normalize = self.normalize_output and self.normalizer
+        if not normalize and not self.keep_tables_together:
+            markdown_content = conversion_result.content
+            page_index = PageOffsetIndex.from_conversion_result(conversion_result)
+        
+        if page_index is None:
+            page_contents = [page.content for page in pages]
+            if normalize:
+                page_contents = self.normalizer.normalize_many(page_contents, max_workers=self.max_workers,
+                                                               parallel_threshold=self.parallel_page_threshold)
+            if self.keep_tables_together:
+                page_contents = [self.table_handler.mark_tables(content) for content in page_contents]
+            markdown_content, offsets = join_pages(page_contents)
+            page_index = PageOffsetIndex(offsets, [len(content) for content in page_contents],
+                                         [page.page_number for page in pages])
         
-        return None
-    
-    def _calculate_content_similarity(self, content1: str, content2: str) -> float:
-        """計算兩個內容的相似度"""
-        if not content1 or not content2:
-            return 0.0
+        # 標題分割與大小分割（區段是合併內容上的偏移範圍）
+        spans = self.span_splitter.split(markdown_content)
+        documents = self.span_splitter.to_documents(markdown_content, spans)
+        
+        pages_by_number = {page.page_number: page for page in pages}
+        final_chunks = []
+        for chunk_order, (span, doc) in enumerate(zip(spans, documents)):
+            page_numbers = page_index.pages_for_range(span.start, span.end) or [page_index.page_at(span.start)]
+            page = pages_by_number.get(page_numbers[0]) or pages[-1]
+            chunk = self._enhance_chunk_with_page_info(doc, page, conversion_result.metadata, chunk_order)
+            chunk.metadata['page_numbers'] = [number for number in page_numbers if number is not None] or [page.page_number]
+            final_chunks.append(chunk)
+        
+        # 後處理：確保表格完整性
+        if self.keep_tables_together:
+            final_chunks = self._postprocess_tables(final_chunks)
+        
+        # 合併過短的 chunks（通常是標題）
+        final_chunks = self._merge_short_chunks(final_chunks)
         
-        # 提取關鍵詞進行匹配
-        words1 = set(content1.lower().split())
-        words2 = set(content2.lower().split())
+        # 按頁碼和chunk順序排序
+        final_chunks = self._sort_chunks_by_page_and_order(final_chunks)
         
-        if not words1 or not words2:
-            return 0.0
+        logger.info(f"Split {len(pages)} pages as continuous text into {len(final_chunks)} chunks")
         
-        # 計算交集和聯集
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
+        # 輸出處理
+        if output_excel:
+            self._export_to_excel(final_chunks, conversion_result.content, output_path)
         
-        # Jaccard 相似度
-        if len(union) == 0:
-            return 0.0
+        if md_output_path:
+            self._export_to_markdown(final_chunks, md_output_path)
         
-        return len(intersection) / len(union)
+        return final_chunks
     
     def _postprocess_tables(self, chunks: List[Document]) -> List[Document]:
         """後處理表格，確保表格完整性"""
         # 分離表格和一般 chunks
         table_chunks, regular_chunks = self.table_handler.extract_table_chunks(chunks)
         
-        # 合併表格 chunks
-        merged_table_chunks = self.table_handler.merge_table_chunks(table_chunks)
+        # 合併表格 chunks（超過 chunk_size 的表格依表格行分組並重複表頭）
+        merged_table_chunks = self.table_handler.merge_table_chunks(
+            table_chunks, max_chunk_size=self.chunk_size, length_function=self.length_function
+        )
         
         # 清理一般 chunks 中的表格標記
         cleaned_regular_chunks = []
@@ -592,22 +684,13 @@ class ChunkSplitter:
         if self.keep_tables_together:
             markdown_content = self.table_handler.mark_tables(markdown_content)
         
-        # 使用 MarkdownHeaderTextSplitter 進行初步分割
-        header_splits = self.markdown_splitter.split_text(markdown_content)
+        # 標題分割與大小分割（區段是 markdown_content 上的偏移範圍）
+        spans = self.span_splitter.split(markdown_content)
         
-        # 對每個分割後的文檔進行進一步分割
-        final_chunks = []
-        for doc in header_splits:
-            # 如果文檔太大，使用 RecursiveCharacterTextSplitter 進一步分割
-            if len(doc.page_content) > self.chunk_size:
-                sub_chunks = self.text_splitter.split_documents([doc])
-                # 為每個子 chunk 添加基本 metadata（無頁碼）
-                enhanced_sub_chunks = self._enhance_chunks_without_pages(sub_chunks, conversion_result)
-                final_chunks.extend(enhanced_sub_chunks)
-            else:
-                # 為單個 chunk 添加基本 metadata（無頁碼）
-                enhanced_chunk = self._enhance_chunk_without_pages(doc, conversion_result)
-                final_chunks.append(enhanced_chunk)
+        # 為每個 chunk 添加基本 metadata（無頁碼）
+        final_chunks = self._enhance_chunks_without_pages(
+            self.span_splitter.to_documents(markdown_content, spans), conversion_result
+        )
         
         # 後處理：確保表格完整性
         if self.keep_tables_together:
@@ -0,0 +1,102 @@
+"""
+分層分割結果導航效能測試
+
+建立不同大小的 HierarchicalSplitResult，測量 get_parent_of_child、get_children_of_parent
+與 get_neighbor_window 每次查詢的平均時間，並與原本逐一掃描列表的查詢方式比較。
+使用索引後，查詢時間不隨 chunk 數量增加（建立索引的時間只在第一次查詢時發生一次）。
+
+執行方式：
+    python service/chunk/examples/navigation_benchmark.py
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# 添加路徑到 Python 路徑
+current_dir = Path(__file__).parent
+project_root = current_dir.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.documents import Document
+
+from service.chunk.hierarchical_models import ParentChunk, ChildChunk, GroupingAnalysis, HierarchicalSplitResult
+
+CHILDREN_PER_PARENT = 5
+SIZES = [1_000, 5_000, 20_000, 50_000]
+LOOKUPS = 1_000
+# 逐一掃描的查詢太慢，只在較小的結果上比較
+LINEAR_SCAN_LIMIT = 20_000
+
+
+def build_result(child_count: int) -> HierarchicalSplitResult:
+    """建立指定子chunk數量的分割結果"""
+    parent_chunks = []
+    child_chunks = []
+    for parent_index in range(child_count // CHILDREN_PER_PARENT):
+        parent_id = f"parent_{parent_index:08x}"
+        metadata = {'page_number': parent_index // 4 + 1}
+        parent_chunks.append(ParentChunk(
+            document=Document(page_content=f"第{parent_index}段", metadata=metadata),
+            chunk_id=parent_id, parent_index=parent_index
+        ))
+        for child_index in range(CHILDREN_PER_PARENT):
+            child_chunks.append(ChildChunk(
+                document=Document(page_content=f"第{parent_index}段第{child_index}句", metadata=metadata),
+                chunk_id=f"child_{parent_index:08x}_{child_index}", parent_chunk_id=parent_id,
+                child_index=child_index
+            ))
+    analysis = GroupingAnalysis(
+        total_parent_chunks=len(parent_chunks), total_child_chunks=len(child_chunks),
+        avg_children_per_parent=0, parent_size_stats={}, child_size_stats={},
+        table_handling_stats={}, grouping_efficiency=0, size_distribution={}
+    )
+    return HierarchicalSplitResult(parent_chunks=parent_chunks, child_chunks=child_chunks, grouping_analysis=analysis)
+
+
+def linear_parent_of_child(result: HierarchicalSplitResult, child_chunk_id: str):
+    """原本的查詢方式：兩次逐一掃描"""
+    child = next((chunk for chunk in result.child_chunks if chunk.chunk_id == child_chunk_id), None)
+    if child is None:
+        return None
+    return next((chunk for chunk in result.parent_chunks if chunk.chunk_id == child.parent_chunk_id), None)
+
+
+def measure(func, ids) -> float:
+    """每次查詢的平均時間（微秒）"""
+    start = time.perf_counter()
+    for chunk_id in ids:
+        func(chunk_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def main():
+    """主程式"""
+    random.seed(0)
+    print(f"{'children':>10} {'index build ms':>15} {'parent_of_child us':>19} "
+          f"{'children_of_parent us':>22} {'neighbor_window us':>19} {'linear scan us':>15}")
+    
+    for size in SIZES:
+        result = build_result(size)
+        child_ids = [chunk.chunk_id for chunk in random.sample(result.child_chunks, min(LOOKUPS, len(result.child_chunks)))]
+        parent_ids = [chunk.chunk_id for chunk in random.sample(result.parent_chunks, min(LOOKUPS, len(result.parent_chunks)))]
+        
+        start = time.perf_counter()
+        result.get_parent_of_child(child_ids[0])
+        build_ms = (time.perf_counter() - start) * 1e3
+        
+        parent_of_child = measure(result.get_parent_of_child, child_ids)
+        children_of_parent = measure(result.get_children_of_parent, parent_ids)
+        neighbor_window = measure(lambda chunk_id: result.get_neighbor_window(chunk_id, before=2, after=2), child_ids)
+        
+        linear = "-"
+        if size <= LINEAR_SCAN_LIMIT:
+            linear = f"{measure(lambda chunk_id: linear_parent_of_child(result, chunk_id), child_ids[:200]):.1f}"
+        
+        print(f"{size:>10} {build_ms:>15.1f} {parent_of_child:>19.2f} "
+              f"{children_of_parent:>22.2f} {neighbor_window:>19.2f} {linear:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,123 +4,432 @@
 定義分層分割過程中使用的資料結構，以清楚表達中間傳遞的資料物件。
 """
 
-from typing import List, Dict, Any, Optional
+import weakref
+from collections.abc import MutableMapping
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from dataclasses import dataclass, field
 from langchain_core.documents import Document
 from datetime import datetime
 
+from .table_scanner import scan_tables
 
-@dataclass
-class ParentChunk:
+
+# 文件層級的元數據欄位（同一份文件的所有 chunk 共用，只保存一份）
+DOCUMENT_CONTEXT_FIELDS = (
+    'source', 'file_name', 'file_type', 'converter_used', 'total_pages',
+    'total_tables', 'file_size', 'conversion_timestamp'
+)
+
+# 標題元數據欄位（依優先級排列）
+HEADER_LEVELS = ('Header 1', 'Header 2', 'Header 3', 'Header 4')
+
+# 標題路徑：((標題層級, 標題文字), ...)
+HeaderPath = Tuple[Tuple[str, str], ...]
+
+# chunk 建立或元數據被修改時遞增，導航索引以此判斷建立後是否有 chunk 變動
+_chunk_generation = 0
+
+
+def _chunks_changed() -> None:
+    """記錄有 chunk 被建立或修改"""
+    global _chunk_generation
+    _chunk_generation += 1
+
+
+class DocumentContext:
+    """
+    同一份文件所有 chunk 共用的文件層級元數據與標題表
+    
+    相同欄位值的 context 只建立一次（intern），chunk 只保存 context 的參考與標題路徑在標題表中的編號。
+    """
+    
+    __slots__ = ('fields', 'header_paths', '_header_ids', '__weakref__')
+    
+    _interned: "weakref.WeakValueDictionary[tuple, DocumentContext]" = weakref.WeakValueDictionary()
+    
+    def __init__(self, fields: Dict[str, Any]):
+        self.fields = dict(fields)
+        self.header_paths: List[HeaderPath] = [()]
+        self._header_ids: Dict[HeaderPath, int] = {(): 0}
+    
+    @classmethod
+    def intern(cls, fields: Dict[str, Any]) -> 'DocumentContext':
+        """
+        取得欄位值相同的共用 context（只保留 DOCUMENT_CONTEXT_FIELDS 中的欄位）
+        
+        Args:
+            fields: 文件層級元數據
+        
+        Returns:
+            DocumentContext: 共用的 context
+        """
+        key = tuple((name, fields[name]) for name in DOCUMENT_CONTEXT_FIELDS if name in fields)
+        try:
+            context = cls._interned.get(key)
+        except TypeError:
+            # 欄位值無法雜湊時不共用
+            return cls(dict(key))
+        if context is None:
+            context = cls(dict(key))
+            cls._interned[key] = context
+        return context
+    
+    def header_id(self, header_path: HeaderPath) -> int:
+        """取得標題路徑在標題表中的編號（新的路徑加到標題表末端）"""
+        header_id = self._header_ids.get(header_path)
+        if header_id is None:
+            header_id = len(self.header_paths)
+            self.header_paths.append(header_path)
+            self._header_ids[header_path] = header_id
+        return header_id
+    
+    def __reduce__(self):
+        # 傳到其他進程時重新 intern（標題表不隨 context 傳遞，chunk 以標題路徑重新取得編號）
+        return DocumentContext.intern, (self.fields,)
+    
+    def __repr__(self) -> str:
+        return f"DocumentContext({self.fields!r}, headers={len(self.header_paths) - 1})"
+
+
+def split_metadata(metadata: Dict[str, Any]) -> Tuple[DocumentContext, HeaderPath, Optional[Dict[str, Any]]]:
+    """
+    將元數據拆成共用的文件 context、標題路徑與 chunk 自身的欄位
+    
+    Args:
+        metadata: 完整的 chunk 元數據
+    
+    Returns:
+        Tuple[DocumentContext, HeaderPath, Optional[Dict[str, Any]]]: (context, 標題路徑, 其他欄位，沒有時為 None)
+    """
+    context = DocumentContext.intern(metadata)
+    header_path = tuple((level, metadata[level]) for level in HEADER_LEVELS if level in metadata)
+    extra = {key: value for key, value in metadata.items()
+             if key not in context.fields and key not in HEADER_LEVELS}
+    return context, header_path, extra or None
+
+
+def _merge_metadata(document: Document, page_number: Optional[int],
+                    metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """合併 document.metadata、附加的元數據與頁碼"""
+    merged = dict(document.metadata)
+    if metadata:
+        merged.update(metadata)
+    if page_number is not None:
+        merged['page_number'] = page_number
+    return merged
+
+
+class ChunkMetadata(MutableMapping):
+    """
+    chunk 元數據的檢視
+    
+    依序合併標題、文件 context 與 chunk 自身的欄位；寫入只影響 chunk 自身的欄位，不會改到共用的 context。
+    """
+    
+    __slots__ = ('_chunk',)
+    
+    def __init__(self, chunk: '_ChunkRecord'):
+        self._chunk = chunk
+    
+    def __getitem__(self, key: str) -> Any:
+        chunk = self._chunk
+        if chunk.extra is not None and key in chunk.extra:
+            return chunk.extra[key]
+        for level, text in chunk.header_path:
+            if level == key:
+                return text
+        return chunk.context.fields[key]
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        chunk = self._chunk
+        if chunk.extra is None:
+            chunk.extra = {}
+        chunk.extra[key] = value
+        _chunks_changed()
+    
+    def __delitem__(self, key: str) -> None:
+        chunk = self._chunk
+        _chunks_changed()
+        if chunk.extra is not None and key in chunk.extra and \
+                key not in chunk.context.fields and key not in dict(chunk.header_path):
+            del chunk.extra[key]
+            return
+        # 刪除共用欄位：改為完整保存在 chunk 自身
+        metadata = dict(self)
+        del metadata[key]
+        chunk.context = DocumentContext.intern({})
+        chunk.header_id = 0
+        chunk.extra = metadata or None
+    
+    def __iter__(self) -> Iterator[str]:
+        extra = self._chunk.extra or {}
+        for level, _ in self._chunk.header_path:
+            if level not in extra:
+                yield level
+        for key in self._chunk.context.fields:
+            if key not in extra:
+                yield key
+        yield from extra
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def copy(self) -> Dict[str, Any]:
+        """複製為一般的 dict"""
+        return dict(self)
+    
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _ChunkRecord:
+    """
+    分層 chunk 的共用部分
+    
+    內容以字串保存，元數據拆成共用的 DocumentContext、標題編號與 chunk 自身的少數欄位；
+    LangChain Document 只在存取 document 時才建立。
+    """
+    
+    __slots__ = ('chunk_id', 'content', 'size', 'context', 'header_id', 'extra')
+    
+    def _set_metadata(self, metadata: Dict[str, Any]) -> None:
+        """由完整元數據設定 context、標題編號與 chunk 自身的欄位"""
+        context, header_path, extra = split_metadata(metadata)
+        self.context = context
+        self.header_id = context.header_id(header_path)
+        self.extra = extra
+        _chunks_changed()
+    
+    @property
+    def header_path(self) -> HeaderPath:
+        """標題路徑"""
+        return self.context.header_paths[self.header_id]
+    
+    @property
+    def metadata(self) -> ChunkMetadata:
+        """元數據（可寫入的檢視）"""
+        return ChunkMetadata(self)
+    
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]) -> None:
+        self._set_metadata(dict(value))
+    
+    @property
+    def document(self) -> Document:
+        """LangChain Document（每次存取時建立）"""
+        return Document(page_content=self.content, metadata=dict(self.metadata))
+    
+    @document.setter
+    def document(self, value: Document) -> None:
+        self.content = value.page_content
+        self._set_metadata(value.metadata)
+    
+    @property
+    def page_number(self) -> Optional[int]:
+        """頁碼"""
+        return self.metadata.get('page_number')
+    
+    def _first_header(self) -> Tuple[Optional[str], Optional[str]]:
+        """依優先級返回第一個有值的 (標題層級, 標題文字)"""
+        headers = dict(self.header_path)
+        if self.extra:
+            headers.update((level, self.extra[level]) for level in HEADER_LEVELS if level in self.extra)
+        for level in HEADER_LEVELS:
+            if headers.get(level):
+                return level, headers[level]
+        return None, None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """以 dict 表示 chunk 的所有欄位、內容與完整元數據"""
+        data = {name: getattr(self, name) for name in self._FIELDS}
+        data['content'] = self.content
+        data['metadata'] = dict(self.metadata)
+        return data
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # 標題以路徑傳遞，接收端以自己的標題表重新編號
+        state = {name: getattr(self, name) for name in self.__slots__ + _ChunkRecord.__slots__}
+        state['header_id'] = self.header_path
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.header_id = self.context.header_id(state['header_id'])
+        _chunks_changed()
+    
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(chunk_id={self.chunk_id!r}, size={self.size}, content={self.content[:30]!r})"
+
+
+class ParentChunk(_ChunkRecord):
     """父層Chunk資料模型"""
-    document: Document
-    chunk_id: str
-    parent_index: int
-    size: int
-    has_tables: bool = False
-    table_count: int = 0
-    header_level: Optional[str] = None
-    header_text: Optional[str] = None
-    page_number: Optional[int] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
     
-    def __post_init__(self):
-        """初始化後處理"""
-        self.size = len(self.document.page_content)
-        self.metadata = self.document.metadata.copy()
+    __slots__ = ('parent_index', 'has_tables', 'table_count')
+    
+    _FIELDS = ('chunk_id', 'parent_index', 'size', 'has_tables', 'table_count',
+               'header_level', 'header_text', 'page_number')
+    
+    def __init__(self,
+                 document: Document,
+                 chunk_id: str,
+                 parent_index: int,
+                 table_count: int = 0,
+                 page_number: Optional[int] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """
+        初始化父chunk（大小、表格與標題信息由 document 內容計算）
+        
+        Args:
+            document: chunk 的內容與元數據
+            chunk_id: chunk ID
+            parent_index: 父chunk 序號
+            table_count: 表格數量（內容包含表格時重新計算）
+            page_number: 頁碼，指定時覆蓋元數據中的頁碼
+            metadata: 附加的元數據，與 document.metadata 合併（同名欄位以此為準）
+        """
+        context, header_path, extra = split_metadata(_merge_metadata(document, page_number, metadata))
+        self._init_record(document.page_content, context, context.header_id(header_path), extra,
+                          chunk_id, parent_index, table_count)
+    
+    @classmethod
+    def from_parts(cls, content: str, context: DocumentContext, header_id: int,
+                   extra: Optional[Dict[str, Any]], chunk_id: str, parent_index: int,
+                   table_count: int = 0) -> 'ParentChunk':
+        """由內容與已拆分的元數據建立父chunk（不建立 Document）"""
+        chunk = cls.__new__(cls)
+        chunk._init_record(content, context, header_id, extra, chunk_id, parent_index, table_count)
+        return chunk
+    
+    def _init_record(self, content: str, context: DocumentContext, header_id: int,
+                     extra: Optional[Dict[str, Any]], chunk_id: str, parent_index: int, table_count: int) -> None:
+        """設定欄位並計算大小與表格信息"""
+        _chunks_changed()
+        self.chunk_id = chunk_id
+        self.parent_index = parent_index
+        self.content = content
+        self.size = len(content)
+        self.context = context
+        self.header_id = header_id
+        self.extra = extra
+        self.table_count = table_count
         
         # 檢查是否包含表格
         self.has_tables = self._detect_tables()
         if self.has_tables:
             self.table_count = self._count_tables()
-        
-        # 提取標題信息
-        self._extract_header_info()
     
     def _detect_tables(self) -> bool:
-        """檢測是否包含表格"""
-        content = self.document.page_content
-        return "<!-- TABLE_START -->" in content or "|" in content
+        """檢測是否包含表格（表格標記或掃描到的表格）"""
+        content = self.content
+        return "<!-- TABLE_START -->" in content or bool(scan_tables(content))
     
     def _count_tables(self) -> int:
-        """計算表格數量"""
-        content = self.document.page_content
-        return content.count("<!-- TABLE_START -->")
+        """計算表格數量（有表格標記時依標記計算，標記已清除時依掃描結果）"""
+        marker_count = self.content.count("<!-- TABLE_START -->")
+        return marker_count or len(scan_tables(self.content))
     
-    def _extract_header_info(self):
-        """提取標題信息"""
-        metadata = self.document.metadata
-        
-        # 按優先級查找標題
-        for level in ['Header 1', 'Header 2', 'Header 3', 'Header 4']:
-            if level in metadata and metadata[level]:
-                self.header_level = level
-                self.header_text = metadata[level]
-                break
-        
-        # 提取頁碼
-        self.page_number = metadata.get('page_number')
+    @property
+    def header_level(self) -> Optional[str]:
+        """最高層級的標題層級"""
+        return self._first_header()[0]
+    
+    @property
+    def header_text(self) -> Optional[str]:
+        """最高層級的標題文字"""
+        return self._first_header()[1]
 
 
-@dataclass
-class ChildChunk:
+class ChildChunk(_ChunkRecord):
     """子層Chunk資料模型"""
-    document: Document
-    chunk_id: str
-    parent_chunk_id: str
-    child_index: int
-    size: int
-    is_table_chunk: bool = False
-    table_info: Optional[Dict[str, Any]] = None
-    parent_header: Optional[str] = None
-    page_number: Optional[int] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
     
-    def __post_init__(self):
-        """初始化後處理"""
-        self.size = len(self.document.page_content)
-        self.metadata = self.document.metadata.copy()
+    __slots__ = ('parent_chunk_id', 'child_index', 'is_table_chunk', 'table_info')
+    
+    _FIELDS = ('chunk_id', 'parent_chunk_id', 'child_index', 'size', 'is_table_chunk',
+               'table_info', 'parent_header', 'page_number')
+    
+    def __init__(self,
+                 document: Document,
+                 chunk_id: str,
+                 parent_chunk_id: str,
+                 child_index: int,
+                 table_info: Optional[Dict[str, Any]] = None,
+                 page_number: Optional[int] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        """
+        初始化子chunk（大小與表格信息由 document 內容計算）
+        
+        Args:
+            document: chunk 的內容與元數據
+            chunk_id: chunk ID
+            parent_chunk_id: 父chunk ID
+            child_index: 在父chunk 中的序號
+            table_info: 表格信息（內容包含表格時重新分析）
+            page_number: 頁碼，指定時覆蓋元數據中的頁碼
+            metadata: 附加的元數據，與 document.metadata 合併（同名欄位以此為準）
+        """
+        context, header_path, extra = split_metadata(_merge_metadata(document, page_number, metadata))
+        self._init_record(document.page_content, context, context.header_id(header_path), extra,
+                          chunk_id, parent_chunk_id, child_index, table_info)
+    
+    @classmethod
+    def from_parent(cls, parent_chunk: ParentChunk, content: str, chunk_id: str, child_index: int) -> 'ChildChunk':
+        """建立父chunk 的子chunk（共用父chunk 的 context 與標題，不建立 Document）"""
+        chunk = cls.__new__(cls)
+        extra = dict(parent_chunk.extra) if parent_chunk.extra else None
+        chunk._init_record(content, parent_chunk.context, parent_chunk.header_id, extra,
+                           chunk_id, parent_chunk.chunk_id, child_index, None)
+        return chunk
+    
+    def _init_record(self, content: str, context: DocumentContext, header_id: int,
+                     extra: Optional[Dict[str, Any]], chunk_id: str, parent_chunk_id: str,
+                     child_index: int, table_info: Optional[Dict[str, Any]]) -> None:
+        """設定欄位並計算大小與表格信息"""
+        _chunks_changed()
+        self.chunk_id = chunk_id
+        self.parent_chunk_id = parent_chunk_id
+        self.child_index = child_index
+        self.content = content
+        self.size = len(content)
+        self.context = context
+        self.header_id = header_id
+        self.extra = extra
+        self.table_info = table_info
         
         # 檢查是否為表格chunk
         self.is_table_chunk = self._detect_table_chunk()
         if self.is_table_chunk:
             self.table_info = self._analyze_table_info()
-        
-        # 提取父層標題
-        self.parent_header = self._extract_parent_header()
-        
-        # 提取頁碼
-        self.page_number = self.metadata.get('page_number')
     
     def _detect_table_chunk(self) -> bool:
-        """檢測是否為表格chunk"""
-        content = self.document.page_content
-        return "<!-- TABLE_START -->" in content or "|" in content
+        """檢測是否為表格chunk（表格標記或掃描到的表格）"""
+        content = self.content
+        return "<!-- TABLE_START -->" in content or bool(scan_tables(content))
     
     def _analyze_table_info(self) -> Dict[str, Any]:
-        """分析表格信息"""
-        content = self.document.page_content
-        
-        # 計算表格行數
-        lines = content.split('\n')
-        table_lines = [line for line in lines if '|' in line and line.strip()]
+        """分析表格信息（與檢測共用同一次掃描結果）"""
+        content = self.content
+        tables = scan_tables(content)
         
         return {
-            'row_count': len(table_lines),
-            'has_header': any('---' in line for line in lines),
+            'row_count': sum(table.row_count for table in tables),
+            'column_count': max((table.column_count for table in tables), default=0),
+            'table_count': len(tables),
+            'has_header': any(table.has_header for table in tables),
             'table_markers': content.count("<!-- TABLE_START -->")
         }
     
-    def _extract_parent_header(self) -> Optional[str]:
-        """提取父層標題"""
-        metadata = self.document.metadata
-        
-        # 按優先級查找標題
-        for level in ['Header 1', 'Header 2', 'Header 3', 'Header 4']:
-            if level in metadata and metadata[level]:
-                return metadata[level]
-        
-        return None
+    @property
+    def parent_header(self) -> Optional[str]:
+        """父層標題（最高層級的標題文字）"""
+        return self._first_header()[1]
 
 
 @dataclass
@@ -144,6 +453,44 @@ class GroupingAnalysis:
         )
 
 
+class HierarchicalResultIndex:
+    """
+    HierarchicalSplitResult 的導航索引（記錄 chunk 在列表中的位置）
+    
+    索引保存建立時的 chunk 列表、長度與 chunk 變動計數：列表被替換或增減、
+    建立了新的 chunk（例如就地替換列表中的元素）或修改了元數據（例如頁碼）時視為失效並重建。
+    """
+    
+    def __init__(self, parent_chunks: List[ParentChunk], child_chunks: List[ChildChunk]):
+        self.parent_chunks = parent_chunks
+        self.child_chunks = child_chunks
+        self.parent_count = len(parent_chunks)
+        self.child_count = len(child_chunks)
+        self.generation = _chunk_generation
+        
+        self.parent_rows: Dict[str, int] = {chunk.chunk_id: row for row, chunk in enumerate(parent_chunks)}
+        self.child_rows: Dict[str, int] = {chunk.chunk_id: row for row, chunk in enumerate(child_chunks)}
+        
+        # 父chunk → 依列表順序的子chunk 列號；子chunk 在兄弟之間的位置
+        self.children_rows: Dict[str, List[int]] = {}
+        self.sibling_positions: List[int] = []
+        for row, chunk in enumerate(child_chunks):
+            rows = self.children_rows.setdefault(chunk.parent_chunk_id, [])
+            self.sibling_positions.append(len(rows))
+            rows.append(row)
+        
+        # 頁碼 → 父chunk 列號
+        self.page_rows: Dict[Optional[int], List[int]] = {}
+        for row, chunk in enumerate(parent_chunks):
+            self.page_rows.setdefault(chunk.page_number, []).append(row)
+    
+    def matches(self, parent_chunks: List[ParentChunk], child_chunks: List[ChildChunk]) -> bool:
+        """索引是否仍對應目前的 chunk 列表"""
+        return (self.parent_chunks is parent_chunks and self.child_chunks is child_chunks and
+                self.parent_count == len(parent_chunks) and self.child_count == len(child_chunks) and
+                self.generation == _chunk_generation)
+
+
 @dataclass
 class HierarchicalSplitResult:
     """分層分割結果資料模型"""
@@ -152,21 +499,41 @@ class HierarchicalSplitResult:
     grouping_analysis: GroupingAnalysis
     processing_metadata: Dict[str, Any] = field(default_factory=dict)
     
+    def _get_index(self, rebuild: bool = False) -> HierarchicalResultIndex:
+        """取得導航索引（第一次使用或 chunk 列表變動後才建立）"""
+        index = getattr(self, '_index', None)
+        parent_chunks = self.parent_chunks
+        child_chunks = self.child_chunks
+        if rebuild or index is None or not index.matches(parent_chunks, child_chunks):
+            index = HierarchicalResultIndex(parent_chunks, child_chunks)
+            self._index = index
+        return index
+    
+    def invalidate_indexes(self) -> None:
+        """直接修改 chunk ID 或父chunk ID 後，強制下次查詢重建索引"""
+        self._index = None
+    
+    def _find_row(self, chunk_id: str, is_parent: bool) -> Optional[int]:
+        """查詢 chunk 的列號（找到的 chunk ID 不符時表示 ID 被直接修改，重建後再查一次）"""
+        index = self._get_index()
+        chunks = index.parent_chunks if is_parent else index.child_chunks
+        row = (index.parent_rows if is_parent else index.child_rows).get(chunk_id)
+        if row is not None and chunks[row].chunk_id != chunk_id:
+            index = self._get_index(rebuild=True)
+            row = (index.parent_rows if is_parent else index.child_rows).get(chunk_id)
+        return row
+    
     def get_chunk_by_id(self, chunk_id: str, is_parent: bool = True) -> Optional[ParentChunk | ChildChunk]:
         """根據ID獲取chunk"""
-        if is_parent:
-            for chunk in self.parent_chunks:
-                if chunk.chunk_id == chunk_id:
-                    return chunk
-        else:
-            for chunk in self.child_chunks:
-                if chunk.chunk_id == chunk_id:
-                    return chunk
-        return None
+        row = self._find_row(chunk_id, is_parent)
+        if row is None:
+            return None
+        return self.parent_chunks[row] if is_parent else self.child_chunks[row]
     
     def get_children_of_parent(self, parent_chunk_id: str) -> List[ChildChunk]:
         """獲取指定父chunk的所有子chunk"""
-        return [child for child in self.child_chunks if child.parent_chunk_id == parent_chunk_id]
+        index = self._get_index()
+        return [self.child_chunks[row] for row in index.children_rows.get(parent_chunk_id, [])]
     
     def get_parent_of_child(self, child_chunk_id: str) -> Optional[ParentChunk]:
         """獲取指定子chunk的父chunk"""
@@ -174,6 +541,87 @@ class HierarchicalSplitResult:
         if child_chunk:
             return self.get_chunk_by_id(child_chunk.parent_chunk_id, is_parent=True)
         return None
+    
+    def get_parents_on_page(self, page_number: Optional[int]) -> List[ParentChunk]:
+        """獲取指定頁面的所有父chunk（依文件順序）"""
+        index = self._get_index()
+        return [self.parent_chunks[row] for row in index.page_rows.get(page_number, [])]
+    
+    def get_previous_sibling(self, chunk_id: str) -> Optional[ParentChunk | ChildChunk]:
+        """獲取前一個兄弟chunk（父chunk 為前一個父chunk，子chunk 為同一父chunk 的前一個子chunk）"""
+        window = self.get_neighbor_window(chunk_id, before=1, after=0)
+        return window[0] if len(window) == 2 else None
+    
+    def get_next_sibling(self, chunk_id: str) -> Optional[ParentChunk | ChildChunk]:
+        """獲取下一個兄弟chunk（父chunk 為下一個父chunk，子chunk 為同一父chunk 的下一個子chunk）"""
+        window = self.get_neighbor_window(chunk_id, before=0, after=1)
+        return window[-1] if len(window) == 2 else None
+    
+    def get_neighbor_window(self, chunk_id: str, before: int = 1, after: int = 1,
+                            within_parent: bool = True) -> List[ParentChunk | ChildChunk]:
+        """
+        獲取 chunk 及其前後相鄰的 chunk（檢索命中後擴展上下文）
+        
+        Args:
+            chunk_id: 父chunk 或子chunk ID
+            before: 向前擴展的 chunk 數量
+            after: 向後擴展的 chunk 數量
+            within_parent: 子chunk 是否只在同一父chunk 內擴展（False 時依全部子chunk 的順序擴展）
+            
+        Returns:
+            List[ParentChunk | ChildChunk]: 依文件順序排列的 chunks，找不到 chunk 時返回空列表
+        """
+        index = self._get_index()
+        if chunk_id in index.parent_rows:
+            row = self._find_row(chunk_id, is_parent=True)
+            if row is not None:
+                return self.parent_chunks[max(0, row - before):row + after + 1]
+        
+        row = self._find_row(chunk_id, is_parent=False)
+        if row is None:
+            return []
+        if not within_parent:
+            return self.child_chunks[max(0, row - before):row + after + 1]
+        
+        parent_chunk_id = self.child_chunks[row].parent_chunk_id
+        index = self._get_index()
+        siblings = index.children_rows.get(parent_chunk_id, [])
+        position = index.sibling_positions[row]
+        if position >= len(siblings) or siblings[position] != row:
+            # 父chunk ID 被直接修改
+            index = self._get_index(rebuild=True)
+            siblings = index.children_rows[parent_chunk_id]
+            position = index.sibling_positions[row]
+        return [self.child_chunks[sibling_row]
+                for sibling_row in siblings[max(0, position - before):position + after + 1]]
+
+
+@dataclass
+class HierarchicalSplitDiff:
+    """兩次分層分割結果的差異（依 chunk ID 比較，ID 包含內容雜湊值，ID 相同即內容相同）"""
+    added_parents: List[ParentChunk] = field(default_factory=list)
+    removed_parent_ids: List[str] = field(default_factory=list)
+    unchanged_parent_ids: List[str] = field(default_factory=list)
+    added_children: List[ChildChunk] = field(default_factory=list)
+    removed_child_ids: List[str] = field(default_factory=list)
+    unchanged_child_ids: List[str] = field(default_factory=list)
+    
+    @property
+    def has_changes(self) -> bool:
+        """是否有新增或移除的 chunk"""
+        return bool(self.added_parents or self.removed_parent_ids or
+                    self.added_children or self.removed_child_ids)
+    
+    def summary(self) -> Dict[str, int]:
+        """各類差異的數量"""
+        return {
+            'added_parents': len(self.added_parents),
+            'removed_parents': len(self.removed_parent_ids),
+            'unchanged_parents': len(self.unchanged_parent_ids),
+            'added_children': len(self.added_children),
+            'removed_children': len(self.removed_child_ids),
+            'unchanged_children': len(self.unchanged_child_ids)
+        }
 
 
 @dataclass
@@ -8,17 +8,20 @@
 import os
 import re
 import logging
-import uuid
 from pathlib import Path
-from typing import List, Union, Optional, Dict, Any, Tuple
-from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
+from typing import List, Union, Optional, Dict, Any, Tuple, Callable, Iterator
 from langchain_core.documents import Document
 
-from ..markdown_integrate.data_models import ConversionResult
+from ..markdown_integrate.data_models import ConversionResult, ConversionMetadata, PageInfo
 from ..serialization import ConversionDeserializer
-from .table_handler import TableHandler
+from .chunk_ids import document_key, make_chunk_id
+from .markdown_span_splitter import MarkdownSpanSplitter, TextSpan
+from .page_executor import DEFAULT_PARALLEL_PAGE_THRESHOLD, iter_pages, map_pages
+from .table_handler import ROW_GROUP_FIELDS, TableHandler
+from .token_length import length_function_name
 from .markdown_normalizer import MarkdownNormalizer
 from .excel_exporter import ExcelExporter
+from .hierarchical_store import HierarchicalResultStore
 from .hierarchical_models import (
     ParentChunk, ChildChunk, GroupingAnalysis, HierarchicalSplitResult,
     SizeDistribution, TableHandlingStats
@@ -26,6 +29,9 @@ from .hierarchical_models import (
 
 logger = logging.getLogger(__name__)
 
+# 分割演算法版本（分割邏輯變更時遞增，使已保存的分割結果失效）
+SPLIT_ALGORITHM_VERSION = 4
+
 
 class HierarchicalChunkSplitter:
     """分層Chunk分割器 - 實現ParentDocumentRetriever模式"""
@@ -38,7 +44,11 @@ class HierarchicalChunkSplitter:
                  headers_to_split_on: Optional[List[tuple]] = None,
                  keep_tables_together: bool = True,
                  normalize_output: bool = True,
-                 output_base_dir: str = "service/output"):
+                 output_base_dir: str = "service/output",
+                 result_store: Optional[HierarchicalResultStore] = None,
+                 length_function: Optional[Callable[[str], int]] = None,
+                 max_workers: Optional[int] = 1,
+                 parallel_page_threshold: int = DEFAULT_PARALLEL_PAGE_THRESHOLD):
         """
         初始化分層分割器 - 針對中文優化
         
@@ -51,6 +61,11 @@ class HierarchicalChunkSplitter:
             keep_tables_together: 是否保持表格完整性
             normalize_output: 是否正規化輸出內容
             output_base_dir: 輸出基礎目錄
+            result_store: 分割結果儲存，提供時相同轉換結果與配置的分割結果直接從儲存載入
+            length_function: 長度函數，None 使用字數；傳入 TokenLengthFunction（如 bge-reranker 的 tokenizer）時
+                             各 chunk 大小與重疊以 token 計算，例如 child_chunk_size=480 可確保子 chunk 放進 rerank 512 的視窗
+            max_workers: 頁面分割的工作進程數量，1 表示逐頁處理，None 表示使用 CPU 核心數
+            parallel_page_threshold: 頁數達到此值才使用進程池
         """
         self.parent_chunk_size = parent_chunk_size
         self.parent_chunk_overlap = parent_chunk_overlap
@@ -59,6 +74,10 @@ class HierarchicalChunkSplitter:
         self.keep_tables_together = keep_tables_together
         self.normalize_output = normalize_output
         self.output_base_dir = output_base_dir
+        self.result_store = result_store
+        self.length_function = length_function or len
+        self.max_workers = max_workers
+        self.parallel_page_threshold = parallel_page_threshold
         
         # 預設的標題分割層級
         if headers_to_split_on is None:
@@ -71,23 +90,24 @@ class HierarchicalChunkSplitter:
         else:
             self.headers_to_split_on = headers_to_split_on
         
-        # 初始化分割器
-        self.parent_splitter = MarkdownHeaderTextSplitter(
-            headers_to_split_on=self.headers_to_split_on,
-            strip_headers=False  # 保留標題用於上下文
+        # 初始化分割器（結果都是同一份文字上的偏移區段）
+        self.parent_splitter = MarkdownSpanSplitter(
+            headers_to_split_on=self.headers_to_split_on  # 保留標題用於上下文
         )
         
         # 父層進一步分割器（當父chunk太大時使用）
-        self.parent_text_splitter = RecursiveCharacterTextSplitter(
+        self.parent_text_splitter = MarkdownSpanSplitter(
             chunk_size=parent_chunk_size,
             chunk_overlap=parent_chunk_overlap,
-            separators=["\n\n", "\n", " ", ""]
+            separators=["\n\n", "\n", " ", ""],
+            length_function=self.length_function
         )
         
-        self.child_splitter = RecursiveCharacterTextSplitter(
+        self.child_splitter = MarkdownSpanSplitter(
             chunk_size=child_chunk_size,
             chunk_overlap=child_chunk_overlap,
-            separators=["\n\n", "\n", " ", ""]
+            separators=["\n\n", "\n", " ", ""],
+            length_function=self.length_function
         )
         
         # 初始化表格處理器
@@ -130,6 +150,8 @@ class HierarchicalChunkSplitter:
         
         # 如果是ConversionResult，檢查是否有頁面信息
         if isinstance(input_data, ConversionResult):
+            if self.result_store is not None:
+                return self._split_with_store(input_data, output_excel, output_path, md_output_path)
             if input_data.pages and len(input_data.pages) > 0:
                 # 有頁面信息，使用頁面分割
                 return self._split_by_pages_hierarchically(input_data, output_excel, output_path, md_output_path)
@@ -140,7 +162,7 @@ class HierarchicalChunkSplitter:
         # 獲取Markdown內容
         markdown_content, metadata = self._extract_content(input_data)
         
-        print(f"DEBUG: Starting split_markdown with keep_tables_together={self.keep_tables_together}")
+        logger.debug(f"Starting split_markdown with keep_tables_together={self.keep_tables_together}")
         
         # 正規化內容
         normalized_content = None
@@ -151,19 +173,19 @@ class HierarchicalChunkSplitter:
         
         # 如果啟用表格保持完整性，先處理表格
         if self.keep_tables_together:
-            print("DEBUG: Marking tables in content")
+            logger.debug("Marking tables in content")
             markdown_content = self.table_handler.mark_tables(markdown_content)
         
         # 1. Parent層分割
-        parent_documents = self.parent_splitter.split_text(markdown_content)
-        parent_chunks = self._create_parent_chunks(parent_documents, metadata)
+        header_spans = self.parent_splitter.split_headers(markdown_content)
+        parent_chunks = self._create_parent_chunks(markdown_content, header_spans, metadata)
         
         # 2. Child層分割
         child_chunks = self._create_child_chunks(parent_chunks)
         
         # 3. 後處理：確保表格完整性
         if self.keep_tables_together:
-            print(f"DEBUG: Cleaning table markers from {len(parent_chunks)} parent chunks")
+            logger.debug(f"Cleaning table markers from {len(parent_chunks)} parent chunks")
             logger.info(f"Cleaning table markers from {len(parent_chunks)} parent chunks")
             # 清理父chunks中的表格標記
             parent_chunks = self._clean_parent_table_markers(parent_chunks)
@@ -195,40 +217,154 @@ class HierarchicalChunkSplitter:
         logger.info(f"Hierarchical splitting completed: {len(parent_chunks)} parent chunks, {len(child_chunks)} child chunks")
         return result
     
-    def _create_parent_chunks(self, parent_documents: List[Document], base_metadata: Dict[str, Any]) -> List[ParentChunk]:
-        """創建父層chunks"""
+    def iter_hierarchical(self,
+                          input_data: Union[str, Path, ConversionResult],
+                          from_serialization: bool = False,
+                          lookahead: Optional[int] = None) -> Iterator[Tuple[ParentChunk, List[ChildChunk]]]:
+        """
+        依頁面串流產生分層分割結果
+        
+        每處理完一頁就依序返回該頁的父chunk及其子chunks（已完成表格後處理），
+        不建立完整的 chunk 列表和 HierarchicalSplitResult，embedding 可以在第一頁完成後就開始。
+        表格合併只在同一個父chunk內進行，每頁的後處理只需要該頁的 chunks；
+        子chunk 的 global_chunk_number 依返回順序連續編號。
+        沒有頁面信息的輸入無法分段，整份分割後再依父chunk逐一返回。
+        
+        Args:
+            input_data: 輸入數據（MD文件路徑、ConversionResult對象或序列化文件路徑）
+            from_serialization: 是否從序列化文件載入ConversionResult
+            lookahead: 使用進程池時同時處理中的頁面數量上限
+            
+        Yields:
+            Tuple[ParentChunk, List[ChildChunk]]: 父chunk 與其子chunks
+        """
+        if from_serialization and isinstance(input_data, (str, Path)):
+            input_data = self._load_from_serialization(input_data)
+        
+        if not (isinstance(input_data, ConversionResult) and input_data.pages):
+            result = self.split_hierarchically(input_data)
+            yield from self._group_children(result.parent_chunks, result.child_chunks)
+            return
+        
+        page_results = iter_pages(
+            self, '_split_page_hierarchically',
+            [(page, input_data.metadata) for page in input_data.pages],
+            max_workers=self.max_workers,
+            parallel_threshold=self.parallel_page_threshold,
+            lookahead=lookahead
+        )
+        
+        chunk_number = 0
+        for page_parent_chunks, page_child_chunks in page_results:
+            # 頁面內的表格後處理（與 _split_by_pages_hierarchically 的全域後處理相同的步驟）
+            if self.keep_tables_together:
+                page_parent_chunks = self._clean_parent_table_markers(page_parent_chunks)
+                page_child_chunks = self._postprocess_tables(page_child_chunks)
+            
+            for parent_chunk, children in self._group_children(page_parent_chunks, page_child_chunks):
+                if self.keep_tables_together:
+                    for child_chunk in children:
+                        chunk_number += 1
+                        child_chunk.metadata['global_chunk_number'] = chunk_number
+                yield parent_chunk, children
+    
+    def _group_children(self, parent_chunks: List[ParentChunk],
+                        child_chunks: List[ChildChunk]) -> Iterator[Tuple[ParentChunk, List[ChildChunk]]]:
+        """依父chunk順序返回 (父chunk, 子chunks)，子chunks 保持原有順序"""
+        children_by_parent: Dict[str, List[ChildChunk]] = {}
+        for child_chunk in child_chunks:
+            children_by_parent.setdefault(child_chunk.parent_chunk_id, []).append(child_chunk)
+        
+        for parent_chunk in parent_chunks:
+            yield parent_chunk, children_by_parent.get(parent_chunk.chunk_id, [])
+    
+    def get_config(self) -> Dict[str, Any]:
+        """
+        獲取會影響分割結果的完整配置（作為分割結果儲存鍵的一部分）
+        
+        Returns:
+            Dict[str, Any]: 分割器配置
+        """
+        return {
+            'splitter': type(self).__name__,
+            'algorithm_version': SPLIT_ALGORITHM_VERSION,
+            'parent_chunk_size': self.parent_chunk_size,
+            'parent_chunk_overlap': self.parent_chunk_overlap,
+            'child_chunk_size': self.child_chunk_size,
+            'child_chunk_overlap': self.child_chunk_overlap,
+            'headers_to_split_on': [list(header) for header in self.headers_to_split_on],
+            'keep_tables_together': self.keep_tables_together,
+            'normalize_output': self.normalize_output,
+            'length_function': length_function_name(self.length_function)
+        }
+    
+    def _split_with_store(self,
+                          conversion_result: ConversionResult,
+                          output_excel: bool = False,
+                          output_path: Optional[str] = None,
+                          md_output_path: Optional[str] = None) -> HierarchicalSplitResult:
+        """分割ConversionResult，轉換結果與配置都未變動時直接載入已保存的分割結果"""
+        key = self.result_store.make_key(conversion_result, self.get_config())
+        result = self.result_store.load(key)
+        
+        if result is None:
+            if conversion_result.pages and len(conversion_result.pages) > 0:
+                result = self._split_by_pages_hierarchically(conversion_result, output_excel, output_path, md_output_path)
+            else:
+                result = self._split_without_pages_hierarchically(conversion_result, output_excel, output_path, md_output_path)
+            self.result_store.save(key, result)
+            result.processing_metadata['result_store'] = {'key': key, 'hit': False}
+            return result
+        
+        result.processing_metadata['result_store'] = {'key': key, 'hit': True}
+        
+        # 輸出處理
+        if output_excel:
+            normalized_content = None
+            if self.normalize_output and self.normalizer:
+                normalized_content = self.normalizer.normalize_text(conversion_result.content)
+            self._export_to_excel(result, conversion_result.content, output_path, normalized_content)
+        
+        if md_output_path:
+            self._export_to_markdown(result, md_output_path)
+        
+        logger.info(f"Loaded stored hierarchical split: {result.parent_count} parent chunks, {result.child_count} child chunks")
+        return result
+    
+    def _create_parent_chunks(self, markdown_content: str, header_spans: List[TextSpan], base_metadata: Dict[str, Any]) -> List[ParentChunk]:
+        """創建父層chunks（header_spans 為 markdown_content 上的標題區段）"""
         parent_chunks = []
+        document = document_key(base_metadata)
         
-        for i, doc in enumerate(parent_documents):
+        span_lengths = self.parent_text_splitter.lengths(markdown_content, header_spans)
+        for i, (span, span_length) in enumerate(zip(header_spans, span_lengths)):
+            doc = self.parent_splitter.to_documents(markdown_content, [span])[0]
             # 如果父chunk太大，需要進一步分割
-            if len(doc.page_content) > self.parent_chunk_size:
-                # 使用parent_text_splitter分割
-                sub_documents = self.parent_text_splitter.split_documents([doc])
+            if span_length > self.parent_chunk_size:
+                sub_documents = self._split_parent_span(markdown_content, span, doc)
                 
                 for j, sub_doc in enumerate(sub_documents):
-                    # 生成唯一ID
-                    chunk_id = f"parent_{uuid.uuid4().hex[:8]}"
+                    # 生成確定性ID（文件、標題區段索引、子區段索引與內容）
+                    chunk_id = make_chunk_id("parent", document, (i, j), sub_doc.page_content)
                     
                     # 創建ParentChunk物件
                     parent_chunk = ParentChunk(
                         document=sub_doc,
                         chunk_id=chunk_id,
                         parent_index=i,
-                        size=len(sub_doc.page_content),
-                        metadata=base_metadata.copy()
+                        metadata=base_metadata
                     )
                     
                     parent_chunks.append(parent_chunk)
             else:
                 # 父chunk大小合適，直接使用
-                chunk_id = f"parent_{uuid.uuid4().hex[:8]}"
+                chunk_id = make_chunk_id("parent", document, (i,), doc.page_content)
                 
                 parent_chunk = ParentChunk(
                     document=doc,
                     chunk_id=chunk_id,
                     parent_index=i,
-                    size=len(doc.page_content),
-                    metadata=base_metadata.copy()
+                    metadata=base_metadata
                 )
                 
                 parent_chunks.append(parent_chunk)
@@ -236,58 +372,126 @@ class HierarchicalChunkSplitter:
         logger.info(f"Created {len(parent_chunks)} parent chunks")
         return parent_chunks
     
+    def _split_parent_span(self, markdown_content: str, span: TextSpan, document: Document) -> List[Document]:
+        """
+        分割超過 parent_chunk_size 的標題區段
+        
+        保持表格完整時，超過上限的表格依表格行分組（每組重複表頭與分隔行），其餘文字以 parent_text_splitter 分割。
+        
+        Args:
+            markdown_content: 緩衝區
+            span: 標題區段
+            document: 標題區段的 Document
+            
+        Returns:
+            List[Document]: 分割後的父chunk 內容
+        """
+        parts = self._split_table_rows(document, self.parent_chunk_size) if self.keep_tables_together else [document]
+        if parts[0] is document:
+            # 使用parent_text_splitter分割（子區段是同一份文字上的偏移範圍，重疊部分不複製）
+            sub_spans = self.parent_text_splitter.split_span(markdown_content, span)
+            return self.parent_text_splitter.to_documents(markdown_content, sub_spans)
+        
+        sub_documents = []
+        for part in parts:
+            if 'table_id' in part.metadata or self.length_function(part.page_content) <= self.parent_chunk_size:
+                sub_documents.append(part)
+                continue
+            text = part.page_content
+            sub_spans = self.parent_text_splitter.split_span(text, TextSpan(0, len(text)))
+            sub_documents.extend(self.parent_text_splitter.to_documents(text, sub_spans, part.metadata))
+        return sub_documents
+    
+    def _split_table_rows(self, document: Document, max_chunk_size: int) -> List[Document]:
+        """
+        將超過大小上限的表格依表格行分組
+        
+        行組的元數據標記 table_id 與資料行範圍；document 本身已是表格行組時沿用其 table_id，
+        資料行範圍換算為原表格的行號。表格以外的文字重新標記其中的表格。
+        
+        Args:
+            document: 帶表格標記的內容
+            max_chunk_size: 大小上限（以 length_function 計算）
+            
+        Returns:
+            List[Document]: 分組後的內容，沒有表格超過上限時返回 [document]
+        """
+        content = self.table_handler.clean_table_markers(document.page_content)
+        parts = self.table_handler.split_table_rows(Document(page_content=content, metadata=document.metadata),
+                                                    max_chunk_size, self.length_function)
+        if not any('table_id' in part.metadata for part in parts):
+            return [document]
+        
+        row_offset = document.metadata.get('table_row_start', 1) - 1
+        documents = []
+        for part in parts:
+            metadata = dict(document.metadata)
+            if 'table_id' not in part.metadata:
+                documents.append(Document(page_content=self.table_handler.mark_tables(part.page_content), metadata=metadata))
+                continue
+            metadata.update({
+                'table_id': metadata.get('table_id', part.metadata['table_id']),
+                'table_row_start': part.metadata['table_row_start'] + row_offset,
+                'table_row_end': part.metadata['table_row_end'] + row_offset,
+                'table_total_rows': metadata.get('table_total_rows', part.metadata['table_total_rows'])
+            })
+            documents.append(Document(page_content=part.page_content, metadata=metadata))
+        return documents
+    
     def _create_child_chunks(self, parent_chunks: List[ParentChunk]) -> List[ChildChunk]:
         """創建子層chunks - 參考chunk_splitter.py的邏輯"""
         child_chunks = []
         
         for parent_chunk in parent_chunks:
-            # 在切割子chunk前，先清理表格分隔符
-            cleaned_content = self.table_handler.clean_table_separators(parent_chunk.document.page_content)
-            
-            # 如果內容被清理後變空或太短，跳過這個父chunk
-            if not cleaned_content.strip() or len(cleaned_content.strip()) < 10:
-                logger.warning(f"Skipping parent chunk {parent_chunk.chunk_id} after cleaning: content too short")
-                continue
-            
-            # 創建清理後的Document
-            cleaned_document = Document(
-                page_content=cleaned_content,
-                metadata=parent_chunk.document.metadata.copy()
-            )
-            
-            # 對每個父chunk進行子分割，不管大小
-            # 使用child_splitter分割
-            sub_documents = self.child_splitter.split_documents([cleaned_document])
+            if self.keep_tables_together and parent_chunk.has_tables:
+                # 超過 child_chunk_size 的表格依表格行分組
+                parts = self._split_table_rows(parent_chunk.document, self.child_chunk_size)
+            else:
+                parts = [Document(page_content=parent_chunk.content)]
             
-            for j, sub_doc in enumerate(sub_documents):
-                # 再次清理子chunk中的表格分隔符
-                final_content = self.table_handler.clean_table_separators(sub_doc.page_content)
-                
-                # 如果子chunk內容太短，跳過
-                if not final_content.strip() or len(final_content.strip()) < 5:
-                    logger.warning(f"Skipping child chunk {j} from parent {parent_chunk.chunk_id}: content too short after cleaning")
+            j = 0
+            for part in parts:
+                if 'table_id' in part.metadata:
+                    # 表格行組保留表頭與分隔行，行組欄位與父chunk 不同時寫入子chunk
+                    child_id = make_chunk_id("child", parent_chunk.chunk_id, (j,), part.page_content)
+                    child_chunk = ChildChunk.from_parent(parent_chunk, part.page_content, child_id, j)
+                    for field in ROW_GROUP_FIELDS:
+                        if child_chunk.metadata.get(field) != part.metadata[field]:
+                            child_chunk.metadata[field] = part.metadata[field]
+                    child_chunks.append(child_chunk)
+                    j += 1
                     continue
                 
-                # 創建最終的Document
-                final_document = Document(
-                    page_content=final_content,
-                    metadata=sub_doc.metadata.copy()
-                )
+                # 在切割子chunk前，先清理表格分隔符
+                cleaned_content = self.table_handler.clean_table_separators(part.page_content)
                 
-                # 生成唯一ID
-                child_id = f"child_{uuid.uuid4().hex[:8]}"
+                # 如果內容被清理後變空或太短，跳過這個父chunk
+                if not cleaned_content.strip() or len(cleaned_content.strip()) < 10:
+                    logger.warning(f"Skipping parent chunk {parent_chunk.chunk_id} after cleaning: content too short")
+                    continue
                 
-                # 創建ChildChunk物件
-                child_chunk = ChildChunk(
-                    document=final_document,
-                    chunk_id=child_id,
-                    parent_chunk_id=parent_chunk.chunk_id,
-                    child_index=j,
-                    size=len(final_content),
-                    metadata=parent_chunk.metadata.copy()
-                )
+                # 對每個父chunk進行子分割，不管大小
+                # 使用child_splitter分割（子區段是清理後內容上的偏移範圍）
+                child_spans = self.child_splitter.split_span(cleaned_content, TextSpan(0, len(cleaned_content)))
                 
-                child_chunks.append(child_chunk)
+                for child_span in child_spans:
+                    # 再次清理子chunk中的表格分隔符
+                    final_content = self.table_handler.clean_table_separators(child_span.text(cleaned_content))
+                    child_index = j
+                    j += 1
+                    
+                    # 如果子chunk內容太短，跳過
+                    if not final_content.strip() or len(final_content.strip()) < 5:
+                        logger.warning(f"Skipping child chunk {child_index} from parent {parent_chunk.chunk_id}: content too short after cleaning")
+                        continue
+                    
+                    # 生成確定性ID（父chunk ID 已包含文件與位置）
+                    child_id = make_chunk_id("child", parent_chunk.chunk_id, (child_index,), final_content)
+                    
+                    # 創建ChildChunk物件（共用父chunk 的文件 context 與標題，不建立 Document）
+                    child_chunk = ChildChunk.from_parent(parent_chunk, final_content, child_id, child_index)
+                    
+                    child_chunks.append(child_chunk)
         
         logger.info(f"Created {len(child_chunks)} child chunks from {len(parent_chunks)} parent chunks")
         return child_chunks
@@ -378,9 +582,10 @@ class HierarchicalChunkSplitter:
     
     def _postprocess_tables(self, child_chunks: List[ChildChunk]) -> List[ChildChunk]:
         """後處理表格，確保表格完整性 - 分層分割版本，保持更多子chunks"""
-        # 分離表格和一般chunks
-        table_chunks = [chunk for chunk in child_chunks if chunk.is_table_chunk]
-        regular_chunks = [chunk for chunk in child_chunks if not chunk.is_table_chunk]
+        # 分離表格行組、表格和一般chunks（表格行組已依 child_chunk_size 分組並重複表頭，保持原樣）
+        row_group_chunks = [chunk for chunk in child_chunks if 'table_id' in chunk.metadata]
+        table_chunks = [chunk for chunk in child_chunks if chunk.is_table_chunk and 'table_id' not in chunk.metadata]
+        regular_chunks = [chunk for chunk in child_chunks if not chunk.is_table_chunk and 'table_id' not in chunk.metadata]
         
         # 對於分層分割，我們只合併非常小的表格chunks，保持大部分子chunks
         merged_table_chunks = self._merge_small_table_chunks_only(table_chunks)
@@ -389,7 +594,7 @@ class HierarchicalChunkSplitter:
         cleaned_regular_chunks = []
         for chunk in regular_chunks:
             # 先清理表格標記
-            cleaned_content = self.table_handler.clean_table_markers(chunk.document.page_content)
+            cleaned_content = self.table_handler.clean_table_markers(chunk.content)
             # 再清理表格分隔符
             cleaned_content = self.table_handler.clean_table_separators(cleaned_content)
             
@@ -398,14 +603,14 @@ class HierarchicalChunkSplitter:
                 logger.warning(f"Skipping regular chunk {chunk.chunk_id}: content too short after cleaning")
                 continue
                 
-            chunk.document = Document(page_content=cleaned_content, metadata=chunk.document.metadata)
+            chunk.content = cleaned_content
             cleaned_regular_chunks.append(chunk)
         
         # 清理表格chunks中的表格標記和分隔符
         cleaned_table_chunks = []
         for chunk in merged_table_chunks:
             # 先清理表格標記
-            cleaned_content = self.table_handler.clean_table_markers(chunk.document.page_content)
+            cleaned_content = self.table_handler.clean_table_markers(chunk.content)
             # 再清理表格分隔符
             cleaned_content = self.table_handler.clean_table_separators(cleaned_content)
             
@@ -414,11 +619,11 @@ class HierarchicalChunkSplitter:
                 logger.warning(f"Skipping table chunk {chunk.chunk_id}: content too short after cleaning")
                 continue
                 
-            chunk.document = Document(page_content=cleaned_content, metadata=chunk.document.metadata)
+            chunk.content = cleaned_content
             cleaned_table_chunks.append(chunk)
         
         # 合併所有chunks
-        all_chunks = cleaned_regular_chunks + cleaned_table_chunks
+        all_chunks = cleaned_regular_chunks + cleaned_table_chunks + row_group_chunks
         
         # 按父chunk和子chunk順序排序
         all_chunks = self._sort_child_chunks(all_chunks)
@@ -432,7 +637,7 @@ class HierarchicalChunkSplitter:
         cleaned_parent_chunks = []
         for i, parent_chunk in enumerate(parent_chunks):
             # 檢查原始內容是否包含表格標記
-            original_content = parent_chunk.document.page_content
+            original_content = parent_chunk.content
             has_markers = '<!-- TABLE_START -->' in original_content or '<!-- TABLE_END -->' in original_content
             logger.info(f"Parent chunk {i+1}: has_markers={has_markers}, content_length={len(original_content)}")
             
@@ -443,20 +648,15 @@ class HierarchicalChunkSplitter:
             still_has_markers = '<!-- TABLE_START -->' in cleaned_content or '<!-- TABLE_END -->' in cleaned_content
             logger.info(f"Parent chunk {i+1} after cleaning: still_has_markers={still_has_markers}, cleaned_length={len(cleaned_content)}")
             
-            # 創建新的Document物件
-            cleaned_document = Document(page_content=cleaned_content, metadata=parent_chunk.document.metadata)
-            # 創建新的ParentChunk物件
-            cleaned_parent_chunk = ParentChunk(
-                document=cleaned_document,
+            # 創建新的ParentChunk物件（沿用原本的文件 context、標題與元數據）
+            cleaned_parent_chunk = ParentChunk.from_parts(
+                cleaned_content,
+                parent_chunk.context,
+                parent_chunk.header_id,
+                parent_chunk.extra,
                 chunk_id=parent_chunk.chunk_id,
                 parent_index=parent_chunk.parent_index,
-                size=len(cleaned_content),
-                has_tables=parent_chunk.has_tables,
-                table_count=parent_chunk.table_count,
-                header_level=parent_chunk.header_level,
-                header_text=parent_chunk.header_text,
-                page_number=parent_chunk.page_number,
-                metadata=parent_chunk.metadata
+                table_count=parent_chunk.table_count
             )
             cleaned_parent_chunks.append(cleaned_parent_chunk)
         
@@ -495,14 +695,28 @@ class HierarchicalChunkSplitter:
             parent_groups[parent_id].append(chunk)
         
         merged_chunks = []
-        for parent_id, chunks in parent_groups.items():
-            if len(chunks) == 1:
+        
+        def flush_group(group: List[ChildChunk]):
+            if len(group) == 1:
                 # 只有一個chunk，直接添加
-                merged_chunks.append(chunks[0])
+                merged_chunks.append(group[0])
             else:
                 # 多個chunks，需要合併
-                merged_chunk = self._merge_table_group(chunks)
-                merged_chunks.append(merged_chunk)
+                merged_chunks.append(self._merge_table_group(group))
+        
+        for parent_id, chunks in parent_groups.items():
+            # 依序合併，合併後超過 child_chunk_size 時開始新的一組
+            group = []
+            contents = []
+            for chunk in chunks:
+                content = self.table_handler.clean_table_markers(chunk.content)
+                if group and self.length_function("\n".join(contents + [content])) > self.child_chunk_size:
+                    flush_group(group)
+                    group = []
+                    contents = []
+                group.append(chunk)
+                contents.append(content)
+            flush_group(group)
         
         return merged_chunks
     
@@ -516,7 +730,7 @@ class HierarchicalChunkSplitter:
         metadata = chunks[0].metadata.copy()
         
         for chunk in chunks:
-            clean_content = self.table_handler.clean_table_markers(chunk.document.page_content)
+            clean_content = self.table_handler.clean_table_markers(chunk.content)
             contents.append(clean_content.strip())
         
         merged_content = "\n".join(contents)
@@ -527,12 +741,10 @@ class HierarchicalChunkSplitter:
         # 創建合併後的ChildChunk
         merged_chunk = ChildChunk(
             document=merged_document,
-            chunk_id=f"merged_{uuid.uuid4().hex[:8]}",
+            chunk_id=make_chunk_id("merged", chunks[0].parent_chunk_id,
+                                   [chunk.chunk_id for chunk in chunks], merged_content),
             parent_chunk_id=chunks[0].parent_chunk_id,
-            child_index=0,
-            size=len(merged_content),
-            is_table_chunk=True,
-            metadata=metadata
+            child_index=0
         )
         
         return merged_chunk
@@ -600,52 +812,15 @@ class HierarchicalChunkSplitter:
         all_parent_chunks = []
         all_child_chunks = []
         
-        # 為每個頁面進行分層分割
-        for page in conversion_result.pages:
-            page_content = page.content
-            
-            # 正規化頁面內容
-            if self.normalize_output and self.normalizer:
-                page_content = self.normalizer.normalize_text(page_content)
-            
-            # 標記表格
-            if self.keep_tables_together:
-                page_content = self.table_handler.mark_tables(page_content)
-            
-            # 使用MarkdownHeaderTextSplitter分割頁面
-            page_splits = self.parent_splitter.split_text(page_content)
-            
-            # 創建父chunks
-            page_parent_chunks = []
-            for i, doc in enumerate(page_splits):
-                chunk_id = f"parent_{page.page_number}_{i}_{uuid.uuid4().hex[:8]}"
-                
-                # 添加頁面信息到metadata
-                enhanced_metadata = doc.metadata.copy()
-                enhanced_metadata.update({
-                    'page_number': page.page_number,
-                    'page_title': page.title,
-                    'file_name': conversion_result.metadata.file_name,
-                    'file_type': conversion_result.metadata.file_type,
-                    'source': conversion_result.metadata.file_path
-                })
-                
-                enhanced_doc = Document(page_content=doc.page_content, metadata=enhanced_metadata)
-                
-                parent_chunk = ParentChunk(
-                    document=enhanced_doc,
-                    chunk_id=chunk_id,
-                    parent_index=i,
-                    size=len(doc.page_content),
-                    page_number=page.page_number,
-                    metadata=enhanced_metadata
-                )
-                
-                page_parent_chunks.append(parent_chunk)
-            
-            # 創建子chunks
-            page_child_chunks = self._create_child_chunks(page_parent_chunks)
+        # 為每個頁面進行分層分割（頁數足夠時分派到進程池，結果依頁面順序返回）
+        page_results = map_pages(
+            self, '_split_page_hierarchically',
+            [(page, conversion_result.metadata) for page in conversion_result.pages],
+            max_workers=self.max_workers,
+            parallel_threshold=self.parallel_page_threshold
+        )
             
+        for page_parent_chunks, page_child_chunks in page_results:
             all_parent_chunks.extend(page_parent_chunks)
             all_child_chunks.extend(page_child_chunks)
         
@@ -686,6 +861,62 @@ class HierarchicalChunkSplitter:
         logger.info(f"Hierarchical page splitting completed: {len(all_parent_chunks)} parent chunks, {len(all_child_chunks)} child chunks")
         return result
     
+    def _split_page_hierarchically(self, page: PageInfo, file_metadata: ConversionMetadata) -> Tuple[List[ParentChunk], List[ChildChunk]]:
+        """
+        分層分割單一頁面（可在工作進程中執行）
+        
+        Args:
+            page: 頁面信息
+            file_metadata: 文件的轉換元數據
+            
+        Returns:
+            Tuple[List[ParentChunk], List[ChildChunk]]: (頁面的父chunks, 頁面的子chunks)
+        """
+        page_content = page.content
+        
+        # 正規化頁面內容
+        if self.normalize_output and self.normalizer:
+            page_content = self.normalizer.normalize_text(page_content)
+        
+        # 標記表格
+        if self.keep_tables_together:
+            page_content = self.table_handler.mark_tables(page_content)
+        
+        # 依標題分割頁面
+        page_splits = self.parent_splitter.to_documents(page_content, self.parent_splitter.split_headers(page_content))
+        
+        # 創建父chunks
+        page_parent_chunks = []
+        for i, doc in enumerate(page_splits):
+            chunk_id = make_chunk_id(f"parent_{page.page_number}_{i}", file_metadata.file_path or file_metadata.file_name,
+                                     (page.page_number, i), doc.page_content)
+            
+            # 添加頁面信息到metadata
+            enhanced_metadata = doc.metadata.copy()
+            enhanced_metadata.update({
+                'page_number': page.page_number,
+                'page_title': page.title,
+                'file_name': file_metadata.file_name,
+                'file_type': file_metadata.file_type,
+                'source': file_metadata.file_path
+            })
+            
+            enhanced_doc = Document(page_content=doc.page_content, metadata=enhanced_metadata)
+            
+            parent_chunk = ParentChunk(
+                document=enhanced_doc,
+                chunk_id=chunk_id,
+                parent_index=i,
+                page_number=page.page_number
+            )
+            
+            page_parent_chunks.append(parent_chunk)
+        
+        # 創建子chunks
+        page_child_chunks = self._create_child_chunks(page_parent_chunks)
+        
+        return page_parent_chunks, page_child_chunks
+    
     def _split_without_pages_hierarchically(self, 
                                          conversion_result: ConversionResult,
                                          output_excel: bool = False,
@@ -705,13 +936,14 @@ class HierarchicalChunkSplitter:
         if self.keep_tables_together:
             markdown_content = self.table_handler.mark_tables(markdown_content)
         
-        # 使用MarkdownHeaderTextSplitter進行初步分割
-        header_splits = self.parent_splitter.split_text(markdown_content)
+        # 依標題進行初步分割
+        header_splits = self.parent_splitter.to_documents(markdown_content, self.parent_splitter.split_headers(markdown_content))
         
         # 創建父chunks
         parent_chunks = []
         for i, doc in enumerate(header_splits):
-            chunk_id = f"parent_{i}_{uuid.uuid4().hex[:8]}"
+            chunk_id = make_chunk_id(f"parent_{i}", conversion_result.metadata.file_path or conversion_result.metadata.file_name,
+                                     (i,), doc.page_content)
             
             # 添加基本metadata
             enhanced_metadata = doc.metadata.copy()
@@ -729,9 +961,7 @@ class HierarchicalChunkSplitter:
             parent_chunk = ParentChunk(
                 document=enhanced_doc,
                 chunk_id=chunk_id,
-                parent_index=i,
-                size=len(doc.page_content),
-                metadata=enhanced_metadata
+                parent_index=i
             )
             
             parent_chunks.append(parent_chunk)
@@ -797,7 +1027,7 @@ class HierarchicalChunkSplitter:
                 'header_level': parent_chunk.header_level,
                 'header_text': parent_chunk.header_text,
                 'page_number': parent_chunk.page_number,
-                'content': parent_chunk.document.page_content,
+                'content': parent_chunk.content,
                 'original_content': original_content,  # 添加原文
                 'normalized_content': normalized_content if normalized_content else original_content,  # 添加正規化內容
                 'file_name': parent_chunk.metadata.get('file_name', ''),
@@ -814,7 +1044,7 @@ class HierarchicalChunkSplitter:
                 'is_table_chunk': child_chunk.is_table_chunk,
                 'parent_header': child_chunk.parent_header,
                 'page_number': child_chunk.page_number,
-                'content': child_chunk.document.page_content,
+                'content': child_chunk.content,
                 'original_content': original_content,  # 添加原文
                 'normalized_content': normalized_content if normalized_content else original_content,  # 添加正規化內容
                 'file_name': child_chunk.metadata.get('file_name', ''),
@@ -848,7 +1078,7 @@ class HierarchicalChunkSplitter:
                 f.write(f"**Size:** {parent_chunk.size} characters\n")
                 f.write(f"**Has Tables:** {parent_chunk.has_tables}\n")
                 f.write(f"**Header:** {parent_chunk.header_text or 'None'}\n\n")
-                f.write(f"{parent_chunk.document.page_content}\n\n")
+                f.write(f"{parent_chunk.content}\n\n")
                 f.write("---\n\n")
             
             # 輸出子chunks
@@ -858,7 +1088,7 @@ class HierarchicalChunkSplitter:
                 f.write(f"**Parent:** {child_chunk.parent_chunk_id}\n")
                 f.write(f"**Size:** {child_chunk.size} characters\n")
                 f.write(f"**Is Table:** {child_chunk.is_table_chunk}\n\n")
-                f.write(f"{child_chunk.document.page_content}\n\n")
+                f.write(f"{child_chunk.content}\n\n")
                 f.write("---\n\n")
         
         logger.info(f"Hierarchical chunks exported to Markdown: {output_path}")
@@ -0,0 +1,448 @@
+"""
+分層分割結果儲存
+
+將 HierarchicalSplitResult 以欄式（columnar）格式保存到磁碟，並可延遲載入：
+父/子 chunk 的各個欄位分別存為 JSON 陣列，內容則串接成一個 UTF-8 檔案並以位元組偏移定位。
+子 chunk 可以依序串流讀取（例如送去 embedding），父 chunk 可以依 ID 直接讀取，不需要載入整份結果。
+
+儲存鍵為「轉換結果雜湊 + 完整的分割器配置」，內容和配置都沒有變動的文件不需要重新分割。
+
+目錄結構：
+    <store_dir>/<key>/
+        manifest.json       # 格式版本、鍵、數量、文件 context 與標題表、GroupingAnalysis、processing_metadata
+        parents.json        # 父 chunk 欄位陣列（含內容偏移與各父 chunk 的子 chunk 列號）
+        parents.content     # 父 chunk 內容串接
+        children.json       # 子 chunk 欄位陣列（含內容偏移）
+        children.content    # 子 chunk 內容串接
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..markdown_integrate.data_models import ConversionResult
+from .hierarchical_models import (
+    ParentChunk, ChildChunk, DocumentContext, GroupingAnalysis, HierarchicalSplitResult
+)
+
+logger = logging.getLogger(__name__)
+
+# 儲存格式版本（格式變更時遞增，舊版本的項目視為未命中）
+STORE_FORMAT_VERSION = 2
+
+# 父/子 chunk 除內容與元數據以外需要保存的欄位
+PARENT_COLUMNS = ("chunk_id", "parent_index", "size", "has_tables", "table_count")
+CHILD_COLUMNS = ("chunk_id", "parent_chunk_id", "child_index", "size", "is_table_chunk", "table_info")
+
+# 影響分割結果的 ConversionMetadata 欄位
+_HASHED_METADATA_FIELDS = ("file_name", "file_path", "file_type", "converter_used", "total_pages", "total_tables")
+
+
+def conversion_hash(conversion_result: ConversionResult) -> str:
+    """
+    計算轉換結果的雜湊（只包含會影響分割結果的內容與元數據，不含轉換時間等欄位）
+    
+    Args:
+        conversion_result: 轉換結果
+    
+    Returns:
+        str: 十六進位雜湊值
+    """
+    digest = hashlib.sha256()
+    metadata = {name: getattr(conversion_result.metadata, name) for name in _HASHED_METADATA_FIELDS}
+    digest.update(json.dumps(metadata, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    digest.update(b"\0content\0")
+    digest.update(conversion_result.content.encode('utf-8'))
+    for page in conversion_result.pages or []:
+        digest.update(f"\0page\0{page.page_number}\0{page.title}\0".encode('utf-8'))
+        digest.update(page.content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _restore(cls, values: Dict[str, Any]):
+    """不重新計算大小與表格信息，直接還原 chunk（保存的欄位即為分割完成時的狀態）"""
+    chunk = cls.__new__(cls)
+    for name, value in values.items():
+        setattr(chunk, name, value)
+    return chunk
+
+
+def _columns(chunks: List[Any], names: tuple, contexts: Dict[int, int]) -> Dict[str, List[Any]]:
+    """
+    將 chunk 列表轉換為欄位陣列
+    
+    元數據只保存文件 context 的編號、標題編號與 chunk 自身的欄位；
+    contexts 記錄已出現的 context（id(context) → 編號），新的 context 依出現順序編號。
+    """
+    columns = {name: [getattr(chunk, name) for chunk in chunks] for name in names}
+    columns["context"] = [contexts.setdefault(id(chunk.context), len(contexts)) for chunk in chunks]
+    columns["header_id"] = [chunk.header_id for chunk in chunks]
+    columns["extra"] = [chunk.extra for chunk in chunks]
+    return columns
+
+
+def _write_content(path: Path, chunks: List[Any]) -> List[int]:
+    """將 chunk 內容串接寫入檔案，返回每個 chunk 的起始位元組偏移（最後一個為檔案長度）"""
+    offsets = [0]
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            data = chunk.content.encode('utf-8')
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    return offsets
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """寫入 JSON 檔案"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
+
+
+class StoredHierarchicalSplitResult(HierarchicalSplitResult):
+    """
+    從儲存目錄延遲載入的 HierarchicalSplitResult
+    
+    存取 parent_chunks / child_chunks 時才載入完整列表；
+    get_parent、iter_children、get_children_of_parent 只讀取需要的 chunk。
+    """
+    
+    def __init__(self, entry_dir: Path, manifest: Dict[str, Any]):
+        self.entry_dir = Path(entry_dir)
+        self.key = manifest["key"]
+        self.grouping_analysis = GroupingAnalysis(**manifest["grouping_analysis"])
+        self.processing_metadata = manifest.get("processing_metadata", {})
+        self._parent_count = manifest["parent_count"]
+        self._child_count = manifest["child_count"]
+        self._parent_columns: Optional[Dict[str, List[Any]]] = None
+        self._child_columns: Optional[Dict[str, List[Any]]] = None
+        self._parent_rows: Optional[Dict[str, int]] = None
+        self._child_rows: Optional[Dict[str, int]] = None
+        self._parent_chunks: Optional[List[ParentChunk]] = None
+        self._child_chunks: Optional[List[ChildChunk]] = None
+    
+        # 保存的 context 與標題表，標題編號對應到目前進程中共用 context 的標題表
+        self._contexts = []
+        for entry in manifest["contexts"]:
+            context = DocumentContext.intern(entry["fields"])
+            header_ids = [context.header_id(tuple(tuple(header) for header in path)) for path in entry["header_paths"]]
+            self._contexts.append((context, header_ids))
+    
+    def _load_columns(self, name: str) -> Dict[str, List[Any]]:
+        """讀取欄位陣列"""
+        with open(self.entry_dir / f"{name}.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    @property
+    def parent_columns(self) -> Dict[str, List[Any]]:
+        """父 chunk 欄位陣列（不含內容）"""
+        if self._parent_columns is None:
+            self._parent_columns = self._load_columns("parents")
+        return self._parent_columns
+    
+    @property
+    def child_columns(self) -> Dict[str, List[Any]]:
+        """子 chunk 欄位陣列（不含內容）"""
+        if self._child_columns is None:
+            self._child_columns = self._load_columns("children")
+        return self._child_columns
+    
+    def _build_chunk(self, cls, names: tuple, columns: Dict[str, List[Any]], row: int, content: str):
+        """由欄位陣列的一列和內容建立 chunk"""
+        values = {name: columns[name][row] for name in names}
+        context, header_ids = self._contexts[columns["context"][row]]
+        values["content"] = content
+        values["context"] = context
+        values["header_id"] = header_ids[columns["header_id"][row]]
+        values["extra"] = columns["extra"][row]
+        return _restore(cls, values)
+    
+    def _read_rows(self, name: str, columns: Dict[str, List[Any]], rows: List[int]) -> Iterator[tuple]:
+        """依列號讀取內容，返回 (列號, 內容)"""
+        offsets = columns["content_offsets"]
+        with open(self.entry_dir / f"{name}.content", 'rb') as f:
+            for row in rows:
+                f.seek(offsets[row])
+                yield row, f.read(offsets[row + 1] - offsets[row]).decode('utf-8')
+    
+    def _build_parents(self, rows: List[int]) -> List[ParentChunk]:
+        """依列號建立父 chunk"""
+        columns = self.parent_columns
+        return [
+            self._build_chunk(ParentChunk, PARENT_COLUMNS, columns, row, content)
+            for row, content in self._read_rows("parents", columns, rows)
+        ]
+    
+    def _build_children(self, rows: List[int]) -> List[ChildChunk]:
+        """依列號建立子 chunk"""
+        columns = self.child_columns
+        return [
+            self._build_chunk(ChildChunk, CHILD_COLUMNS, columns, row, content)
+            for row, content in self._read_rows("children", columns, rows)
+        ]
+    
+    @property
+    def parent_chunks(self) -> List[ParentChunk]:
+        """所有父 chunk（第一次存取時載入）"""
+        if self._parent_chunks is None:
+            self._parent_chunks = self._build_parents(list(range(self._parent_count)))
+        return self._parent_chunks
+    
+    @parent_chunks.setter
+    def parent_chunks(self, value: List[ParentChunk]) -> None:
+        self._parent_chunks = value
+    
+    @property
+    def child_chunks(self) -> List[ChildChunk]:
+        """所有子 chunk（第一次存取時載入）"""
+        if self._child_chunks is None:
+            self._child_chunks = list(self.iter_children())
+        return self._child_chunks
+    
+    @child_chunks.setter
+    def child_chunks(self, value: List[ChildChunk]) -> None:
+        self._child_chunks = value
+    
+    @property
+    def parent_count(self) -> int:
+        """父 chunk 數量（不需要載入）"""
+        return self._parent_count
+    
+    @property
+    def child_count(self) -> int:
+        """子 chunk 數量（不需要載入）"""
+        return self._child_count
+    
+    def iter_children(self, batch_size: int = 256) -> Iterator[ChildChunk]:
+        """
+        依序串流讀取子 chunk，同一時間只保留一批內容
+        
+        Args:
+            batch_size: 每次讀取的子 chunk 數量
+        
+        Yields:
+            ChildChunk: 依保存順序產出的子 chunk
+        """
+        for start in range(0, self._child_count, batch_size):
+            yield from self._build_children(list(range(start, min(start + batch_size, self._child_count))))
+    
+    def get_parent(self, chunk_id: str) -> Optional[ParentChunk]:
+        """
+        依 ID 讀取單一父 chunk（只讀取該 chunk 的內容）
+        
+        Args:
+            chunk_id: 父 chunk ID
+        
+        Returns:
+            Optional[ParentChunk]: 找不到時返回 None
+        """
+        if self._parent_rows is None:
+            self._parent_rows = {chunk_id: row for row, chunk_id in enumerate(self.parent_columns["chunk_id"])}
+        row = self._parent_rows.get(chunk_id)
+        if row is None:
+            return None
+        if self._parent_chunks is not None:
+            return self._parent_chunks[row]
+        return self._build_parents([row])[0]
+    
+    def get_child(self, chunk_id: str) -> Optional[ChildChunk]:
+        """
+        依 ID 讀取單一子 chunk
+        
+        Args:
+            chunk_id: 子 chunk ID
+        
+        Returns:
+            Optional[ChildChunk]: 找不到時返回 None
+        """
+        if self._child_rows is None:
+            self._child_rows = {chunk_id: row for row, chunk_id in enumerate(self.child_columns["chunk_id"])}
+        row = self._child_rows.get(chunk_id)
+        if row is None:
+            return None
+        if self._child_chunks is not None:
+            return self._child_chunks[row]
+        return self._build_children([row])[0]
+    
+    def get_chunk_by_id(self, chunk_id: str, is_parent: bool = True) -> Optional[ParentChunk | ChildChunk]:
+        """根據ID獲取chunk"""
+        return self.get_parent(chunk_id) if is_parent else self.get_child(chunk_id)
+    
+    def get_children_of_parent(self, parent_chunk_id: str) -> List[ChildChunk]:
+        """獲取指定父chunk的所有子chunk（依保存的父→子連結讀取）"""
+        if self._parent_rows is None:
+            self.get_parent(parent_chunk_id)
+        row = self._parent_rows.get(parent_chunk_id)
+        if row is None:
+            return []
+        child_rows = self.parent_columns["child_rows"][row]
+        if self._child_chunks is not None:
+            return [self._child_chunks[child_row] for child_row in child_rows]
+        return self._build_children(child_rows)
+    
+    def get_parent_of_child(self, child_chunk_id: str) -> Optional[ParentChunk]:
+        """獲取指定子chunk的父chunk"""
+        if self._child_rows is None:
+            self.get_child(child_chunk_id)
+        row = self._child_rows.get(child_chunk_id)
+        if row is None:
+            return None
+        return self.get_parent(self.child_columns["parent_chunk_id"][row])
+    
+    def materialize(self) -> HierarchicalSplitResult:
+        """
+        載入所有 chunk 並返回一般的 HierarchicalSplitResult
+        
+        Returns:
+            HierarchicalSplitResult: 完整載入的分割結果
+        """
+        return HierarchicalSplitResult(
+            parent_chunks=list(self.parent_chunks),
+            child_chunks=list(self.child_chunks),
+            grouping_analysis=self.grouping_analysis,
+            processing_metadata=dict(self.processing_metadata)
+        )
+
+
+class HierarchicalResultStore:
+    """分層分割結果的欄式儲存"""
+    
+    def __init__(self, store_dir: str = "service/serialization/hierarchical"):
+        """
+        初始化儲存
+        
+        Args:
+            store_dir: 儲存目錄
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def make_key(conversion_result: ConversionResult, splitter_config: Dict[str, Any]) -> str:
+        """
+        計算儲存鍵
+        
+        Args:
+            conversion_result: 轉換結果
+            splitter_config: 分割器的完整配置（需可 JSON 序列化）
+        
+        Returns:
+            str: 儲存鍵
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{STORE_FORMAT_VERSION}\0".encode('ascii'))
+        digest.update(conversion_hash(conversion_result).encode('ascii'))
+        digest.update(json.dumps(splitter_config, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _entry_dir(self, key: str) -> Path:
+        """取得儲存項目的目錄"""
+        return self.store_dir / key
+    
+    def contains(self, key: str) -> bool:
+        """檢查是否有指定的鍵"""
+        return (self._entry_dir(key) / "manifest.json").exists()
+    
+    def save(self, key: str, result: HierarchicalSplitResult) -> str:
+        """
+        保存分割結果
+        
+        先寫入暫存目錄再改名，其他進程不會讀到寫到一半的項目。
+        
+        Args:
+            key: 儲存鍵
+            result: 分割結果
+        
+        Returns:
+            str: 儲存項目目錄
+        """
+        entry_dir = self._entry_dir(key)
+        parents = list(result.parent_chunks)
+        children = list(result.child_chunks)
+        
+        parent_rows = {chunk.chunk_id: row for row, chunk in enumerate(parents)}
+        child_rows: List[List[int]] = [[] for _ in parents]
+        for row, child in enumerate(children):
+            parent_row = parent_rows.get(child.parent_chunk_id)
+            if parent_row is not None:
+                child_rows[parent_row].append(row)
+        
+        contexts: Dict[int, int] = {}
+        context_objects = {id(chunk.context): chunk.context for chunk in parents + children}
+        
+        temp_dir = Path(tempfile.mkdtemp(dir=str(self.store_dir), prefix=f".{key[:12]}_"))
+        try:
+            parent_columns = _columns(parents, PARENT_COLUMNS, contexts)
+            parent_columns["content_offsets"] = _write_content(temp_dir / "parents.content", parents)
+            parent_columns["child_rows"] = child_rows
+            _write_json(temp_dir / "parents.json", parent_columns)
+            
+            child_columns = _columns(children, CHILD_COLUMNS, contexts)
+            child_columns["content_offsets"] = _write_content(temp_dir / "children.content", children)
+            _write_json(temp_dir / "children.json", child_columns)
+            
+            # manifest 最後寫入，作為項目完整的標記
+            _write_json(temp_dir / "manifest.json", {
+                "format_version": STORE_FORMAT_VERSION,
+                "key": key,
+                "parent_count": len(parents),
+                "child_count": len(children),
+                "contexts": [
+                    {"fields": context_objects[context_id].fields,
+                     "header_paths": context_objects[context_id].header_paths}
+                    for context_id in sorted(contexts, key=contexts.get)
+                ],
+                "grouping_analysis": asdict(result.grouping_analysis),
+                "processing_metadata": result.processing_metadata
+            })
+            
+            if entry_dir.exists():
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(temp_dir, entry_dir)
+        except OSError:
+            # 其他進程已寫入相同的鍵，保留既有項目
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            if not self.contains(key):
+                raise
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        
+        logger.info(f"Hierarchical split result stored: {key[:12]} ({len(parents)} parents, {len(children)} children)")
+        return str(entry_dir)
+    
+    def load(self, key: str) -> Optional[StoredHierarchicalSplitResult]:
+        """
+        延遲載入分割結果（只讀取 manifest）
+        
+        Args:
+            key: 儲存鍵
+        
+        Returns:
+            Optional[StoredHierarchicalSplitResult]: 命中時返回結果，否則返回 None
+        """
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(entry_dir / "manifest.json", 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding corrupt hierarchical store entry {key[:12]}: {e}")
+            self.remove(key)
+            return None
+        
+        if manifest.get("format_version") != STORE_FORMAT_VERSION:
+            return None
+        
+        logger.info(f"Hierarchical store hit: {key[:12]}")
+        return StoredHierarchicalSplitResult(entry_dir, manifest)
+    
+    def remove(self, key: str) -> None:
+        """移除儲存項目，不存在時忽略"""
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
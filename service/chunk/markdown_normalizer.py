@@ -3,13 +3,18 @@ Markdown 正規化器
 
 清理和正規化 Markdown 內容，特別針對表格進行優化，
 移除多餘的空格、符號和 HTML 標籤，使其更適合 LLM 處理。
+
+HTML 標籤可能跨行，先對整份文字移除；其餘規則（表格清理、行尾與多餘空格、空行合併）
+在同一次逐行處理中完成，不再每個步驟各自產生一份完整文字。
 """
 
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from langchain_core.documents import Document
 import logging
 
+from .page_executor import DEFAULT_PARALLEL_PAGE_THRESHOLD, map_pages
+
 logger = logging.getLogger(__name__)
 
 
@@ -51,6 +56,9 @@ class MarkdownNormalizer:
         # 多餘換行模式
         self.extra_newlines_pattern = re.compile(r'\n{3,}')
         
+        # 多餘空行模式（空行之間夾雜空白字元）
+        self.extra_blank_lines_pattern = re.compile(r'\n\s*\n\s*\n')
+        
         # 表格分隔符模式（多餘的 - 符號）
         self.table_separator_pattern = re.compile(r'\|[\s\-]+\|')
         
@@ -112,6 +120,9 @@ class MarkdownNormalizer:
         """
         正規化文本內容
         
+        依序套用：移除 HTML 標籤、統一換行符、清理表格行（表格結束後補空行）、
+        移除行尾與多餘空格、去除首尾空白並合併多餘空行，以換行符結尾。
+        
         Args:
             text: 原始文本
             
@@ -121,126 +132,91 @@ class MarkdownNormalizer:
         if not text:
             return text
         
-        normalized = text
+        # 1. 移除 HTML 標籤（標籤可能跨行，對整份文字處理；<br> 也在此被移除）
+        if self.remove_html_tags and '<' in text:
+            text = self.html_tag_pattern.sub('', text)
         
-        # 1. 移除 HTML 標籤
-        if self.remove_html_tags:
-            normalized = self._remove_html_tags(normalized)
+        # 2. 統一換行符（連續換行在最後一併合併）
+        if self.normalize_line_breaks and '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
         
-        # 2. 正規化換行符
-        if self.normalize_line_breaks:
-            normalized = self._normalize_line_breaks(normalized)
-        
-        # 3. 清理表格格式
-        if self.clean_tables:
-            normalized = self._clean_tables(normalized)
+        # 3. 逐行清理表格與空格
+        clean_tables = self.clean_tables and '|' in text
+        remove_extra_spaces = self.remove_extra_spaces
+        extra_spaces_sub = self.extra_spaces_pattern.sub
+        lines = []
+        in_table = False
+        previous_blank = False
+        
+        for line in text.split('\n'):
+            if clean_tables:
+                if '|' in line:
+                    in_table = True
+                    line = self._clean_table_line(line)
+                elif in_table:
+                    # 表格結束，後面緊接內容時補一個空行
+                    if line.strip() and not line.startswith('#'):
+                        lines.append('')
+                    in_table = False
         
-        # 4. 移除多餘空格
-        if self.remove_extra_spaces:
-            normalized = self._remove_extra_spaces(normalized)
+            if remove_extra_spaces:
+                line = line.rstrip()
+                if '  ' in line or '\t' in line:
+                    line = extra_spaces_sub(' ', line)
+                # 行尾空白已移除，連續空行只保留一個（等同合併三個以上的換行）
+                if not line:
+                    if previous_blank:
+                        continue
+                    previous_blank = True
+                else:
+                    previous_blank = False
+        
+            lines.append(line)
+        
+        # 4. 去除首尾空白並合併多餘空行
+        normalized = '\n'.join(lines).strip()
+        if not remove_extra_spaces:
+            normalized = self.extra_blank_lines_pattern.sub('\n\n', normalized)
         
-        # 5. 最終清理
-        normalized = self._final_cleanup(normalized)
+        # 確保以單個換行符結尾
+        if normalized:
+            normalized += '\n'
         
         return normalized
     
-    def _remove_html_tags(self, text: str) -> str:
-        """移除 HTML 標籤"""
-        # 移除常見的 HTML 標籤
-        text = self.html_tag_pattern.sub('', text)
-        
-        # 特別處理 <br> 標籤
-        text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
-        
-        return text
-    
-    def _normalize_line_breaks(self, text: str) -> str:
-        """正規化換行符"""
-        # 統一換行符
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    def normalize_many(self, texts: Sequence[str],
+                       max_workers: Optional[int] = None,
+                       parallel_threshold: int = DEFAULT_PARALLEL_PAGE_THRESHOLD) -> List[str]:
+        """
+        正規化多段文本（例如一份文件的所有頁面）
         
-        # 移除多餘的換行符（保留最多兩個連續換行）
-        text = self.extra_newlines_pattern.sub('\n\n', text)
+        文本數量達到門檻時分派到進程池處理，結果順序與輸入相同。
         
-        return text
+        Args:
+            texts: 原始文本列表
+            max_workers: 工作進程數量，1 表示不使用進程池，None 表示使用 CPU 核心數
+            parallel_threshold: 文本數量少於此值時逐一處理
     
-    def _clean_tables(self, text: str) -> str:
-        """清理表格格式"""
-        lines = text.split('\n')
-        cleaned_lines = []
-        in_table = False
-        
-        for line in lines:
-            # 檢查是否為表格行
-            if '|' in line:
-                in_table = True
-                cleaned_line = self._clean_table_line(line)
-                cleaned_lines.append(cleaned_line)
-            else:
-                if in_table:
-                    # 表格結束，檢查是否需要添加空行
-                    if line.strip() and not line.startswith('#'):
-                        cleaned_lines.append('')
-                    in_table = False
-                cleaned_lines.append(line)
-        
-        return '\n'.join(cleaned_lines)
+        Returns:
+            List[str]: 正規化後的文本列表
+        """
+        return map_pages(self, 'normalize_text', [(text,) for text in texts],
+                         max_workers=max_workers, parallel_threshold=parallel_threshold)
     
     def _clean_table_line(self, line: str) -> str:
-        """清理單個表格行"""
-        # 移除行首行尾空格
+        """清理單個表格行（去除首尾空白、各單元格前後空白與內部多餘空格）"""
         line = line.strip()
-        
-        # 移除多餘的空格
-        line = self.extra_spaces_pattern.sub(' ', line)
-        
-        # 清理表格分隔符（移除多餘的 - 符號）
-        if re.match(r'\|[\s\-]+\|', line):
-            # 這是表格分隔符行，簡化為標準格式
-            parts = line.split('|')
-            if len(parts) >= 3:
-                # 保持原有的欄位數量，只簡化分隔符
-                simplified_parts = [''] + ['---'] * (len(parts) - 2) + ['']
-                line = '|'.join(simplified_parts)
-        
-        # 清理表格單元格內容
         parts = line.split('|')
-        cleaned_parts = []
         
-        for part in parts:
-            # 移除前後空格
-            cleaned_part = part.strip()
-            # 移除內部多餘空格
-            cleaned_part = self.extra_spaces_pattern.sub(' ', cleaned_part)
-            cleaned_parts.append(cleaned_part)
-        
-        return '|'.join(cleaned_parts)
-    
-    def _remove_extra_spaces(self, text: str) -> str:
-        """移除多餘空格"""
-        # 移除行尾空格
-        lines = text.split('\n')
-        cleaned_lines = [line.rstrip() for line in lines]
-        
-        # 移除多餘的空白字符
-        text = '\n'.join(cleaned_lines)
-        text = self.extra_spaces_pattern.sub(' ', text)
-        
-        return text
-    
-    def _final_cleanup(self, text: str) -> str:
-        """最終清理"""
-        # 移除開頭和結尾的空白
-        text = text.strip()
-        
-        # 移除多餘的空行
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
-        
-        # 確保以單個換行符結尾
-        if text and not text.endswith('\n'):
-            text += '\n'
+        # 表格分隔符行簡化為標準格式（保持原有的欄位數量）
+        if self.table_separator_pattern.match(line):
+            return '|'.join([''] + ['---'] * (len(parts) - 2) + [''])
         
-        return text
+        # 空格合併不會跨越 |，可以在組回整行後一次處理
+        line = '|'.join([part.strip() for part in parts])
+        if '  ' in line or '\t' in line:
+            line = self.extra_spaces_pattern.sub(' ', line)
+        return line
     
     def get_normalization_stats(self, original_text: str, normalized_text: str) -> Dict[str, Any]:
         """獲取正規化統計信息"""
@@ -0,0 +1,357 @@
+"""
+偏移量 Markdown 分割器
+
+取代 LangChain 的 MarkdownHeaderTextSplitter + RecursiveCharacterTextSplitter 組合。
+對正規化後的文字只做一次逐行掃描，產生 (start, end, header_path) 區段；
+大小分割與重疊也只是同一份緩衝區上的偏移範圍，只有在輸出 Document 時才切出字串。
+
+與 LangChain 的差異：MarkdownHeaderTextSplitter 會去除每行前後空白、刪除空行並以 "  \\n" 重新連接，
+這裡的區段直接是原文的連續片段，段落之間的空行得以保留（大小分割也因此能優先在段落邊界切開）。
+標題層級、程式碼區塊內不視為標題、純標題區段併入下一個更深層標題等行為與 LangChain 相同。
+
+長度函數可替換（例如 token_length.TokenLengthFunction）：候選片段一次批次計算長度（count_many），
+非字元長度時合併後的區段會再實際測量一次，超過 chunk_size 才進一步切開。
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# 標題路徑：((metadata 名稱, 標題文字), ...)，由淺到深
+HeaderPath = Tuple[Tuple[str, str], ...]
+
+DEFAULT_HEADERS_TO_SPLIT_ON = [
+    ("#", "Header 1"),
+    ("##", "Header 2"),
+    ("###", "Header 3"),
+    ("####", "Header 4"),
+]
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+class TextSpan(NamedTuple):
+    """緩衝區中的一段文字"""
+    start: int
+    end: int
+    header_path: HeaderPath = ()
+    
+    def text(self, buffer: str) -> str:
+        """從緩衝區切出這段文字"""
+        return buffer[self.start:self.end]
+    
+    def header_metadata(self) -> Dict[str, str]:
+        """標題路徑轉為 metadata（與 MarkdownHeaderTextSplitter 的鍵相同，如 "Header 1"）"""
+        return dict(self.header_path)
+
+
+def _strip_range(text: str, start: int, end: int) -> Tuple[int, int]:
+    """去除範圍前後的空白，等同 text[start:end].strip() 的範圍"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+class MarkdownSpanSplitter:
+    """以偏移量表示結果的 Markdown 標題與大小分割器"""
+    
+    def __init__(self,
+                 headers_to_split_on: Optional[List[Tuple[str, str]]] = None,
+                 chunk_size: Optional[int] = None,
+                 chunk_overlap: int = 0,
+                 separators: Optional[List[str]] = None,
+                 length_function: Callable[[str], int] = len):
+        """
+        初始化分割器
+        
+        Args:
+            headers_to_split_on: 要分割的標題層級，None 使用 # 到 ####
+            chunk_size: 區段大小上限，None 表示只依標題分割
+            chunk_overlap: 相鄰區段的重疊大小
+            separators: 大小分割時依序嘗試的分隔符
+            length_function: 計算文字長度的函數（預設字元數；提供 count_many 方法時批次計算）
+        """
+        if chunk_size is not None and chunk_overlap > chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) is larger than chunk_size ({chunk_size})")
+        
+        self.headers_to_split_on = sorted(
+            headers_to_split_on if headers_to_split_on is not None else DEFAULT_HEADERS_TO_SPLIT_ON,
+            key=lambda header: len(header[0]),
+            reverse=True
+        )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators) if separators is not None else list(DEFAULT_SEPARATORS)
+        self.length_function = length_function
+    
+    def _length(self, text: str, start: int, end: int) -> int:
+        """範圍的長度；預設的 len 直接由偏移量計算，不切出字串"""
+        if self.length_function is len:
+            return end - start
+        return self.length_function(text[start:end])
+    
+    def lengths(self, text: str, ranges: Iterable[Tuple[int, ...]]) -> List[int]:
+        """
+        批次計算多個範圍的長度
+        
+        Args:
+            text: 緩衝區
+            ranges: (start, end) 範圍或 TextSpan
+        
+        Returns:
+            List[int]: 各範圍的長度
+        """
+        ranges = [(item[0], item[1]) for item in ranges]
+        if self.length_function is len:
+            return [end - start for start, end in ranges]
+        count_many = getattr(self.length_function, "count_many", None)
+        if count_many is not None:
+            return count_many([text[start:end] for start, end in ranges])
+        return [self.length_function(text[start:end]) for start, end in ranges]
+    
+    def split(self, text: str) -> List[TextSpan]:
+        """
+        依標題分割，超過 chunk_size 的區段再依大小分割
+        
+        Args:
+            text: 正規化後的 Markdown 文字
+        
+        Returns:
+            List[TextSpan]: 依原文順序排列的區段
+        """
+        header_spans = self.split_headers(text)
+        if self.chunk_size is None:
+            return header_spans
+        
+        spans = []
+        lengths = self.lengths(text, header_spans)
+        for span, length in zip(header_spans, lengths):
+            if length > self.chunk_size:
+                spans.extend(self.split_span(text, span))
+            else:
+                spans.append(span)
+        return spans
+    
+    def split_headers(self, text: str) -> List[TextSpan]:
+        """
+        依標題分割（保留標題行），一次逐行掃描
+        
+        Args:
+            text: Markdown 文字
+        
+        Returns:
+            List[TextSpan]: 標題區段，header_path 為區段所屬的標題路徑
+        """
+        spans: List[TextSpan] = []
+        last_is_header = False
+        
+        def emit(start: int, end: int, path: HeaderPath, header_only: bool) -> None:
+            nonlocal last_is_header
+            if spans:
+                previous = spans[-1]
+                # 相同標題路徑的相鄰區段合併；只有標題的區段併入下一個更深層的標題區段
+                if previous.header_path == path or (
+                        last_is_header and len(previous.header_path) < len(path)):
+                    spans[-1] = TextSpan(previous.start, end, path)
+                    last_is_header = header_only
+                    return
+            spans.append(TextSpan(start, end, path))
+            last_is_header = header_only
+        
+        header_stack: List[Tuple[int, str, str]] = []
+        path: HeaderPath = ()
+        section_start: Optional[int] = None
+        section_end = 0
+        header_only = False
+        in_code_block = False
+        opening_fence = ""
+        
+        text_length = len(text)
+        position = 0
+        while position <= text_length:
+            newline = text.find("\n", position)
+            line_end = text_length if newline == -1 else newline
+            line_start, stripped_end = _strip_range(text, position, line_end)
+            line = text[line_start:stripped_end]
+            position = line_end + 1
+            
+            # 程式碼區塊內的行不視為標題
+            if not in_code_block:
+                if line.startswith("```") and line.count("```") == 1:
+                    in_code_block = True
+                    opening_fence = "```"
+                elif line.startswith("~~~"):
+                    in_code_block = True
+                    opening_fence = "~~~"
+            elif line.startswith(opening_fence):
+                in_code_block = False
+                opening_fence = ""
+            
+            header = None if in_code_block else self._match_header(line)
+            if header is not None:
+                level, name, value = header
+                while header_stack and header_stack[-1][0] >= level:
+                    header_stack.pop()
+                header_stack.append((level, name, value))
+                
+                if section_start is not None:
+                    emit(section_start, section_end, path, header_only)
+                path = tuple((entry[1], entry[2]) for entry in header_stack)
+                section_start, section_end = line_start, stripped_end
+                header_only = True
+            elif line:
+                if section_start is None:
+                    section_start = line_start
+                section_end = stripped_end
+                header_only = False
+        
+        if section_start is not None:
+            emit(section_start, section_end, path, header_only)
+        return spans
+    
+    def _match_header(self, line: str) -> Optional[Tuple[int, str, str]]:
+        """判斷去除空白後的行是否為標題，返回 (層級, metadata 名稱, 標題文字)"""
+        if not line.startswith("#"):
+            return None
+        for separator, name in self.headers_to_split_on:
+            if line.startswith(separator) and (len(line) == len(separator) or line[len(separator)] == " "):
+                return separator.count("#"), name, line[len(separator):].strip()
+        return None
+    
+    def split_span(self, text: str, span: TextSpan) -> List[TextSpan]:
+        """
+        依大小分割區段（與 RecursiveCharacterTextSplitter 相同：分隔符保留在下一段開頭，結果去除前後空白）
+        
+        Args:
+            text: 緩衝區
+            span: 要分割的區段
+        
+        Returns:
+            List[TextSpan]: 子區段（沿用原區段的 header_path，重疊部分是相同的偏移範圍）
+        """
+        if self.chunk_size is None:
+            raise ValueError("chunk_size is required for size-based splitting")
+        return [TextSpan(start, end, span.header_path)
+                for start, end in self._split_range(text, span.start, span.end, self.separators)]
+    
+    def split_text(self, text: str) -> List[str]:
+        """依大小分割整段文字並返回字串"""
+        return [text[start:end] for start, end in self._split_range(text, 0, len(text), self.separators)]
+    
+    def _split_range(self, text: str, start: int, end: int, separators: List[str]) -> List[Tuple[int, int]]:
+        """遞迴分割範圍：使用範圍內出現的第一個分隔符，仍然過大的片段再用下一個分隔符分割"""
+        separator = separators[-1]
+        remaining: List[str] = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                remaining = separators[i + 1:]
+                break
+        
+        pieces = self._pieces(text, start, end, separator)
+        piece_lengths = self.lengths(text, pieces)
+        
+        ranges: List[Tuple[int, int]] = []
+        small_pieces: List[Tuple[int, int]] = []
+        small_lengths: List[int] = []
+        for piece, length in zip(pieces, piece_lengths):
+            if length < self.chunk_size:
+                small_pieces.append(piece)
+                small_lengths.append(length)
+                continue
+            if small_pieces:
+                ranges.extend(self._merge_pieces(text, small_pieces, small_lengths))
+                small_pieces, small_lengths = [], []
+            if remaining:
+                ranges.extend(self._split_range(text, piece[0], piece[1], remaining))
+            else:
+                ranges.append(piece)
+        if small_pieces:
+            ranges.extend(self._merge_pieces(text, small_pieces, small_lengths))
+        return ranges
+    
+    @staticmethod
+    def _pieces(text: str, start: int, end: int, separator: str) -> List[Tuple[int, int]]:
+        """在分隔符出現處切開範圍，分隔符保留在後一片段的開頭"""
+        if not separator:
+            return [(i, i + 1) for i in range(start, end)]
+        
+        pieces = []
+        piece_start = start
+        found = text.find(separator, start, end)
+        while found != -1:
+            if found > piece_start:
+                pieces.append((piece_start, found))
+            piece_start = found
+            found = text.find(separator, found + len(separator), end)
+        if end > piece_start:
+            pieces.append((piece_start, end))
+        return pieces
+    
+    def _merge_pieces(self, text: str, pieces: List[Tuple[int, int]], lengths: List[int]) -> List[Tuple[int, int]]:
+        """將相鄰的小片段合併到 chunk_size 以內，相鄰結果保留 chunk_overlap 的重疊"""
+        ranges: List[Tuple[int, int]] = []
+        window_start = 0
+        total = 0
+        
+        for index, length in enumerate(lengths):
+            if total + length > self.chunk_size and index > window_start:
+                if total > self.chunk_size:
+                    logger.warning(f"Created a chunk of size {total}, which is longer than the specified {self.chunk_size}")
+                self._emit_window(text, pieces, window_start, index, ranges)
+                while total > self.chunk_overlap or (total + length > self.chunk_size and total > 0):
+                    total -= lengths[window_start]
+                    window_start += 1
+            total += length
+        
+        if window_start < len(pieces):
+            self._emit_window(text, pieces, window_start, len(pieces), ranges)
+        return ranges
+    
+    def _emit_window(self, text: str, pieces: List[Tuple[int, int]], first: int, last: int,
+                     ranges: List[Tuple[int, int]]) -> None:
+        """
+        輸出 pieces[first:last] 合併後的範圍（去除前後空白）
+        
+        token 數不能逐段相加（片段接合處可能合併或拆出 token），非字元長度時實際測量合併結果，
+        超過 chunk_size 就對半切開；單一片段一定小於 chunk_size，所以結果一定放得進上限。
+        """
+        merged = _strip_range(text, pieces[first][0], pieces[last - 1][1])
+        if merged[1] <= merged[0]:
+            return
+        if self.length_function is not len and last - first > 1 and self._length(text, *merged) > self.chunk_size:
+            middle = (first + last) // 2
+            self._emit_window(text, pieces, first, middle, ranges)
+            self._emit_window(text, pieces, middle, last, ranges)
+            return
+        ranges.append(merged)
+    
+    @staticmethod
+    def to_documents(text: str, spans: Iterable[TextSpan],
+                     metadata: Optional[Dict[str, object]] = None) -> List[Document]:
+        """
+        在 API 邊界將區段轉為 Document
+        
+        Args:
+            text: 緩衝區
+            spans: 區段
+            metadata: 附加到每個 Document 的 metadata
+        
+        Returns:
+            List[Document]: page_content 為區段文字、metadata 含標題路徑的 Document
+        """
+        documents = []
+        for span in spans:
+            document_metadata = span.header_metadata()
+            if metadata:
+                document_metadata.update(metadata)
+            documents.append(Document(page_content=text[span.start:span.end], metadata=document_metadata))
+        return documents
@@ -0,0 +1,128 @@
+"""
+頁面平行分割
+
+各頁面的正規化、表格標記、標題分割與子分割彼此獨立，頁數夠多時分派到進程池處理，
+結果依頁面順序組回，輸出與逐頁處理相同；頁數少於門檻時直接逐頁處理，避免啟動進程池的成本。
+iter_pages 以串流方式返回結果，同時只有有限數量的頁面在處理中（lookahead），記憶體用量不隨頁數增加。
+"""
+
+import logging
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 頁數少於此值時不使用進程池
+DEFAULT_PARALLEL_PAGE_THRESHOLD = 32
+
+# 工作進程中的分割器（每個工作進程只反序列化一次）
+_worker_splitter = None
+
+
+def _init_page_worker(splitter) -> None:
+    """工作進程初始化：保存分割器"""
+    global _worker_splitter
+    _worker_splitter = splitter
+
+
+def _run_page_task(task: Tuple[str, tuple]) -> Any:
+    """在工作進程中以分割器的方法處理一個頁面"""
+    method_name, args = task
+    return getattr(_worker_splitter, method_name)(*args)
+
+
+def _use_process_pool(splitter, task_count: int, max_workers: Optional[int], parallel_threshold: int) -> bool:
+    """判斷是否使用進程池（頁數不足或分割器無法 pickle 時逐頁處理）"""
+    if max_workers == 1 or task_count < max(parallel_threshold, 2):
+        return False
+    try:
+        pickle.dumps(splitter)
+    except Exception as e:
+        logger.warning(f"Splitter cannot be sent to worker processes ({e}), splitting pages serially")
+        return False
+    return True
+
+
+def map_pages(splitter, method_name: str, tasks: Sequence[tuple],
+              max_workers: Optional[int] = 1,
+              parallel_threshold: int = DEFAULT_PARALLEL_PAGE_THRESHOLD) -> List[Any]:
+    """
+    以分割器的方法處理每個頁面，返回依頁面順序排列的結果
+    
+    Args:
+        splitter: 分割器（使用進程池時會被 pickle 傳給工作進程）
+        method_name: 處理單一頁面的方法名稱
+        tasks: 每個頁面的方法參數
+        max_workers: 工作進程數量，1 表示不使用進程池，None 表示使用 CPU 核心數
+        parallel_threshold: 頁數少於此值時逐頁處理
+    
+    Returns:
+        List[Any]: 各頁面的處理結果（順序與 tasks 相同）
+    """
+    method = getattr(splitter, method_name)
+    if not _use_process_pool(splitter, len(tasks), max_workers, parallel_threshold):
+        return [method(*args) for args in tasks]
+    
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+    logger.info(f"Splitting {len(tasks)} pages with {workers} worker processes")
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker,
+                                 initargs=(splitter,)) as executor:
+            return list(executor.map(_run_page_task, [(method_name, args) for args in tasks],
+                                     chunksize=chunksize))
+    except BrokenProcessPool:
+        logger.warning("Page worker pool broken, splitting pages serially")
+        return [method(*args) for args in tasks]
+
+
+def iter_pages(splitter, method_name: str, tasks: Sequence[tuple],
+               max_workers: Optional[int] = 1,
+               parallel_threshold: int = DEFAULT_PARALLEL_PAGE_THRESHOLD,
+               lookahead: Optional[int] = None) -> Iterator[Any]:
+    """
+    以分割器的方法處理每個頁面，依頁面順序逐一返回結果
+
+    Args:
+        splitter: 分割器（使用進程池時會被 pickle 傳給工作進程）
+        method_name: 處理單一頁面的方法名稱
+        tasks: 每個頁面的方法參數
+        max_workers: 工作進程數量，1 表示不使用進程池，None 表示使用 CPU 核心數
+        parallel_threshold: 頁數少於此值時逐頁處理
+        lookahead: 使用進程池時同時處理中的頁面數量上限，None 為工作進程數量的兩倍
+
+    Yields:
+        Any: 各頁面的處理結果（順序與 tasks 相同）
+    """
+    method = getattr(splitter, method_name)
+    if not _use_process_pool(splitter, len(tasks), max_workers, parallel_threshold):
+        for args in tasks:
+            yield method(*args)
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    window = max(1, lookahead or workers * 2)
+    logger.info(f"Streaming {len(tasks)} pages with {workers} worker processes (lookahead={window})")
+
+    next_index = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker,
+                                 initargs=(splitter,)) as executor:
+            pending = deque()
+            submitted = 0
+            while next_index < len(tasks):
+                while submitted < len(tasks) and len(pending) < window:
+                    pending.append(executor.submit(_run_page_task, (method_name, tasks[submitted])))
+                    submitted += 1
+                result = pending.popleft().result()
+                next_index += 1
+                yield result
+    except BrokenProcessPool:
+        logger.warning("Page worker pool broken, splitting remaining pages serially")
+        for args in tasks[next_index:]:
+            yield method(*args)
@@ -5,19 +5,24 @@
 """
 
 import re
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from langchain_core.documents import Document
 import logging
 
+from .chunk_ids import document_key, make_chunk_id
+from .table_scanner import MarkdownTable, has_table, scan_tables
+
 logger = logging.getLogger(__name__)
 
+# split_table_rows 標記在表格行組元數據中的欄位
+ROW_GROUP_FIELDS = ('table_id', 'table_row_start', 'table_row_end', 'table_total_rows')
+
 
 class TableHandler:
     """表格處理器"""
     
     def __init__(self):
         """初始化表格處理器"""
-        self.table_pattern = r'(\|.*\|(?:\n\|.*\|)*)'
         self.table_start_marker = "<!-- TABLE_START -->"
         self.table_end_marker = "<!-- TABLE_END -->"
     
@@ -32,49 +37,33 @@ class TableHandler:
             List[Dict]: 表格信息列表
         """
         tables = []
-        matches = re.finditer(self.table_pattern, content, re.MULTILINE)
-        
-        for i, match in enumerate(matches):
-            table_content = match.group(1)
-            start_pos = match.start()
-            end_pos = match.end()
-            
-            # 分析表格結構
-            table_info = self._analyze_table_structure(table_content)
-            
+        for i, table in enumerate(self.scan_tables(content)):
             tables.append({
                 'index': i,
-                'content': table_content,
-                'start_pos': start_pos,
-                'end_pos': end_pos,
-                'rows': table_info['rows'],
-                'columns': table_info['columns'],
-                'has_header': table_info['has_header']
+                'content': table.text(content),
+                'start_pos': table.start,
+                'end_pos': table.end,
+                'rows': table.row_count,
+                'columns': table.column_count,
+                'has_header': table.has_header
             })
         
         logger.info(f"Detected {len(tables)} tables in content")
         return tables
     
-    def _analyze_table_structure(self, table_content: str) -> Dict[str, Any]:
-        """分析表格結構"""
-        lines = table_content.strip().split('\n')
-        rows = len(lines)
+    def scan_tables(self, content: str) -> Tuple[MarkdownTable, ...]:
+        """
+        逐行掃描內容中的表格位置與結構
         
-        # 計算列數（基於第一行）
-        if rows > 0:
-            first_line = lines[0]
-            columns = len([cell for cell in first_line.split('|') if cell.strip()])
-        else:
-            columns = 0
+        結果依內容快取，標記、檢測與統計共用同一次掃描。
         
-        # 檢查是否有表頭（第二行通常是分隔符行）
-        has_header = rows > 1 and '---' in lines[1] if rows > 1 else False
+        Args:
+            content: Markdown 內容
         
-        return {
-            'rows': rows,
-            'columns': columns,
-            'has_header': has_header
-        }
+        Returns:
+            Tuple[MarkdownTable, ...]: 表格列表（共用物件）
+        """
+        return scan_tables(content)
     
     def mark_tables(self, content: str) -> str:
         """
@@ -86,11 +75,19 @@ class TableHandler:
         Returns:
             str: 標記後的內容
         """
-        def replace_table(match):
-            table_content = match.group(1)
-            return f"\n\n{self.table_start_marker}\n{table_content}\n{self.table_end_marker}\n\n"
-        
-        marked_content = re.sub(self.table_pattern, replace_table, content, flags=re.MULTILINE)
+        tables = self.scan_tables(content)
+        if not tables:
+            return content
+        
+        parts = []
+        cursor = 0
+        for table in tables:
+            parts.append(content[cursor:table.start])
+            parts.append(f"\n\n{self.table_start_marker}\n{table.text(content)}\n{self.table_end_marker}\n\n")
+            cursor = table.end
+        parts.append(content[cursor:])
+        
+        marked_content = "".join(parts)
         logger.info("Tables marked in content")
         return marked_content
     
@@ -124,8 +121,8 @@ class TableHandler:
         if self.table_start_marker in content or self.table_end_marker in content:
             return True
         
-        # 檢查是否包含表格模式
-        if re.search(self.table_pattern, content, re.MULTILINE):
+        # 檢查是否包含表格（掃描結果依內容快取）
+        if has_table(content):
             return True
         
         # 檢查元數據
@@ -134,12 +131,16 @@ class TableHandler:
         
         return False
     
-    def merge_table_chunks(self, table_chunks: List[Document]) -> List[Document]:
+    def merge_table_chunks(self, table_chunks: List[Document],
+                           max_chunk_size: Optional[int] = None,
+                           length_function: Optional[Callable[[str], int]] = None) -> List[Document]:
         """
         合併相關的表格 chunks
         
         Args:
             table_chunks: 表格 chunks 列表
+            max_chunk_size: 合併後的大小上限，超過時依表格行分組（None 表示不限制）
+            length_function: 計算大小的長度函數，None 使用字符數
             
         Returns:
             List[Document]: 合併後的表格 chunks
@@ -150,16 +151,23 @@ class TableHandler:
         merged_chunks = []
         current_table_group = []
         
+        def flush_group():
+            merged_chunk = self._merge_table_group(current_table_group)
+            if max_chunk_size:
+                merged_chunks.extend(self.split_table_rows(merged_chunk, max_chunk_size, length_function))
+            else:
+                merged_chunks.append(merged_chunk)
+        
         for chunk in table_chunks:
             if self.table_start_marker in chunk.page_content:
                 # 開始新的表格組
                 if current_table_group:
-                    merged_chunks.append(self._merge_table_group(current_table_group))
+                    flush_group()
                 current_table_group = [chunk]
             elif self.table_end_marker in chunk.page_content:
                 # 結束當前表格組
                 current_table_group.append(chunk)
-                merged_chunks.append(self._merge_table_group(current_table_group))
+                flush_group()
                 current_table_group = []
             else:
                 # 表格中間內容
@@ -167,7 +175,7 @@ class TableHandler:
         
         # 處理最後一組
         if current_table_group:
-            merged_chunks.append(self._merge_table_group(current_table_group))
+            flush_group()
         
         logger.info(f"Merged {len(table_chunks)} table chunks into {len(merged_chunks)} merged chunks")
         return merged_chunks
@@ -195,6 +203,97 @@ class TableHandler:
         
         return Document(page_content=merged_content, metadata=metadata)
     
+    def split_table_rows(self, chunk: Document, max_chunk_size: int,
+                         length_function: Optional[Callable[[str], int]] = None) -> List[Document]:
+        """
+        將超過大小上限的表格 chunk 依表格行分組
+        
+        每組重複表頭行與分隔行，使每個片段都能獨立理解；表格前後的文字各自成為一個 chunk。
+        每組的元數據標記所屬表格 ID（table_id）與資料行範圍（table_row_start、table_row_end，
+        從 1 起算且不含表頭）。單一資料行加上表頭就超過上限時，該行仍獨立成為一組。
+        
+        Args:
+            chunk: 合併後的表格 chunk
+            max_chunk_size: 每個 chunk 的大小上限（以 length_function 計算）
+            length_function: 長度函數，None 使用字符數；需與分割器計算 chunk_size 的方式相同
+            
+        Returns:
+            List[Document]: 分組後的 chunks（未超過上限或沒有表格時返回原 chunk）
+        """
+        measure = length_function or len
+        content = chunk.page_content
+        tables = self.scan_tables(content)
+        if not tables or measure(content) <= max_chunk_size:
+            return [chunk]
+        
+        parts = []
+        buffer = []
+        
+        def add_part(text: str, **table_metadata):
+            metadata = dict(chunk.metadata)
+            metadata.update(table_metadata)
+            parts.append(Document(page_content=text, metadata=metadata))
+        
+        def flush_buffer():
+            text = "\n".join(buffer).strip()
+            if text:
+                add_part(text, is_table=bool(self.scan_tables(text)))
+            buffer.clear()
+        
+        separator_size = measure("\n")
+        cursor = 0
+        for table_index, table in enumerate(tables):
+            buffer.append(content[cursor:table.start])
+            cursor = table.end
+            table_content = table.text(content)
+            
+            # 整個表格能與前面的文字放在一起
+            if measure("\n".join(buffer + [table_content]).strip()) <= max_chunk_size:
+                buffer.append(table_content)
+                continue
+            flush_buffer()
+            
+            # 表格本身沒有超過上限，保留完整表格（可以與後面的文字放在一起）
+            if measure(table_content) <= max_chunk_size:
+                buffer.append(table_content)
+                continue
+            
+            rows = table_content.split('\n')
+            header_rows = rows[:2] if table.has_header and len(rows) > 2 else []
+            data_rows = rows[len(header_rows):]
+            header = "\n".join(header_rows)
+            table_id = make_chunk_id("table", document_key(chunk.metadata),
+                                     (chunk.metadata.get('page_number'), table_index), table_content)
+            
+            header_size = measure(header) + separator_size if header_rows else 0
+            row_sizes = [measure(row) for row in data_rows]
+            
+            group_start = 0
+            while group_start < len(data_rows):
+                # 以各行長度累加估算可放入的行數
+                group_end = group_start + 1
+                group_size = header_size + row_sizes[group_start]
+                while (group_end < len(data_rows) and
+                       group_size + separator_size + row_sizes[group_end] <= max_chunk_size):
+                    group_size += separator_size + row_sizes[group_end]
+                    group_end += 1
+                
+                # 長度無法逐行相加時（例如 token 數）以實際長度確認，超過上限就少放幾行
+                group_text = "\n".join(header_rows + data_rows[group_start:group_end])
+                while group_end - group_start > 1 and measure(group_text) > max_chunk_size:
+                    group_end -= 1
+                    group_text = "\n".join(header_rows + data_rows[group_start:group_end])
+                
+                add_part(group_text, table_id=table_id, table_row_start=group_start + 1,
+                         table_row_end=group_end, table_total_rows=len(data_rows))
+                group_start = group_end
+        
+        buffer.append(content[cursor:])
+        flush_buffer()
+        
+        logger.info(f"Split oversized table chunk of {len(content)} characters into {len(parts)} row groups")
+        return parts
+    
     def clean_table_markers(self, content: str) -> str:
         """清理表格標記"""
         content = content.replace(self.table_start_marker, "")
@@ -236,8 +335,10 @@ class TableHandler:
     
     def get_table_statistics(self, chunks: List[Document]) -> Dict[str, Any]:
         """獲取表格統計信息"""
-        table_chunks = [chunk for chunk in chunks if self._is_table_chunk(chunk)]
-        regular_chunks = [chunk for chunk in chunks if not self._is_table_chunk(chunk)]
+        table_chunks = []
+        regular_chunks = []
+        for chunk in chunks:
+            (table_chunks if self._is_table_chunk(chunk) else regular_chunks).append(chunk)
         
         total_tables = len(table_chunks)
         total_regular = len(regular_chunks)
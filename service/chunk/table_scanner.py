@@ -0,0 +1,113 @@
+"""
+Markdown 表格掃描器
+
+以單次逐行掃描找出文字中的表格，取代 TableHandler 原本的正則 `(\\|.*\\|(?:\\n\\|.*\\|)*)`，
+識別結果與該正則相同：
+- 表格從某一行的第一個 | 開始（該行需要有兩個以上的 |），到該行最後一個 | 為止
+- 上一行以 | 結尾時，下一行若以 | 開頭且有兩個以上的 |，延續為同一個表格的下一行
+
+掃描器以 find/rfind 直接跳到下一個 |，只處理含 | 的行，整份文字只走一遍，並同時取得行數、列數與表頭。
+掃描結果依文字快取，標記、檢測、統計與 ParentChunk/ChildChunk 的表格旗標共用同一份結果，
+不再每個 chunk 各自執行一次（統計時兩次）正則搜尋。
+"""
+
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+
+# 快取的文字數量上限（chunk 內容與頁面內容共用）
+TABLE_SCAN_CACHE_SIZE = 4096
+
+
+class MarkdownTable(NamedTuple):
+    """文字中的表格位置與結構"""
+    start: int                 # 起始偏移（第一行第一個 |）
+    end: int                   # 結束偏移（最後一行最後一個 | 之後）
+    row_count: int             # 行數（包含分隔行）
+    column_count: int          # 列數（第一行的非空單元格數量）
+    has_header: bool           # 第二行是否為表頭分隔行
+    
+    def text(self, content: str) -> str:
+        """從掃描的文字切出表格內容"""
+        return content[self.start:self.end]
+
+
+def _build_table(text: str, rows: List[Tuple[int, int]]) -> MarkdownTable:
+    """
+    由表格各行的偏移範圍建立 MarkdownTable
+    
+    Args:
+        text: 掃描的文字
+        rows: 各行的 (起始偏移, 結束偏移)
+    
+    Returns:
+        MarkdownTable: 表格資訊
+    """
+    first_start, first_end = rows[0]
+    columns = sum(1 for cell in text[first_start:first_end].split('|') if cell.strip())
+    has_header = len(rows) > 1 and text.find('---', rows[1][0], rows[1][1]) != -1
+    return MarkdownTable(
+        start=first_start,
+        end=rows[-1][1],
+        row_count=len(rows),
+        column_count=columns,
+        has_header=has_header
+    )
+
+
+@lru_cache(maxsize=TABLE_SCAN_CACHE_SIZE)
+def _scan(text: str) -> Tuple[MarkdownTable, ...]:
+    """逐行掃描表格（結果由快取共用）"""
+    tables: List[MarkdownTable] = []
+    length = len(text)
+    find = text.find
+    rfind = text.rfind
+    
+    # 直接跳到下一個 |，沒有 | 的行不需要逐行處理
+    first = find('|')
+    while first != -1:
+        line_end = find('\n', first)
+        if line_end == -1:
+            line_end = length
+        
+        last = rfind('|', first + 1, line_end)
+        if last != -1:
+            rows = [(first, last + 1)]
+            # 行尾就是最後一個 | 時，下一行可以延續表格
+            while rows[-1][1] == line_end < length:
+                next_start = line_end + 1
+                if not text.startswith('|', next_start):
+                    break
+                next_end = find('\n', next_start)
+                if next_end == -1:
+                    next_end = length
+                next_last = rfind('|', next_start + 1, next_end)
+                if next_last == -1:
+                    break
+                rows.append((next_start, next_last + 1))
+                line_end = next_end
+            tables.append(_build_table(text, rows))
+        
+        first = find('|', line_end + 1)
+    
+    return tuple(tables)
+
+
+def scan_tables(text: str) -> Tuple[MarkdownTable, ...]:
+    """
+    找出文字中的所有表格
+    
+    Args:
+        text: Markdown 文字
+    
+    Returns:
+        Tuple[MarkdownTable, ...]: 依位置排列的表格（相同文字返回同一個快取物件）
+    """
+    # 沒有 | 的文字不可能包含表格，不佔用快取
+    if '|' not in text:
+        return ()
+    return _scan(text)
+
+
+def has_table(text: str) -> bool:
+    """文字是否包含表格"""
+    return bool(scan_tables(text))
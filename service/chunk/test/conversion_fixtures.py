@@ -0,0 +1,53 @@
+"""
+分割測試共用的轉換結果
+
+提供多頁保險條款的測試頁面內容，以及由頁面內容建立 ConversionResult 的工廠函數。
+"""
+
+from pathlib import Path
+from typing import Optional, Sequence
+
+from service.chunk.table_scanner import scan_tables
+from service.markdown_integrate.data_models import ConversionResult, ConversionMetadata, PageInfo, join_pages
+
+
+def policy_chapter(number: int, clauses: int) -> str:
+    """第 number 章的測試頁面：承保範圍小節（重複 clauses 次告知條文）與一個給付表格"""
+    return f"""# 第{number}章
+
+## 承保範圍
+
+本章說明第{number}類保險的承保範圍。""" + "被保險人應據實告知。" * clauses + f"""
+
+| 項目 | 金額 |
+|------|------|
+| 住院 | {number * 1000} |
+"""
+
+
+def make_conversion_result(page_contents: Sequence[str],
+                           file_path: str = "/docs/policy.pdf",
+                           titles: Optional[Sequence[str]] = None,
+                           page_offsets: bool = True) -> ConversionResult:
+    """
+    以頁面內容建立測試轉換結果
+    
+    Args:
+        page_contents: 依頁碼排列的頁面內容
+        file_path: 文件路徑
+        titles: 各頁標題，None 時為「第N章」
+        page_offsets: 是否記錄頁面偏移（False 時模擬舊版序列化結果）
+    """
+    titles = titles or [f"第{number}章" for number in range(1, len(page_contents) + 1)]
+    pages = [PageInfo(page_number=number, title=title, content=content, content_length=len(content),
+                      block_count=content.count("\n\n") + 1, block_types={},
+                      table_count=len(scan_tables(content)))
+             for number, (title, content) in enumerate(zip(titles, page_contents), start=1)]
+    content, offsets = join_pages(page_contents)
+    metadata = ConversionMetadata(
+        file_name=Path(file_path).name, file_path=file_path, file_type=".pdf", file_size=2048,
+        total_pages=len(pages), total_tables=sum(page.table_count for page in pages),
+        total_content_length=len(content), conversion_timestamp=1234567890.0, converter_used="marker"
+    )
+    return ConversionResult(content=content, metadata=metadata, pages=pages,
+                            page_offsets=offsets if page_offsets else None)
@@ -0,0 +1,70 @@
+"""
+確定性 chunk ID 與分割結果差異測試
+
+驗證重新分割相同文件得到相同的 chunk ID，以及文件部分變動時 diff 只回報變動頁面的 chunk。
+"""
+
+import re
+import tempfile
+
+from service.chunk.chunk_ids import diff, make_chunk_id
+from service.chunk.hierarchical_splitter import HierarchicalChunkSplitter
+from service.chunk.hierarchical_store import HierarchicalResultStore
+from service.chunk.test.conversion_fixtures import make_conversion_result, policy_chapter
+from service.markdown_integrate.data_models import ConversionResult
+
+
+def make_policy(changed_page: int = 0, file_path: str = "/docs/policy.pdf") -> ConversionResult:
+    """建立四頁的測試轉換結果（changed_page 指定的頁面內容不同）"""
+    page_contents = [policy_chapter(number, number * 6) for number in range(1, 5)]
+    if changed_page:
+        page_contents[changed_page - 1] = page_contents[changed_page - 1].replace("據實告知", "於三十日內通知")
+    return make_conversion_result(page_contents, file_path=file_path)
+
+
+def ids(chunks):
+    return [chunk.chunk_id for chunk in chunks]
+
+
+def test_chunk_ids_are_deterministic():
+    """測試重新分割相同文件得到相同的 ID，不同文件的相同內容得到不同的 ID"""
+    splitter = HierarchicalChunkSplitter(child_chunk_size=100, child_chunk_overlap=10)
+    first = splitter.split_hierarchically(make_policy())
+    second = HierarchicalChunkSplitter(child_chunk_size=100, child_chunk_overlap=10) \
+        .split_hierarchically(make_policy())
+    
+    assert ids(first.parent_chunks) == ids(second.parent_chunks)
+    assert ids(first.child_chunks) == ids(second.child_chunks)
+    assert all(re.fullmatch(r"parent_\d+_\d+_[0-9a-f]{16}", chunk_id) for chunk_id in ids(first.parent_chunks))
+    assert len(set(ids(first.child_chunks))) == len(first.child_chunks)
+    
+    other = splitter.split_hierarchically(make_policy(file_path="/docs/other.pdf"))
+    assert not set(ids(other.parent_chunks)) & set(ids(first.parent_chunks))
+    
+    assert make_chunk_id("child", "parent_x", (1,), "內容") != make_chunk_id("child", "parent_x", (2,), "內容")
+
+
+def test_diff_reports_only_changed_page():
+    """測試只有一頁變動時，diff 只回報該頁的 chunk（上一次的結果從儲存載入）"""
+    splitter = HierarchicalChunkSplitter(child_chunk_size=100, child_chunk_overlap=10)
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = HierarchicalResultStore(store_dir=store_dir)
+        previous = splitter.split_hierarchically(make_policy())
+        key = store.make_key(make_policy(), splitter.get_config())
+        store.save(key, previous)
+        stored = store.load(key)
+        
+        current = splitter.split_hierarchically(make_policy(changed_page=3))
+        result_diff = diff(stored, current)
+    
+    assert result_diff.has_changes
+    assert {chunk.page_number for chunk in result_diff.added_parents} == {3}
+    assert {chunk.page_number for chunk in result_diff.added_children} == {3}
+    removed = set(result_diff.removed_parent_ids) | set(result_diff.removed_child_ids)
+    assert removed == {chunk.chunk_id for chunk in previous.parent_chunks + previous.child_chunks
+                       if chunk.page_number == 3}
+    assert len(result_diff.unchanged_child_ids) == \
+        sum(1 for chunk in current.child_chunks if chunk.page_number != 3)
+    
+    assert not diff(current, current).has_changes
+    assert diff(None, current).summary()['added_children'] == len(current.child_chunks)
@@ -0,0 +1,97 @@
+"""
+精簡 chunk 記錄測試
+
+驗證同一份文件的 chunk 共用 DocumentContext 與標題表、元數據檢視的讀寫語意，
+以及 chunk 傳到其他進程（pickle）後標題仍然正確。
+"""
+
+import pickle
+
+from langchain_core.documents import Document
+
+from service.chunk.hierarchical_models import ChildChunk, DocumentContext, ParentChunk
+from service.chunk.hierarchical_splitter import HierarchicalChunkSplitter
+from service.chunk.test.conversion_fixtures import make_conversion_result, policy_chapter
+from service.markdown_integrate.data_models import ConversionResult
+
+
+def make_policy() -> ConversionResult:
+    """建立兩頁的測試轉換結果"""
+    return make_conversion_result([
+        policy_chapter(number, 20) + "\n## 理賠\n\n" + "保險金依約定給付。" * 20 for number in (1, 2)
+    ])
+
+
+def test_chunks_share_document_context():
+    """測試同一份文件的 chunk 共用一個 context，標題以編號保存"""
+    result = HierarchicalChunkSplitter(child_chunk_size=80, child_chunk_overlap=10) \
+        .split_hierarchically(make_policy())
+    chunks = result.parent_chunks + result.child_chunks
+    
+    contexts = {id(chunk.context) for chunk in chunks}
+    assert len(contexts) == 1
+    context = chunks[0].context
+    assert context.fields == {'source': "/docs/policy.pdf", 'file_name': "policy.pdf", 'file_type': ".pdf"}
+    assert DocumentContext.intern({'file_name': "policy.pdf", 'source': "/docs/policy.pdf",
+                                   'file_type': ".pdf", 'page_number': 9}) is context
+    
+    child = result.child_chunks[0]
+    parent = result.get_parent_of_child(child.chunk_id)
+    assert child.header_id == parent.header_id
+    assert context.header_paths[child.header_id] == (('Header 1', "第1章"), ('Header 2', "承保範圍"))
+    assert dict(child.metadata) == {
+        'Header 1': "第1章", 'Header 2': "承保範圍", 'source': "/docs/policy.pdf", 'file_name': "policy.pdf",
+        'file_type': ".pdf", 'page_number': 1, 'page_title': "第1章",
+        'global_chunk_number': child.metadata['global_chunk_number']
+    }
+    assert parent.header_level == 'Header 1' and parent.header_text == "第1章"
+    assert child.parent_header == "第1章" and child.page_number == 1
+    assert child.document.page_content == child.content
+
+
+def test_metadata_writes_stay_on_chunk():
+    """測試寫入元數據只影響該 chunk，不會改到共用的 context"""
+    metadata = {'source': "/docs/a.pdf", 'file_name': "a.pdf", 'Header 1': "總則", 'page_number': 3}
+    first = ParentChunk(document=Document(page_content="第一段", metadata=metadata), chunk_id="p1", parent_index=0)
+    second = ChildChunk(document=Document(page_content="第二段", metadata=metadata), chunk_id="c1",
+                        parent_chunk_id="p1", child_index=0)
+    assert first.context is second.context
+    
+    first.metadata['file_name'] = "b.pdf"
+    first.metadata['global_chunk_number'] = 1
+    del first.metadata['Header 1']
+    assert first.metadata['file_name'] == "b.pdf" and 'Header 1' not in first.metadata
+    assert second.metadata['file_name'] == "a.pdf" and second.metadata['Header 1'] == "總則"
+    assert first.metadata.copy() == {'source': "/docs/a.pdf", 'file_name': "b.pdf", 'page_number': 3,
+                                     'global_chunk_number': 1}
+    
+    second.document = Document(page_content="替換內容", metadata={'source': "/docs/a.pdf", 'Header 2': "定義"})
+    assert second.content == "替換內容" and second.parent_header == "定義"
+
+
+def test_constructor_metadata_merged_with_document():
+    """測試建構時傳入的元數據與頁碼合併到 document 的元數據（同名欄位以參數為準）"""
+    document = Document(page_content="第一段", metadata={'Header 1': "總則", 'page_number': 1})
+    parent = ParentChunk(document=document, chunk_id="p1", parent_index=0, page_number=4,
+                         metadata={'source': "/docs/a.pdf", 'page_title': "總則"})
+    child = ChildChunk(document=document, chunk_id="c1", parent_chunk_id="p1", child_index=0,
+                       metadata={'page_title': "附表", 'page_number': 2})
+
+    assert parent.metadata.copy() == {'Header 1': "總則", 'source': "/docs/a.pdf",
+                                      'page_number': 4, 'page_title': "總則"}
+    assert parent.context.fields == {'source': "/docs/a.pdf"} and parent.header_text == "總則"
+    assert child.page_number == 2 and child.metadata['page_title'] == "附表"
+    assert document.metadata == {'Header 1': "總則", 'page_number': 1}
+
+
+def test_pickled_chunk_keeps_header_path():
+    """測試 pickle 後的 chunk 以標題路徑重新取得編號"""
+    metadata = {'source': "/docs/pickle.pdf", 'Header 1': "第一章", 'Header 2': "定義"}
+    chunk = ChildChunk(document=Document(page_content="| a | b |", metadata=metadata), chunk_id="c1",
+                       parent_chunk_id="p1", child_index=2)
+    restored = pickle.loads(pickle.dumps(chunk))
+    
+    assert restored == chunk
+    assert restored.context is chunk.context
+    assert restored.header_path == (('Header 1', "第一章"), ('Header 2', "定義"))
+    assert restored.is_table_chunk and restored.table_info == chunk.table_info
@@ -51,8 +51,7 @@ def test_basic_functionality():
         parent_chunk = ParentChunk(
             document=test_doc,
             chunk_id="test_parent_001",
-            parent_index=0,
-            size=len(test_doc.page_content)
+            parent_index=0
         )
         
         logger.info("✓ ParentChunk 創建成功")
@@ -64,8 +63,7 @@ def test_basic_functionality():
             document=test_doc,
             chunk_id="test_child_001",
             parent_chunk_id="test_parent_001",
-            child_index=0,
-            size=len(test_doc.page_content)
+            child_index=0
         )
         
         logger.info("✓ ChildChunk 創建成功")
@@ -0,0 +1,104 @@
+"""
+分層分割結果儲存測試
+
+驗證 HierarchicalSplitResult 的欄式保存、延遲載入，以及分割器依轉換結果與配置重用已保存的結果。
+"""
+
+import tempfile
+from unittest import mock
+
+from service.chunk.hierarchical_splitter import HierarchicalChunkSplitter
+from service.chunk.hierarchical_store import HierarchicalResultStore, StoredHierarchicalSplitResult
+from service.chunk.test.conversion_fixtures import make_conversion_result
+from service.markdown_integrate.data_models import ConversionResult
+
+
+PAGE_ONE = """# 保險條款
+
+本條款適用於所有被保險人。保險期間內發生的事故依本條款理賠。
+
+## 理賠文件
+
+| 文件 | 說明 |
+|------|------|
+| 診斷證明 | 正本 |
+| 收據 | 副本 |
+"""
+
+PAGE_TWO = """# 除外責任
+
+下列情形不負理賠責任：故意行為、戰爭、核能事故。""" + "其他除外事項說明。" * 60
+
+
+def make_policy(page_two: str = PAGE_TWO) -> ConversionResult:
+    """建立兩頁的測試轉換結果"""
+    return make_conversion_result([PAGE_ONE, page_two], titles=["保險條款", "除外責任"])
+
+
+def chunk_state(chunk):
+    """比較用：chunk 的所有欄位與內容"""
+    document = chunk.document
+    return chunk.to_dict(), document.page_content, document.metadata
+
+
+def test_store_round_trip():
+    """測試保存後延遲載入的結果與原始結果相同"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        splitter = HierarchicalChunkSplitter(parent_chunk_size=300, child_chunk_size=120, child_chunk_overlap=20)
+        result = splitter.split_hierarchically(make_policy())
+
+        store = HierarchicalResultStore(store_dir=temp_dir)
+        store.save("key", result)
+        loaded = store.load("key")
+
+        assert isinstance(loaded, StoredHierarchicalSplitResult)
+        assert loaded.child_count == len(result.child_chunks)
+
+        # 依 ID 讀取父 chunk 與父→子連結，不需要載入完整列表
+        parent = result.parent_chunks[0]
+        assert chunk_state(loaded.get_parent(parent.chunk_id)) == chunk_state(parent)
+        assert [chunk.chunk_id for chunk in loaded.get_children_of_parent(parent.chunk_id)] == \
+            [chunk.chunk_id for chunk in result.get_children_of_parent(parent.chunk_id)]
+        child = result.child_chunks[-1]
+        assert loaded.get_parent_of_child(child.chunk_id).chunk_id == child.parent_chunk_id
+        assert loaded._parent_chunks is None and loaded._child_chunks is None
+
+        # 串流讀取子 chunk
+        streamed = list(loaded.iter_children(batch_size=2))
+        assert [chunk_state(chunk) for chunk in streamed] == [chunk_state(chunk) for chunk in result.child_chunks]
+        assert [chunk_state(chunk) for chunk in loaded.parent_chunks] == \
+            [chunk_state(chunk) for chunk in result.parent_chunks]
+
+        assert loaded.grouping_analysis == result.grouping_analysis
+        assert loaded.processing_metadata == result.processing_metadata
+        assert loaded.get_chunk_by_id("missing") is None
+
+
+def test_splitter_reuses_stored_result():
+    """測試轉換結果與配置不變時直接載入，任一變動時重新分割"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = HierarchicalResultStore(store_dir=temp_dir)
+        splitter = HierarchicalChunkSplitter(child_chunk_size=120, child_chunk_overlap=20, result_store=store)
+
+        first = splitter.split_hierarchically(make_policy())
+        assert first.processing_metadata['result_store']['hit'] is False
+
+        # 轉換時間不同但內容相同：直接載入，不重新分割
+        conversion_result = make_policy()
+        conversion_result.metadata.conversion_timestamp = 999.0
+        with mock.patch.object(splitter, '_split_by_pages_hierarchically',
+                               side_effect=AssertionError("should not re-split")):
+            second = splitter.split_hierarchically(conversion_result)
+        assert second.processing_metadata['result_store'] == {
+            'key': first.processing_metadata['result_store']['key'], 'hit': True
+        }
+        assert [chunk.chunk_id for chunk in second.child_chunks] == [chunk.chunk_id for chunk in first.child_chunks]
+
+        # 內容變動
+        changed = splitter.split_hierarchically(make_policy(PAGE_TWO + "\n\n新增條款。"))
+        assert changed.processing_metadata['result_store']['hit'] is False
+
+        # 配置變動
+        other = HierarchicalChunkSplitter(child_chunk_size=200, child_chunk_overlap=20, result_store=store)
+        assert other.split_hierarchically(make_policy()).processing_metadata['result_store']['hit'] is False
+        assert other.get_config() != splitter.get_config()
@@ -0,0 +1,89 @@
+"""
+偏移量 Markdown 分割器測試
+
+驗證標題區段與大小分割的結果都是原文上的偏移範圍，且分割邏輯與 LangChain 的分割器一致。
+"""
+
+import tempfile
+from pathlib import Path
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from service.chunk.chunk_splitter import ChunkSplitter
+from service.chunk.markdown_span_splitter import MarkdownSpanSplitter, TextSpan
+
+
+MARKDOWN = """前言段落。
+
+# 保險條款
+
+本條款適用於所有被保險人。
+
+  - 縮排的清單項目
+
+## 理賠文件
+### 申請書
+
+```python
+# 這不是標題
+print("code")
+```
+
+## 除外責任
+
+下列情形不負理賠責任。
+"""
+
+
+def test_header_spans_are_offsets():
+    """測試標題區段是原文的連續片段，並帶有標題路徑"""
+    splitter = MarkdownSpanSplitter()
+    spans = splitter.split_headers(MARKDOWN)
+    
+    assert [span.header_metadata() for span in spans] == [
+        {},
+        {"Header 1": "保險條款"},
+        {"Header 1": "保險條款", "Header 2": "理賠文件", "Header 3": "申請書"},
+        {"Header 1": "保險條款", "Header 2": "除外責任"},
+    ]
+    assert spans[0].text(MARKDOWN) == "前言段落。"
+    # 保留空行與縮排
+    assert spans[1].text(MARKDOWN) == "# 保險條款\n\n本條款適用於所有被保險人。\n\n  - 縮排的清單項目"
+    # 只有標題的區段併入下一個更深層的標題區段；程式碼區塊內的 # 不是標題
+    assert spans[2].text(MARKDOWN).startswith("## 理賠文件\n### 申請書")
+    assert "# 這不是標題" in spans[2].text(MARKDOWN)
+    
+    documents = splitter.to_documents(MARKDOWN, spans, metadata={"page_number": 1})
+    assert documents[3].page_content == "## 除外責任\n\n下列情形不負理賠責任。"
+    assert documents[3].metadata == {"Header 1": "保險條款", "Header 2": "除外責任", "page_number": 1}
+
+
+def test_size_split_matches_recursive_splitter():
+    """測試大小分割與 RecursiveCharacterTextSplitter 的結果相同，重疊部分是相同的偏移範圍"""
+    text = "\n\n".join(f"第{i}段：" + "條款內容說明 " * (i % 7 + 1) for i in range(40))
+    
+    for chunk_size, chunk_overlap in [(50, 0), (80, 20), (200, 60)]:
+        expected = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=["\n\n", "\n", " ", ""]
+        ).split_text(text)
+        splitter = MarkdownSpanSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        assert splitter.split_text(text) == expected
+    
+    spans = MarkdownSpanSplitter(chunk_size=80, chunk_overlap=20).split_span(
+        text, TextSpan(0, len(text), (("Header 1", "條款"),))
+    )
+    assert all(span.header_path == (("Header 1", "條款"),) for span in spans)
+    assert any(later.start < earlier.end for earlier, later in zip(spans, spans[1:]))
+
+
+def test_chunk_splitter_chunks_are_slices():
+    """測試 ChunkSplitter 的 chunk 內容是正規化後文字的片段"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        md_path = Path(temp_dir) / "policy.md"
+        md_path.write_text(MARKDOWN, encoding="utf-8")
+        splitter = ChunkSplitter(chunk_size=40, chunk_overlap=10, normalize_output=False, keep_tables_together=False)
+        chunks = splitter.split_markdown(str(md_path))
+    
+    assert chunks
+    assert all(chunk.page_content in MARKDOWN for chunk in chunks)
+    assert all(len(chunk.page_content) <= 40 for chunk in chunks)
@@ -0,0 +1,80 @@
+"""
+單次逐行正規化測試
+
+以原本逐步處理的五個步驟作為參考實作，驗證逐行正規化在各種選項組合下輸出完全相同，
+以及 normalize_many 使用進程池時結果順序與逐一處理相同。
+"""
+
+import itertools
+import random
+import re
+
+from service.chunk.markdown_normalizer import MarkdownNormalizer
+
+SPACES = re.compile(r'[ \t]+')
+
+SAMPLE = """<div>標題</div>\r\n# 理賠  項目\r\n\r\n\r\n\r\n|  項目 |\t金額   |\n| ---- | :--: |\n|  住院<br>日額 | 1,000  |\n說明文字   \n\n\n   \n   縮排段落\t\t結尾  \n|a|b|\n## 下一節\n"""
+
+
+def sequential_normalize(text: str, clean_tables: bool = True, remove_extra_spaces: bool = True,
+                         remove_html_tags: bool = True, normalize_line_breaks: bool = True) -> str:
+    """原本逐步處理的正規化（每個步驟各自處理整份文字）"""
+    if not text:
+        return text
+    if remove_html_tags:
+        text = re.sub(r'<[^>]+>', '', text)
+        text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
+    if normalize_line_breaks:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        text = re.sub(r'\n{3,}', '\n\n', text)
+    if clean_tables and '|' in text:
+        lines = []
+        in_table = False
+        for line in text.split('\n'):
+            if '|' in line:
+                in_table = True
+                line = SPACES.sub(' ', line.strip())
+                if re.match(r'\|[\s\-]+\|', line):
+                    line = '|'.join([''] + ['---'] * (len(line.split('|')) - 2) + [''])
+                line = '|'.join(SPACES.sub(' ', part.strip()) for part in line.split('|'))
+            elif in_table:
+                if line.strip() and not line.startswith('#'):
+                    lines.append('')
+                in_table = False
+            lines.append(line)
+        text = '\n'.join(lines)
+    if remove_extra_spaces:
+        text = SPACES.sub(' ', '\n'.join(line.rstrip() for line in text.split('\n')))
+    text = re.sub(r'\n\s*\n\s*\n', '\n\n', text.strip())
+    if text and not text.endswith('\n'):
+        text += '\n'
+    return text
+
+
+def test_single_pass_matches_sequential_steps():
+    """測試各種選項組合下的輸出與逐步處理完全相同"""
+    random.seed(0)
+    alphabet = ['|', '|', ' ', '  ', '\t', '\n', '\n', '\r', '\r\n', '-', '文', '#', '<', '>',
+                '<br>', '　', '\x0b', '---', '|---|', '\n\n\n']
+    texts = [SAMPLE, "", "   ", "\n\n|a|\n"] + \
+        [''.join(random.choice(alphabet) for _ in range(random.randint(0, 30))) for _ in range(3000)]
+    
+    for flags in itertools.product([True, False], repeat=4):
+        normalizer = MarkdownNormalizer(*flags)
+        for text in texts:
+            assert normalizer.normalize_text(text) == sequential_normalize(text, *flags), (flags, text)
+    
+    assert MarkdownNormalizer().normalize_text(SAMPLE) == (
+        "標題\n# 理賠 項目\n\n|項目|金額|\n|---|---|\n|住院日額|1,000|\n\n說明文字\n\n 縮排段落 結尾\n|a|b|\n## 下一節\n"
+    )
+
+
+def test_normalize_many_keeps_order():
+    """測試 normalize_many 使用進程池時結果順序與逐一處理相同"""
+    normalizer = MarkdownNormalizer()
+    pages = [f"# 第{number}頁\n\n|  項目 | 金額 |\n| --- | --- |\n| 住院 | {number} |\n內容   {number}"
+             for number in range(12)]
+    expected = [normalizer.normalize_text(page) for page in pages]
+    
+    assert normalizer.normalize_many(pages, max_workers=2, parallel_threshold=4) == expected
+    assert normalizer.normalize_many(pages, max_workers=1) == expected
@@ -0,0 +1,59 @@
+"""
+頁面偏移對應測試
+
+驗證合併頁面內容時記錄的偏移、以二分搜尋將偏移範圍對應到頁碼（包含跨頁範圍），
+以及 ChunkSplitter 跨頁分割時 chunk 的頁碼。
+"""
+
+from service.chunk.chunk_splitter import ChunkSplitter
+from service.chunk.test.conversion_fixtures import make_conversion_result
+from service.markdown_integrate.data_models import ConversionResult, PageOffsetIndex, join_pages
+
+
+def make_policy(page_offsets: bool = True) -> ConversionResult:
+    """建立三頁的測試轉換結果（第二頁的段落延續到第三頁）"""
+    page_contents = [
+        "# 第一章\n\n本章說明承保範圍。" + "被保險人應據實告知。" * 10,
+        "## 理賠\n\n理賠申請應檢具相關文件，" + "保險金依約定給付" * 6,
+        "，並於三十日內完成審核。\n\n# 第二章\n\n" + "除外責任依本條款辦理。" * 10,
+    ]
+    return make_conversion_result(page_contents, titles=["第1頁", "第2頁", "第3頁"], page_offsets=page_offsets)
+
+
+def test_offsets_map_ranges_to_pages():
+    """測試偏移範圍對應到頁碼，跨頁範圍返回所有頁碼，只涵蓋分隔字串的範圍不屬於任何頁面"""
+    content, offsets = join_pages(["abc", "", "defg"])
+    assert content == "abc\n\n\n\ndefg" and offsets == [0, 5, 7]
+    
+    index = PageOffsetIndex(offsets, [3, 0, 4], [1, 2, 3])
+    assert index.pages_for_range(0, 3) == [1]
+    assert index.pages_for_range(2, 8) == [1, 3]
+    assert index.pages_for_range(3, 5) == []
+    assert index.page_at(8) == 3 and index.page_at(4) == 3
+    
+    # 沒有記錄偏移的結果（例如舊的序列化文件）依頁面內容推導
+    result = make_policy()
+    assert make_policy(page_offsets=False).get_page_offsets() == result.page_offsets
+    assert [result.content[offset:offset + 4] for offset in result.page_offsets] == \
+        [page.content[:4] for page in result.pages]
+
+
+def test_split_across_pages_reports_spanned_pages():
+    """測試跨頁分割時延續到下一頁的段落標記兩個頁碼"""
+    conversion_result = make_policy()
+    for normalize in (False, True):
+        splitter = ChunkSplitter(chunk_size=500, chunk_overlap=0, normalize_output=normalize,
+                                 keep_tables_together=normalize, split_across_pages=True)
+        chunks = splitter.split_markdown(conversion_result)
+        
+        spanning = [chunk for chunk in chunks if "三十日內" in chunk.page_content]
+        assert len(spanning) == 1
+        assert spanning[0].metadata['page_numbers'] == [2, 3]
+        assert spanning[0].metadata['page_number'] == 2
+        assert "保險金依約定給付" in spanning[0].page_content
+        
+        first = next(chunk for chunk in chunks if "本章說明" in chunk.page_content)
+        assert first.metadata['page_numbers'] == [1] and first.metadata['page_title'] == "第1頁"
+        assert [chunk.metadata['page_number'] for chunk in chunks] == \
+            sorted(chunk.metadata['page_number'] for chunk in chunks)
+        assert list(splitter.iter_chunks(conversion_result)) == chunks
@@ -0,0 +1,60 @@
+"""
+頁面平行分割測試
+
+驗證使用進程池分割頁面時，輸出與逐頁處理相同。
+"""
+
+import logging
+
+from service.chunk.chunk_splitter import ChunkSplitter
+from service.chunk.hierarchical_splitter import HierarchicalChunkSplitter
+from service.chunk.test.conversion_fixtures import make_conversion_result, policy_chapter
+from service.markdown_integrate.data_models import ConversionResult
+
+
+def make_policy(page_count: int = 6) -> ConversionResult:
+    """建立多頁的測試轉換結果"""
+    return make_conversion_result([policy_chapter(number, number * 8) for number in range(1, page_count + 1)])
+
+
+def test_chunk_splitter_parallel_matches_serial(caplog):
+    """測試 ChunkSplitter 平行分割的結果與逐頁處理相同"""
+    caplog.set_level(logging.INFO, logger="service.chunk.page_executor")
+    conversion_result = make_policy()
+    serial = ChunkSplitter(chunk_size=200, chunk_overlap=20).split_markdown(conversion_result)
+    parallel = ChunkSplitter(chunk_size=200, chunk_overlap=20, max_workers=2,
+                             parallel_page_threshold=2).split_markdown(conversion_result)
+    assert "Splitting 6 pages with 2 worker processes" in caplog.text
+    
+    assert [(chunk.page_content, chunk.metadata) for chunk in parallel] == \
+        [(chunk.page_content, chunk.metadata) for chunk in serial]
+
+
+def test_hierarchical_splitter_parallel_matches_serial():
+    """測試 HierarchicalChunkSplitter 平行分割的結果（含 chunk ID）與逐頁處理相同"""
+    conversion_result = make_policy()
+    serial = HierarchicalChunkSplitter(child_chunk_size=120, child_chunk_overlap=20) \
+        .split_hierarchically(conversion_result)
+    parallel = HierarchicalChunkSplitter(child_chunk_size=120, child_chunk_overlap=20, max_workers=2,
+                                         parallel_page_threshold=2).split_hierarchically(conversion_result)
+    
+    def contents(chunks):
+        return [(chunk.document.page_content, chunk.page_number) for chunk in chunks]
+    
+    assert contents(parallel.parent_chunks) == contents(serial.parent_chunks)
+    assert contents(parallel.child_chunks) == contents(serial.child_chunks)
+    assert [chunk.chunk_id for chunk in parallel.child_chunks] == [chunk.chunk_id for chunk in serial.child_chunks]
+    # 子 chunk 仍指向同一頁的父 chunk
+    parents = {chunk.chunk_id: chunk for chunk in parallel.parent_chunks}
+    assert all(parents[chunk.parent_chunk_id].page_number == chunk.page_number for chunk in parallel.child_chunks)
+
+
+def test_streaming_with_process_pool():
+    """測試串流分割使用進程池時，結果與逐頁處理相同"""
+    conversion_result = make_policy()
+    serial = list(ChunkSplitter(chunk_size=200, chunk_overlap=20).iter_chunks(conversion_result))
+    parallel = list(ChunkSplitter(chunk_size=200, chunk_overlap=20, max_workers=2, parallel_page_threshold=2)
+                    .iter_chunks(conversion_result, lookahead=2))
+    
+    assert [(chunk.page_content, chunk.metadata) for chunk in parallel] == \
+        [(chunk.page_content, chunk.metadata) for chunk in serial]
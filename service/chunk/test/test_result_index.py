@@ -0,0 +1,131 @@
+"""
+分層分割結果導航索引測試
+
+驗證索引查詢與逐一掃描的結果相同、相鄰 chunk 視窗，以及 chunk 列表變動後索引會重建。
+"""
+
+from langchain_core.documents import Document
+
+from service.chunk import hierarchical_models
+from service.chunk.hierarchical_models import ChildChunk
+from service.chunk.hierarchical_splitter import HierarchicalChunkSplitter
+from service.chunk.test.conversion_fixtures import make_conversion_result, policy_chapter
+from service.markdown_integrate.data_models import ConversionResult
+
+
+def make_policy(page_count: int = 4) -> ConversionResult:
+    """建立多頁的測試轉換結果（每頁都有承保範圍與理賠兩段）"""
+    return make_conversion_result([
+        policy_chapter(number, number * 6) + "\n## 理賠\n\n理賠申請應檢具相關文件。" + "保險金依約定給付。" * 8 + "\n"
+        for number in range(1, page_count + 1)
+    ])
+
+
+def split():
+    return HierarchicalChunkSplitter(child_chunk_size=60, child_chunk_overlap=10) \
+        .split_hierarchically(make_policy())
+
+
+def test_index_matches_linear_scan():
+    """測試索引查詢的結果與逐一掃描相同"""
+    result = split()
+    
+    for parent in result.parent_chunks:
+        assert result.get_chunk_by_id(parent.chunk_id) is parent
+        assert result.get_children_of_parent(parent.chunk_id) == \
+            [child for child in result.child_chunks if child.parent_chunk_id == parent.chunk_id]
+    for child in result.child_chunks:
+        assert result.get_chunk_by_id(child.chunk_id, is_parent=False) is child
+        assert result.get_parent_of_child(child.chunk_id).chunk_id == child.parent_chunk_id
+    
+    assert result.get_parents_on_page(2) == [parent for parent in result.parent_chunks if parent.page_number == 2]
+    assert result.get_chunk_by_id("missing") is None
+    assert result.get_children_of_parent("missing") == []
+    assert result.get_neighbor_window("missing") == []
+
+
+def test_neighbor_window_and_siblings():
+    """測試相鄰 chunk 視窗與前後兄弟chunk"""
+    result = split()
+    parent = next(parent for parent in result.parent_chunks
+                  if len(result.get_children_of_parent(parent.chunk_id)) >= 3)
+    children = result.get_children_of_parent(parent.chunk_id)
+    
+    assert result.get_neighbor_window(children[1].chunk_id) == children[0:3]
+    assert result.get_neighbor_window(children[0].chunk_id, before=2, after=1) == children[0:2]
+    assert result.get_previous_sibling(children[0].chunk_id) is None
+    assert result.get_next_sibling(children[0].chunk_id) is children[1]
+    
+    # 跨父chunk 擴展時依全部子chunk 的順序
+    last = result.get_children_of_parent(result.parent_chunks[0].chunk_id)[-1]
+    window = result.get_neighbor_window(last.chunk_id, before=0, after=1, within_parent=False)
+    assert window[1].parent_chunk_id == result.parent_chunks[1].chunk_id
+    
+    assert result.get_next_sibling(result.parent_chunks[0].chunk_id) is result.parent_chunks[1]
+    assert result.get_previous_sibling(result.parent_chunks[0].chunk_id) is None
+
+
+def test_index_rebuilt_after_postprocessing():
+    """測試 chunk 列表被替換、增減或就地修改後，查詢仍返回正確結果"""
+    result = split()
+    first_parent = result.parent_chunks[0]
+    assert len(result.get_children_of_parent(first_parent.chunk_id)) > 0
+    
+    # 替換列表
+    result.child_chunks = [child for child in result.child_chunks if child.parent_chunk_id != first_parent.chunk_id]
+    assert result.get_children_of_parent(first_parent.chunk_id) == []
+    
+    # 新增子chunk
+    extra = ChildChunk(document=Document(page_content="補充說明", metadata={}), chunk_id="child_extra",
+                       parent_chunk_id=first_parent.chunk_id, child_index=0)
+    result.child_chunks.append(extra)
+    assert result.get_children_of_parent(first_parent.chunk_id) == [extra]
+    assert result.get_parent_of_child("child_extra") is first_parent
+    
+    # 就地替換元素（長度不變）：查不到或查到的 chunk ID 不符時自動重建
+    replacement = ChildChunk(document=Document(page_content="替換", metadata={}), chunk_id="child_replaced",
+                             parent_chunk_id=first_parent.chunk_id, child_index=0)
+    result.child_chunks[-1] = replacement
+    assert result.get_chunk_by_id("child_replaced", is_parent=False) is replacement
+    assert result.get_chunk_by_id("child_extra", is_parent=False) is None
+    assert result.get_children_of_parent(first_parent.chunk_id) == [replacement]
+
+
+def test_index_follows_page_number_changes():
+    """測試就地修改父chunk 頁碼後，頁面查詢返回正確結果"""
+    result = split()
+    moved = result.parent_chunks[-1]
+    assert result.get_parents_on_page(9) == []
+    
+    moved.metadata['page_number'] = 9
+    assert result.get_parents_on_page(9) == [moved]
+    assert moved not in result.get_parents_on_page(4)
+
+
+def test_lookups_do_not_rebuild_index(monkeypatch):
+    """測試查不到或結果為空的查詢不會重建索引，chunk 沒有變動時索引只建立一次"""
+    result = split()
+    builds = []
+    original_init = hierarchical_models.HierarchicalResultIndex.__init__
+    
+    def counting_init(self, parent_chunks, child_chunks):
+        builds.append(1)
+        original_init(self, parent_chunks, child_chunks)
+    
+    monkeypatch.setattr(hierarchical_models.HierarchicalResultIndex, '__init__', counting_init)
+    
+    child = result.child_chunks[3]
+    for _ in range(10):
+        assert result.get_neighbor_window(child.chunk_id)
+        result.get_previous_sibling(child.chunk_id)
+        assert result.get_chunk_by_id("missing") is None
+        assert result.get_children_of_parent("missing") == []
+        assert result.get_parents_on_page(99) == []
+    assert len(builds) == 1
+    
+    # 直接修改 chunk ID：以舊 ID 查到的 chunk 不符時重建
+    old_id = child.chunk_id
+    child.chunk_id = "child_renamed"
+    assert result.get_chunk_by_id(old_id, is_parent=False) is None
+    assert result.get_chunk_by_id("child_renamed", is_parent=False) is child
+    assert len(builds) == 2
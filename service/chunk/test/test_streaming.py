@@ -0,0 +1,53 @@
+"""
+串流分割測試
+
+驗證 iter_chunks / iter_hierarchical 逐頁返回結果，且與一次分割整份文件的結果相同。
+"""
+
+from unittest import mock
+
+from service.chunk.chunk_splitter import ChunkSplitter
+from service.chunk.hierarchical_splitter import HierarchicalChunkSplitter
+from service.chunk.test.conversion_fixtures import make_conversion_result, policy_chapter
+from service.markdown_integrate.data_models import ConversionResult
+
+
+def make_policy(page_count: int = 5) -> ConversionResult:
+    """建立多頁的測試轉換結果"""
+    return make_conversion_result([policy_chapter(number, number * 6) for number in range(1, page_count + 1)])
+
+
+def test_iter_chunks_matches_split_markdown():
+    """測試串流結果與 split_markdown 相同，且第一個 chunk 在第一頁完成後就返回"""
+    conversion_result = make_policy()
+    splitter = ChunkSplitter(chunk_size=150, chunk_overlap=20)
+    expected = splitter.split_markdown(conversion_result)
+    
+    with mock.patch.object(splitter, '_split_page', wraps=splitter._split_page) as split_page:
+        stream = splitter.iter_chunks(conversion_result)
+        first = next(stream)
+        assert split_page.call_count == 1
+        streamed = [first] + list(stream)
+        assert split_page.call_count == len(conversion_result.pages)
+    
+    assert [(chunk.page_content, chunk.metadata) for chunk in streamed] == \
+        [(chunk.page_content, chunk.metadata) for chunk in expected]
+
+
+def test_iter_hierarchical_groups_children_by_parent():
+    """測試串流返回父chunk與其子chunks，內容與 split_hierarchically 相同"""
+    conversion_result = make_policy()
+    splitter = HierarchicalChunkSplitter(child_chunk_size=100, child_chunk_overlap=10)
+    result = splitter.split_hierarchically(conversion_result)
+    
+    groups = list(splitter.iter_hierarchical(conversion_result))
+    
+    assert [parent.document.page_content for parent, _ in groups] == \
+        [parent.document.page_content for parent in result.parent_chunks]
+    for (parent, children), expected_parent in zip(groups, result.parent_chunks):
+        assert all(child.parent_chunk_id == parent.chunk_id for child in children)
+        assert [child.document.page_content for child in children] == \
+            [child.document.page_content for child in result.get_children_of_parent(expected_parent.chunk_id)]
+    
+    numbers = [child.metadata['global_chunk_number'] for _, children in groups for child in children]
+    assert numbers == list(range(1, len(result.child_chunks) + 1))
@@ -0,0 +1,101 @@
+"""
+大型表格依行分組測試
+
+驗證超過 chunk 大小的表格被切成重複表頭的行組，行範圍連續且涵蓋所有資料行，
+以及 ChunkSplitter 與 HierarchicalChunkSplitter 在 keep_tables_together 時輸出的表格 chunk 不超過上限。
+"""
+
+from langchain_core.documents import Document
+
+from service.chunk.chunk_splitter import ChunkSplitter
+from service.chunk.hierarchical_splitter import HierarchicalChunkSplitter
+from service.chunk.table_handler import TableHandler
+
+HEADER = "| 項目 | 金額 | 備註 |\n|------|------|------|"
+ROWS = [f"| 項目{i} | {i * 100} | 依約定給付 |" for i in range(120)]
+
+
+def test_split_table_rows_repeats_header():
+    """測試每個行組都重複表頭，行範圍連續且涵蓋所有資料行"""
+    handler = TableHandler()
+    content = "以下為給付項目：\n" + HEADER + "\n" + "\n".join(ROWS) + "\n表格後的說明。"
+    chunk = Document(page_content=content, metadata={'source': "/docs/a.pdf", 'page_number': 2, 'is_table': True})
+    
+    parts = handler.split_table_rows(chunk, max_chunk_size=400)
+    assert parts[0].page_content == "以下為給付項目：" and not parts[0].metadata['is_table']
+    assert parts[-1].page_content == "表格後的說明。"
+    
+    groups = parts[1:-1]
+    assert len(groups) > 1
+    assert len({group.metadata['table_id'] for group in groups}) == 1
+    expected_start = 1
+    for group in groups:
+        assert len(group.page_content) <= 400
+        assert group.page_content.startswith(HEADER + "\n")
+        assert group.metadata['table_row_start'] == expected_start
+        assert group.metadata['table_total_rows'] == len(ROWS)
+        assert group.metadata['page_number'] == 2
+        expected_start = group.metadata['table_row_end'] + 1
+    assert expected_start == len(ROWS) + 1
+    assert [row for group in groups for row in group.page_content.split("\n")[2:]] == ROWS
+    
+    # 未超過上限時保持原樣
+    assert handler.split_table_rows(chunk, max_chunk_size=len(content)) == [chunk]
+
+
+def test_chunk_splitter_bounds_table_chunks(tmp_path):
+    """測試保持表格完整時，大型表格的 chunk 仍不超過 chunk_size"""
+    markdown_path = tmp_path / "table.md"
+    markdown_path.write_text("# 費用表\n\n" + HEADER + "\n" + "\n".join(ROWS) + "\n", encoding="utf-8")
+    
+    chunks = ChunkSplitter(chunk_size=500, chunk_overlap=0, normalize_output=False) \
+        .split_markdown(str(markdown_path))
+    table_chunks = [chunk for chunk in chunks if 'table_id' in chunk.metadata]
+    
+    assert len(table_chunks) > 1
+    assert all(len(chunk.page_content) <= 500 for chunk in table_chunks)
+    assert all(chunk.page_content.startswith(HEADER) for chunk in table_chunks)
+    assert table_chunks[-1].metadata['table_row_end'] == len(ROWS)
+
+
+def test_split_table_rows_uses_length_function():
+    """測試以 token 計算大小時，行組依 token 數分組且不超過上限"""
+    def token_length(text):
+        # 每個非空白字元一個 token，每 20 字元額外一個 token（token 數不能逐行相加）
+        return sum(1 for char in text if not char.isspace()) + len(text) // 20
+    
+    handler = TableHandler()
+    content = HEADER + "\n" + "\n".join(ROWS)
+    chunk = Document(page_content=content, metadata={'source': "/docs/a.pdf", 'page_number': 1})
+    
+    parts = handler.split_table_rows(chunk, max_chunk_size=300, length_function=token_length)
+    assert len(parts) > 1
+    assert all(token_length(part.page_content) <= 300 for part in parts)
+    # 以字符數計算時同樣的上限可放入的行數較少
+    assert len(parts) < len(handler.split_table_rows(chunk, max_chunk_size=300))
+    assert [row for part in parts for row in part.page_content.split("\n")[2:]] == ROWS
+
+
+def test_hierarchical_splitter_bounds_table_children(tmp_path):
+    """測試分層分割時，跨多個父chunk 的大型表格子chunk 重複表頭、不超過上限且行範圍涵蓋所有資料行"""
+    rows = [f"| 項目{i} | {i * 100} | 依約定給付 |" for i in range(400)]
+    markdown_path = tmp_path / "table.md"
+    markdown_path.write_text("# 費用表\n\n以下為給付項目：\n\n" + HEADER + "\n" + "\n".join(rows) + "\n",
+                             encoding="utf-8")
+    
+    splitter = HierarchicalChunkSplitter(child_chunk_size=350, normalize_output=False)
+    result = splitter.split_hierarchically(str(markdown_path))
+    groups = sorted((chunk for chunk in result.child_chunks if 'table_id' in chunk.metadata),
+                    key=lambda chunk: chunk.metadata['table_row_start'])
+    
+    assert len(result.parent_chunks) > 2 and len(groups) > 1
+    assert len({group.metadata['table_id'] for group in groups}) == 1
+    assert all(group.content.startswith(HEADER + "\n") and group.size <= 350 for group in groups)
+    assert all(chunk.size <= 350 for chunk in result.child_chunks)
+    expected_start = 1
+    for group in groups:
+        assert group.metadata['table_row_start'] == expected_start
+        assert group.metadata['table_total_rows'] == len(rows)
+        expected_start = group.metadata['table_row_end'] + 1
+    assert expected_start == len(rows) + 1
+    assert [row for group in groups for row in group.content.split("\n")[2:]] == rows
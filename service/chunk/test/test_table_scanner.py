@@ -0,0 +1,85 @@
+r"""
+表格掃描器測試
+
+驗證逐行掃描的表格範圍與原本的正則 (\|.*\|(?:\n\|.*\|)*) 相同，
+以及 TableHandler 的標記、檢測、統計與 chunk 表格旗標共用掃描結果。
+"""
+
+import random
+import re
+
+from langchain_core.documents import Document
+
+from service.chunk.hierarchical_models import ChildChunk, ParentChunk
+from service.chunk.table_handler import TableHandler
+from service.chunk.table_scanner import scan_tables
+
+REGEX_TABLE_PATTERN = re.compile(r'(\|.*\|(?:\n\|.*\|)*)')
+
+CONTENT = """# 給付項目
+
+說明 | 不是表格開頭的行 | 也算
+| 項目 | 金額 |
+|------|------|
+| 住院 | 1000 |
+| 手術 | 2000 | 備註
+| 下一行不延續 |
+
+  | 縮排 | 表格 |
+|單獨一個 |
+"""
+
+
+def test_scan_matches_regex():
+    """測試掃描範圍與原本的正則完全相同（包含行中開始、行尾文字與縮排的情況）"""
+    expected = [(match.start(), match.end()) for match in REGEX_TABLE_PATTERN.finditer(CONTENT)]
+    tables = scan_tables(CONTENT)
+    assert [(table.start, table.end) for table in tables] == expected
+    
+    # 行中開始的表格在最後一個 | 結束，行尾文字不屬於表格
+    assert tables[0].text(CONTENT) == "| 不是表格開頭的行 |" and tables[0].row_count == 1
+    assert tables[1].row_count == 4 and tables[1].column_count == 2 and tables[1].has_header
+    assert tables[1].text(CONTENT).endswith("| 2000 |")
+    assert scan_tables(CONTENT) is tables
+    assert scan_tables("沒有表格") == ()
+    
+    random.seed(0)
+    for _ in range(5000):
+        text = ''.join(random.choice('|| a-\n ') for _ in range(random.randint(0, 24)))
+        assert [(table.start, table.end) for table in scan_tables(text)] == \
+            [(match.start(), match.end()) for match in REGEX_TABLE_PATTERN.finditer(text)]
+
+
+def test_table_handler_uses_scan():
+    """測試標記結果與原本的正則替換相同，檢測與統計使用同一份掃描結果"""
+    handler = TableHandler()
+    expected = REGEX_TABLE_PATTERN.sub(
+        lambda match: f"\n\n{handler.table_start_marker}\n{match.group(1)}\n{handler.table_end_marker}\n\n", CONTENT
+    )
+    assert handler.mark_tables(CONTENT) == expected
+    
+    tables = handler.detect_tables("| 項目 | 金額 |\n|------|------|\n| 住院 | 1000 |")
+    assert len(tables) == 1
+    assert tables[0]['rows'] == 3 and tables[0]['columns'] == 2 and tables[0]['has_header']
+    
+    chunks = [Document(page_content="| a | b |"), Document(page_content="a | b"),
+              Document(page_content="純文字", metadata={'is_table': True})]
+    statistics = handler.get_table_statistics(chunks)
+    assert statistics['table_chunks'] == 2 and statistics['regular_chunks'] == 1
+
+
+def test_chunk_table_flags():
+    """測試 chunk 的表格旗標依掃描結果判斷，單獨的 | 不算表格"""
+    table = "| 項目 | 金額 |\n|------|------|\n| 住院 | 1000 |"
+    parent = ParentChunk(document=Document(page_content=f"給付如下：\n\n{table}", metadata={}),
+                         chunk_id="p1", parent_index=0)
+    assert parent.has_tables and parent.table_count == 1
+    
+    plain = ParentChunk(document=Document(page_content="甲 | 乙", metadata={}), chunk_id="p2", parent_index=1)
+    assert not plain.has_tables and plain.table_count == 0
+    
+    child = ChildChunk(document=Document(page_content=table, metadata={}), chunk_id="c1",
+                       parent_chunk_id="p1", child_index=0)
+    assert child.is_table_chunk
+    assert child.table_info == {'row_count': 3, 'column_count': 2, 'table_count': 1,
+                                'has_header': True, 'table_markers': 0}
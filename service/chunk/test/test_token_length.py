@@ -0,0 +1,82 @@
+"""
+Token 長度函數測試
+
+以簡單的本地 tokenizer 驗證批次計數與快取，以及以 token 計算大小時 chunk 一定放得進上限。
+"""
+
+import tempfile
+from pathlib import Path
+
+from service.chunk.hierarchical_splitter import HierarchicalChunkSplitter
+from service.chunk.markdown_span_splitter import MarkdownSpanSplitter
+from service.chunk.token_length import TokenLengthFunction
+
+
+class CharTokenizer:
+    """每個非空白字元一個 token，每 20 字元額外一個 token（token 數不能逐段相加）"""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def __call__(self, texts, add_special_tokens=False):
+        self.batches.append(list(texts))
+        input_ids = []
+        for text in texts:
+            count = sum(1 for char in text if not char.isspace()) + len(text) // 20
+            input_ids.append(list(range(count + (2 if add_special_tokens else 0))))
+        return {"input_ids": input_ids}
+
+
+MARKDOWN = "# 理賠申請\n\n" + "\n\n".join(
+    f"第{i}條 被保險人應於事故發生後三十日內通知本公司，並檢具理賠申請書與相關證明文件。" for i in range(30)
+)
+
+
+def test_batch_counting_and_cache():
+    """測試批次計數並以片段雜湊值快取"""
+    tokenizer = CharTokenizer()
+    token_length = TokenLengthFunction(tokenizer=tokenizer, model_name="test")
+    
+    assert token_length.count_many(["保險 條款", "理賠", "保險 條款"]) == [4, 2, 4]
+    assert tokenizer.batches == [["保險 條款", "理賠"]]
+    
+    assert token_length("理賠") == 2
+    assert len(tokenizer.batches) == 1
+    assert token_length.cache_info() == {'hits': 1, 'misses': 2, 'size': 2}
+    assert token_length.name == "tokens:test:plain"
+
+
+def test_token_sized_chunks_fit_limit():
+    """測試以 token 計算大小時，每個 chunk 都放得進上限且不會過度切割"""
+    tokenizer = CharTokenizer()
+    token_length = TokenLengthFunction(tokenizer=tokenizer, model_name="test")
+    splitter = MarkdownSpanSplitter(chunk_size=120, chunk_overlap=20, length_function=token_length)
+    
+    spans = splitter.split(MARKDOWN)
+    # 再次分割相同內容時全部從快取讀取，不呼叫 tokenizer
+    batch_count = len(tokenizer.batches)
+    assert splitter.split(MARKDOWN) == spans
+    assert len(tokenizer.batches) == batch_count
+    
+    counts = tokenizer([span.text(MARKDOWN) for span in spans])["input_ids"]
+    assert all(len(ids) <= 120 for ids in counts)
+    # 每條約 45 tokens，每個 chunk 應容納兩條
+    assert len(spans) <= 16
+
+
+def test_hierarchical_splitter_with_token_length():
+    """測試分層分割器使用 token 長度函數，並記錄在配置中"""
+    token_length = TokenLengthFunction(tokenizer=CharTokenizer(), model_name="test")
+    splitter = HierarchicalChunkSplitter(parent_chunk_size=600, parent_chunk_overlap=50,
+                                         child_chunk_size=100, child_chunk_overlap=10,
+                                         length_function=token_length, normalize_output=False)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        md_path = Path(temp_dir) / "policy.md"
+        md_path.write_text(MARKDOWN, encoding="utf-8")
+        result = splitter.split_hierarchically(str(md_path))
+    
+    assert all(token_length(chunk.document.page_content) <= 100 for chunk in result.child_chunks)
+    assert all(token_length(chunk.document.page_content) <= 600 for chunk in result.parent_chunks)
+    assert splitter.get_config()['length_function'] == "tokens:test:plain"
+    assert HierarchicalChunkSplitter().get_config()['length_function'] == "chars"
+
@@ -0,0 +1,152 @@
+"""
+Token 長度函數
+
+以本地 tokenizer 計算文字的 token 數，作為分割器的長度函數，讓 chunk 大小直接對應
+embedding / rerank 模型的輸入上限（例如 bge-reranker 的 512 tokens），而不是以字元數估計。
+
+分割器會一次送出一批候選片段（count_many），計數結果以片段內容的雜湊值快取，
+遞迴分割反覆測量相同片段時不會重新 tokenize。
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 可選的 tokenizer 套件
+try:
+    from tokenizers import Tokenizer
+    TOKENIZERS_AVAILABLE = True
+except ImportError:
+    TOKENIZERS_AVAILABLE = False
+
+try:
+    from transformers import AutoTokenizer
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+# 預設使用 rerank 模型的 tokenizer（子 chunk 需要放進 rerank 的輸入視窗）
+DEFAULT_TOKENIZER_MODEL = "BAAI/bge-reranker-base"
+
+
+def _segment_key(text: str) -> bytes:
+    """片段內容的雜湊值（作為快取鍵，不保留片段字串本身）"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class TokenLengthFunction:
+    """以本地 tokenizer 計算 token 數的長度函數，附帶批次計數與快取"""
+    
+    def __init__(self,
+                 model_name: str = DEFAULT_TOKENIZER_MODEL,
+                 tokenizer_path: Optional[str] = None,
+                 tokenizer: Optional[Any] = None,
+                 add_special_tokens: bool = False,
+                 cache_size: int = 100000):
+        """
+        初始化 token 長度函數
+        
+        Args:
+            model_name: tokenizer 模型名稱（tokenizers 或 transformers 從本地快取或 Hugging Face 載入）
+            tokenizer_path: tokenizer.json 路徑，提供時優先使用
+            tokenizer: 已載入的 tokenizer（tokenizers.Tokenizer 或 transformers 的 tokenizer），提供時不另外載入
+            add_special_tokens: 是否計入 [CLS]/[SEP] 等特殊 token
+            cache_size: 快取的片段數量上限
+        """
+        self.model_name = model_name
+        self.add_special_tokens = add_special_tokens
+        self.cache_size = cache_size
+        self.tokenizer = tokenizer if tokenizer is not None else self._load_tokenizer(model_name, tokenizer_path)
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _load_tokenizer(model_name: str, tokenizer_path: Optional[str]) -> Any:
+        """依可用的套件載入 tokenizer"""
+        if TOKENIZERS_AVAILABLE:
+            if tokenizer_path:
+                return Tokenizer.from_file(tokenizer_path)
+            return Tokenizer.from_pretrained(model_name)
+        if TRANSFORMERS_AVAILABLE:
+            return AutoTokenizer.from_pretrained(tokenizer_path or model_name)
+        raise ImportError("Token-based chunk sizing requires the 'tokenizers' or 'transformers' package")
+    
+    @property
+    def name(self) -> str:
+        """長度函數名稱（作為分割器配置的一部分）"""
+        return f"tokens:{self.model_name}:{'special' if self.add_special_tokens else 'plain'}"
+    
+    def __call__(self, text: str) -> int:
+        """計算單一片段的 token 數"""
+        return self.count_many([text])[0]
+    
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        """
+        批次計算片段的 token 數，只有快取中沒有的片段送進 tokenizer
+        
+        Args:
+            texts: 片段列表
+        
+        Returns:
+            List[int]: 各片段的 token 數
+        """
+        texts = list(texts)
+        keys = [_segment_key(text) for text in texts]
+        
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in self._cache and key not in missing:
+                missing[key] = text
+        
+        computed: Dict[bytes, int] = {}
+        if missing:
+            computed = dict(zip(missing, self._tokenize_counts(list(missing.values()))))
+            self.misses += len(missing)
+        
+        counts = []
+        for key in keys:
+            count = computed.get(key)
+            if count is None:
+                count = self._cache[key]
+                self._cache.move_to_end(key)
+                self.hits += 1
+            counts.append(count)
+        
+        self._cache.update(computed)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return counts
+    
+    def _tokenize_counts(self, texts: List[str]) -> List[int]:
+        """呼叫 tokenizer 批次編碼並返回 token 數"""
+        if hasattr(self.tokenizer, "encode_batch"):
+            encodings = self.tokenizer.encode_batch(texts, add_special_tokens=self.add_special_tokens)
+            return [len(encoding.ids) for encoding in encodings]
+        encoded = self.tokenizer(texts, add_special_tokens=self.add_special_tokens)
+        return [len(ids) for ids in encoded["input_ids"]]
+    
+    def cache_info(self) -> Dict[str, int]:
+        """快取統計"""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache)}
+
+
+def length_function_name(length_function) -> str:
+    """
+    長度函數的名稱（記錄在分割器配置中，長度函數不同的分割結果不會被當成相同）
+    
+    Args:
+        length_function: 長度函數
+    
+    Returns:
+        str: 名稱，預設的 len 為 "chars"
+    """
+    if length_function is None or length_function is len:
+        return "chars"
+    name = getattr(length_function, "name", None)
+    if isinstance(name, str):
+        return name
+    return getattr(length_function, "__qualname__", type(length_function).__qualname__)
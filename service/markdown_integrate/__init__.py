@@ -1,7 +1,7 @@
 """
 統一 Markdown 轉換器模組
 
-整合 Marker 和 Markitdown 轉換器，提供統一的接口和數據格式。
+整合 Marker、原生 Excel 和 Markitdown 轉換器，提供統一的接口和數據格式。
 
 主要組件：
 - UnifiedMarkdownConverter: 統一轉換器主類
@@ -9,16 +9,20 @@
 - PageInfo: 頁面信息
 - TableInfo: 表格信息
 - FormatRouter: 格式路由器
+- ConversionServer / ConversionClient: 常駐轉換服務及其客戶端
 - MarkerConverter: Marker 轉換器
+- ExcelConverter: 原生 Excel 轉換器（每個工作表一個頁面）
 - MarkitdownConverter: Markitdown 轉換器
 """
 
 from .unified_converter import UnifiedMarkdownConverter
 from .data_models import ConversionResult, PageInfo, TableInfo, ConversionMetadata
 from .format_router import FormatRouter
+from .conversion_server import ConversionServer, ConversionClient
 
 # 導入子模組
 from . import marker
+from . import excel
 from . import markitdown
 
 __version__ = "1.0.0"
@@ -32,6 +36,9 @@ __all__ = [
     'TableInfo',
     'ConversionMetadata',
     'FormatRouter',
+    'ConversionServer',
+    'ConversionClient',
     'marker',
+    'excel',
     'markitdown'
 ]
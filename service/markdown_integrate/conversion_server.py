@@ -0,0 +1,478 @@
+"""
+常駐轉換服務
+
+在獨立的工作進程中保持已載入的 Marker / Markitdown 轉換器，透過 Unix socket
+接收轉換請求並返回序列化後的 ConversionResult，避免每次執行都重新載入模型。
+
+協定：每個連線傳送一行 JSON 請求，服務返回一行 JSON 回應。
+    {"action": "convert", "file_path": "...", "timeout": 600}
+    {"action": "health"}
+    {"action": "stats"}
+    {"action": "shutdown"}
+
+使用方式：
+    python -m service.markdown_integrate.conversion_server --socket /tmp/markdown_converter.sock
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from .data_models import ConversionResult
+from .unified_converter import _init_batch_worker, _convert_in_batch_worker, _warmup_batch_worker
+from ..serialization.conversion_serializer import ConversionSerializer
+from ..serialization.conversion_deserializer import ConversionDeserializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = "/tmp/markdown_converter.sock"
+
+
+class ConversionServerError(RuntimeError):
+    """轉換服務返回錯誤"""
+
+
+class ConversionJob:
+    """排隊中的轉換工作"""
+    
+    def __init__(self, file_path: str, timeout: float):
+        """
+        初始化轉換工作
+        
+        Args:
+            file_path: 要轉換的檔案路徑
+            timeout: 轉換時間上限（秒）
+        """
+        self.file_path = file_path
+        self.timeout = timeout
+        self.submitted_at = time.time()
+        self.result: Optional[ConversionResult] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+    
+    def finish(self, result: Optional[ConversionResult] = None, error: Optional[str] = None) -> None:
+        """記錄結果並喚醒等待的連線"""
+        self.result = result
+        self.error = error
+        self.done.set()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """處理單一連線的 JSON 請求"""
+    
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        
+        try:
+            request = json.loads(line.decode('utf-8'))
+            response = self.server.conversion_server.handle_request(request)
+        except json.JSONDecodeError as e:
+            response = {'status': 'error', 'error': f"Invalid request: {e}"}
+        except Exception as e:
+            logger.error(f"Failed to handle request: {e}")
+            response = {'status': 'error', 'error': str(e)}
+        
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """每個連線一個執行緒的 Unix socket 服務"""
+    daemon_threads = True
+
+
+class ConversionServer:
+    """
+    常駐轉換服務
+    
+    轉換在單一工作進程中依序執行，轉換器只在進程啟動時載入一次；
+    工作佇列有長度上限，佇列已滿時直接拒絕新請求。單一工作超時或
+    工作進程崩潰時，會終止並重建工作進程，不影響後續請求。
+    """
+    
+    def __init__(self,
+                 socket_path: str = DEFAULT_SOCKET_PATH,
+                 max_queue_size: int = 16,
+                 job_timeout: float = 600,
+                 converter_kwargs: Optional[Dict[str, Any]] = None,
+                 max_memory_mb: Optional[int] = None,
+                 warmup_converters: Optional[List[str]] = None):
+        """
+        初始化轉換服務
+        
+        Args:
+            socket_path: Unix socket 路徑
+            max_queue_size: 等待中工作的數量上限
+            job_timeout: 預設的單一工作轉換時間上限（秒）
+            converter_kwargs: 建立 UnifiedMarkdownConverter 的參數
+            max_memory_mb: 工作進程的記憶體上限（MB），None 表示不限制
+            warmup_converters: 啟動時預先載入的轉換器，None 表示全部
+        """
+        self.socket_path = socket_path
+        self.max_queue_size = max_queue_size
+        self.job_timeout = job_timeout
+        self.converter_kwargs = converter_kwargs or {}
+        self.max_memory_mb = max_memory_mb
+        self.warmup_converters = warmup_converters
+        
+        self._queue: 'queue.Queue[Optional[ConversionJob]]' = queue.Queue(maxsize=max_queue_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._warmup_future: Optional[Future] = None
+        self._server: Optional[_UnixServer] = None
+        self._threads: List[threading.Thread] = []
+        self._stats_lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._warm_status: Dict[str, bool] = {}
+        self._current_job: Optional[ConversionJob] = None
+        self._serializer = ConversionSerializer(output_dir=str(Path(socket_path).parent))
+        self._stats: Dict[str, Any] = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'timed_out': 0,
+            'rejected': 0,
+            'worker_restarts': 0,
+            'total_conversion_seconds': 0.0
+        }
+    
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """建立工作進程並在背景預先載入轉換器"""
+        # 服務本身是多執行緒的，使用 spawn 避免 fork 時複製到其他執行緒持有的鎖
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_batch_worker,
+            initargs=(self.converter_kwargs, self.max_memory_mb)
+        )
+        self._warmup_future = executor.submit(_warmup_batch_worker, self.warmup_converters)
+        self._warmup_future.add_done_callback(self._on_warmup_done)
+        return executor
+    
+    def _on_warmup_done(self, future: Future) -> None:
+        """記錄預先載入的結果"""
+        try:
+            self._warm_status = future.result()
+            logger.info(f"Conversion worker warmed up: {self._warm_status}")
+        except Exception as e:
+            logger.warning(f"Conversion worker warmup failed: {e}")
+    
+    def _restart_executor(self) -> None:
+        """終止目前的工作進程並重建"""
+        executor = self._executor
+        # ProcessPoolExecutor 沒有終止執行中工作的公開方法，只能直接終止工作進程
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        self._warm_status = {}
+        self._executor = self._create_executor()
+        self._increment('worker_restarts')
+    
+    def _increment(self, name: str, amount: float = 1) -> None:
+        """更新統計數據"""
+        with self._stats_lock:
+            self._stats[name] += amount
+    
+    def submit(self, file_path: str, timeout: Optional[float] = None) -> ConversionJob:
+        """
+        將轉換工作加入佇列
+        
+        Args:
+            file_path: 要轉換的檔案路徑
+            timeout: 轉換時間上限（秒），None 表示使用預設值
+        
+        Returns:
+            ConversionJob: 已排隊的工作
+        
+        Raises:
+            FileNotFoundError: 如果檔案不存在
+            queue.Full: 如果佇列已滿
+        """
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        job = ConversionJob(str(file_path), timeout or self.job_timeout)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._increment('rejected')
+            raise
+        
+        self._increment('submitted')
+        return job
+    
+    def _worker_loop(self) -> None:
+        """依序執行佇列中的轉換工作"""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            
+            # 等待模型載入完成後才開始計時，避免載入時間被算進工作的轉換時間
+            try:
+                self._warmup_future.result()
+            except Exception:
+                pass
+            
+            self._current_job = job
+            started_at = time.time()
+            try:
+                future = self._executor.submit(_convert_in_batch_worker, job.file_path)
+                result = future.result(timeout=job.timeout)
+            except FutureTimeoutError:
+                logger.error(f"Conversion of {Path(job.file_path).name} timed out after {job.timeout}s, restarting worker")
+                self._increment('timed_out')
+                self._restart_executor()
+                job.finish(error=f"Conversion timed out after {job.timeout}s")
+            except BrokenProcessPool:
+                logger.error(f"Conversion worker crashed while converting {Path(job.file_path).name}, restarting worker")
+                self._increment('failed')
+                self._restart_executor()
+                job.finish(error="Conversion worker crashed")
+            except Exception as e:
+                logger.error(f"Failed to convert {Path(job.file_path).name}: {e}")
+                self._increment('failed')
+                job.finish(error=str(e))
+            else:
+                self._increment('completed')
+                self._increment('total_conversion_seconds', time.time() - started_at)
+                job.finish(result=result)
+            finally:
+                self._current_job = None
+    
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        處理一個 JSON 請求
+        
+        Args:
+            request: 請求內容，必須包含 action
+        
+        Returns:
+            Dict[str, Any]: 回應內容
+        """
+        action = request.get('action')
+        
+        if action == 'convert':
+            try:
+                job = self.submit(request['file_path'], request.get('timeout'))
+            except KeyError:
+                return {'status': 'error', 'error': "Missing file_path"}
+            except FileNotFoundError as e:
+                return {'status': 'error', 'error': str(e)}
+            except queue.Full:
+                return {'status': 'busy', 'error': f"Job queue is full ({self.max_queue_size} jobs)"}
+            
+            job.done.wait()
+            if job.error is not None:
+                return {'status': 'error', 'error': job.error}
+            return {'status': 'ok', 'result': self._serializer.to_dict(job.result)}
+        
+        if action == 'health':
+            return {
+                'status': 'ok',
+                'pid': os.getpid(),
+                'warm_converters': dict(self._warm_status),
+                'queue_size': self._queue.qsize()
+            }
+        
+        if action == 'stats':
+            return {'status': 'ok', 'stats': self.get_stats()}
+        
+        if action == 'shutdown':
+            threading.Thread(target=self.stop, daemon=True).start()
+            return {'status': 'ok'}
+        
+        return {'status': 'error', 'error': f"Unknown action: {action}"}
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取服務統計信息
+        
+        Returns:
+            Dict[str, Any]: 工作數量、佇列長度、平均轉換時間等
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        
+        completed = stats['completed']
+        current_job = self._current_job
+        stats.update({
+            'uptime_seconds': time.time() - self._started_at if self._started_at else 0.0,
+            'queue_size': self._queue.qsize(),
+            'max_queue_size': self.max_queue_size,
+            'current_job': current_job.file_path if current_job else None,
+            'avg_conversion_seconds': stats['total_conversion_seconds'] / completed if completed else 0.0
+        })
+        return stats
+    
+    def start(self) -> None:
+        """在背景執行緒中啟動服務"""
+        # 移除上次未正常關閉留下的 socket 檔案
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        
+        self._started_at = time.time()
+        self._executor = self._create_executor()
+        self._server = _UnixServer(self.socket_path, _RequestHandler)
+        self._server.conversion_server = self
+        
+        self._threads = [
+            threading.Thread(target=self._worker_loop, name="conversion-worker", daemon=True),
+            threading.Thread(target=self._server.serve_forever, name="conversion-server", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        
+        logger.info(f"Conversion server listening on {self.socket_path}")
+    
+    def serve_forever(self) -> None:
+        """啟動服務並阻塞直到服務停止"""
+        self.start()
+        try:
+            while any(thread.is_alive() for thread in self._threads):
+                for thread in self._threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stop()
+    
+    def stop(self) -> None:
+        """停止服務，等待中的工作會收到錯誤回應"""
+        if self._server is None:
+            return
+        
+        server, self._server = self._server, None
+        server.shutdown()
+        server.server_close()
+        
+        # 取消尚未開始的工作
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.finish(error="Conversion server is shutting down")
+        self._queue.put(None)
+        
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        logger.info("Conversion server stopped")
+
+
+class ConversionClient:
+    """常駐轉換服務的客戶端"""
+    
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, connect_timeout: float = 5):
+        """
+        初始化客戶端
+        
+        Args:
+            socket_path: 服務的 Unix socket 路徑
+            connect_timeout: 連線逾時（秒）
+        """
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout
+        self._deserializer = ConversionDeserializer()
+    
+    def _request(self, request: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """送出請求並等待回應"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.connect_timeout)
+            sock.connect(self.socket_path)
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps(request, ensure_ascii=False).encode('utf-8') + b"\n")
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+        
+        if not line:
+            raise ConversionServerError("Conversion server closed the connection")
+        return json.loads(line.decode('utf-8'))
+    
+    def is_available(self) -> bool:
+        """檢查服務是否可連線"""
+        try:
+            return self.health().get('status') == 'ok'
+        except (OSError, ValueError):
+            return False
+    
+    def convert_file(self, file_path: str, timeout: Optional[float] = None) -> ConversionResult:
+        """
+        請求服務轉換檔案
+        
+        Args:
+            file_path: 輸入檔案路徑（服務端需可讀取）
+            timeout: 轉換時間上限（秒），None 表示使用服務的預設值
+        
+        Returns:
+            ConversionResult: 轉換結果
+        
+        Raises:
+            ConversionServerError: 如果服務返回錯誤、佇列已滿或轉換超時
+        """
+        request: Dict[str, Any] = {'action': 'convert', 'file_path': str(Path(file_path).resolve())}
+        if timeout is not None:
+            request['timeout'] = timeout
+        
+        response = self._request(request)
+        if response.get('status') != 'ok':
+            raise ConversionServerError(response.get('error', 'Unknown error'))
+        return self._deserializer.from_dict(response['result'])
+    
+    def health(self) -> Dict[str, Any]:
+        """查詢服務健康狀態"""
+        return self._request({'action': 'health'}, timeout=self.connect_timeout)
+    
+    def stats(self) -> Dict[str, Any]:
+        """查詢服務統計信息"""
+        return self._request({'action': 'stats'}, timeout=self.connect_timeout).get('stats', {})
+    
+    def shutdown(self) -> None:
+        """要求服務停止"""
+        self._request({'action': 'shutdown'}, timeout=self.connect_timeout)
+
+
+def main():
+    """命令列入口"""
+    parser = argparse.ArgumentParser(description='Persistent Markdown conversion server')
+    parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET_PATH, help='Unix socket path')
+    parser.add_argument('--queue-size', type=int, default=16, help='Maximum number of queued jobs')
+    parser.add_argument('--job-timeout', type=float, default=600, help='Default per-job timeout in seconds')
+    parser.add_argument('--worker-memory-mb', type=int, default=None, help='Memory limit of the conversion worker in MB')
+    parser.add_argument('--cache-dir', type=str, default=None, help='Conversion cache directory (default: no cache)')
+    
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    converter_kwargs: Dict[str, Any] = {}
+    if args.cache_dir:
+        from ..serialization.conversion_cache import ConversionCache
+        converter_kwargs['cache'] = ConversionCache(cache_dir=args.cache_dir)
+    
+    server = ConversionServer(
+        socket_path=args.socket,
+        max_queue_size=args.queue_size,
+        job_timeout=args.job_timeout,
+        converter_kwargs=converter_kwargs,
+        max_memory_mb=args.worker_memory_mb
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,14 @@
 定義所有轉換器使用的統一數據結構，確保不同轉換器的結果格式一致。
 """
 
-from typing import List, Optional, Dict, Any, Union
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Dict, Any, Union, Iterable, Tuple
+from dataclasses import dataclass, field
 from pathlib import Path
 
+# 合併頁面內容時頁面之間的分隔字串
+PAGE_SEPARATOR = '\n\n'
+
 
 @dataclass
 class TableInfo:
@@ -19,6 +23,9 @@ class TableInfo:
     column_count: int
     start_line: int
     end_line: int
+    sheet_name: Optional[str] = None  # 來源工作表名稱（僅 Excel 原生轉換提供）
+    first_row: Optional[int] = None   # 表格在工作表中的起始列號（1 起始）
+    last_row: Optional[int] = None    # 表格在工作表中的結束列號（包含）
 
 
 @dataclass
@@ -53,7 +60,7 @@ class ConversionMetadata:
     total_tables: int
     total_content_length: int
     conversion_timestamp: float
-    converter_used: str  # 'marker' 或 'markitdown'
+    converter_used: str  # 'marker'、'markitdown' 或 'excel'
     additional_info: Optional[Dict[str, Any]] = None  # 可能沒有額外信息
     
     def __post_init__(self):
@@ -68,7 +75,111 @@ class ConversionResult:
     metadata: ConversionMetadata   # 元數據
     pages: Optional[List[PageInfo]] = None  # 可能沒有頁面信息
     output_path: Optional[str] = None  # 如果保存到檔案，記錄路徑
+    page_offsets: Optional[List[int]] = field(default=None, compare=False, repr=False)  # 各頁面在 content 中的起始偏移
     
     def __post_init__(self):
         if self.pages is None:
             self.pages = []
+
+    def get_page_offsets(self) -> Optional[List[int]]:
+        """
+        各頁面在 content 中的起始偏移
+        
+        轉換時沒有記錄（例如從舊的序列化文件載入）時，依頁面順序在 content 中尋找各頁內容並保存結果。
+        
+        Returns:
+            Optional[List[int]]: 起始偏移，沒有頁面或頁面內容不在 content 中時返回 None
+        """
+        if not self.pages:
+            return None
+        offsets = getattr(self, 'page_offsets', None)
+        if offsets is not None and len(offsets) == len(self.pages):
+            return offsets
+        
+        offsets = []
+        cursor = 0
+        for page in self.pages:
+            position = self.content.find(page.content, cursor)
+            if position < 0:
+                return None
+            offsets.append(position)
+            cursor = position + len(page.content)
+        self.page_offsets = offsets
+        return offsets
+
+
+def join_pages(page_contents: Iterable[str]) -> Tuple[str, List[int]]:
+    """
+    以 PAGE_SEPARATOR 合併頁面內容，並記錄各頁面在合併後內容中的起始偏移
+    
+    Args:
+        page_contents: 依頁面順序排列的頁面內容
+    
+    Returns:
+        Tuple[str, List[int]]: (合併後的內容, 各頁面的起始偏移)
+    """
+    page_contents = list(page_contents)
+    offsets = []
+    position = 0
+    for content in page_contents:
+        offsets.append(position)
+        position += len(content) + len(PAGE_SEPARATOR)
+    return PAGE_SEPARATOR.join(page_contents), offsets
+
+
+class PageOffsetIndex:
+    """
+    頁面在合併內容中的位置索引
+    
+    起始偏移是頁面長度（加分隔字串）的前綴和，以二分搜尋找出偏移範圍涵蓋的頁面，
+    跨越頁面邊界的範圍返回所有涵蓋的頁碼。
+    """
+    
+    def __init__(self, offsets: List[int], lengths: List[int], page_numbers: List[int]):
+        """
+        Args:
+            offsets: 各頁面的起始偏移（遞增）
+            lengths: 各頁面的內容長度
+            page_numbers: 各頁面的頁碼
+        """
+        self.starts = list(offsets)
+        self.ends = [start + length for start, length in zip(offsets, lengths)]
+        self.page_numbers = list(page_numbers)
+    
+    @classmethod
+    def from_conversion_result(cls, conversion_result: ConversionResult) -> Optional['PageOffsetIndex']:
+        """由轉換結果的頁面偏移建立索引，無法取得偏移時返回 None"""
+        offsets = conversion_result.get_page_offsets()
+        if offsets is None:
+            return None
+        pages = conversion_result.pages
+        return cls(offsets, [len(page.content) for page in pages], [page.page_number for page in pages])
+    
+    def pages_for_range(self, start: int, end: int) -> List[int]:
+        """
+        偏移範圍 [start, end) 涵蓋的頁碼（只落在頁面分隔字串上的部分不計）
+        
+        Args:
+            start: 起始偏移
+            end: 結束偏移
+        
+        Returns:
+            List[int]: 依頁面順序排列的頁碼
+        """
+        first = max(bisect_right(self.starts, start) - 1, 0)
+        if first < len(self.ends) and start >= self.ends[first]:
+            first += 1
+        last = bisect_left(self.starts, max(end, start + 1)) - 1
+        # 空白頁面沒有內容，不會被任何範圍涵蓋
+        return [self.page_numbers[index] for index in range(first, last + 1)
+                if self.ends[index] > self.starts[index]]
+    
+    def page_at(self, offset: int) -> Optional[int]:
+        """偏移所在的頁碼（落在頁面分隔字串上時返回下一個有內容的頁面）"""
+        pages = self.pages_for_range(offset, offset + 1)
+        if pages:
+            return pages[0]
+        for index in range(bisect_right(self.starts, offset), len(self.page_numbers)):
+            if self.ends[index] > self.starts[index]:
+                return self.page_numbers[index]
+        return None
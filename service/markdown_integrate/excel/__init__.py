@@ -0,0 +1,7 @@
+"""
+原生 Excel 轉換服務（openpyxl / xlrd 串流讀取，每個工作表一個頁面）。
+"""
+
+from .excel_converter import ExcelConverter, NATIVE_EXCEL_FORMATS, format_cell
+
+__all__ = ['ExcelConverter', 'NATIVE_EXCEL_FORMATS', 'format_cell']
@@ -0,0 +1,277 @@
+"""
+原生 Excel 轉換器
+
+以串流、唯讀的方式逐一讀取工作表（.xlsx 使用 openpyxl，.xls 使用 xlrd），
+每個工作表直接產出一個 PageInfo，並在 TableInfo 中記錄工作表名稱、列範圍與表格尺寸。
+不經過 MarkItDown 的整份 Markdown 字串，也不需要再以 ## 標題切回工作表，
+儲存格內容含有 "## " 時也不會錯誤分頁。
+"""
+
+import datetime
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+try:
+    from ..data_models import PageInfo, TableInfo
+except ImportError:
+    from data_models import PageInfo, TableInfo
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+try:
+    import xlrd
+    XLRD_AVAILABLE = True
+except ImportError:
+    XLRD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 目前環境可以原生轉換的副檔名（依已安裝的讀取套件決定）
+NATIVE_EXCEL_FORMATS: Set[str] = set()
+if OPENPYXL_AVAILABLE:
+    NATIVE_EXCEL_FORMATS.add('.xlsx')
+if XLRD_AVAILABLE:
+    NATIVE_EXCEL_FORMATS.add('.xls')
+
+# 一列的來源資訊：(工作表中的列號（1 起始）, 儲存格值)
+SheetRow = Tuple[int, Tuple[Any, ...]]
+
+
+def format_cell(value: Any) -> str:
+    """
+    將儲存格值轉換為表格中的文字
+    
+    空值轉為空字串，整數值的浮點數去除小數點，日期時間轉為 ISO 格式，
+    多行文字合併為單行並壓縮空白，管道符號會被轉義。
+    
+    Args:
+        value: 儲存格值
+    
+    Returns:
+        str: 儲存格文字
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        text = str(int(value))
+    elif isinstance(value, datetime.datetime):
+        if value.time() == datetime.time(0, 0):
+            text = value.date().isoformat()
+        else:
+            text = value.isoformat(sep=' ')
+    elif isinstance(value, (datetime.date, datetime.time)):
+        text = value.isoformat()
+    else:
+        text = str(value)
+    return " ".join(text.split()).replace("|", "\\|")
+
+
+class ExcelConverter:
+    """原生 Excel 轉換器 - 每個工作表產出一個頁面"""
+    
+    SUPPORTED_EXTENSIONS: Set[str] = NATIVE_EXCEL_FORMATS
+    
+    def __init__(self, detect_caption_rows: bool = True):
+        """
+        初始化 Excel 轉換器
+        
+        Args:
+            detect_caption_rows: 是否將表格前只有一個非空儲存格的列視為標題說明文字，
+                                 輸出在表格上方，而不是作為表頭
+        
+        Raises:
+            ImportError: 如果沒有安裝任何 Excel 讀取套件
+        """
+        if not NATIVE_EXCEL_FORMATS:
+            raise ImportError("openpyxl or xlrd is required for native Excel conversion")
+        self.detect_caption_rows = detect_caption_rows
+    
+    def is_supported_file(self, file_path: str) -> bool:
+        """
+        檢查檔案是否可以原生轉換
+        
+        Args:
+            file_path: 檔案路徑
+        
+        Returns:
+            bool: 是否支援
+        """
+        return Path(file_path).suffix.lower() in self.SUPPORTED_EXTENSIONS
+    
+    def iter_pages(self, file_path: str) -> Iterator[PageInfo]:
+        """
+        逐一轉換工作表，每個工作表產出一個 PageInfo
+        
+        工作表以唯讀模式逐列讀取，同一時間只保留目前工作表的資料。
+        
+        Args:
+            file_path: Excel 檔案路徑
+        
+        Yields:
+            PageInfo: 依工作表順序產出的頁面，標題為工作表名稱
+        
+        Raises:
+            FileNotFoundError: 如果檔案不存在
+            ValueError: 如果檔案格式不支援
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        if not self.is_supported_file(str(file_path)):
+            raise ValueError(f"Unsupported file format for native Excel conversion: {file_path.suffix}")
+        
+        for page_number, (sheet_name, rows) in enumerate(self._iter_sheets(file_path), 1):
+            yield self._build_page(page_number, sheet_name, rows)
+    
+    def convert_file(self, file_path: str) -> List[PageInfo]:
+        """
+        轉換整個活頁簿
+        
+        Args:
+            file_path: Excel 檔案路徑
+        
+        Returns:
+            List[PageInfo]: 每個工作表一個頁面
+        """
+        logger.info(f"Converting Excel file natively: {Path(file_path).name}")
+        pages = list(self.iter_pages(file_path))
+        logger.info(f"Successfully converted {len(pages)} sheets: {Path(file_path).name}")
+        return pages
+    
+    def _iter_sheets(self, file_path: Path) -> Iterator[Tuple[str, Iterator[SheetRow]]]:
+        """依副檔名選擇讀取方式，逐一產出 (工作表名稱, 列迭代器)"""
+        if file_path.suffix.lower() == '.xls':
+            yield from self._iter_xls_sheets(file_path)
+        else:
+            yield from self._iter_xlsx_sheets(file_path)
+    
+    @staticmethod
+    def _iter_xlsx_sheets(file_path: Path) -> Iterator[Tuple[str, Iterator[SheetRow]]]:
+        """以 openpyxl 唯讀模式讀取 .xlsx（公式取快取的計算結果）"""
+        workbook = openpyxl.load_workbook(str(file_path), read_only=True, data_only=True)
+        try:
+            for worksheet in workbook.worksheets:
+                rows = worksheet.iter_rows(values_only=True)
+                yield worksheet.title, enumerate(rows, 1)
+        finally:
+            workbook.close()
+    
+    @staticmethod
+    def _iter_xls_sheets(file_path: Path) -> Iterator[Tuple[str, Iterator[SheetRow]]]:
+        """以 xlrd 按需載入讀取 .xls，讀完的工作表立即釋放"""
+        workbook = xlrd.open_workbook(str(file_path), on_demand=True)
+        try:
+            for sheet_name in workbook.sheet_names():
+                sheet = workbook.sheet_by_name(sheet_name)
+                rows = []
+                for row_index in range(sheet.nrows):
+                    values = []
+                    for cell in sheet.row(row_index):
+                        if cell.ctype == xlrd.XL_CELL_DATE:
+                            values.append(xlrd.xldate.xldate_as_datetime(cell.value, workbook.datemode))
+                        elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+                            values.append(None)
+                        else:
+                            values.append(cell.value)
+                    rows.append((row_index + 1, tuple(values)))
+                workbook.unload_sheet(sheet_name)
+                yield sheet_name, iter(rows)
+        finally:
+            workbook.release_resources()
+    
+    def _build_page(self, page_number: int, sheet_name: str, rows: Iterator[SheetRow]) -> PageInfo:
+        """
+        將單一工作表轉換為頁面
+        
+        頁面內容為 "## 工作表名稱"、標題說明文字（如有）及 GFM 表格。
+        全空的列會被略過，左右兩側全空的欄會被裁掉。
+        
+        Args:
+            page_number: 頁碼（工作表順序，1 起始）
+            sheet_name: 工作表名稱
+            rows: 工作表的列迭代器
+        
+        Returns:
+            PageInfo: 頁面資訊
+        """
+        table_rows: List[Tuple[int, List[str]]] = []
+        first_column = None
+        width = 0
+        for row_number, values in rows:
+            cells = [format_cell(value) for value in values]
+            while cells and not cells[-1]:
+                cells.pop()
+            if not cells:
+                continue
+            leading = next(index for index, cell in enumerate(cells) if cell)
+            first_column = leading if first_column is None else min(first_column, leading)
+            width = max(width, len(cells))
+            table_rows.append((row_number, cells))
+        
+        if first_column:
+            table_rows = [(row_number, cells[first_column:]) for row_number, cells in table_rows]
+            width -= first_column
+        
+        # 表格前只有一個非空儲存格的列（例如合併儲存格的大標題）視為說明文字
+        captions: List[str] = []
+        if self.detect_caption_rows and width > 1:
+            while len(table_rows) > 1 and sum(1 for cell in table_rows[0][1] if cell) == 1:
+                captions.append(next(cell for cell in table_rows.pop(0)[1] if cell))
+        
+        lines = [f"## {sheet_name}"]
+        if captions:
+            lines.extend(["", *captions])
+        
+        tables: List[TableInfo] = []
+        block_types: Dict[str, int] = {'title': 1}
+        if captions:
+            block_types['paragraph'] = len(captions)
+        
+        if table_rows:
+            lines.append("")
+            start_line = len(lines)
+            table_lines = self._render_table([cells for _, cells in table_rows], width)
+            lines.extend(table_lines)
+            
+            tables.append(TableInfo(
+                table_id=f"page_{page_number}_table_1",
+                title=sheet_name,
+                content="\n".join(table_lines),
+                row_count=len(table_lines),
+                column_count=width,
+                start_line=start_line,
+                end_line=len(lines) - 1,
+                sheet_name=sheet_name,
+                first_row=table_rows[0][0],
+                last_row=table_rows[-1][0]
+            ))
+            block_types['table'] = len(table_lines)
+        
+        content = "\n".join(lines)
+        return PageInfo(
+            page_number=page_number,
+            title=sheet_name,
+            content=content,
+            content_length=len(content),
+            block_count=sum(block_types.values()),
+            block_types=block_types,
+            tables=tables,
+            table_count=len(tables)
+        )
+    
+    @staticmethod
+    def _render_table(rows: List[List[str]], width: int) -> List[str]:
+        """將等寬化後的列輸出為 GFM 表格行，第一列作為表頭"""
+        lines = []
+        for index, cells in enumerate(rows):
+            cells = cells + [""] * (width - len(cells))
+            lines.append("| " + " | ".join(cells) + " |")
+            if index == 0:
+                lines.append("| " + " | ".join(["---"] * width) + " |")
+        return lines
+
@@ -1,12 +1,22 @@
 """
 格式路由器
 
-根據檔案格式決定使用哪個轉換器（Marker 或 Markitdown）
+根據檔案格式決定使用哪個轉換器（逐頁混合、Marker、原生 Excel 或 Markitdown）
 """
 
 from pathlib import Path
 from typing import Tuple, Set
 
+try:
+    from .excel.excel_converter import NATIVE_EXCEL_FORMATS
+except ImportError:
+    NATIVE_EXCEL_FORMATS: Set[str] = set()
+
+try:
+    from .marker.page_router import PYPDFIUM_AVAILABLE
+except ImportError:
+    PYPDFIUM_AVAILABLE = False
+
 
 class FormatRouter:
     """格式路由器 - 決定使用哪個轉換器"""
@@ -14,6 +24,12 @@ class FormatRouter:
     # Marker 支援的格式 (docx, pdf, pptx)
     MARKER_FORMATS: Set[str] = {'.docx', '.pdf', '.pptx'}
     
+    # 逐頁混合路由支援的格式（可讀取 PDF 文字層時，只有需要版面分析的頁面才交給 Marker）
+    HYBRID_FORMATS: Set[str] = {'.pdf'} if PYPDFIUM_AVAILABLE else set()
+    
+    # 原生 Excel 轉換器支援的格式（有安裝對應讀取套件時優先於 Markitdown）
+    EXCEL_FORMATS: Set[str] = set(NATIVE_EXCEL_FORMATS)
+    
     # Markitdown 支援的格式 (excel 和其他)
     MARKITDOWN_FORMATS: Set[str] = {
         '.xlsx', '.xls', '.png', '.jpg', '.jpeg', '.gif', '.bmp', 
@@ -38,8 +54,12 @@ class FormatRouter:
         """
         file_ext = Path(file_path).suffix.lower()
         
-        if file_ext in cls.MARKER_FORMATS:
+        if file_ext in cls.HYBRID_FORMATS:
+            return 'hybrid', file_ext
+        elif file_ext in cls.MARKER_FORMATS:
             return 'marker', file_ext
+        elif file_ext in cls.EXCEL_FORMATS:
+            return 'excel', file_ext
         elif file_ext in cls.MARKITDOWN_FORMATS:
             return 'markitdown', file_ext
         else:
@@ -68,19 +88,21 @@ class FormatRouter:
         獲取所有支援的格式列表
         
         Returns:
-            dict: 包含 marker 和 markitdown 支援的格式
+            dict: 包含 hybrid、marker、excel 和 markitdown 支援的格式
         """
         return {
-            'marker': sorted(list(cls.MARKER_FORMATS)),
-            'markitdown': sorted(list(cls.MARKITDOWN_FORMATS))
+            'hybrid': sorted(list(cls.HYBRID_FORMATS)),
+            'marker': sorted(list(cls.MARKER_FORMATS - cls.HYBRID_FORMATS)),
+            'excel': sorted(list(cls.EXCEL_FORMATS)),
+            'markitdown': sorted(list(cls.MARKITDOWN_FORMATS - cls.EXCEL_FORMATS))
         }
     
     @classmethod
     def get_all_supported_formats(cls) -> Set[str]:
         """
-        獲取所有支援的格式（合併 marker 和 markitdown）
+        獲取所有支援的格式（合併 marker、excel 和 markitdown）
         
         Returns:
             Set[str]: 所有支援的格式
         """
-        return cls.MARKER_FORMATS.union(cls.MARKITDOWN_FORMATS)
+        return cls.MARKER_FORMATS | cls.EXCEL_FORMATS | cls.MARKITDOWN_FORMATS
@@ -10,10 +10,22 @@ from .marker_converter import (
     PageContent,
     PagesResult
 )
+from .table_engine import TableGrid, parse_html_tables, convert_html_tables
+from .page_scanner import PageScan, TableSpan, scan_page
+from .page_router import PageRoute, RoutingThresholds, route_pdf_pages
 
 __all__ = [
     'MarkerConverter', 
     'create_marker_converter',
     'PageContent',
-    'PagesResult'
+    'PagesResult',
+    'TableGrid',
+    'parse_html_tables',
+    'convert_html_tables',
+    'PageScan',
+    'TableSpan',
+    'scan_page',
+    'PageRoute',
+    'RoutingThresholds',
+    'route_pdf_pages'
 ]
@@ -10,12 +10,13 @@ import re
 import logging
 import uuid
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Union, TypedDict, TYPE_CHECKING
+from typing import Optional, Dict, Any, List, Union, Iterator, TypedDict, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from marker.renderers.markdown import MarkdownOutput
 import tempfile
 import shutil
+from functools import lru_cache
 
 try:
     from marker.converters.pdf import PdfConverter
@@ -27,14 +28,36 @@ except ImportError:
     logging.warning("Marker package not available. Please install marker-pdf[full].")
 
 try:
-    from bs4 import BeautifulSoup
-    BEAUTIFULSOUP_AVAILABLE = True
+    import pypdfium2
+    PYPDFIUM_AVAILABLE = True
 except ImportError:
-    BEAUTIFULSOUP_AVAILABLE = False
-    logging.warning("BeautifulSoup not available. Please install beautifulsoup4.")
+    PYPDFIUM_AVAILABLE = False
+
+try:
+    from .table_engine import html_table_to_gfm, convert_html_tables
+    from .page_scanner import scan_page, TableSpan
+    from .page_router import format_page_range
+except ImportError:
+    # 以頂層模組載入時（marker/tests、marker/examples 會把此目錄加入 sys.path）
+    from table_engine import html_table_to_gfm, convert_html_tables
+    from page_scanner import scan_page, TableSpan
+    from page_router import format_page_range
 
 logger = logging.getLogger(__name__)
 
+# Marker 的頁面分隔符：\n\n{page_id}------------------------------------------------\n\n
+PAGE_SEPARATOR_PATTERN = re.compile(r'\n\n\{(\d+)\}' + r'-' * 48 + r'\n\n')
+
+
+@lru_cache(maxsize=1)
+def _load_artifact_dict() -> Dict[str, Any]:
+    """
+    載入 Marker 模型
+    
+    同一進程內只載入一次，之後建立的 MarkerConverter 共用相同的模型。
+    """
+    logger.info("Loading Marker models...")
+    return create_model_dict()
 
 
 class TableInfo(TypedDict):
@@ -72,6 +95,12 @@ class MarkerConverter:
     支援 PDF 和 XLSX 檔案轉換，提供每頁結構化輸出和表格轉換
     """
     
+    # Marker 轉換配置：使用 Markdown 輸出格式並啟用分頁
+    MARKER_CONFIG: Dict[str, Any] = {
+        "output_format": "markdown",
+        "paginate_output": True
+    }
+    
     def __init__(self, model_locations: Optional[Dict[str, str]] = None):
         """
         初始化 Marker 轉換器
@@ -82,9 +111,6 @@ class MarkerConverter:
         if not MARKER_AVAILABLE:
             raise ImportError("Marker package is not available. Please install marker-pdf[full].")
         
-        if not BEAUTIFULSOUP_AVAILABLE:
-            raise ImportError("BeautifulSoup is not available. Please install beautifulsoup4.")
-        
         self.model_locations = model_locations or {}
         self.converter: Optional[PdfConverter] = None
         self._initialize_converter()
@@ -92,12 +118,8 @@ class MarkerConverter:
     def _initialize_converter(self):
         """初始化 Marker 轉換器"""
         try:
-            # 使用 Markdown 輸出格式並啟用分頁
-            cfg = ConfigParser({
-                "output_format": "markdown",
-                "paginate_output": True
-            })
-            artifact_dict = create_model_dict()
+            cfg = ConfigParser(dict(self.MARKER_CONFIG))
+            artifact_dict = _load_artifact_dict()
             
             # 初始化轉換器（支援 PDF 和 XLSX）
             self.converter = PdfConverter(
@@ -116,49 +138,18 @@ class MarkerConverter:
     
     def _table_html_to_md(self, html: str) -> str:
         """
-        嘗試把 <table> 轉成 GFM 表格；若含 rowspan/colspan 就保留 HTML。
+        把 <table> 轉成 GFM 表格，rowspan/colspan 會展開為完整的儲存格網格
         
         Args:
             html: HTML 表格字符串
             
         Returns:
-            轉換後的 Markdown 表格或原始 HTML
+            轉換後的 Markdown 表格；沒有表格時返回空字串
         """
-        soup = BeautifulSoup(html or "", "html.parser")
-        table = soup.find("table")
-        if not table:
-            return (html or "").strip()
-
-        # 檢查是否有跨欄/跨列
-        for cell in table.find_all(["td", "th"]):
-            if cell.has_attr("rowspan") or cell.has_attr("colspan"):
-                return f"\n<!-- complex table; keep HTML -->\n{str(table)}\n"
-
-        # 提取表格行
-        rows = []
-        for tr in table.find_all("tr"):
-            row = []
-            for cell in tr.find_all(["td", "th"]):
-                txt = " ".join(cell.stripped_strings)
-                row.append(self._md_escape(txt))
-            if row:
-                rows.append(row)
-
-        if not rows:
+        table_md = html_table_to_gfm(html)
+        if not table_md:
             return ""
-
-        # 構建 Markdown 表格
-        header = rows[0]
-        sep = ["---"] * len(header)
-        body = rows[1:]
-
-        lines = [
-            "| " + " | ".join(header) + " |",
-            "| " + " | ".join(sep) + " |"
-        ]
-        for r in body:
-            lines.append("| " + " | ".join(r) + " |")
-        return "\n" + "\n".join(lines) + "\n"
+        return "\n" + table_md + "\n"
     
     def _block_to_md(self, block) -> str:
         """
@@ -285,19 +276,7 @@ class MarkerConverter:
             pages_with_info = []
             
             for i, content in enumerate(page_contents, 1):
-                # 分析頁面內容
-                block_count, block_types, tables = self._analyze_page_content(content)
-                
-                page_info: PageContent = {
-                    'page_number': i,
-                    'content': content,
-                    'content_length': len(content),
-                    'block_count': block_count,
-                    'block_types': block_types,
-                    'tables': tables,
-                    'table_count': len(tables)
-                }
-                pages_with_info.append(page_info)
+                pages_with_info.append(self._build_page_content(i, content))
             
             # 構建結果
             file_name = file_path.name
@@ -313,6 +292,166 @@ class MarkerConverter:
             logger.error(f"Failed to extract pages from file: {e}")
             raise
     
+    def iter_pages(self, input_file: str, window: int = 10) -> Iterator[PageContent]:
+        """
+        以頁面窗口逐段轉換 PDF，每完成一個窗口就產出該窗口的頁面
+        
+        每個窗口只把 window 頁交給 Marker 轉換（共用已載入的模型），
+        轉換完成後立即產出頁面並釋放該窗口的渲染結果，
+        下游可以在後面的頁面仍在轉換時就開始處理前面的頁面。
+        
+        Args:
+            input_file (str): 檔案路徑（支援 PDF 和 XLSX，XLSX 無法分窗口，會整份轉換後再逐頁產出）
+            window (int): 每個窗口的頁數
+        
+        Yields:
+            PageContent: 依序產出的頁面內容和資訊，頁碼在整份文件中連續
+        
+        Example:
+            >>> converter = MarkerConverter()
+            >>> for page in converter.iter_pages("manual.pdf", window=20):
+            ...     print(f"第 {page['page_number']} 頁: {page['content_length']} 字元")
+        """
+        if window < 1:
+            raise ValueError(f"window must be a positive integer, got {window}")
+        
+        file_path = Path(input_file)
+        file_extension = file_path.suffix.lower()
+        if file_extension not in ['.pdf', '.xlsx']:
+            raise ValueError(f"Unsupported file format: {file_extension}. Supported formats: .pdf, .xlsx")
+        
+        total_pages = self._count_pdf_pages(input_file) if file_extension == '.pdf' else None
+        if total_pages is None:
+            # 無法取得頁數時退回整份轉換
+            yield from self.marker_pages(input_file)['pages']
+            return
+        
+        page_number = 0
+        for start in range(0, total_pages, window):
+            end = min(start + window, total_pages)
+            logger.info(f"Converting pages {start + 1}-{end} of {total_pages}: {file_path.name}")
+            
+            # page_range 使用 0 起始的頁碼，格式如 "0-9"
+            rendered: 'MarkdownOutput' = self._create_window_converter(f"{start}-{end - 1}")(input_file)
+            if hasattr(rendered, 'markdown'):
+                page_contents = self._split_markdown_by_pages(rendered.markdown, rendered)
+            else:
+                page_contents = [str(rendered)]
+            del rendered
+            
+            for content in page_contents:
+                page_number += 1
+                yield self._build_page_content(page_number, content)
+        
+        logger.info(f"Streamed {page_number} pages from {file_extension.upper()} file: {file_path.name}")
+    
+    def convert_page_subset(self, input_file: str, page_indices: List[int]) -> Dict[int, PageContent]:
+        """
+        只把指定的頁面交給 Marker 轉換（用於逐頁混合路由）
+        
+        Args:
+            input_file (str): PDF 檔案路徑
+            page_indices (List[int]): 要轉換的頁面索引（0 起始）
+        
+        Returns:
+            Dict[int, PageContent]: 頁面索引 -> 頁面內容；頁碼欄位為原始文件中的頁碼（1 起始）
+        """
+        indices = sorted(set(page_indices))
+        if not indices:
+            return {}
+        
+        logger.info(f"Converting {len(indices)} pages with Marker: {Path(input_file).name}")
+        rendered: 'MarkdownOutput' = self._create_window_converter(format_page_range(indices))(input_file)
+        markdown_content = rendered.markdown if hasattr(rendered, 'markdown') else str(rendered)
+        del rendered
+        
+        parts = self._split_pages_with_ids(markdown_content)
+        if parts and all(page_id in indices for page_id, _ in parts):
+            contents = dict(parts)
+        else:
+            # 分隔符中的頁碼與請求的頁面不一致時，依順序對應
+            contents = dict(zip(indices, (content for _, content in parts)))
+        
+        return {
+            index: self._build_page_content(index + 1, contents.get(index, ""))
+            for index in indices
+        }
+    
+    def _split_pages_with_ids(self, markdown_content: str) -> List[tuple[int, str]]:
+        """
+        依 Marker 頁面分隔符分割內容，保留每頁的原始頁碼（空白頁也保留）
+        
+        Args:
+            markdown_content (str): 啟用 paginate_output 的 Markdown 內容
+        
+        Returns:
+            List[tuple[int, str]]: (頁面索引, 頁面內容) 列表
+        """
+        parts = PAGE_SEPARATOR_PATTERN.split(markdown_content)
+        return [(int(parts[i]), parts[i + 1].strip()) for i in range(1, len(parts) - 1, 2)]
+    
+    def _create_window_converter(self, page_range: str) -> 'PdfConverter':
+        """
+        建立只轉換指定頁面範圍的 Marker 轉換器
+        
+        Args:
+            page_range (str): Marker 的頁面範圍字串（0 起始），如 "0-9" 或 "0-2,5"
+        
+        Returns:
+            PdfConverter: 共用已載入模型的轉換器
+        """
+        cfg = ConfigParser({**self.MARKER_CONFIG, "page_range": page_range})
+        return PdfConverter(
+            config=cfg.generate_config_dict(),
+            artifact_dict=_load_artifact_dict()
+        )
+    
+    def _count_pdf_pages(self, input_file: str) -> Optional[int]:
+        """
+        讀取 PDF 的頁數（不做版面分析）
+        
+        Args:
+            input_file (str): PDF 檔案路徑
+        
+        Returns:
+            Optional[int]: 頁數，無法讀取時返回 None
+        """
+        if not PYPDFIUM_AVAILABLE:
+            return None
+        try:
+            pdf = pypdfium2.PdfDocument(input_file)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+        except Exception as e:
+            logger.warning(f"Failed to count PDF pages, falling back to full conversion: {e}")
+            return None
+    
+    def _build_page_content(self, page_number: int, content: str) -> PageContent:
+        """
+        分析頁面內容並建立 PageContent
+        
+        Args:
+            page_number (int): 頁碼
+            content (str): 頁面 Markdown 內容
+        
+        Returns:
+            PageContent: 頁面內容和資訊
+        """
+        # 頁面中殘留的 HTML 表格一次批次轉換為 GFM
+        content = convert_html_tables(content)
+        block_count, block_types, tables = self._analyze_page_content(content)
+        return {
+            'page_number': page_number,
+            'content': content,
+            'content_length': len(content),
+            'block_count': block_count,
+            'block_types': block_types,
+            'tables': tables,
+            'table_count': len(tables)
+        }
+    
     def _split_markdown_by_pages(self, markdown_content: str, rendered: 'MarkdownOutput' = None) -> List[str]:
         """
         將 Markdown 內容按照原始 PDF 的物理頁面分割
@@ -380,10 +519,8 @@ class MarkerConverter:
         
         # Marker 的頁面分隔符格式：\n\n{page_id}------------------------------------------------\n\n
         # 其中 page_id 是頁面編號，後面跟著 48 個連字符
-        page_separator_pattern = r'\n\n\{(\d+)\}' + r'-' * 48 + r'\n\n'
-        
         # 使用正則表達式分割內容
-        page_parts = re.split(page_separator_pattern, markdown_content)
+        page_parts = PAGE_SEPARATOR_PATTERN.split(markdown_content)
         
         logger.info(f"找到 {len(page_parts)} 個部分")
         
@@ -452,147 +589,43 @@ class MarkerConverter:
         Returns:
             List[TableInfo]: 表格信息列表
         """
-        tables = []
-        lines = content.split('\n')
-        
-        # 查找表格行
-        table_lines = []
-        current_table_start = -1
+        return [self._table_info_from_span(span) for span in scan_page(content).tables]
         
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-                
-            # 檢查是否為表格行
-            if '|' in line and line.count('|') >= 2:
-                if current_table_start == -1:
-                    current_table_start = i
-                table_lines.append((i, line))
-            else:
-                # 如果不是表格行，檢查是否有完整的表格
-                if table_lines and current_table_start != -1:
-                    # 提取表格
-                    table_info = self._parse_table_lines(table_lines, current_table_start)
-                    if table_info:
-                        tables.append(table_info)
-                    table_lines = []
-                    current_table_start = -1
-        
-        # 處理最後一個表格
-        if table_lines and current_table_start != -1:
-            table_info = self._parse_table_lines(table_lines, current_table_start)
-            if table_info:
-                tables.append(table_info)
-        
-        return tables
-    
-    def _parse_table_lines(self, table_lines: List[tuple], start_line: int) -> Optional[TableInfo]:
+    def _table_info_from_span(self, span: TableSpan) -> TableInfo:
         """
-        解析表格行，提取表格信息
+        將掃描到的表格位置轉換為 TableInfo
         
         Args:
-            table_lines (List[tuple]): 表格行列表，每個元素為 (行號, 內容)
-            start_line (int): 表格起始行號
+            span (TableSpan): 頁面掃描器找到的表格
             
         Returns:
-            Optional[TableInfo]: 表格信息，如果解析失敗則返回 None
+            TableInfo: 表格信息（每次產生新的表格 UUID）
         """
-        if len(table_lines) < 2:  # 至少需要標題行和分隔行
-            return None
-        
-        # 提取表格內容
-        table_content_lines = [line for _, line in table_lines]
-        table_content = '\n'.join(table_content_lines)
-        
-        # 計算行數和列數
-        row_count = len(table_lines)
-        
-        # 跳過分隔行來計算列數
-        data_lines = [line for _, line in table_lines if not line.startswith('|---')]
-        if not data_lines:
-            return None
-            
-        first_line = data_lines[0]
-        column_count = first_line.count('|') - 1  # 減去首尾的 |
-        
-        # 嘗試提取表格標題（從表格前的內容中尋找）
-        title = self._extract_table_title(table_content_lines[0])
-        
-        # 生成表格 UUID
-        table_id = str(uuid.uuid4())
-        
         return TableInfo(
-            table_id=table_id,
-            title=title,
-            content=table_content,
-            row_count=row_count,
-            column_count=column_count,
-            start_line=start_line,
-            end_line=table_lines[-1][0]
+            table_id=str(uuid.uuid4()),
+            title=span.title,
+            content=span.content,
+            row_count=span.row_count,
+            column_count=span.column_count,
+            start_line=span.start_line,
+            end_line=span.end_line
         )
     
-    def _extract_table_title(self, first_line: str) -> str:
-        """
-        從表格第一行提取標題
-        
-        Args:
-            first_line (str): 表格第一行內容
-            
-        Returns:
-            str: 表格標題
-        """
-        # 移除 Markdown 表格格式
-        cells = [cell.strip() for cell in first_line.split('|') if cell.strip()]
-        if cells:
-            # 使用第一個非空單元格作為標題
-            return cells[0]
-        return "未命名表格"
-    
     def _analyze_page_content(self, content: str) -> tuple[int, Dict[str, int], List[TableInfo]]:
         """
         分析頁面內容，統計區塊類型和數量，並提取表格信息
         
+        區塊統計與表格定位由頁面掃描器在同一次逐行掃描中完成。
+        
         Args:
             content (str): 頁面 Markdown 內容
             
         Returns:
             tuple[int, Dict[str, int], List[TableInfo]]: (區塊總數, 區塊類型分布, 表格列表)
         """
-        block_types = {}
-        block_count = 0
-        
-        # 按行分析內容
-        lines = content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            block_count += 1
-            
-            # 判斷區塊類型
-            if line.startswith('#'):
-                block_type = 'title'
-            elif line.startswith('|') and '|' in line[1:]:
-                block_type = 'table'
-            elif line.startswith('- ') or line.startswith('* '):
-                block_type = 'list'
-            elif line.startswith('```'):
-                block_type = 'code'
-            elif line.startswith('>'):
-                block_type = 'quote'
-            elif line.startswith('<!--') and line.endswith('-->'):
-                block_type = 'comment'
-            else:
-                block_type = 'paragraph'
-            
-            block_types[block_type] = block_types.get(block_type, 0) + 1
-        
-        # 提取表格信息
-        tables = self._extract_tables_from_content(content)
-        
-        return block_count, block_types, tables
+        scan = scan_page(content)
+        tables = [self._table_info_from_span(span) for span in scan.tables]
+        return scan.block_count, dict(scan.block_types), tables
     
     def marker_to_markdown(self, input_file: str) -> str:
         """
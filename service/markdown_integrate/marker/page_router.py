@@ -0,0 +1,206 @@
+"""
+PDF 逐頁路由
+
+以 pypdfium2 讀取每一頁的文字層與頁面物件，判斷該頁可以直接抽取文字，
+還是需要交給 Marker 的版面分析/OCR 模型：
+- 文字層乾淨、沒有大量框線與大面積圖片的原生數位頁面 → 直接抽取文字（'text'）
+- 沒有文字層、以圖片為主的掃描頁，或框線密集的表格/複雜版面 → Marker（'marker'）
+
+同一次讀取也會計算每頁的指紋（文字層、頁面物件位置與圖片資料的雜湊），
+用於增量轉換時判斷新舊版本中哪些頁面沒有變動。
+
+pypdfium2 是 marker-pdf 的依賴套件，安裝 Marker 時即可使用。
+"""
+
+import re
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+try:
+    import pypdfium2
+    import pypdfium2.raw as pdfium_c
+    PYPDFIUM_AVAILABLE = True
+except ImportError:
+    PYPDFIUM_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 頁面引擎名稱
+ENGINE_TEXT = 'text'
+ENGINE_MARKER = 'marker'
+
+# 連續三個以上的換行壓縮為一個空行
+_BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+
+
+@dataclass(frozen=True)
+class RoutingThresholds:
+    """逐頁路由的判斷門檻"""
+    min_text_chars: int = 50            # 文字層非空白字元少於此數視為沒有文字層
+    max_image_coverage: float = 0.5     # 圖片覆蓋頁面面積的比例上限，超過視為掃描頁
+    max_path_objects: int = 20          # 向量路徑（框線）物件數上限，超過視為表格或複雜版面
+    max_garbled_ratio: float = 0.05     # 無法辨識字元（U+FFFD、私用區）的比例上限
+
+
+@dataclass(frozen=True)
+class PageRoute:
+    """單一頁面的路由結果"""
+    page_index: int              # 頁面索引（0 起始）
+    engine: str                  # 'text' 或 'marker'
+    reason: str                  # 判斷原因，如 'text_layer'、'no_text_layer'、'scanned'、'layout'、'garbled_text'
+    text: Optional[str] = None   # 直接抽取的 Markdown 內容（僅 'text' 頁面）
+    fingerprint: Optional[str] = None  # 頁面指紋（內容相同的頁面指紋相同，與頁碼無關）
+
+
+def text_to_markdown(text: str) -> str:
+    """
+    將文字層抽取的純文字整理為 Markdown 段落
+    
+    統一換行符號、去除行尾空白，並壓縮多餘的空行。
+    
+    Args:
+        text: pdfium 抽取的文字
+    
+    Returns:
+        str: 整理後的內容
+    """
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    content = '\n'.join(line.rstrip() for line in lines)
+    return _BLANK_LINES_PATTERN.sub('\n\n', content).strip()
+
+
+def _garbled_ratio(text: str) -> float:
+    """計算無法辨識字元佔非空白字元的比例"""
+    visible = [char for char in text if not char.isspace()]
+    if not visible:
+        return 0.0
+    garbled = sum(1 for char in visible if char == '\ufffd' or '\ue000' <= char <= '\uf8ff')
+    return garbled / len(visible)
+
+
+def _object_bounds(page_object) -> Sequence[float]:
+    """讀取頁面物件的邊界 (left, bottom, right, top)（pypdfium2 5.x 將 get_pos 改名為 get_bounds）"""
+    get_bounds = getattr(page_object, 'get_bounds', None) or page_object.get_pos
+    return get_bounds()
+
+
+def _image_data(page_object) -> bytes:
+    """讀取圖片物件的原始資料，無法讀取時返回空位元組"""
+    try:
+        return bytes(page_object.get_data(decode_simple=False))
+    except Exception:
+        return b""
+
+
+def _inspect_page(page, thresholds: RoutingThresholds) -> tuple:
+    """
+    判斷單一頁面的引擎並計算頁面指紋
+    
+    Returns:
+        tuple: (引擎, 原因, 文字層內容, 頁面指紋)
+    """
+    textpage = page.get_textpage()
+    try:
+        text = textpage.get_text_range()
+    finally:
+        textpage.close()
+    
+    width, height = page.get_size()
+    digest = hashlib.sha256()
+    digest.update(f"{width:.1f}x{height:.1f}\n".encode('utf-8'))
+    digest.update(text.encode('utf-8'))
+    
+    page_area = max(width * height, 1.0)
+    image_area = 0.0
+    path_objects = 0
+    for page_object in page.get_objects():
+        left, bottom, right, top = _object_bounds(page_object)
+        digest.update(f"\n{page_object.type}:{left:.1f},{bottom:.1f},{right:.1f},{top:.1f}".encode('utf-8'))
+        if page_object.type == pdfium_c.FPDF_PAGEOBJ_IMAGE:
+            image_area += max(right - left, 0) * max(top - bottom, 0)
+            digest.update(hashlib.sha256(_image_data(page_object)).digest())
+        elif page_object.type == pdfium_c.FPDF_PAGEOBJ_PATH:
+            path_objects += 1
+    fingerprint = digest.hexdigest()
+    
+    if len(''.join(text.split())) < thresholds.min_text_chars:
+        return ENGINE_MARKER, 'no_text_layer', None, fingerprint
+    if image_area / page_area > thresholds.max_image_coverage:
+        return ENGINE_MARKER, 'scanned', None, fingerprint
+    if path_objects > thresholds.max_path_objects:
+        return ENGINE_MARKER, 'layout', None, fingerprint
+    if _garbled_ratio(text) > thresholds.max_garbled_ratio:
+        return ENGINE_MARKER, 'garbled_text', None, fingerprint
+    return ENGINE_TEXT, 'text_layer', text_to_markdown(text), fingerprint
+
+
+def route_pdf_pages(input_file: str, thresholds: Optional[RoutingThresholds] = None) -> List[PageRoute]:
+    """
+    逐頁判斷 PDF 每一頁應使用的引擎，並一併抽取文字頁的內容和計算頁面指紋
+    
+    只讀取文字層和頁面物件，不做版面分析，成本遠低於 Marker 模型推論。
+    
+    Args:
+        input_file: PDF 檔案路徑
+        thresholds: 路由門檻，None 表示使用預設值
+    
+    Returns:
+        List[PageRoute]: 依頁面順序排列的路由結果
+    
+    Raises:
+        ImportError: 如果沒有安裝 pypdfium2
+    """
+    if not PYPDFIUM_AVAILABLE:
+        raise ImportError("pypdfium2 is required for per-page PDF routing")
+    
+    thresholds = thresholds or RoutingThresholds()
+    routes: List[PageRoute] = []
+    pdf = pypdfium2.PdfDocument(input_file)
+    try:
+        for page_index in range(len(pdf)):
+            page = pdf[page_index]
+            try:
+                engine, reason, text, fingerprint = _inspect_page(page, thresholds)
+            except Exception as e:
+                # 單頁讀取失敗時交給 Marker 處理（沒有指紋的頁面不會被增量轉換重用）
+                logger.warning(f"Failed to inspect page {page_index + 1}, routing to Marker: {e}")
+                engine, reason, text, fingerprint = ENGINE_MARKER, 'inspect_failed', None, None
+            finally:
+                page.close()
+            routes.append(PageRoute(
+                page_index=page_index, engine=engine, reason=reason, text=text, fingerprint=fingerprint
+            ))
+    finally:
+        pdf.close()
+    
+    marker_count = sum(1 for route in routes if route.engine == ENGINE_MARKER)
+    logger.info(f"Routed {len(routes)} pages: {len(routes) - marker_count} text, {marker_count} marker")
+    return routes
+
+
+def format_page_range(page_indices: Sequence[int]) -> str:
+    """
+    將頁面索引列表壓縮為 Marker 的 page_range 字串
+    
+    Args:
+        page_indices: 頁面索引（0 起始）
+    
+    Returns:
+        str: 如 "0-2,5,7-9"
+    """
+    parts = []
+    indices = sorted(set(page_indices))
+    start = previous = None
+    for index in indices:
+        if start is None:
+            start = previous = index
+        elif index == previous + 1:
+            previous = index
+        else:
+            parts.append(f"{start}-{previous}" if previous != start else str(start))
+            start = previous = index
+    if start is not None:
+        parts.append(f"{start}-{previous}" if previous != start else str(start))
+    return ','.join(parts)
@@ -0,0 +1,147 @@
+"""
+頁面結構掃描器
+
+一次逐行掃描頁面 Markdown 內容，同時統計區塊數量、區塊類型並定位表格，
+表格以行號和字元偏移記錄位置。相同內容的掃描結果會被快取，
+MarkerConverter、TableHandler 等元件可共用同一份頁面結構。
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# 快取的頁面數量上限
+SCAN_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class TableSpan:
+    """頁面中的表格位置與資訊"""
+    start_line: int            # 起始行號（0 起始）
+    end_line: int              # 結束行號（包含）
+    start_offset: int          # 起始行在頁面內容中的字元偏移
+    end_offset: int            # 結束行結尾在頁面內容中的字元偏移
+    row_count: int             # 行數（包含分隔行）
+    column_count: int          # 列數
+    title: str                 # 表格標題（第一個非空單元格）
+    content: str               # 表格 Markdown 內容（各行去除前後空白）
+
+
+@dataclass(frozen=True)
+class PageScan:
+    """頁面掃描結果（由快取共用，請勿修改 block_types）"""
+    block_count: int                  # 非空行（區塊）數量
+    block_types: Dict[str, int]       # 區塊類型分布
+    tables: Tuple[TableSpan, ...]     # 表格列表
+    table_line_count: int             # 含兩個以上 | 的行數
+
+
+def _classify_line(line: str) -> str:
+    """判斷已去除前後空白的單行區塊類型"""
+    first = line[0]
+    if first == '#':
+        return 'title'
+    if first == '|' and '|' in line[1:]:
+        return 'table'
+    if line.startswith('- ') or line.startswith('* '):
+        return 'list'
+    if line.startswith('```'):
+        return 'code'
+    if first == '>':
+        return 'quote'
+    if line.startswith('<!--') and line.endswith('-->'):
+        return 'comment'
+    return 'paragraph'
+
+
+def _build_table(table_lines: List[Tuple[int, int, int, str]]) -> Optional[TableSpan]:
+    """
+    由連續的表格行建立 TableSpan
+    
+    Args:
+        table_lines: 表格行列表，每個元素為 (行號, 起始偏移, 結束偏移, 去除空白後的內容)
+    
+    Returns:
+        Optional[TableSpan]: 表格資訊，少於兩行或沒有資料行時返回 None
+    """
+    if len(table_lines) < 2:  # 至少需要標題行和分隔行
+        return None
+    
+    first_data_line = None
+    for _, _, _, line in table_lines:
+        if not line.startswith('|---'):
+            first_data_line = line
+            break
+    if first_data_line is None:
+        return None
+    
+    first_line = table_lines[0][3]
+    cells = [cell.strip() for cell in first_line.split('|') if cell.strip()]
+    
+    return TableSpan(
+        start_line=table_lines[0][0],
+        end_line=table_lines[-1][0],
+        start_offset=table_lines[0][1],
+        end_offset=table_lines[-1][2],
+        row_count=len(table_lines),
+        column_count=first_data_line.count('|') - 1,
+        title=cells[0] if cells else "未命名表格",
+        content='\n'.join(line for _, _, _, line in table_lines)
+    )
+
+
+@lru_cache(maxsize=SCAN_CACHE_SIZE)
+def scan_page(content: str) -> PageScan:
+    """
+    一次掃描頁面內容，取得區塊統計與表格位置
+    
+    規則：
+    - 每個非空行算一個區塊，依行首判斷類型（title/table/list/code/quote/comment/paragraph）
+    - 含兩個以上 | 的連續行視為同一個表格，空行不會中斷表格
+    - 表格至少需要兩行，且至少有一行不是分隔行
+    
+    Args:
+        content: 頁面 Markdown 內容
+    
+    Returns:
+        PageScan: 掃描結果（相同內容會返回同一個快取物件）
+    """
+    block_types: Dict[str, int] = {}
+    block_count = 0
+    tables: List[TableSpan] = []
+    table_line_count = 0
+    table_lines: List[Tuple[int, int, int, str]] = []
+    
+    offset = 0
+    for line_number, raw_line in enumerate(content.split('\n')):
+        line_start = offset
+        offset += len(raw_line) + 1
+        
+        line = raw_line.strip()
+        if not line:
+            continue
+        
+        block_count += 1
+        block_type = _classify_line(line)
+        block_types[block_type] = block_types.get(block_type, 0) + 1
+        
+        if line.count('|') >= 2:
+            table_line_count += 1
+            table_lines.append((line_number, line_start, line_start + len(raw_line), line))
+        elif table_lines:
+            table = _build_table(table_lines)
+            if table:
+                tables.append(table)
+            table_lines = []
+    
+    if table_lines:
+        table = _build_table(table_lines)
+        if table:
+            tables.append(table)
+    
+    return PageScan(
+        block_count=block_count,
+        block_types=block_types,
+        tables=tuple(tables),
+        table_line_count=table_line_count
+    )
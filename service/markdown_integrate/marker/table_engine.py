@@ -0,0 +1,302 @@
+"""
+HTML 表格轉換引擎
+
+以標準庫的串流 HTMLParser 一次掃描解析表格，將 rowspan/colspan 展開為
+完整的儲存格網格，再輸出為 GFM 表格，避免原始 HTML 殘留在 chunk 中。
+"""
+
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+# 跨欄/跨列的上限，避免異常的屬性值產生過大的網格
+MAX_SPAN = 1000
+
+# 表格開始/結束標籤，用於在頁面內容中定位最外層表格
+TABLE_TAG_PATTERN = re.compile(r'<(/?)table\b[^>]*>', re.IGNORECASE)
+
+
+@dataclass
+class TableGrid:
+    """展開跨欄/跨列後的表格網格"""
+    rows: List[List[str]] = field(default_factory=list)  # 每列的儲存格文字，所有列等寬
+    header_rows: int = 0                                 # 表頭列數（thead 或全部為 th 的前導列）
+    
+    @property
+    def row_count(self) -> int:
+        """列數"""
+        return len(self.rows)
+    
+    @property
+    def column_count(self) -> int:
+        """欄數"""
+        return len(self.rows[0]) if self.rows else 0
+    
+    def to_gfm(self) -> str:
+        """
+        輸出為 GFM 表格
+        
+        Returns:
+            str: GFM 表格，第一列作為表頭；沒有任何列時返回空字串
+        """
+        if not self.rows:
+            return ""
+        
+        header = self.rows[0]
+        lines = [
+            "| " + " | ".join(header) + " |",
+            "| " + " | ".join(["---"] * len(header)) + " |"
+        ]
+        for row in self.rows[1:]:
+            lines.append("| " + " | ".join(row) + " |")
+        return "\n".join(lines)
+
+
+def _parse_span(value: Optional[str]) -> int:
+    """解析 rowspan/colspan 屬性值，無效值視為 1"""
+    try:
+        span = int(value)
+    except (TypeError, ValueError):
+        return 1
+    return min(max(span, 1), MAX_SPAN)
+
+
+def _cell_text(chunks: List[str]) -> str:
+    """合併儲存格內的文字片段，壓縮空白並轉義管道符號"""
+    return " ".join(" ".join(chunks).split()).replace("|", "\\|")
+
+
+def expand_spans(rows: List[List[Tuple[str, int, int]]]) -> List[List[str]]:
+    """
+    將含有跨欄/跨列的儲存格展開為完整網格
+    
+    被跨越的位置會重複填入原儲存格的文字，缺少的位置補空字串。
+    
+    Args:
+        rows: 每列的儲存格列表，每個儲存格為 (文字, rowspan, colspan)
+    
+    Returns:
+        List[List[str]]: 等寬的儲存格網格
+    """
+    grid: List[List[str]] = []
+    carry = {}  # 欄位 -> [剩餘列數, 文字]，記錄由上方儲存格延伸下來的位置
+    
+    for cells in rows:
+        row = {}
+        
+        # 先填入上方延伸下來的儲存格
+        for col in list(carry):
+            remaining_text = carry[col]
+            row[col] = remaining_text[1]
+            remaining_text[0] -= 1
+            if remaining_text[0] == 0:
+                del carry[col]
+        
+        col = 0
+        for text, rowspan, colspan in cells:
+            while col in row:
+                col += 1
+            for c in range(col, col + colspan):
+                row[c] = text
+                if rowspan > 1:
+                    carry[c] = [rowspan - 1, text]
+            col += colspan
+        
+        if row:
+            width = max(row) + 1
+            grid.append([row.get(c, "") for c in range(width)])
+    
+    # 補齊寬度
+    width = max((len(row) for row in grid), default=0)
+    for row in grid:
+        row.extend([""] * (width - len(row)))
+    return grid
+
+
+class _TableParser(HTMLParser):
+    """串流解析 HTML 中所有最外層表格的儲存格"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables: List[TableGrid] = []
+        self._depth = 0
+        self._rows: List[List[Tuple[str, int, int]]] = []
+        self._row: Optional[List[Tuple[str, int, int]]] = None
+        self._row_is_header = True
+        self._header_rows = 0
+        self._counting_header = True
+        self._in_thead = False
+        self._cell: Optional[List[str]] = None
+        self._cell_spans = (1, 1)
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self._depth += 1
+            if self._depth == 1:
+                self._rows = []
+                self._header_rows = 0
+                self._counting_header = True
+            return
+        
+        # 巢狀表格的內容併入外層儲存格的文字
+        if self._depth != 1:
+            if tag == 'br' and self._cell is not None:
+                self._cell.append(" ")
+            return
+        
+        if tag == 'thead':
+            self._in_thead = True
+        elif tag == 'tr':
+            self._finish_row()
+            self._row = []
+            self._row_is_header = True
+        elif tag in ('td', 'th'):
+            self._finish_cell()
+            if self._row is None:
+                self._row = []
+                self._row_is_header = True
+            attributes = dict(attrs)
+            self._cell = []
+            self._cell_spans = (_parse_span(attributes.get('rowspan')), _parse_span(attributes.get('colspan')))
+            if tag == 'td' and not self._in_thead:
+                self._row_is_header = False
+        elif tag == 'br' and self._cell is not None:
+            self._cell.append(" ")
+    
+    def handle_startendtag(self, tag, attrs):
+        if tag == 'br' and self._cell is not None:
+            self._cell.append(" ")
+    
+    def handle_endtag(self, tag):
+        if tag == 'table':
+            if self._depth == 1:
+                self._finish_row()
+                self.tables.append(TableGrid(rows=expand_spans(self._rows), header_rows=self._header_rows))
+                self._in_thead = False
+            self._depth = max(self._depth - 1, 0)
+            return
+        
+        if self._depth != 1:
+            return
+        
+        if tag == 'thead':
+            self._in_thead = False
+        elif tag in ('td', 'th'):
+            self._finish_cell()
+        elif tag == 'tr':
+            self._finish_row()
+    
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+    
+    def _finish_cell(self):
+        """結束目前的儲存格"""
+        if self._cell is None:
+            return
+        rowspan, colspan = self._cell_spans
+        self._row.append((_cell_text(self._cell), rowspan, colspan))
+        self._cell = None
+    
+    def _finish_row(self):
+        """結束目前的列，並統計前導的表頭列"""
+        self._finish_cell()
+        if self._row is None:
+            return
+        if self._row:
+            self._rows.append(self._row)
+            if self._counting_header and self._row_is_header:
+                self._header_rows += 1
+            else:
+                self._counting_header = False
+        self._row = None
+
+
+def parse_html_tables(html: str) -> List[TableGrid]:
+    """
+    一次掃描解析 HTML 中所有最外層表格
+    
+    Args:
+        html: 包含一個或多個 <table> 的 HTML
+    
+    Returns:
+        List[TableGrid]: 依出現順序排列的表格網格
+    """
+    parser = _TableParser()
+    parser.feed(html or "")
+    parser.close()
+    return parser.tables
+
+
+def html_table_to_gfm(html: str) -> str:
+    """
+    將 HTML 中的第一個表格轉換為 GFM 表格
+    
+    Args:
+        html: HTML 表格字符串
+    
+    Returns:
+        str: GFM 表格；沒有表格或表格沒有任何列時返回空字串
+    """
+    tables = parse_html_tables(html)
+    return tables[0].to_gfm() if tables else ""
+
+
+def find_table_spans(content: str) -> List[Tuple[int, int]]:
+    """
+    找出內容中所有最外層 <table> 的位置
+    
+    Args:
+        content: 頁面內容
+    
+    Returns:
+        List[Tuple[int, int]]: 每個表格的 (起始位置, 結束位置)
+    """
+    spans = []
+    depth = 0
+    start = 0
+    for match in TABLE_TAG_PATTERN.finditer(content):
+        if not match.group(1):
+            if depth == 0:
+                start = match.start()
+            depth += 1
+        elif depth > 0:
+            depth -= 1
+            if depth == 0:
+                spans.append((start, match.end()))
+    return spans
+
+
+def convert_html_tables(content: str) -> str:
+    """
+    將頁面內容中所有 HTML 表格批次轉換為 GFM 表格
+    
+    所有表格在同一次解析中處理；沒有 <table> 時直接返回原內容。
+    
+    Args:
+        content: 可能混有 HTML 表格的 Markdown 內容
+    
+    Returns:
+        str: HTML 表格已替換為 GFM 表格的內容
+    """
+    if '<' not in content:
+        return content
+    
+    spans = find_table_spans(content)
+    if not spans:
+        return content
+    
+    grids = parse_html_tables("".join(content[start:end] for start, end in spans))
+    if len(grids) != len(spans):
+        # 表格位於註解等特殊區塊中導致數量不一致時，改為逐一解析
+        grids = [(parse_html_tables(content[start:end]) or [TableGrid()])[0] for start, end in spans]
+    
+    parts = []
+    position = 0
+    for (start, end), grid in zip(spans, grids):
+        parts.append(content[position:start])
+        parts.append("\n" + grid.to_gfm() + "\n" if grid.rows else "")
+        position = end
+    parts.append(content[position:])
+    return "".join(parts)
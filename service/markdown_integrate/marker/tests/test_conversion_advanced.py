@@ -213,7 +213,7 @@ def test_table_conversion():
                 <tr><td>100</td><td>200</td></tr>
             </table>
             """,
-            "expected": ["complex table; keep HTML", "<table>"]
+            "expected": ["| 項目 | Q1 | Q2 |", "| 項目 | 100 | 200 |"]
         }
     ]
     
@@ -92,7 +92,7 @@ class TestMarkerConverter:
             assert "| Jane | 30 |" in result
     
     def test_table_html_to_md_complex(self):
-        """測試複雜表格轉換（保留 HTML）"""
+        """測試複雜表格轉換（展開 rowspan）"""
         with patch('marker_converter.ConfigParser'), \
              patch('marker_converter.create_model_dict'), \
              patch('marker_converter.PdfConverter'):
@@ -108,8 +108,9 @@ class TestMarkerConverter:
             """
             
             result = converter._table_html_to_md(html)
-            assert "complex table; keep HTML" in result
-            assert "<table>" in result
+            assert "| Item | Q1 | Q2 |" in result
+            assert "| Item | 100 | 200 |" in result
+            assert "<table>" not in result
     
     def test_table_html_to_md_empty(self):
         """測試空表格處理"""
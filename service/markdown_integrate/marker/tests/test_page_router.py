@@ -0,0 +1,56 @@
+"""
+PDF 逐頁路由測試
+
+測試頁面範圍壓縮、文字層整理與實際 PDF 的逐頁路由
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加父目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from page_router import (
+    PYPDFIUM_AVAILABLE, RoutingThresholds, format_page_range, route_pdf_pages, text_to_markdown, _garbled_ratio
+)
+
+
+def test_format_page_range():
+    """測試頁面索引壓縮為 Marker 的 page_range 字串"""
+    assert format_page_range([0, 1, 2, 5, 7, 8, 9]) == "0-2,5,7-9"
+    assert format_page_range([4, 1, 1]) == "1,4"
+    assert format_page_range([]) == ""
+
+
+def test_text_to_markdown():
+    """測試文字層內容的換行與空行整理"""
+    text = "第一行  \r\n第二行\r\n\r\n\r\n\r\n第三段\r"
+    assert text_to_markdown(text) == "第一行\n第二行\n\n第三段"
+
+
+def test_garbled_ratio():
+    """測試無法辨識字元的比例"""
+    assert _garbled_ratio("") == 0.0
+    assert _garbled_ratio("正常文字") == 0.0
+    assert _garbled_ratio("ab�") == 0.5
+
+
+@pytest.mark.skipif(not PYPDFIUM_AVAILABLE, reason="pypdfium2 not available")
+def test_route_pdf_pages():
+    """測試實際 PDF 每一頁都有路由結果與指紋，文字頁附帶抽取的內容"""
+    pdf_files = sorted((Path(__file__).parents[4] / "raw_docs").glob("*.pdf"))
+    if not pdf_files:
+        pytest.skip("No PDF files in raw_docs")
+    
+    routes = route_pdf_pages(str(pdf_files[0]), RoutingThresholds())
+    
+    assert routes
+    assert [route.page_index for route in routes] == list(range(len(routes)))
+    for route in routes:
+        assert route.engine in ("text", "marker")
+        # 每一頁都能讀取頁面物件並計算指紋（pypdfium2 版本的 API 差異不應讓所有頁面退回 Marker）
+        assert route.reason != "inspect_failed"
+        assert route.fingerprint
+        assert (route.text is not None) == (route.engine == "text")
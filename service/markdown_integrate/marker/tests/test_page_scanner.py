@@ -0,0 +1,77 @@
+"""
+頁面結構掃描器測試
+
+測試區塊統計與表格定位在同一次掃描中的結果
+"""
+
+import sys
+from pathlib import Path
+
+# 添加父目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from page_scanner import scan_page
+
+
+PAGE = """# 保險費率
+
+說明文字
+- 項目一
+
+| 年齡 | 男 | 女 |
+|---|---|---|
+
+| 20 | 100 | 90 |
+> 備註
+<!-- comment -->
+| 單獨一行 | 不是表格 |
+"""
+
+
+def test_block_statistics():
+    """測試區塊數量與類型分布"""
+    scan = scan_page(PAGE)
+    
+    assert scan.block_count == 9
+    assert scan.block_types == {
+        'title': 1,
+        'paragraph': 1,
+        'list': 1,
+        'table': 4,
+        'quote': 1,
+        'comment': 1
+    }
+
+
+def test_table_spans():
+    """測試表格位置與資訊，空行不中斷表格，單行不算表格"""
+    scan = scan_page(PAGE)
+    
+    assert len(scan.tables) == 1
+    table = scan.tables[0]
+    assert (table.start_line, table.end_line) == (5, 8)
+    assert table.row_count == 3
+    assert table.column_count == 3
+    assert table.title == "年齡"
+    assert table.content == "| 年齡 | 男 | 女 |\n|---|---|---|\n| 20 | 100 | 90 |"
+    assert PAGE[table.start_offset:table.end_offset].startswith("| 年齡 |")
+    assert PAGE[table.start_offset:table.end_offset].endswith("| 20 | 100 | 90 |")
+    assert scan.table_line_count == 4
+
+
+def test_separator_only_table_is_ignored():
+    """測試只有分隔行的表格不被計入"""
+    assert scan_page("|---|---|\n|---|---|").tables == ()
+
+
+def test_scan_is_cached():
+    """測試相同內容返回同一個掃描結果"""
+    assert scan_page(PAGE) is scan_page(PAGE)
+
+
+def test_empty_page():
+    """測試空頁面"""
+    scan = scan_page("")
+    assert scan.block_count == 0
+    assert scan.block_types == {}
+    assert scan.tables == ()
@@ -0,0 +1,98 @@
+"""
+HTML 表格轉換引擎測試
+
+測試 rowspan/colspan 展開、GFM 輸出以及頁面內容的批次轉換
+"""
+
+import sys
+from pathlib import Path
+
+# 添加父目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from table_engine import parse_html_tables, html_table_to_gfm, convert_html_tables, expand_spans
+
+
+def test_simple_table():
+    """測試簡單表格轉換"""
+    html = """
+    <table>
+        <tr><th>姓名</th><th>年齡</th></tr>
+        <tr><td>張三</td><td>25</td></tr>
+    </table>
+    """
+    assert html_table_to_gfm(html) == "| 姓名 | 年齡 |\n| --- | --- |\n| 張三 | 25 |"
+
+
+def test_rowspan_and_colspan_expansion():
+    """測試跨欄/跨列展開為完整網格"""
+    html = """
+    <table>
+        <tr><th rowspan="2">年齡</th><th colspan="2">保費</th></tr>
+        <tr><th>男</th><th>女</th></tr>
+        <tr><td>20</td><td>1,000</td><td>900</td></tr>
+        <tr><td rowspan="2">30</td><td colspan="2">1,200</td></tr>
+        <tr><td>1,300</td><td>1,100</td></tr>
+    </table>
+    """
+    grid = parse_html_tables(html)[0]
+    
+    assert grid.rows == [
+        ["年齡", "保費", "保費"],
+        ["年齡", "男", "女"],
+        ["20", "1,000", "900"],
+        ["30", "1,200", "1,200"],
+        ["30", "1,300", "1,100"],
+    ]
+    assert grid.header_rows == 2
+    assert grid.row_count == 5
+    assert grid.column_count == 3
+
+
+def test_ragged_rows_are_padded():
+    """測試缺少儲存格的列補齊寬度"""
+    assert expand_spans([[("a", 1, 1), ("b", 1, 1)], [("c", 1, 1)]]) == [["a", "b"], ["c", ""]]
+
+
+def test_cell_text_normalization():
+    """測試儲存格文字的空白壓縮、換行與管道符號轉義"""
+    html = "<table><tr><td>第一行<br>第二行\n  續行</td><td>A|B &amp; C</td></tr></table>"
+    assert parse_html_tables(html)[0].rows == [["第一行 第二行 續行", "A\\|B & C"]]
+
+
+def test_nested_table_is_flattened():
+    """測試巢狀表格併入外層儲存格"""
+    html = "<table><tr><td>外層</td><td><table><tr><td>內層</td></tr></table></td></tr></table>"
+    tables = parse_html_tables(html)
+    
+    assert len(tables) == 1
+    assert tables[0].rows == [["外層", "內層"]]
+
+
+def test_no_table():
+    """測試沒有表格時返回空字串"""
+    assert html_table_to_gfm("") == ""
+    assert html_table_to_gfm("<div>No table here</div>") == ""
+
+
+def test_convert_html_tables_in_page():
+    """測試頁面內容中的多個表格批次轉換，其他內容保持不變"""
+    content = (
+        "# 費率表\n\n"
+        "<table><tr><th>A</th></tr><tr><td>1</td></tr></table>\n\n"
+        "說明文字\n\n"
+        "<TABLE><tr><td colspan=\"2\">合併</td></tr></TABLE>"
+    )
+    result = convert_html_tables(content)
+    
+    assert "<table" not in result.lower()
+    assert result.startswith("# 費率表\n\n")
+    assert "| A |\n| --- |\n| 1 |" in result
+    assert "說明文字" in result
+    assert "| 合併 | 合併 |" in result
+
+
+def test_convert_html_tables_without_tables():
+    """測試沒有表格的內容原樣返回"""
+    content = "# 標題\n\n| a | b |\n|---|---|\n| 1 | 2 |"
+    assert convert_html_tables(content) is content
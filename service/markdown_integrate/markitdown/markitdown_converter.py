@@ -306,6 +306,89 @@ class MarkitdownConverter:
         # 如果沒有找到合適的標題，使用預設標題
         return f"Page {page_number}"
     
+    def _split_content_to_pages(self, file_path: Path, content: str) -> List[str]:
+        """
+        根據檔案類型將已轉換的 markdown 內容分割為頁面。
+        
+        Args:
+            file_path: 原始檔案路徑（用於判斷檔案類型）
+            content: 已轉換的 markdown 內容
+            
+        Returns:
+            頁面內容列表
+        """
+        suffix = file_path.suffix.lower()
+        
+        if suffix in ['.pdf']:
+            # PDF 檔案：暫時返回整個內容作為一頁
+            # 實際的頁面分割可能需要更複雜的邏輯
+            return [content]
+        elif suffix in ['.pptx', '.ppt']:
+            # PowerPoint 檔案：按幻燈片分割
+            slides = content.split('<!-- Slide number:')
+            if len(slides) > 1:
+                return [slides[0]] + [f'<!-- Slide number:{slide}' for slide in slides[1:]]
+            return [content]
+        else:
+            # Excel 及其他檔案類型：使用 ## 標題分割
+            return self._split_by_headers(content)
+    
+    def _split_excel_sheets(self, content: str) -> List[Dict[str, str]]:
+        """
+        使用 ## {標題} 將已轉換的 Excel markdown 內容分割為工作表。
+        
+        Args:
+            content: 已轉換的 markdown 內容
+            
+        Returns:
+            工作表列表，每個元素包含 'title' 和 'content' 鍵
+        """
+        sheets = []
+        
+        # 按 ## 標題分割內容
+        sections = content.split('\n## ')
+        
+        if len(sections) > 1:
+            # 第一個部分可能沒有 ## 前綴，需要特殊處理
+            first_section = sections[0]
+            if first_section.strip():
+                # 如果第一個部分有內容，檢查是否以 ## 開頭
+                if first_section.startswith('## '):
+                    # 移除 ## 前綴
+                    title = first_section[3:].split('\n')[0].strip()
+                    content_text = first_section[3 + len(title):].strip()
+                else:
+                    # 沒有 ## 前綴，可能是整個內容
+                    title = 'Sheet1'
+                    content_text = first_section.strip()
+                
+                if content_text:
+                    sheets.append({
+                        'title': title,
+                        'content': content_text
+                    })
+            
+            # 處理其餘部分
+            for section in sections[1:]:
+                if section.strip():
+                    lines = section.split('\n')
+                    title = lines[0].strip()
+                    content_text = '\n'.join(lines[1:]).strip()
+                    
+                    if content_text:
+                        sheets.append({
+                            'title': title,
+                            'content': content_text
+                        })
+        else:
+            # 沒有找到 ## 標題，將整個內容作為一個工作表
+            sheets = [{
+                'title': 'Sheet1',
+                'content': content
+            }]
+        
+        return sheets
+    
     def convert_file_to_pages(self, file_path: str, output_filename: Optional[str] = None) -> List[str]:
         """
         將檔案轉換為頁面列表（每頁一個字串）。
@@ -336,31 +419,7 @@ class MarkitdownConverter:
                 logger.info(f"Page splitting disabled, returning empty pages list for: {file_path.name}")
                 return []
             
-            # 根據檔案類型分割頁面
-            pages = []
-            if file_path.suffix.lower() in ['.pdf']:
-                # PDF 檔案：按頁面分割（使用頁面分隔符）
-                content = result.text_content
-                # 嘗試按頁面分割（這裡使用簡單的分割方法）
-                # 實際的頁面分割可能需要更複雜的邏輯
-                pages = [content]  # 暫時返回整個內容作為一頁
-            elif file_path.suffix.lower() in ['.pptx', '.ppt']:
-                # PowerPoint 檔案：按幻燈片分割
-                content = result.text_content
-                # 按幻燈片標題分割
-                slides = content.split('<!-- Slide number:')
-                if len(slides) > 1:
-                    pages = [slides[0]] + [f'<!-- Slide number:{slide}' for slide in slides[1:]]
-                else:
-                    pages = [content]
-            elif file_path.suffix.lower() in ['.xlsx', '.xls']:
-                # Excel 檔案：使用 ## 標題分割
-                content = result.text_content
-                pages = self._split_by_headers(content)
-            else:
-                # 其他檔案類型：使用 ## 標題分割
-                content = result.text_content
-                pages = self._split_by_headers(content)
+            pages = self._split_content_to_pages(file_path, result.text_content)
             
             logger.info(f"Successfully converted to {len(pages)} pages: {file_path.name}")
             return pages
@@ -394,51 +453,7 @@ class MarkitdownConverter:
             # 將 Excel 檔案轉換為 markdown
             result: DocumentConverterResult = self.converter.convert(str(file_path))
             
-            # 使用 ## {標題} 來分割工作表
-            content = result.text_content
-            sheets = []
-            
-            # 按 ## 標題分割內容
-            sections = content.split('\n## ')
-            
-            if len(sections) > 1:
-                # 第一個部分可能沒有 ## 前綴，需要特殊處理
-                first_section = sections[0]
-                if first_section.strip():
-                    # 如果第一個部分有內容，檢查是否以 ## 開頭
-                    if first_section.startswith('## '):
-                        # 移除 ## 前綴
-                        title = first_section[3:].split('\n')[0].strip()
-                        content_text = first_section[3 + len(title):].strip()
-                    else:
-                        # 沒有 ## 前綴，可能是整個內容
-                        title = 'Sheet1'
-                        content_text = first_section.strip()
-                    
-                    if content_text:
-                        sheets.append({
-                            'title': title,
-                            'content': content_text
-                        })
-                
-                # 處理其餘部分
-                for section in sections[1:]:
-                    if section.strip():
-                        lines = section.split('\n')
-                        title = lines[0].strip()
-                        content_text = '\n'.join(lines[1:]).strip()
-                        
-                        if content_text:
-                            sheets.append({
-                                'title': title,
-                                'content': content_text
-                            })
-            else:
-                # 沒有找到 ## 標題，將整個內容作為一個工作表
-                sheets = [{
-                    'title': 'Sheet1',
-                    'content': content
-                }]
+            sheets = self._split_excel_sheets(result.text_content)
             
             logger.info(f"Successfully converted to {len(sheets)} sheets: {file_path.name}")
             return sheets
@@ -481,8 +496,11 @@ class MarkitdownConverter:
                 'metadata': {}
             }
             
-            # 獲取頁面內容
-            pages = self.convert_file_to_pages(str(file_path))
+            # 獲取頁面內容（重用同一次轉換的結果，不再重新解析檔案）
+            if self.enable_page_splitting:
+                pages = self._split_content_to_pages(file_path, result.text_content)
+            else:
+                pages = []
             conversion_result['pages'] = pages
             
             # 如果啟用頁面分割且有頁面，添加頁面標題
@@ -496,7 +514,7 @@ class MarkitdownConverter:
             
             # 如果是 Excel 檔案，添加工作表資訊
             if file_path.suffix.lower() in ['.xlsx', '.xls']:
-                sheets = self.convert_excel_to_sheets(str(file_path))
+                sheets = self._split_excel_sheets(result.text_content)
                 conversion_result['sheets'] = sheets
             
             # 添加基本元資料
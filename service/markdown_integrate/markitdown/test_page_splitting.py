@@ -7,6 +7,7 @@
 
 import sys
 from pathlib import Path
+from types import SimpleNamespace
 import logging
 
 # 添加專案根目錄到 Python 路徑
@@ -159,6 +160,40 @@ def test_title_extraction():
         print(f"  結果: {'✅' if title == expected else '❌'}")
         print()
 
+def test_single_pass_conversion(tmp_path):
+    """測試 convert_file_with_metadata 對同一檔案只解析一次"""
+    print("=== 測試單次轉換 ===\n")
+    
+    class CountingConverter:
+        """記錄 convert 呼叫次數的假轉換器"""
+        def __init__(self):
+            self.calls = 0
+        
+        def convert(self, path):
+            self.calls += 1
+            return SimpleNamespace(
+                title=None,
+                text_content="## 工作表一\n| A | B |\n| --- | --- |\n| 1 | 2 |\n## 工作表二\n| C |\n| --- |\n| 3 |"
+            )
+    
+    excel_file = tmp_path / "rules.xlsx"
+    excel_file.write_bytes(b"")
+    
+    converter = MarkitdownConverter(output_dir=str(tmp_path / "out"), enable_page_splitting=True)
+    counting = CountingConverter()
+    converter.converter = counting
+    
+    result = converter.convert_file_with_metadata(str(excel_file))
+    
+    assert counting.calls == 1
+    assert len(result['pages']) == 2
+    assert result['page_titles'] == ['工作表一', '工作表二']
+    assert [sheet['title'] for sheet in result['sheets']] == ['工作表一', '工作表二']
+    
+    # 與各自獨立呼叫的公開方法結果一致
+    assert result['pages'] == converter.convert_file_to_pages(str(excel_file))
+    assert result['sheets'] == converter.convert_excel_to_sheets(str(excel_file))
+
 def main():
     """主測試函數"""
     print("=== MarkitdownConverter 頁面分割功能測試 ===\n")
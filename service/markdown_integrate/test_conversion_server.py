@@ -0,0 +1,128 @@
+"""
+常駐轉換服務測試
+
+測試 ConversionServer 與 ConversionClient 的基本功能。
+"""
+
+import os
+import queue
+import tempfile
+import unittest
+from pathlib import Path
+from service.markdown_integrate import UnifiedMarkdownConverter
+from service.markdown_integrate.conversion_server import ConversionServer, ConversionClient, ConversionServerError
+
+
+class TestConversionServer(unittest.TestCase):
+    """常駐轉換服務測試類"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """啟動共用的轉換服務"""
+        if not UnifiedMarkdownConverter().get_converter_status()['markitdown']:
+            raise unittest.SkipTest("Markitdown converter not available")
+        
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.socket_path = os.path.join(cls.temp_dir.name, "converter.sock")
+        cls.server = ConversionServer(
+            socket_path=cls.socket_path,
+            max_queue_size=4,
+            job_timeout=60,
+            warmup_converters=['markitdown']
+        )
+        cls.server.start()
+        cls.client = ConversionClient(cls.socket_path)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """停止轉換服務"""
+        cls.server.stop()
+        cls.temp_dir.cleanup()
+    
+    def test_convert_file(self):
+        """測試透過服務轉換檔案"""
+        file_path = Path(self.temp_dir.name) / "doc.txt"
+        file_path.write_text("# 標題\n\n服務轉換內容", encoding='utf-8')
+        
+        result = self.client.convert_file(str(file_path))
+        
+        self.assertEqual(result.metadata.file_name, "doc.txt")
+        self.assertEqual(result.metadata.converter_used, "markitdown")
+        self.assertIn("服務轉換內容", result.content)
+    
+    def test_health_and_stats(self):
+        """測試健康檢查與統計端點"""
+        self.assertTrue(self.client.is_available())
+        health = self.client.health()
+        self.assertEqual(health['status'], 'ok')
+        
+        stats = self.client.stats()
+        for key in ['submitted', 'completed', 'failed', 'timed_out', 'rejected', 'queue_size', 'uptime_seconds']:
+            self.assertIn(key, stats)
+    
+    def test_missing_file(self):
+        """測試轉換不存在的檔案"""
+        with self.assertRaises(ConversionServerError):
+            self.client.convert_file(os.path.join(self.temp_dir.name, "nonexistent.txt"))
+    
+    def test_job_timeout_restarts_worker(self):
+        """測試工作超時後重建工作進程，後續請求仍可處理"""
+        # 讀取沒有寫入端的 FIFO 會永遠阻塞，確保轉換超時
+        fifo_path = os.path.join(self.temp_dir.name, "blocked.txt")
+        os.mkfifo(fifo_path)
+        restarts = self.client.stats()['worker_restarts']
+        
+        with self.assertRaises(ConversionServerError):
+            self.client.convert_file(fifo_path, timeout=1)
+        
+        stats = self.client.stats()
+        self.assertEqual(stats['worker_restarts'], restarts + 1)
+        self.assertGreaterEqual(stats['timed_out'], 1)
+        
+        file_path = Path(self.temp_dir.name) / "after_timeout.txt"
+        file_path.write_text("重建後的內容", encoding='utf-8')
+        result = self.client.convert_file(str(file_path))
+        self.assertIn("重建後的內容", result.content)
+
+
+class TestConversionQueue(unittest.TestCase):
+    """工作佇列測試類"""
+    
+    def test_queue_limit(self):
+        """測試佇列已滿時拒絕新工作"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = Path(temp_dir) / "doc.txt"
+            file_path.write_text("內容", encoding='utf-8')
+            
+            # 未啟動服務，佇列中的工作不會被取出
+            server = ConversionServer(socket_path=os.path.join(temp_dir, "converter.sock"), max_queue_size=1)
+            server.submit(str(file_path))
+            with self.assertRaises(queue.Full):
+                server.submit(str(file_path))
+            
+            response = server.handle_request({'action': 'convert', 'file_path': str(file_path)})
+            self.assertEqual(response['status'], 'busy')
+            self.assertEqual(server.get_stats()['rejected'], 2)
+
+
+def run_tests():
+    """運行所有測試"""
+    print("開始運行常駐轉換服務測試...")
+    
+    # 創建測試套件
+    suite = unittest.TestSuite()
+    
+    # 添加測試類
+    suite.addTest(unittest.makeSuite(TestConversionServer))
+    suite.addTest(unittest.makeSuite(TestConversionQueue))
+    
+    # 運行測試
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    return result.wasSuccessful()
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
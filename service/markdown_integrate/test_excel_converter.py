@@ -0,0 +1,145 @@
+"""
+原生 Excel 轉換器測試
+
+測試以 openpyxl 串流讀取工作表、每個工作表產出一個頁面及表格資訊。
+"""
+
+import datetime
+import tempfile
+import unittest
+from pathlib import Path
+from service.markdown_integrate import UnifiedMarkdownConverter, FormatRouter
+from service.markdown_integrate.excel.excel_converter import ExcelConverter, format_cell, OPENPYXL_AVAILABLE
+
+if OPENPYXL_AVAILABLE:
+    import openpyxl
+
+
+@unittest.skipUnless(OPENPYXL_AVAILABLE, "openpyxl not available")
+class TestExcelConverter(unittest.TestCase):
+    """原生 Excel 轉換器測試類"""
+    
+    def setUp(self):
+        """建立測試活頁簿"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "rules.xlsx"
+        
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = "應備文件"
+        sheet.append(["理賠審核原則"])
+        sheet.append(["類別", "項次", "結論"])
+        sheet.append(["文件", 1, "第一行\n## 第二行"])
+        sheet.append([])
+        sheet.append(["文件", 2.0, "A|B"])
+        
+        second = workbook.create_sheet("急診")
+        second["B2"] = "項目"
+        second["C2"] = "日期"
+        second["B3"] = "留觀"
+        second["C3"] = datetime.datetime(2024, 1, 2)
+        
+        workbook.create_sheet("空白")
+        workbook.save(self.file_path)
+        
+        self.converter = ExcelConverter()
+    
+    def tearDown(self):
+        """清理測試環境"""
+        self.temp_dir.cleanup()
+    
+    def test_one_page_per_sheet(self):
+        """測試每個工作表產出一個頁面，儲存格含 ## 也不會錯誤分頁"""
+        pages = self.converter.convert_file(str(self.file_path))
+        
+        self.assertEqual([page.title for page in pages], ["應備文件", "急診", "空白"])
+        self.assertEqual([page.page_number for page in pages], [1, 2, 3])
+        self.assertEqual(pages[0].content, (
+            "## 應備文件\n\n"
+            "理賠審核原則\n\n"
+            "| 類別 | 項次 | 結論 |\n"
+            "| --- | --- | --- |\n"
+            "| 文件 | 1 | 第一行 ## 第二行 |\n"
+            "| 文件 | 2 | A\\|B |"
+        ))
+        self.assertEqual(pages[2].content, "## 空白")
+        self.assertEqual(pages[2].table_count, 0)
+    
+    def test_table_info(self):
+        """測試表格資訊包含工作表名稱、列範圍與尺寸"""
+        page = self.converter.convert_file(str(self.file_path))[0]
+        table = page.tables[0]
+        
+        self.assertEqual(page.table_count, 1)
+        self.assertEqual(table.title, "應備文件")
+        self.assertEqual(table.sheet_name, "應備文件")
+        self.assertEqual((table.first_row, table.last_row), (2, 5))
+        self.assertEqual((table.row_count, table.column_count), (4, 3))
+        
+        lines = page.content.split("\n")
+        self.assertEqual("\n".join(lines[table.start_line:table.end_line + 1]), table.content)
+    
+    def test_empty_columns_are_trimmed(self):
+        """測試左側全空的欄被裁掉，日期轉為 ISO 格式"""
+        page = self.converter.convert_file(str(self.file_path))[1]
+        
+        self.assertEqual(page.tables[0].content, "| 項目 | 日期 |\n| --- | --- |\n| 留觀 | 2024-01-02 |")
+        self.assertEqual((page.tables[0].first_row, page.tables[0].last_row), (2, 3))
+    
+    def test_iter_pages_is_lazy(self):
+        """測試串流讀取：取得第一個頁面時不需要先轉換其他工作表"""
+        pages = self.converter.iter_pages(str(self.file_path))
+        self.assertEqual(next(pages).title, "應備文件")
+        pages.close()
+    
+    def test_unified_converter_routes_to_excel(self):
+        """測試統一轉換器優先使用原生 Excel 轉換器"""
+        self.assertEqual(FormatRouter.get_converter_info(str(self.file_path))[0], "excel")
+        
+        converter = UnifiedMarkdownConverter()
+        result = converter.convert_file(str(self.file_path))
+        
+        self.assertEqual(result.metadata.converter_used, "excel")
+        self.assertEqual(result.metadata.total_pages, 3)
+        self.assertEqual(result.metadata.total_tables, 2)
+        self.assertEqual([sheet['title'] for sheet in result.metadata.additional_info['sheets']], ["應備文件", "急診", "空白"])
+        self.assertFalse(converter.get_loaded_converters()['markitdown'])
+        
+        streamed = list(converter.iter_convert(str(self.file_path)))
+        self.assertEqual([page.content for page in streamed], [page.content for page in result.pages])
+
+
+class TestFormatCell(unittest.TestCase):
+    """儲存格格式化測試類"""
+    
+    def test_format_cell(self):
+        """測試各種儲存格值的文字表示"""
+        self.assertEqual(format_cell(None), "")
+        self.assertEqual(format_cell(3.0), "3")
+        self.assertEqual(format_cell(3.5), "3.5")
+        self.assertEqual(format_cell(datetime.datetime(2024, 1, 2, 8, 30)), "2024-01-02 08:30:00")
+        self.assertEqual(format_cell(datetime.date(2024, 1, 2)), "2024-01-02")
+        self.assertEqual(format_cell("  多行\n 文字  "), "多行 文字")
+
+
+def run_tests():
+    """運行所有測試"""
+    print("開始運行原生 Excel 轉換器測試...")
+    
+    # 創建測試套件
+    suite = unittest.TestSuite()
+    
+    # 添加測試類
+    suite.addTest(unittest.makeSuite(TestExcelConverter))
+    suite.addTest(unittest.makeSuite(TestFormatCell))
+    
+    # 運行測試
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    return result.wasSuccessful()
+
+
+if __name__ == "__main__":
+    success = run_tests()
+    exit(0 if success else 1)
@@ -4,9 +4,22 @@
 測試 UnifiedMarkdownConverter 的基本功能。
 """
 
+import os
 import unittest
+import tempfile
 from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 from service.markdown_integrate import UnifiedMarkdownConverter, FormatRouter
+from service.markdown_integrate.marker.page_router import PageRoute
+from service.markdown_integrate import unified_converter
+
+
+def _convert_or_crash(file_path):
+    """檔名含 crash 的檔案直接終止工作進程，模擬轉換時崩潰"""
+    if "crash" in Path(file_path).name:
+        os._exit(1)
+    return unified_converter._worker_converter.convert_file(file_path)
 
 
 class TestUnifiedConverter(unittest.TestCase):
@@ -25,13 +38,18 @@ class TestUnifiedConverter(unittest.TestCase):
         self.assertFalse(FormatRouter.is_supported("test.xyz"))
         
         # 測試轉換器選擇
+        # 可讀取 PDF 文字層時 PDF 先逐頁路由，只有需要的頁面才交給 Marker
         converter_name, file_type = FormatRouter.get_converter_info("test.pdf")
-        self.assertEqual(converter_name, "marker")
+        self.assertEqual(converter_name, "hybrid" if ".pdf" in FormatRouter.HYBRID_FORMATS else "marker")
         self.assertEqual(file_type, ".pdf")
         
+        # 有安裝 openpyxl 時 Excel 優先使用原生轉換器
         converter_name, file_type = FormatRouter.get_converter_info("test.xlsx")
-        self.assertEqual(converter_name, "markitdown")
+        self.assertEqual(converter_name, "excel" if ".xlsx" in FormatRouter.EXCEL_FORMATS else "markitdown")
         self.assertEqual(file_type, ".xlsx")
+        
+        converter_name, _ = FormatRouter.get_converter_info("test.csv")
+        self.assertEqual(converter_name, "markitdown")
     
     def test_converter_initialization(self):
         """測試轉換器初始化"""
@@ -48,6 +66,33 @@ class TestUnifiedConverter(unittest.TestCase):
         self.assertIn("marker", status)
         self.assertIn("markitdown", status)
     
+    def test_lazy_initialization(self):
+        """測試轉換器延遲初始化"""
+        # 建立時不應載入任何轉換器
+        loaded = self.converter.get_loaded_converters()
+        self.assertFalse(loaded['marker'])
+        self.assertFalse(loaded['markitdown'])
+        
+        if not self.converter.get_converter_status()['markitdown']:
+            self.skipTest("Markitdown converter not available")
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = Path(temp_dir) / "lazy.txt"
+            file_path.write_text("# 標題\n\n內容", encoding='utf-8')
+            self.converter.convert_file(str(file_path))
+        
+        # 只有被路由到的轉換器會被建立
+        loaded = self.converter.get_loaded_converters()
+        self.assertTrue(loaded['markitdown'])
+        self.assertFalse(loaded['marker'])
+    
+    def test_warmup(self):
+        """測試預先初始化轉換器"""
+        status = self.converter.warmup(['markitdown'])
+        self.assertEqual(list(status.keys()), ['markitdown'])
+        self.assertEqual(status['markitdown'], self.converter.get_loaded_converters()['markitdown'])
+        self.assertFalse(self.converter.get_loaded_converters()['marker'])
+    
     def test_file_support_check(self):
         """測試檔案支援檢查"""
         # 測試支援的格式
@@ -79,6 +124,332 @@ class TestUnifiedConverter(unittest.TestCase):
                 temp_file.unlink()
 
 
+class TestBatchConversion(unittest.TestCase):
+    """批量轉換測試類"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.converter = UnifiedMarkdownConverter()
+        if not self.converter.get_converter_status()['markitdown']:
+            self.skipTest("Markitdown converter not available")
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_paths = []
+        for i in range(3):
+            file_path = Path(self.temp_dir.name) / f"doc_{i}.txt"
+            file_path.write_text(f"# 文件 {i}\n\n測試內容 {i}", encoding='utf-8')
+            self.file_paths.append(str(file_path))
+    
+    def tearDown(self):
+        """清理測試環境"""
+        self.temp_dir.cleanup()
+    
+    def test_convert_many(self):
+        """測試進程池批量轉換"""
+        results = list(self.converter.convert_many(self.file_paths, max_workers=2, max_tasks_per_child=1))
+        
+        self.assertEqual(len(results), 3)
+        self.assertEqual(
+            sorted(result.metadata.file_name for result in results),
+            ["doc_0.txt", "doc_1.txt", "doc_2.txt"]
+        )
+        for result in results:
+            self.assertEqual(result.metadata.converter_used, "markitdown")
+            self.assertIn("測試內容", result.content)
+    
+    def test_convert_many_skips_missing_files(self):
+        """測試批量轉換略過不存在的檔案"""
+        paths = self.file_paths[:1] + ["nonexistent.txt"]
+        results = list(self.converter.convert_many(paths, max_workers=1))
+        
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].metadata.file_name, "doc_0.txt")
+    
+    def test_convert_many_isolates_crashing_file(self):
+        """測試工作進程崩潰時只有造成崩潰的檔案被放棄"""
+        crash_path = Path(self.temp_dir.name) / "crash.txt"
+        crash_path.write_text("# 崩潰", encoding='utf-8')
+        for i in range(3, 7):
+            file_path = Path(self.temp_dir.name) / f"doc_{i}.txt"
+            file_path.write_text(f"# 文件 {i}\n\n測試內容 {i}", encoding='utf-8')
+            self.file_paths.append(str(file_path))
+        paths = [str(crash_path)] + self.file_paths
+        
+        isolated = []
+        original_isolated = UnifiedMarkdownConverter._iter_isolated_results
+        
+        def record_isolated(paths, executor_kwargs, max_retries):
+            isolated.extend(paths)
+            return original_isolated(paths, executor_kwargs, max_retries)
+        
+        with mock.patch.object(unified_converter, '_convert_in_batch_worker', _convert_or_crash), \
+                mock.patch.object(UnifiedMarkdownConverter, '_iter_isolated_results', staticmethod(record_isolated)):
+            results = list(self.converter.convert_many(paths, max_workers=2, max_retries=1))
+        
+        self.assertEqual(
+            sorted(result.metadata.file_name for result in results),
+            [f"doc_{i}.txt" for i in range(7)]
+        )
+        # 其餘檔案在新的進程池中並行轉換，只有連續遇到崩潰的少數檔案逐一重跑
+        self.assertIn(str(crash_path), isolated)
+        self.assertLessEqual(len(isolated), 3)
+
+
+class TestStreamingConversion(unittest.TestCase):
+    """串流轉換測試類"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.converter = UnifiedMarkdownConverter()
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """清理測試環境"""
+        self.temp_dir.cleanup()
+    
+    def test_iter_convert_markitdown(self):
+        """測試 Markitdown 格式的串流轉換與 convert_file 結果一致"""
+        if not self.converter.get_converter_status()['markitdown']:
+            self.skipTest("Markitdown converter not available")
+        file_path = Path(self.temp_dir.name) / "doc.txt"
+        file_path.write_text("# 標題\n\n串流內容", encoding='utf-8')
+        
+        streamed = list(self.converter.iter_convert(str(file_path)))
+        converted = self.converter.convert_file(str(file_path))
+        
+        self.assertEqual([page.content for page in streamed], [page.content for page in converted.pages])
+    
+    def test_iter_convert_marker_windows(self):
+        """測試 Marker 依頁面窗口轉換，並在每個窗口完成後立即產出頁面"""
+        from service.markdown_integrate.marker.marker_converter import MarkerConverter
+        
+        separator = "-" * 48
+        converted_ranges = []
+        
+        def create_window_converter(page_range):
+            start, end = (int(n) for n in page_range.split("-"))
+            converted_ranges.append((start, end))
+            markdown = "".join(f"\n\n{{{i}}}{separator}\n\n第 {i + 1} 頁內容" for i in range(start, end + 1))
+            page_stats = [{"page_id": i} for i in range(start, end + 1)]
+            return lambda input_file: SimpleNamespace(markdown=markdown, metadata={"page_stats": page_stats})
+        
+        # 不載入 Marker 模型，只替換頁數讀取和窗口轉換器
+        marker = MarkerConverter.__new__(MarkerConverter)
+        marker._count_pdf_pages = lambda input_file: 5
+        marker._create_window_converter = create_window_converter
+        self.converter._marker_converter = marker
+        
+        file_path = Path(self.temp_dir.name) / "manual.pdf"
+        file_path.write_bytes(b"%PDF-1.4")
+        
+        pages = self.converter.iter_convert(str(file_path), window=2)
+        first_page = next(pages)
+        self.assertEqual(first_page.page_number, 1)
+        self.assertEqual(converted_ranges, [(0, 1)])
+        
+        remaining = list(pages)
+        self.assertEqual(converted_ranges, [(0, 1), (2, 3), (4, 4)])
+        self.assertEqual([page.page_number for page in remaining], [2, 3, 4, 5])
+        self.assertEqual(remaining[-1].content, "第 5 頁內容")
+
+
+class TestHybridPdfRouting(unittest.TestCase):
+    """PDF 逐頁混合路由測試類"""
+    
+    ROUTES = [
+        PageRoute(page_index=0, engine="text", reason="text_layer", text="# 封面\n\n第 1 頁文字"),
+        PageRoute(page_index=1, engine="marker", reason="scanned"),
+        PageRoute(page_index=2, engine="text", reason="text_layer", text="第 3 頁文字"),
+        PageRoute(page_index=3, engine="marker", reason="layout"),
+        PageRoute(page_index=4, engine="marker", reason="layout"),
+    ]
+    
+    def setUp(self):
+        """設置測試環境"""
+        from service.markdown_integrate.marker.marker_converter import MarkerConverter
+        
+        separator = "-" * 48
+        self.page_ranges = []
+        
+        def create_window_converter(page_range):
+            self.page_ranges.append(page_range)
+            indices = []
+            for part in page_range.split(","):
+                start, _, end = part.partition("-")
+                indices.extend(range(int(start), int(end or start) + 1))
+            markdown = "".join(f"\n\n{{{i}}}{separator}\n\n| 第 {i + 1} 頁 | 表格 |\n|---|---|\n| a | b |" for i in indices)
+            return lambda input_file: SimpleNamespace(markdown=markdown, metadata={})
+        
+        # 不載入 Marker 模型，只替換轉換器
+        marker = MarkerConverter.__new__(MarkerConverter)
+        marker._create_window_converter = create_window_converter
+        
+        self.converter = UnifiedMarkdownConverter()
+        self.converter._marker_converter = marker
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "manual.pdf"
+        self.file_path.write_bytes(b"%PDF-1.4")
+        
+        # 沒有安裝 pypdfium2 時仍強制走逐頁路由，路由結果由 ROUTES 提供
+        patchers = [
+            mock.patch.object(FormatRouter, "HYBRID_FORMATS", {".pdf"}),
+            mock.patch("service.markdown_integrate.unified_converter.route_pdf_pages", return_value=self.ROUTES)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def tearDown(self):
+        """清理測試環境"""
+        self.temp_dir.cleanup()
+    
+    def test_stitched_result(self):
+        """測試文字頁與 Marker 頁依原始頁碼合併，並記錄每頁使用的引擎"""
+        result = self.converter.convert_file(str(self.file_path))
+        
+        self.assertEqual(result.metadata.converter_used, "hybrid")
+        self.assertEqual(self.page_ranges, ["1,3-4"])
+        self.assertEqual([page.page_number for page in result.pages], [1, 2, 3, 4, 5])
+        self.assertEqual(result.pages[0].content, "# 封面\n\n第 1 頁文字")
+        self.assertEqual(result.pages[0].block_types, {"title": 1, "paragraph": 1})
+        self.assertIn("| 第 2 頁 | 表格 |", result.pages[1].content)
+        self.assertEqual(result.pages[3].table_count, 1)
+        self.assertEqual(result.metadata.total_tables, 3)
+        
+        page_engines = result.metadata.additional_info["page_engines"]
+        self.assertEqual([item["engine"] for item in page_engines], ["text", "marker", "text", "marker", "marker"])
+        self.assertEqual(page_engines[1], {"page_number": 2, "engine": "marker", "reason": "scanned"})
+        self.assertEqual(result.metadata.additional_info["engine_counts"], {"text": 2, "marker": 3})
+    
+    def test_iter_convert_batches_marker_pages(self):
+        """測試串流轉換時文字頁立即產出，Marker 頁依 window 分批轉換"""
+        pages = self.converter.iter_convert(str(self.file_path), window=2)
+        
+        self.assertEqual(next(pages).page_number, 1)
+        self.assertEqual(self.page_ranges, [])
+        
+        remaining = list(pages)
+        self.assertEqual(self.page_ranges, ["1,3", "4"])
+        self.assertEqual([page.page_number for page in remaining], [2, 3, 4, 5])
+    
+    def test_routing_can_be_disabled(self):
+        """測試關閉逐頁路由時 PDF 整份交給 Marker"""
+        converter = UnifiedMarkdownConverter(enable_hybrid_pdf_routing=False)
+        self.assertEqual(converter.get_converter_info(str(self.file_path))[0], "marker")
+        self.assertEqual(self.converter.get_converter_info(str(self.file_path))[0], "hybrid")
+
+
+class TestIncrementalConversion(unittest.TestCase):
+    """增量轉換測試類"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        from service.markdown_integrate.marker.marker_converter import MarkerConverter
+        
+        self.converted_subsets = []
+        
+        def convert_page_subset(input_file, page_indices):
+            self.converted_subsets.append(list(page_indices))
+            return {
+                index: marker._build_page_content(index + 1, f"新版第 {index + 1} 頁")
+                for index in page_indices
+            }
+        
+        # 不載入 Marker 模型，只替換指定頁面的轉換
+        marker = MarkerConverter.__new__(MarkerConverter)
+        marker.convert_page_subset = convert_page_subset
+        self.marker = marker
+        
+        self.converter = UnifiedMarkdownConverter()
+        self.converter._marker_converter = marker
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.old_path = Path(self.temp_dir.name) / "manual_old.pdf"
+        self.new_path = Path(self.temp_dir.name) / "manual_new.pdf"
+        self.old_path.write_bytes(b"%PDF-1.4 old")
+        self.new_path.write_bytes(b"%PDF-1.4 new")
+        
+        old_routes = [
+            PageRoute(page_index=0, engine="text", reason="text_layer", text="封面", fingerprint="fp-cover"),
+            PageRoute(page_index=1, engine="marker", reason="layout", fingerprint="fp-table"),
+            PageRoute(page_index=2, engine="text", reason="text_layer", text="舊版條款", fingerprint="fp-old"),
+        ]
+        # 新版在封面後插入一頁，並修改了條款頁
+        self.new_routes = [
+            PageRoute(page_index=0, engine="text", reason="text_layer", text="封面", fingerprint="fp-cover"),
+            PageRoute(page_index=1, engine="marker", reason="scanned", fingerprint="fp-inserted"),
+            PageRoute(page_index=2, engine="marker", reason="layout", fingerprint="fp-table"),
+            PageRoute(page_index=3, engine="text", reason="text_layer", text="新版條款", fingerprint="fp-new"),
+        ]
+        routes_by_file = {str(self.old_path): old_routes, str(self.new_path): self.new_routes}
+        
+        patchers = [
+            mock.patch.object(FormatRouter, "HYBRID_FORMATS", {".pdf"}),
+            mock.patch("service.markdown_integrate.unified_converter.PAGE_ROUTING_AVAILABLE", True),
+            mock.patch(
+                "service.markdown_integrate.unified_converter.route_pdf_pages",
+                side_effect=lambda input_file, thresholds=None: routes_by_file[input_file]
+            )
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        self.previous = self.converter.convert_file(str(self.old_path))
+        self.converted_subsets.clear()
+    
+    def tearDown(self):
+        """清理測試環境"""
+        self.temp_dir.cleanup()
+    
+    def test_unchanged_pages_are_reused(self):
+        """測試指紋相同的頁面重用舊結果，只轉換變動和新增的頁面"""
+        result = self.converter.convert_incremental(str(self.new_path), self.previous)
+        
+        self.assertEqual(self.converted_subsets, [[1]])
+        self.assertEqual([page.page_number for page in result.pages], [1, 2, 3, 4])
+        self.assertEqual(result.pages[0].content, "封面")
+        self.assertEqual(result.pages[1].content, "新版第 2 頁")
+        self.assertEqual(result.pages[2].content, self.previous.pages[1].content)
+        self.assertEqual(result.pages[3].content, "新版條款")
+        
+        incremental = result.metadata.additional_info["incremental"]
+        self.assertEqual(incremental["reused_pages"], [1, 3])
+        self.assertEqual(incremental["converted_pages"], [2, 4])
+        self.assertEqual(result.metadata.additional_info["page_engines"][2]["source_page"], 2)
+        self.assertEqual(result.metadata.additional_info["page_fingerprints"],
+                         [route.fingerprint for route in self.new_routes])
+        
+        # 重用的頁面是副本，修改新結果不影響舊結果
+        self.assertIsNot(result.pages[2], self.previous.pages[1])
+        self.assertEqual(self.previous.pages[1].page_number, 2)
+    
+    def test_previous_without_fingerprints(self):
+        """測試舊結果沒有指紋時，改為讀取舊檔案計算指紋"""
+        del self.previous.metadata.additional_info["page_fingerprints"]
+        
+        result = self.converter.convert_incremental(str(self.new_path), self.previous)
+        self.assertEqual(result.metadata.additional_info["incremental"]["reused_pages"], [1, 3])
+        
+        self.previous.metadata.file_path = str(Path(self.temp_dir.name) / "missing.pdf")
+        result = self.converter.convert_incremental(str(self.new_path), self.previous)
+        self.assertEqual(result.metadata.additional_info["incremental"]["reused_pages"], [])
+        self.assertEqual(result.metadata.additional_info["incremental"]["converted_pages"], [1, 2, 3, 4])
+    
+    def test_routing_failure_falls_back_to_full_conversion(self):
+        """測試無法讀取新版本的頁面指紋時，改為整份交給 Marker 轉換"""
+        self.marker.marker_pages = lambda input_file: {
+            'pages': [self.marker._build_page_content(1, "全新內容")]
+        }
+        
+        with mock.patch("service.markdown_integrate.unified_converter.route_pdf_pages",
+                        side_effect=RuntimeError("pdfium failure")):
+            result = self.converter.convert_incremental(str(self.new_path), self.previous)
+        
+        self.assertEqual(result.metadata.converter_used, "marker")
+        self.assertEqual([page.content for page in result.pages], ["全新內容"])
+        self.assertEqual(result.metadata.additional_info["incremental"]["reused_pages"], [])
+        self.assertEqual(result.metadata.additional_info["incremental"]["converted_pages"], [1])
+
+
 class TestDataModels(unittest.TestCase):
     """數據模型測試類"""
     
@@ -132,6 +503,10 @@ def run_tests():
     
     # 添加測試
     suite.addTest(unittest.makeSuite(TestUnifiedConverter))
+    suite.addTest(unittest.makeSuite(TestBatchConversion))
+    suite.addTest(unittest.makeSuite(TestStreamingConversion))
+    suite.addTest(unittest.makeSuite(TestHybridPdfRouting))
+    suite.addTest(unittest.makeSuite(TestIncrementalConversion))
     suite.addTest(unittest.makeSuite(TestDataModels))
     
     # 運行測試
@@ -1,16 +1,30 @@
 """
 統一 Markdown 轉換器
 
-整合 Marker 和 Markitdown 轉換器，提供統一的接口和數據格式。
+整合 Marker、原生 Excel 和 Markitdown 轉換器，提供統一的接口和數據格式。
 """
 
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from dataclasses import asdict, replace
+from typing import Optional, Dict, Any, List, Set, Tuple, Iterable, Iterator, TYPE_CHECKING
+from importlib import metadata as importlib_metadata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 import logging
+import os
+import threading
 import time
 
-from .data_models import ConversionResult, PageInfo, ConversionMetadata, TableInfo
+from .data_models import ConversionResult, PageInfo, ConversionMetadata, TableInfo, join_pages
 from .format_router import FormatRouter
+from .marker.page_scanner import scan_page
+from .marker.page_router import (
+    PageRoute, RoutingThresholds, route_pdf_pages, ENGINE_MARKER,
+    PYPDFIUM_AVAILABLE as PAGE_ROUTING_AVAILABLE
+)
+
+if TYPE_CHECKING:
+    from ..serialization.conversion_cache import ConversionCache
 
 # 嘗試導入轉換器
 try:
@@ -27,8 +41,64 @@ except ImportError:
     MARKITDOWN_AVAILABLE = False
     logging.warning("Markitdown converter not available")
 
+try:
+    from .excel.excel_converter import ExcelConverter, NATIVE_EXCEL_FORMATS
+    EXCEL_AVAILABLE = bool(NATIVE_EXCEL_FORMATS)
+except ImportError:
+    EXCEL_AVAILABLE = False
+    logging.warning("Native Excel converter not available")
+
 logger = logging.getLogger(__name__)
 
+# 轉換結果格式版本，轉換邏輯改變導致輸出不同時需遞增，使舊的快取失效
+CONVERTER_VERSION = "1.0.0"
+
+# 各轉換器對應的第三方套件名稱（用於快取鍵中的版本資訊）
+CONVERTER_PACKAGES = {
+    'marker': 'marker-pdf',
+    'hybrid': 'marker-pdf',
+    'excel': 'openpyxl',
+    'markitdown': 'markitdown'
+}
+
+# 檔案遇到幾次進程池崩潰後改為在單一工作進程中隔離重跑
+ISOLATE_AFTER_POOL_BREAKS = 2
+
+# 每個工作進程各自持有的轉換器（由 _init_batch_worker 建立，只載入一次）
+_worker_converter: Optional['UnifiedMarkdownConverter'] = None
+
+
+def _init_batch_worker(converter_kwargs: Dict[str, Any], max_memory_mb: Optional[int]) -> None:
+    """
+    批量轉換工作進程的初始化函數
+    
+    Args:
+        converter_kwargs: 建立 UnifiedMarkdownConverter 的參數
+        max_memory_mb: 工作進程的記憶體上限（MB），None 表示不限制
+    """
+    global _worker_converter
+    
+    if max_memory_mb:
+        try:
+            import resource
+            limit = int(max_memory_mb) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            # Windows 沒有 resource 模組，或系統不允許調整上限
+            logger.warning(f"Failed to set worker memory limit: {e}")
+    
+    _worker_converter = UnifiedMarkdownConverter(**converter_kwargs)
+
+
+def _convert_in_batch_worker(file_path: str) -> ConversionResult:
+    """在工作進程中轉換單一檔案"""
+    return _worker_converter.convert_file(file_path)
+
+
+def _warmup_batch_worker(converters: Optional[List[str]] = None) -> Dict[str, bool]:
+    """在工作進程中預先初始化轉換器"""
+    return _worker_converter.warmup(converters)
+
 
 class UnifiedMarkdownConverter:
     """統一的 Markdown 轉換器"""
@@ -37,7 +107,10 @@ class UnifiedMarkdownConverter:
                  marker_model_locations: Optional[Dict[str, str]] = None,
                  markitdown_input_dir: str = "raw_docs",
                  markitdown_output_dir: str = "service/markdown_integrate/markitdown/converted",
-                 enable_markitdown_page_splitting: bool = False): # 預設不啟用頁面分割功能
+                 enable_markitdown_page_splitting: bool = False, # 預設不啟用頁面分割功能
+                 cache: Optional['ConversionCache'] = None,
+                 enable_hybrid_pdf_routing: bool = True,
+                 routing_thresholds: Optional[RoutingThresholds] = None):
         """
         初始化統一轉換器
         
@@ -46,36 +119,122 @@ class UnifiedMarkdownConverter:
             markitdown_input_dir: Markitdown 輸入目錄
             markitdown_output_dir: Markitdown 輸出目錄
             enable_markitdown_page_splitting: 是否啟用 Markitdown 頁面分割功能
+            cache: 轉換結果快取（ConversionCache），None 表示不使用快取
+            enable_hybrid_pdf_routing: 是否對 PDF 逐頁路由（文字層乾淨的頁面直接抽取文字，
+                                       其餘頁面才交給 Marker），關閉時整份 PDF 交給 Marker
+            routing_thresholds: 逐頁路由的判斷門檻，None 表示使用預設值
         """
-        self.marker_converter: Optional[MarkerConverter] = None
-        self.markitdown_converter: Optional[MarkitdownConverter] = None
-        self._initialize_converters(marker_model_locations, markitdown_input_dir, markitdown_output_dir, enable_markitdown_page_splitting)
+        self.cache = cache
+        # 保存初始化參數，供批量轉換的工作進程重建相同配置的轉換器
+        self._init_kwargs: Dict[str, Any] = {
+            'marker_model_locations': marker_model_locations,
+            'markitdown_input_dir': markitdown_input_dir,
+            'markitdown_output_dir': markitdown_output_dir,
+            'enable_markitdown_page_splitting': enable_markitdown_page_splitting,
+            'cache': cache,
+            'enable_hybrid_pdf_routing': enable_hybrid_pdf_routing,
+            'routing_thresholds': routing_thresholds or RoutingThresholds()
+        }
+        # 轉換器延遲建立：第一個路由到該轉換器的檔案才會觸發初始化（含模型載入）
+        self._marker_converter: Optional['MarkerConverter'] = None
+        self._excel_converter: Optional['ExcelConverter'] = None
+        self._markitdown_converter: Optional['MarkitdownConverter'] = None
+        self._failed_converters: Set[str] = set()
+        self._init_lock = threading.Lock()
+    
+    @property
+    def marker_converter(self) -> Optional['MarkerConverter']:
+        """Marker 轉換器（首次存取時建立並載入模型）"""
+        return self._get_converter('marker')
+    
+    @property
+    def excel_converter(self) -> Optional['ExcelConverter']:
+        """原生 Excel 轉換器（首次存取時建立）"""
+        return self._get_converter('excel')
     
-    def _initialize_converters(self, marker_model_locations, markitdown_input_dir, markitdown_output_dir, enable_markitdown_page_splitting):
-        """初始化兩個轉換器"""
-        # 初始化 Marker 轉換器
-        if MARKER_AVAILABLE:
+    @property
+    def markitdown_converter(self) -> Optional['MarkitdownConverter']:
+        """Markitdown 轉換器（首次存取時建立）"""
+        return self._get_converter('markitdown')
+    
+    def _get_converter(self, converter_name: str):
+        """
+        取得指定的轉換器，尚未建立時先初始化並快取
+        
+        Args:
+            converter_name: 轉換器名稱（'marker'、'excel' 或 'markitdown'）
+        
+        Returns:
+            轉換器實例，初始化失敗或不可用時返回 None
+        """
+        attr_name = f"_{converter_name}_converter"
+        converter = getattr(self, attr_name)
+        if converter is not None or converter_name in self._failed_converters:
+            return converter
+        
+        with self._init_lock:
+            # 取得鎖之後再檢查一次，避免多執行緒重複初始化
+            converter = getattr(self, attr_name)
+            if converter is None and converter_name not in self._failed_converters:
+                converter = self._initialize_converter(converter_name)
+                if converter is None:
+                    self._failed_converters.add(converter_name)
+                else:
+                    setattr(self, attr_name, converter)
+        
+        return converter
+    
+    def _initialize_converter(self, converter_name: str):
+        """初始化單一轉換器，失敗時返回 None"""
+        start_time = time.time()
+        
+        if converter_name == 'marker':
+            if not MARKER_AVAILABLE:
+                logger.warning("Marker converter not available")
+                return None
             try:
-                self.marker_converter = create_marker_converter(marker_model_locations)
-                logger.info("Marker converter initialized")
+                converter = create_marker_converter(self._init_kwargs['marker_model_locations'])
             except Exception as e:
                 logger.warning(f"Failed to initialize Marker converter: {e}")
-        else:
-            logger.warning("Marker converter not available")
-        
-        # 初始化 Markitdown 轉換器
-        if MARKITDOWN_AVAILABLE:
+                return None
+        elif converter_name == 'excel':
+            if not EXCEL_AVAILABLE:
+                logger.warning("Native Excel converter not available")
+                return None
+            converter = ExcelConverter()
+        elif converter_name == 'markitdown':
+            if not MARKITDOWN_AVAILABLE:
+                logger.warning("Markitdown converter not available")
+                return None
             try:
-                self.markitdown_converter = MarkitdownConverter(
-                    markitdown_input_dir, 
-                    markitdown_output_dir, 
-                    enable_page_splitting=enable_markitdown_page_splitting
+                converter = MarkitdownConverter(
+                    self._init_kwargs['markitdown_input_dir'],
+                    self._init_kwargs['markitdown_output_dir'],
+                    enable_page_splitting=self._init_kwargs['enable_markitdown_page_splitting']
                 )
-                logger.info("Markitdown converter initialized")
             except Exception as e:
                 logger.warning(f"Failed to initialize Markitdown converter: {e}")
+                return None
         else:
-            logger.warning("Markitdown converter not available")
+            raise ValueError(f"Unknown converter: {converter_name}")
+        
+        logger.info(f"{converter_name} converter initialized in {time.time() - start_time:.2f}s")
+        return converter
+    
+    def warmup(self, converters: Optional[List[str]] = None) -> Dict[str, bool]:
+        """
+        預先初始化轉換器（適用於希望在啟動時就載入模型的服務）
+        
+        Args:
+            converters: 要初始化的轉換器名稱列表，None 表示全部
+        
+        Returns:
+            dict: 各轉換器是否初始化成功
+        """
+        if converters is None:
+            converters = ['marker', 'excel', 'markitdown']
+        
+        return {name: self._get_converter(name) is not None for name in converters}
     
     def convert_file(self, 
                     file_path: str, 
@@ -88,10 +247,10 @@ class UnifiedMarkdownConverter:
             file_path: 輸入檔案路徑
             output_path: 輸出檔案路徑（僅當 save_to_file=True 時使用）
             save_to_file: 是否保存到成 .md 檔案
-            
+        
         Returns:
             ConversionResult: 統一格式的轉換結果
-            
+        
         Raises:
             FileNotFoundError: 如果檔案不存在
             ValueError: 如果檔案格式不支援
@@ -102,17 +261,513 @@ class UnifiedMarkdownConverter:
             raise FileNotFoundError(f"File not found: {file_path}")
         
         # 決定使用哪個轉換器
-        converter_name, file_type = FormatRouter.get_converter_info(str(file_path))
+        converter_name, file_type = self.get_converter_info(str(file_path))
+        
+        # 查詢快取（以檔案內容和轉換器配置為鍵，改名或搬移的檔案也能命中）
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.get_cache_key(str(file_path))
+            cached_result = self.cache.get(cache_key)
+            if cached_result is not None:
+                logger.info(f"Using cached conversion for {file_path.name}")
+                return self._finalize_cached_result(cached_result, file_path, cache_key, output_path, save_to_file)
         
         logger.info(f"Converting {file_path.name} using {converter_name}")
         
         # 根據轉換器類型進行轉換
         if converter_name == 'marker':
-            return self._convert_with_marker(file_path, output_path, save_to_file)
+            result = self._convert_with_marker(file_path, output_path, save_to_file)
+        elif converter_name == 'hybrid':
+            result = self._convert_with_hybrid(file_path, output_path, save_to_file)
+        elif converter_name == 'excel':
+            result = self._convert_with_excel(file_path, output_path, save_to_file)
         elif converter_name == 'markitdown':
-            return self._convert_with_markitdown(file_path, output_path, save_to_file)
+            result = self._convert_with_markitdown(file_path, output_path, save_to_file)
         else:
             raise ValueError(f"Unknown converter: {converter_name}")
+        
+        if cache_key is not None:
+            result.metadata.additional_info['conversion_cache'] = {'key': cache_key, 'hit': False}
+            try:
+                self.cache.put(cache_key, result)
+            except Exception as e:
+                logger.warning(f"Failed to cache conversion of {file_path.name}: {e}")
+        
+        return result
+    
+    def iter_convert(self, file_path: str, window: int = 10) -> Iterator[PageInfo]:
+        """
+        串流轉換接口，逐頁產出 PageInfo
+        
+        Marker 處理的 PDF 以 window 頁為一個窗口轉換，每完成一個窗口就產出其頁面
+        （逐頁路由時文字頁立即產出，需要 Marker 的頁面每 window 頁轉換一次），
+        下游分割可以在後面的頁面仍在轉換時開始處理。快取命中時直接產出快取的頁面；
+        串流轉換的結果不寫入快取（需要完整結果時請使用 convert_file）。
+        原生 Excel 轉換每讀完一個工作表就產出一個頁面；Markitdown 處理的格式本身不支援分段轉換，會整份轉換後再逐頁產出。
+        
+        Args:
+            file_path: 輸入檔案路徑
+            window: Marker 每個轉換窗口的頁數
+        
+        Yields:
+            PageInfo: 依序產出的頁面信息
+        
+        Raises:
+            FileNotFoundError: 如果檔案不存在
+            ValueError: 如果檔案格式不支援
+            RuntimeError: 如果對應的轉換器不可用
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        converter_name, file_type = self.get_converter_info(str(file_path))
+        
+        if self.cache is not None:
+            cached_result = self.cache.get(self.get_cache_key(str(file_path)))
+            if cached_result is not None:
+                logger.info(f"Using cached conversion for {file_path.name}")
+                yield from cached_result.pages or []
+                return
+        
+        logger.info(f"Streaming {file_path.name} using {converter_name}")
+        
+        if converter_name == 'marker':
+            if not self.marker_converter:
+                raise RuntimeError("Marker converter not available")
+            for page_data in self.marker_converter.iter_pages(str(file_path), window=window):
+                yield self._page_info_from_marker(page_data)
+        elif converter_name == 'hybrid':
+            try:
+                routes = route_pdf_pages(str(file_path), self._init_kwargs['routing_thresholds'])
+            except Exception as e:
+                logger.warning(f"Per-page routing failed for {file_path.name}, using Marker for all pages: {e}")
+                if not self.marker_converter:
+                    raise RuntimeError("Marker converter not available")
+                for page_data in self.marker_converter.iter_pages(str(file_path), window=window):
+                    yield self._page_info_from_marker(page_data)
+                return
+            yield from self._iter_hybrid_pages(file_path, routes, window=window)
+        elif converter_name == 'excel':
+            if not self.excel_converter:
+                raise RuntimeError("Native Excel converter not available")
+            yield from self.excel_converter.iter_pages(str(file_path))
+        elif converter_name == 'markitdown':
+            result = self._convert_with_markitdown(file_path, None, False)
+            yield from result.pages or []
+        else:
+            raise ValueError(f"Unknown converter: {converter_name}")
+    
+    def convert_incremental(self,
+                            new_path: str,
+                            previous_result: ConversionResult,
+                            output_path: Optional[str] = None,
+                            save_to_file: bool = False) -> ConversionResult:
+        """
+        增量轉換新版本的文件，重用與舊版本相同的頁面
+        
+        以頁面指紋比對新舊版本：指紋與舊版本某一頁相同的頁面直接重用舊結果中的 PageInfo
+        （頁碼更新為新版本中的位置），只有變動或新增的頁面才重新轉換。
+        舊版本的指紋取自 previous_result.metadata.additional_info['page_fingerprints']，
+        沒有記錄時改為讀取 previous_result.metadata.file_path 的舊檔案計算。
+        
+        Args:
+            new_path: 新版本的檔案路徑
+            previous_result: 舊版本的轉換結果（通常由序列化檔案反序列化取得）
+            output_path: 輸出檔案路徑（僅當 save_to_file=True 時使用）
+            save_to_file: 是否保存到成 .md 檔案
+        
+        Returns:
+            ConversionResult: 新版本的完整轉換結果，重用情況記錄在 additional_info['incremental']
+                - reused_pages: 重用的頁碼列表
+                - converted_pages: 重新轉換的頁碼列表
+        
+        Raises:
+            FileNotFoundError: 如果檔案不存在
+            ValueError: 如果檔案格式不支援
+            RuntimeError: 如果對應的轉換器不可用
+        
+        Note:
+            只有 PDF 且可讀取頁面指紋（需要 pypdfium2）時才能增量轉換，其他情況會完整轉換。
+        """
+        file_path = Path(new_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        converter_name, _ = self.get_converter_info(str(file_path))
+        if file_path.suffix.lower() != '.pdf' or not PAGE_ROUTING_AVAILABLE:
+            logger.info(f"Incremental conversion not supported for {file_path.name}, converting all pages")
+            return self._convert_all_pages(file_path, previous_result, output_path, save_to_file)
+        
+        try:
+            routes = route_pdf_pages(str(file_path), self._init_kwargs['routing_thresholds'])
+        except Exception as e:
+            logger.warning(f"Reading page fingerprints failed for {file_path.name}, converting all pages: {e}")
+            return self._convert_all_pages(file_path, previous_result, output_path, save_to_file)
+        previous_pages = self._previous_pages_by_fingerprint(previous_result)
+        
+        reused: Dict[int, PageInfo] = {}
+        pending: List[PageRoute] = []
+        for route in routes:
+            previous_page = previous_pages.get(route.fingerprint) if route.fingerprint else None
+            if previous_page is not None:
+                reused[route.page_index] = previous_page
+            elif converter_name == 'hybrid':
+                pending.append(route)
+            else:
+                # 關閉逐頁路由時，變動的頁面全部交給 Marker
+                pending.append(replace(route, engine=ENGINE_MARKER, reason='routing_disabled', text=None))
+        
+        logger.info(f"Incremental conversion of {file_path.name}: "
+                    f"{len(reused)} pages reused, {len(pending)} pages to convert")
+        
+        converted = {page.page_number - 1: page for page in self._iter_hybrid_pages(file_path, pending)}
+        pending_by_index = {route.page_index: route for route in pending}
+        
+        pages: List[PageInfo] = []
+        page_engines: List[Dict[str, Any]] = []
+        for route in routes:
+            page_number = route.page_index + 1
+            if route.page_index in reused:
+                previous_page = reused[route.page_index]
+                pages.append(replace(previous_page, page_number=page_number, tables=list(previous_page.tables)))
+                page_engines.append({
+                    'page_number': page_number,
+                    'engine': 'reused',
+                    'reason': 'fingerprint_match',
+                    'source_page': previous_page.page_number
+                })
+            else:
+                pending_route = pending_by_index[route.page_index]
+                pages.append(converted[route.page_index])
+                page_engines.append({'page_number': page_number, 'engine': pending_route.engine, 'reason': pending_route.reason})
+        
+        # 合併所有頁面內容
+        full_content, page_offsets = join_pages(page.content for page in pages)
+        
+        engine_counts: Dict[str, int] = {}
+        for item in page_engines:
+            engine_counts[item['engine']] = engine_counts.get(item['engine'], 0) + 1
+        
+        # 創建元數據
+        metadata = ConversionMetadata(
+            file_name=file_path.name,
+            file_path=str(file_path),
+            file_type=file_path.suffix.lower(),
+            file_size=file_path.stat().st_size,
+            total_pages=len(pages),
+            total_tables=sum(page.table_count for page in pages),
+            total_content_length=len(full_content),
+            conversion_timestamp=time.time(),
+            converter_used=converter_name,
+            additional_info={
+                'page_engines': page_engines,
+                'engine_counts': engine_counts,
+                'page_fingerprints': [route.fingerprint for route in routes],
+                'incremental': {
+                    'previous_file': previous_result.metadata.file_name,
+                    'reused_pages': sorted(index + 1 for index in reused),
+                    'converted_pages': sorted(index + 1 for index in converted)
+                }
+            }
+        )
+        
+        result = ConversionResult(
+            content=full_content,
+            pages=pages,
+            metadata=metadata,
+            page_offsets=page_offsets
+        )
+        
+        # 如果需要保存到檔案
+        if save_to_file:
+            output_file = self._save_to_file(result, output_path, file_path)
+            result.output_path = str(output_file)
+        
+        return result
+    
+    def _convert_all_pages(self,
+                           file_path: Path,
+                           previous_result: ConversionResult,
+                           output_path: Optional[str],
+                           save_to_file: bool) -> ConversionResult:
+        """無法增量轉換時完整轉換新版本，並記錄沒有重用任何頁面"""
+        result = self.convert_file(str(file_path), output_path, save_to_file)
+        result.metadata.additional_info['incremental'] = {
+            'previous_file': previous_result.metadata.file_name,
+            'reused_pages': [],
+            'converted_pages': [page.page_number for page in result.pages]
+        }
+        return result
+    
+    def _previous_pages_by_fingerprint(self, previous_result: ConversionResult) -> Dict[str, PageInfo]:
+        """
+        建立舊版本的 頁面指紋 -> PageInfo 對照表
+        
+        只有舊結果的頁面與 PDF 物理頁面一一對應（頁數與指紋數量相同）時才能重用，
+        否則返回空字典（全部重新轉換）。
+        """
+        fingerprints = previous_result.metadata.additional_info.get('page_fingerprints')
+        if not fingerprints:
+            previous_path = Path(previous_result.metadata.file_path)
+            if previous_path.suffix.lower() == '.pdf' and previous_path.exists():
+                try:
+                    fingerprints = [route.fingerprint for route in route_pdf_pages(str(previous_path))]
+                except Exception as e:
+                    logger.warning(f"Failed to fingerprint previous version {previous_path.name}: {e}")
+        
+        previous_pages = previous_result.pages or []
+        if not fingerprints or len(fingerprints) != len(previous_pages):
+            logger.warning(f"Previous result of {previous_result.metadata.file_name} has no page fingerprints "
+                           f"matching its pages, converting all pages")
+            return {}
+        
+        pages_by_fingerprint: Dict[str, PageInfo] = {}
+        for fingerprint, page in zip(fingerprints, sorted(previous_pages, key=lambda page: page.page_number)):
+            if fingerprint and fingerprint not in pages_by_fingerprint:
+                pages_by_fingerprint[fingerprint] = page
+        return pages_by_fingerprint
+    
+    def get_converter_info(self, file_path: str) -> Tuple[str, str]:
+        """
+        決定檔案使用的轉換器（FormatRouter 的結果再套用本實例的路由設定）
+        
+        Args:
+            file_path: 檔案路徑
+        
+        Returns:
+            Tuple[converter_name, file_type]: 轉換器名稱和檔案類型
+        
+        Raises:
+            ValueError: 如果檔案格式不支援
+        """
+        converter_name, file_type = FormatRouter.get_converter_info(file_path)
+        if converter_name == 'hybrid' and not self._init_kwargs['enable_hybrid_pdf_routing']:
+            converter_name = 'marker'
+        return converter_name, file_type
+    
+    def get_converter_config(self, converter_name: str) -> Dict[str, Any]:
+        """
+        獲取影響轉換輸出的轉換器配置（名稱、版本和設定）
+        
+        Args:
+            converter_name: 轉換器名稱（'marker'、'hybrid'、'excel' 或 'markitdown'）
+        
+        Returns:
+            dict: 轉換器配置，用於計算快取鍵
+        """
+        package_name = CONVERTER_PACKAGES.get(converter_name)
+        try:
+            package_version = importlib_metadata.version(package_name) if package_name else None
+        except importlib_metadata.PackageNotFoundError:
+            package_version = None
+        
+        config: Dict[str, Any] = {
+            'converter': converter_name,
+            'converter_version': CONVERTER_VERSION,
+            'package_version': package_version
+        }
+        
+        if converter_name in ('marker', 'hybrid'):
+            config['marker_config'] = dict(MarkerConverter.MARKER_CONFIG) if MARKER_AVAILABLE else {}
+            config['model_locations'] = self._init_kwargs['marker_model_locations'] or {}
+        if converter_name == 'hybrid':
+            config['routing_thresholds'] = asdict(self._init_kwargs['routing_thresholds'])
+        elif converter_name == 'excel':
+            config['detect_caption_rows'] = True
+        elif converter_name == 'markitdown':
+            config['enable_page_splitting'] = self._init_kwargs['enable_markitdown_page_splitting']
+        
+        return config
+    
+    def get_cache_key(self, file_path: str) -> str:
+        """
+        計算檔案的轉換快取鍵
+        
+        Args:
+            file_path: 檔案路徑
+        
+        Returns:
+            str: 快取鍵
+        
+        Raises:
+            RuntimeError: 如果沒有設定快取
+            ValueError: 如果檔案格式不支援
+        """
+        if self.cache is None:
+            raise RuntimeError("Conversion cache not configured")
+        
+        converter_name, _ = self.get_converter_info(file_path)
+        return self.cache.make_key(file_path, self.get_converter_config(converter_name))
+    
+    def _finalize_cached_result(self, result: ConversionResult, file_path: Path, cache_key: str,
+                                output_path: Optional[str], save_to_file: bool) -> ConversionResult:
+        """將快取結果的檔案資訊更新為目前的檔案位置"""
+        result.metadata.file_name = file_path.name
+        result.metadata.file_path = str(file_path)
+        result.metadata.file_size = file_path.stat().st_size
+        result.metadata.additional_info['conversion_cache'] = {'key': cache_key, 'hit': True}
+        result.output_path = None
+        
+        if save_to_file:
+            output_file = self._save_to_file(result, output_path, file_path)
+            result.output_path = str(output_file)
+        
+        return result
+    
+    def convert_many(self,
+                     file_paths: Iterable[str],
+                     max_workers: Optional[int] = None,
+                     max_memory_mb: Optional[int] = None,
+                     max_tasks_per_child: Optional[int] = None,
+                     max_retries: int = 2) -> Iterator[ConversionResult]:
+        """
+        使用進程池批量轉換多個檔案
+        
+        每個工作進程只在啟動時建立一次轉換器（載入 Marker/Markitdown），
+        之後重複使用；轉換結果依完成順序逐一返回。
+        
+        Args:
+            file_paths: 要轉換的檔案路徑列表
+            max_workers: 工作進程數量，None 表示使用 CPU 核心數
+            max_memory_mb: 每個工作進程的記憶體上限（MB），None 表示不限制
+            max_tasks_per_child: 每個工作進程處理多少個檔案後重啟，None 表示不重啟
+            max_retries: 工作進程異常終止時，每個檔案的最大重試次數
+        
+        Yields:
+            ConversionResult: 依完成順序返回的轉換結果
+        
+        Note:
+            - 單一檔案轉換失敗只會記錄錯誤並跳過，不會中斷整個批次
+            - 工作進程因記憶體上限等原因崩潰時，未完成的檔案會送進新的進程池繼續並行轉換；
+              連續遇到崩潰的檔案才逐一重跑，只有造成崩潰的檔案會消耗重試次數（max_retries）
+        """
+        pending: List[str] = []
+        for file_path in file_paths:
+            if not Path(file_path).exists():
+                logger.error(f"File not found, skipped: {file_path}")
+                continue
+            pending.append(str(file_path))
+        
+        if not pending:
+            return
+        
+        executor_kwargs: Dict[str, Any] = {
+            'max_workers': max_workers,
+            'initializer': _init_batch_worker,
+            'initargs': (self._init_kwargs, max_memory_mb)
+        }
+        if max_tasks_per_child:
+            executor_kwargs['max_tasks_per_child'] = max_tasks_per_child
+        
+        # 同時交給工作進程的檔案數（ProcessPoolExecutor 會多預先排入一個）
+        in_flight_limit = (max_workers or os.cpu_count() or 1) + 1
+        
+        # 進程池崩潰時無法得知是哪個檔案造成的：崩潰時還在排隊的檔案不可能是原因，直接送進新的進程池；
+        # 已交給工作進程的檔案記錄一次崩潰並排到最後重送，連續遇到崩潰的檔案才逐一隔離重跑
+        pool_breaks: Dict[str, int] = {}
+        suspects: List[str] = []
+        while pending:
+            logger.info(f"Starting batch conversion of {len(pending)} files (max_workers={max_workers})")
+            broken: List[str] = []
+            yield from self._iter_pool_results(pending, executor_kwargs, broken)
+            if not broken:
+                break
+            
+            in_flight, queued = broken[:in_flight_limit], broken[in_flight_limit:]
+            retry_last: List[str] = []
+            for path in in_flight:
+                pool_breaks[path] = pool_breaks.get(path, 0) + 1
+                if pool_breaks[path] >= ISOLATE_AFTER_POOL_BREAKS:
+                    suspects.append(path)
+                else:
+                    retry_last.append(path)
+            pending = queued + retry_last
+            logger.warning(f"Process pool broken, resubmitting {len(pending)} files to a new pool "
+                           f"({len(suspects)} files isolated so far)")
+        
+        if suspects:
+            # 只有自己造成崩潰的檔案才會消耗重試次數
+            logger.warning(f"Re-running {len(suspects)} files one at a time")
+            yield from self._iter_isolated_results(suspects, {**executor_kwargs, 'max_workers': 1}, max_retries)
+    
+    @staticmethod
+    def _iter_pool_results(paths: List[str],
+                           executor_kwargs: Dict[str, Any],
+                           broken: List[str]) -> Iterator[ConversionResult]:
+        """
+        在進程池中並行轉換檔案，依完成順序產出結果
+        
+        Args:
+            paths: 要轉換的檔案路徑列表
+            executor_kwargs: 建立 ProcessPoolExecutor 的參數
+            broken: 進程池崩潰時，未完成的檔案路徑依送出順序加入此列表
+        """
+        broken_paths: Set[str] = set()
+        executor = ProcessPoolExecutor(**executor_kwargs)
+        try:
+            futures = {executor.submit(_convert_in_batch_worker, path): path for path in paths}
+            
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    broken_paths.add(path)
+                    continue
+                except Exception as e:
+                    logger.error(f"Failed to convert {Path(path).name}: {e}")
+                    continue
+                
+                logger.info(f"Successfully converted: {Path(path).name}")
+                yield result
+        finally:
+            # 提前關閉生成器時取消尚未開始的轉換，不等待整個批次完成
+            executor.shutdown(cancel_futures=True)
+        
+        broken.extend(path for path in paths if path in broken_paths)
+    
+    @staticmethod
+    def _iter_isolated_results(paths: List[str],
+                               executor_kwargs: Dict[str, Any],
+                               max_retries: int) -> Iterator[ConversionResult]:
+        """
+        逐一轉換檔案，工作進程崩潰時只計入正在轉換的檔案
+        
+        Args:
+            paths: 要轉換的檔案路徑列表
+            executor_kwargs: 建立單一工作進程 ProcessPoolExecutor 的參數
+            max_retries: 檔案造成工作進程崩潰時的最大重試次數
+        """
+        queue = list(paths)
+        attempts: Dict[str, int] = {}
+        executor: Optional[ProcessPoolExecutor] = None
+        try:
+            while queue:
+                path = queue.pop(0)
+                if executor is None:
+                    executor = ProcessPoolExecutor(**executor_kwargs)
+                try:
+                    result = executor.submit(_convert_in_batch_worker, path).result()
+                except BrokenProcessPool:
+                    # 只有這個檔案在轉換，崩潰確定由它造成；重建進程池後再重試
+                    executor.shutdown(wait=False)
+                    executor = None
+                    attempts[path] = attempts.get(path, 0) + 1
+                    if attempts[path] <= max_retries:
+                        queue.append(path)
+                    else:
+                        logger.error(f"Worker crashed while converting {Path(path).name}, giving up")
+                    continue
+                except Exception as e:
+                    logger.error(f"Failed to convert {Path(path).name}: {e}")
+                    continue
+                
+                logger.info(f"Successfully converted: {Path(path).name}")
+                yield result
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
     
     def _convert_with_marker(self, file_path: Path, output_path: Optional[str], save_to_file: bool) -> ConversionResult:
         """使用 Marker 轉換"""
@@ -127,34 +782,12 @@ class UnifiedMarkdownConverter:
         total_tables: int = 0
         
         for page_data in marker_result['pages']:
-            # 轉換 TableInfo
-            tables: List[TableInfo] = []
-            for table_data in page_data.get('tables', []):
-                table = TableInfo(
-                    table_id=table_data['table_id'],
-                    title=table_data['title'],
-                    content=table_data['content'],
-                    row_count=table_data['row_count'],
-                    column_count=table_data['column_count'],
-                    start_line=table_data['start_line'],
-                    end_line=table_data['end_line']
-                )
-                tables.append(table)
-            
-            page = PageInfo(
-                page_number=page_data['page_number'],
-                content=page_data['content'],
-                content_length=page_data['content_length'],
-                block_count=page_data['block_count'],
-                block_types=page_data['block_types'],
-                tables=tables,
-                table_count=page_data['table_count']
-            )
+            page = self._page_info_from_marker(page_data)
             pages.append(page)
-            total_tables += len(tables)
+            total_tables += page.table_count
         
         # 合併所有頁面內容
-        full_content = '\n\n'.join([page.content for page in pages])
+        full_content, page_offsets = join_pages(page.content for page in pages)
         
         # 創建元數據
         metadata = ConversionMetadata(
@@ -172,7 +805,180 @@ class UnifiedMarkdownConverter:
         result = ConversionResult(
             content=full_content,
             pages=pages,
-            metadata=metadata
+            metadata=metadata,
+            page_offsets=page_offsets
+        )
+        
+        # 如果需要保存到檔案
+        if save_to_file:
+            output_file = self._save_to_file(result, output_path, file_path)
+            result.output_path = str(output_file)
+        
+        return result
+    
+    @staticmethod
+    def _page_info_from_marker(page_data: Dict[str, Any]) -> PageInfo:
+        """將 Marker 的 PageContent 轉換為 PageInfo"""
+        tables: List[TableInfo] = []
+        for table_data in page_data.get('tables', []):
+            table = TableInfo(
+                table_id=table_data['table_id'],
+                title=table_data['title'],
+                content=table_data['content'],
+                row_count=table_data['row_count'],
+                column_count=table_data['column_count'],
+                start_line=table_data['start_line'],
+                end_line=table_data['end_line']
+            )
+            tables.append(table)
+        
+        return PageInfo(
+            page_number=page_data['page_number'],
+            content=page_data['content'],
+            content_length=page_data['content_length'],
+            block_count=page_data['block_count'],
+            block_types=page_data['block_types'],
+            tables=tables,
+            table_count=page_data['table_count']
+        )
+    
+    def _convert_with_hybrid(self, file_path: Path, output_path: Optional[str], save_to_file: bool) -> ConversionResult:
+        """
+        逐頁混合轉換 PDF：文字層乾淨的頁面直接抽取文字，只有掃描頁或複雜版面才交給 Marker
+        
+        每頁使用的引擎記錄在 additional_info['page_engines']，
+        每頁的指紋記錄在 additional_info['page_fingerprints']（供增量轉換使用）。
+        """
+        try:
+            routes = route_pdf_pages(str(file_path), self._init_kwargs['routing_thresholds'])
+        except Exception as e:
+            logger.warning(f"Per-page routing failed for {file_path.name}, using Marker for all pages: {e}")
+            return self._convert_with_marker(file_path, output_path, save_to_file)
+        
+        pages = list(self._iter_hybrid_pages(file_path, routes))
+        
+        # 合併所有頁面內容
+        full_content, page_offsets = join_pages(page.content for page in pages)
+        
+        page_engines = [
+            {'page_number': route.page_index + 1, 'engine': route.engine, 'reason': route.reason}
+            for route in routes
+        ]
+        engine_counts: Dict[str, int] = {}
+        for route in routes:
+            engine_counts[route.engine] = engine_counts.get(route.engine, 0) + 1
+        
+        # 創建元數據
+        metadata = ConversionMetadata(
+            file_name=file_path.name,
+            file_path=str(file_path),
+            file_type=file_path.suffix.lower(),
+            file_size=file_path.stat().st_size,
+            total_pages=len(pages),
+            total_tables=sum(page.table_count for page in pages),
+            total_content_length=len(full_content),
+            conversion_timestamp=time.time(),
+            converter_used='hybrid',
+            additional_info={
+                'page_engines': page_engines,
+                'engine_counts': engine_counts,
+                'page_fingerprints': [route.fingerprint for route in routes]
+            }
+        )
+        
+        result = ConversionResult(
+            content=full_content,
+            pages=pages,
+            metadata=metadata,
+            page_offsets=page_offsets
+        )
+        
+        # 如果需要保存到檔案
+        if save_to_file:
+            output_file = self._save_to_file(result, output_path, file_path)
+            result.output_path = str(output_file)
+        
+        return result
+    
+    def _iter_hybrid_pages(self, file_path: Path, routes: List[PageRoute], window: Optional[int] = None) -> Iterator[PageInfo]:
+        """
+        依路由結果逐頁產出 PageInfo
+        
+        文字頁直接由文字層內容建立；需要 Marker 的頁面每 window 頁一批交給 Marker，
+        window 為 None 時所有 Marker 頁面一次轉換。頁碼與原始 PDF 的頁碼一致。
+        
+        Args:
+            file_path: PDF 檔案路徑
+            routes: route_pdf_pages 的路由結果
+            window: 每批交給 Marker 的頁數
+        
+        Yields:
+            PageInfo: 依頁面順序產出的頁面信息
+        """
+        marker_indices = [route.page_index for route in routes if route.engine == ENGINE_MARKER]
+        if marker_indices and not self.marker_converter:
+            raise RuntimeError("Marker converter not available")
+        
+        batch_size = window or len(marker_indices) or 1
+        converted: Dict[int, Dict[str, Any]] = {}
+        next_batch = 0
+        
+        for route in routes:
+            if route.engine == ENGINE_MARKER:
+                if route.page_index not in converted:
+                    batch = marker_indices[next_batch:next_batch + batch_size]
+                    next_batch += batch_size
+                    converted = self.marker_converter.convert_page_subset(str(file_path), batch)
+                yield self._page_info_from_marker(converted.pop(route.page_index))
+            else:
+                yield self._page_info_from_text(route.page_index + 1, route.text or "")
+    
+    @staticmethod
+    def _page_info_from_text(page_number: int, content: str) -> PageInfo:
+        """由文字層抽取的內容建立 PageInfo"""
+        scan = scan_page(content)
+        return PageInfo(
+            page_number=page_number,
+            content=content,
+            content_length=len(content),
+            block_count=scan.block_count,
+            block_types=dict(scan.block_types),
+            tables=[],
+            table_count=0
+        )
+    
+    def _convert_with_excel(self, file_path: Path, output_path: Optional[str], save_to_file: bool) -> ConversionResult:
+        """使用原生 Excel 轉換器轉換（每個工作表一個頁面）"""
+        if not self.excel_converter:
+            raise RuntimeError("Native Excel converter not available")
+        
+        pages = self.excel_converter.convert_file(str(file_path))
+        
+        # 合併所有頁面內容
+        full_content, page_offsets = join_pages(page.content for page in pages)
+        
+        # 創建元數據
+        metadata = ConversionMetadata(
+            file_name=file_path.name,
+            file_path=str(file_path),
+            file_type=file_path.suffix.lower(),
+            file_size=file_path.stat().st_size,
+            total_pages=len(pages),
+            total_tables=sum(page.table_count for page in pages),
+            total_content_length=len(full_content),
+            conversion_timestamp=time.time(),
+            converter_used='excel',
+            additional_info={
+                'title': file_path.stem,
+                'sheets': [{'title': page.title, 'content': page.content} for page in pages]  # 與 Markitdown 的工作表信息格式相同
+            }
+        )
+        
+        result = ConversionResult(
+            content=full_content,
+            pages=pages,
+            metadata=metadata,
+            page_offsets=page_offsets
         )
         
         # 如果需要保存到檔案
@@ -305,7 +1111,7 @@ class UnifiedMarkdownConverter:
         
         Args:
             file_path: 檔案路徑
-            
+        
         Returns:
             bool: 是否支援該格式
         """
@@ -316,7 +1122,7 @@ class UnifiedMarkdownConverter:
         獲取支援的格式列表
         
         Returns:
-            dict: 包含 marker 和 markitdown 支援的格式
+            dict: 包含 marker、excel 和 markitdown 支援的格式
         """
         return FormatRouter.get_supported_formats()
     
@@ -324,10 +1130,29 @@ class UnifiedMarkdownConverter:
         """
         獲取轉換器可用狀態
         
+        Note:
+            不會觸發轉換器初始化；尚未建立的轉換器以套件是否可用判斷，
+            如需確認模型可正常載入請使用 warmup()
+        
         Returns:
             dict: 各轉換器的可用狀態
         """
         return {
-            'marker': self.marker_converter is not None,
-            'markitdown': self.markitdown_converter is not None
+            'marker': MARKER_AVAILABLE and 'marker' not in self._failed_converters,
+            'hybrid': PAGE_ROUTING_AVAILABLE and self._init_kwargs['enable_hybrid_pdf_routing'],
+            'excel': EXCEL_AVAILABLE and 'excel' not in self._failed_converters,
+            'markitdown': MARKITDOWN_AVAILABLE and 'markitdown' not in self._failed_converters
+        }
+    
+    def get_loaded_converters(self) -> Dict[str, bool]:
+        """
+        獲取轉換器是否已初始化
+        
+        Returns:
+            dict: 各轉換器是否已建立
+        """
+        return {
+            'marker': self._marker_converter is not None,
+            'excel': self._excel_converter is not None,
+            'markitdown': self._markitdown_converter is not None
         }
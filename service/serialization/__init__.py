@@ -1,10 +1,17 @@
 """
 Serialization 模組
 
-提供 ConversionResult 的序列化和反序列化功能，支援 JSON 格式儲存和載入。
+提供 ConversionResult 的序列化和反序列化功能，支援 JSON 格式與按需載入頁面的二進位容器，
+以及以檔案內容定址的轉換結果快取。
 """
 
 from .conversion_serializer import ConversionSerializer
 from .conversion_deserializer import ConversionDeserializer
+from .conversion_cache import ConversionCache
+from .binary_format import LazyConversionResult
+from .serialization_catalog import SerializationCatalog
 
-__all__ = ['ConversionSerializer', 'ConversionDeserializer']
+__all__ = [
+    'ConversionSerializer', 'ConversionDeserializer', 'ConversionCache',
+    'LazyConversionResult', 'SerializationCatalog'
+]
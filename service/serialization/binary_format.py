@@ -0,0 +1,259 @@
+"""
+ConversionResult 二進位容器格式
+
+檔案結構：
+    [檔頭] MAGIC(4 bytes) + 格式版本(uint16) + 標頭長度(uint32)，小端序
+    [標頭] zlib 壓縮的 JSON：ConversionMetadata、頁面偏移表、完整內容的位置
+    [資料區] 每個頁面各自以 zlib 壓縮的 JSON 區塊
+
+完整內容若等於各頁內容以 CONTENT_SEPARATOR 連接的結果，就不另外保存（避免同一份文字存兩次），
+讀取時由頁面重建；否則完整內容存為獨立的壓縮區塊。
+讀取時只解析標頭，頁面在第一次存取時才從檔案讀取並解壓縮。
+"""
+
+import json
+import os
+import struct
+import tempfile
+import zlib
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..markdown_integrate.data_models import ConversionResult, ConversionMetadata, PageInfo
+
+# 檔案識別碼與格式版本
+MAGIC = b"CVRB"
+FORMAT_VERSION = 1
+
+# 二進位格式的副檔名
+BINARY_EXTENSION = ".cvrb"
+
+# 檔頭：識別碼、格式版本、標頭長度
+PREAMBLE = struct.Struct("<4sHI")
+
+# 頁面內容的連接方式（與轉換器合併頁面內容的方式相同）
+CONTENT_SEPARATOR = "\n\n"
+
+# zlib 壓縮等級
+COMPRESSION_LEVEL = 6
+
+
+def _compress_json(data: Any) -> bytes:
+    """將資料編碼為 JSON 並壓縮"""
+    return zlib.compress(json.dumps(data, ensure_ascii=False).encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def _decompress_json(blob: bytes) -> Any:
+    """解壓縮並解析 JSON"""
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+def is_binary_file(file_path: str) -> bool:
+    """
+    檢查檔案是否為二進位容器格式（讀取檔頭的識別碼）
+    
+    Args:
+        file_path: 檔案路徑
+    
+    Returns:
+        bool: 是否為二進位容器
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_container(output_path: Path, header: Dict[str, Any], page_dicts: Optional[List[Dict[str, Any]]],
+                    content: Optional[str]) -> Dict[str, Any]:
+    """
+    寫入二進位容器（先寫入暫存檔再替換，寫入中途失敗不會留下不完整的檔案）
+    
+    Args:
+        output_path: 輸出檔案路徑
+        header: 標頭資料（不含頁面偏移表和內容位置，由此函數補上）
+        page_dicts: 序列化後的頁面字典列表，None 表示沒有頁面信息
+        content: 完整內容；None 表示可由頁面內容重建
+
+    Returns:
+        Dict[str, Any]: 寫入的完整標頭
+    """
+    blobs: List[bytes] = []
+    offset = 0
+    
+    page_table = None
+    if page_dicts is not None:
+        page_table = []
+        for page_dict in page_dicts:
+            blob = _compress_json(page_dict)
+            page_table.append({
+                "page_number": page_dict.get("page_number"),
+                "title": page_dict.get("title"),
+                "content_length": page_dict.get("content_length"),
+                "offset": offset,
+                "length": len(blob)
+            })
+            blobs.append(blob)
+            offset += len(blob)
+    
+    content_entry = None
+    if content is not None:
+        blob = zlib.compress(content.encode('utf-8'), COMPRESSION_LEVEL)
+        content_entry = {"offset": offset, "length": len(blob)}
+        blobs.append(blob)
+    
+    header = dict(header, pages=page_table, content=content_entry, content_separator=CONTENT_SEPARATOR)
+    header_blob = _compress_json(header)
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=str(output_path.parent), prefix=".tmp_", suffix=BINARY_EXTENSION)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_blob)))
+            f.write(header_blob)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return header
+
+
+def read_header(file_path: str) -> Tuple[Dict[str, Any], int]:
+    """
+    只讀取二進位容器的標頭
+    
+    Args:
+        file_path: 檔案路徑
+    
+    Returns:
+        Tuple[Dict[str, Any], int]: (標頭資料, 資料區在檔案中的起始位置)
+    
+    Raises:
+        ValueError: 如果不是二進位容器或格式版本不支援
+    """
+    with open(file_path, 'rb') as f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) < PREAMBLE.size:
+            raise ValueError(f"Not a binary conversion file: {file_path}")
+        magic, version, header_length = PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"Not a binary conversion file: {file_path}")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary format version {version}: {file_path}")
+        header_blob = f.read(header_length)
+    return _decompress_json(header_blob), PREAMBLE.size + header_length
+
+
+def read_blob(file_path: str, position: int, length: int) -> bytes:
+    """讀取資料區中的單一區塊"""
+    with open(file_path, 'rb') as f:
+        f.seek(position)
+        blob = f.read(length)
+    if len(blob) != length:
+        raise ValueError(f"Truncated binary conversion file: {file_path}")
+    return blob
+
+
+class LazyPages(Sequence):
+    """依頁面偏移表延遲載入的頁面列表，每頁第一次存取時才讀取並解壓縮"""
+    
+    def __init__(self, file_path: str, data_start: int, page_table: List[Dict[str, Any]],
+                 page_loader: Callable[[Dict[str, Any]], PageInfo]):
+        """
+        Args:
+            file_path: 二進位容器路徑
+            data_start: 資料區起始位置
+            page_table: 標頭中的頁面偏移表
+            page_loader: 將頁面字典轉換為 PageInfo 的函數
+        """
+        self._file_path = file_path
+        self._data_start = data_start
+        self._page_table = page_table
+        self._page_loader = page_loader
+        self._loaded: Dict[int, PageInfo] = {}
+    
+    def __len__(self) -> int:
+        return len(self._page_table)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("page index out of range")
+        
+        page = self._loaded.get(index)
+        if page is None:
+            entry = self._page_table[index]
+            blob = read_blob(self._file_path, self._data_start + entry["offset"], entry["length"])
+            page = self._page_loader(_decompress_json(blob))
+            self._loaded[index] = page
+        return page
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, LazyPages)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"LazyPages({len(self)} pages, {len(self._loaded)} loaded)"
+    
+    @property
+    def loaded_count(self) -> int:
+        """已載入的頁面數量"""
+        return len(self._loaded)
+    
+    @property
+    def page_table(self) -> List[Dict[str, Any]]:
+        """頁面偏移表（含頁碼、標題與內容長度，不需要載入頁面即可查詢）"""
+        return self._page_table
+
+
+class LazyConversionResult(ConversionResult):
+    """
+    從二進位容器讀取的 ConversionResult
+    
+    頁面由 LazyPages 延遲載入；完整內容在第一次存取時才讀取或由頁面內容重建。
+    """
+    
+    def __init__(self, metadata: ConversionMetadata, pages: Optional[LazyPages],
+                 content_loader: Callable[[], str], output_path: Optional[str] = None):
+        self._content: Optional[str] = None
+        self._content_loader = content_loader
+        self.metadata = metadata
+        self.pages = pages if pages is not None else []
+        self.output_path = output_path
+    
+    @property
+    def content(self) -> str:
+        """完整的 markdown 內容（第一次存取時載入）"""
+        if self._content is None:
+            self._content = self._content_loader()
+        return self._content
+    
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = value
+    
+    def materialize(self) -> ConversionResult:
+        """
+        載入所有頁面並返回一般的 ConversionResult（可被 pickle，適合傳給其他進程）
+        
+        Returns:
+            ConversionResult: 完整載入的轉換結果
+        """
+        return ConversionResult(
+            content=self.content,
+            metadata=self.metadata,
+            pages=list(self.pages),
+            output_path=self.output_path
+        )
+    
+    def __reduce__(self):
+        return (ConversionResult, (self.content, self.metadata, list(self.pages), self.output_path))
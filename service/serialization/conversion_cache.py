@@ -0,0 +1,203 @@
+"""
+ConversionResult 內容定址快取
+
+以「來源檔案內容 + 轉換器名稱/版本 + 轉換器配置」的雜湊值作為鍵，
+快取序列化後的 ConversionResult。檔案改名或搬移後仍可命中，
+內容變更（即使檔名相同）則會產生新的鍵，不會沿用過期的轉換結果。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from ..markdown_integrate.data_models import ConversionResult
+from .conversion_serializer import ConversionSerializer
+from .conversion_deserializer import ConversionDeserializer
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionCache:
+    """ConversionResult 內容定址快取（LRU，限制數量與總大小）"""
+    
+    def __init__(self,
+                 cache_dir: str = "service/serialization/cache",
+                 max_entries: int = 512,
+                 max_size_mb: float = 4096):
+        """
+        初始化快取
+        
+        Args:
+            cache_dir: 快取目錄（可由多個輸出目錄、多個進程共用）
+            max_entries: 最多保留的快取項目數量
+            max_size_mb: 快取目錄的總大小上限（MB）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._serializer = ConversionSerializer(output_dir=str(self.cache_dir))
+        self._deserializer = ConversionDeserializer(input_dir=str(self.cache_dir))
+    
+    @staticmethod
+    def hash_file(file_path: str, block_size: int = 1024 * 1024) -> str:
+        """
+        計算檔案內容的 SHA-256
+        
+        Args:
+            file_path: 檔案路徑
+            block_size: 每次讀取的位元組數
+        
+        Returns:
+            str: 十六進位雜湊值
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def make_key(self, file_path: str, converter_config: Dict[str, Any]) -> str:
+        """
+        計算快取鍵
+        
+        Args:
+            file_path: 來源檔案路徑
+            converter_config: 轉換器名稱、版本與配置（需可 JSON 序列化）
+        
+        Returns:
+            str: 快取鍵
+        """
+        digest = hashlib.sha256()
+        digest.update(self.hash_file(file_path).encode('ascii'))
+        digest.update(json.dumps(converter_config, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _entry_path(self, key: str) -> Path:
+        """取得快取項目的檔案路徑"""
+        return self.cache_dir / f"{key}.json"
+    
+    def contains(self, key: str) -> bool:
+        """檢查快取中是否有指定的鍵"""
+        return self._entry_path(key).exists()
+    
+    def get(self, key: str) -> Optional[ConversionResult]:
+        """
+        讀取快取的轉換結果
+        
+        Args:
+            key: 快取鍵
+        
+        Returns:
+            Optional[ConversionResult]: 命中時返回轉換結果，否則返回 None
+        """
+        entry_path = self._entry_path(key)
+        try:
+            result = self._deserializer.deserialize(str(entry_path))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # 快取檔案損壞，移除後當作未命中
+            logger.warning(f"Discarding corrupt cache entry {entry_path.name}: {e}")
+            self._remove(entry_path)
+            return None
+        
+        # 更新修改時間作為 LRU 的最近使用時間
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        
+        logger.info(f"Conversion cache hit: {key[:12]}")
+        return result
+    
+    def put(self, key: str, conversion_result: ConversionResult) -> str:
+        """
+        寫入轉換結果到快取
+        
+        Args:
+            key: 快取鍵
+            conversion_result: 轉換結果
+        
+        Returns:
+            str: 快取檔案路徑
+        """
+        entry_path = self._entry_path(key)
+        
+        # 先寫入暫存檔再原子替換，避免多進程同時寫入時讀到不完整的檔案
+        fd, temp_path = tempfile.mkstemp(dir=str(self.cache_dir), prefix=f".{key[:12]}_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._serializer.to_dict(conversion_result), f, ensure_ascii=False)
+            os.replace(temp_path, entry_path)
+        except Exception:
+            self._remove(Path(temp_path))
+            raise
+        
+        logger.info(f"Conversion cached: {key[:12]} ({conversion_result.metadata.file_name})")
+        self.evict()
+        return str(entry_path)
+    
+    def evict(self) -> int:
+        """
+        依 LRU 移除超出數量或大小上限的快取項目
+        
+        Returns:
+            int: 移除的項目數量
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        
+        entries.sort(key=lambda item: item[0])
+        total_size = sum(size for _, size, _ in entries)
+        removed = 0
+        
+        while entries and (len(entries) > self.max_entries or total_size > self.max_size_bytes):
+            _, size, path = entries.pop(0)
+            self._remove(path)
+            total_size -= size
+            removed += 1
+        
+        if removed:
+            logger.info(f"Evicted {removed} conversion cache entries")
+        return removed
+    
+    def clear(self) -> None:
+        """清空快取"""
+        for entry in self.cache_dir.glob("*.json"):
+            self._remove(entry)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        獲取快取統計信息
+        
+        Returns:
+            Dict[str, Any]: 項目數量與總大小
+        """
+        sizes = [entry.stat().st_size for entry in self.cache_dir.glob("*.json")]
+        return {
+            'cache_dir': str(self.cache_dir),
+            'entries': len(sizes),
+            'total_size': sum(sizes),
+            'max_entries': self.max_entries,
+            'max_size_bytes': self.max_size_bytes
+        }
+    
+    @staticmethod
+    def _remove(path: Path) -> None:
+        """移除檔案，不存在時忽略"""
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
@@ -2,13 +2,18 @@
 ConversionResult 反序列化器
 
 從 JSON 文件反序列化 ConversionResult 對象，支援完整的元數據和頁面信息恢復。
+二進位容器只解析標頭，返回的 ConversionResult 在第一次存取頁面或內容時才讀取對應區塊。
+列出文件、查詢最新結果和驗證文件都查詢目錄索引（見 serialization_catalog），不需要逐一解析文件。
 """
 
 import json
+import zlib
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
 from ..markdown_integrate.data_models import ConversionResult, ConversionMetadata, PageInfo, TableInfo
+from .binary_format import LazyConversionResult, LazyPages, is_binary_file, read_blob, read_header
+from .serialization_catalog import SerializationCatalog, has_required_fields, read_summary
 
 
 class ConversionDeserializer:
@@ -22,25 +27,42 @@ class ConversionDeserializer:
             input_dir: JSON 文件輸入目錄
         """
         self.input_dir = Path(input_dir)
+        self.catalog = SerializationCatalog(str(self.input_dir))
     
     def deserialize(self, file_path: str) -> ConversionResult:
         """
-        從 JSON 文件反序列化 ConversionResult
+        從 JSON 文件或二進位容器反序列化 ConversionResult
         
         Args:
-            file_path: JSON 文件路徑
+            file_path: 序列化文件路徑
             
         Returns:
-            ConversionResult: 反序列化後的 ConversionResult 對象
+            ConversionResult: 反序列化後的 ConversionResult 對象；
+                              二進位容器返回 LazyConversionResult，頁面按需載入
         """
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(f"Serialization file not found: {file_path}")
         
+        if is_binary_file(str(file_path)):
+            return self._deserialize_binary(str(file_path))
+        
         # 讀取 JSON 文件
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
+        return self.from_dict(data)
+    
+    def from_dict(self, data: Dict[str, Any]) -> ConversionResult:
+        """
+        從字典反序列化 ConversionResult
+        
+        Args:
+            data: ConversionSerializer.to_dict 產生的字典
+            
+        Returns:
+            ConversionResult: 反序列化後的 ConversionResult 對象
+        """
         # 反序列化各個組件
         metadata = self._deserialize_metadata(data["metadata"])
         pages = self._deserialize_pages(data.get("pages")) if data.get("pages") else None
@@ -55,6 +77,42 @@ class ConversionDeserializer:
         
         return conversion_result
     
+    def _deserialize_binary(self, file_path: str) -> LazyConversionResult:
+        """
+        從二進位容器反序列化，只讀取標頭
+        
+        Args:
+            file_path: 二進位容器路徑
+        
+        Returns:
+            LazyConversionResult: 頁面和完整內容延遲載入的轉換結果
+        """
+        header, data_start = read_header(file_path)
+        metadata = self._deserialize_metadata(header["metadata"])
+        
+        pages = None
+        if header.get("pages"):
+            pages = LazyPages(
+                file_path, data_start, header["pages"],
+                lambda page_dict: self._deserialize_pages([page_dict])[0]
+            )
+        
+        content_entry = header.get("content")
+        separator = header.get("content_separator", "\n\n")
+        
+        def load_content() -> str:
+            if content_entry is not None:
+                blob = read_blob(file_path, data_start + content_entry["offset"], content_entry["length"])
+                return zlib.decompress(blob).decode('utf-8')
+            return separator.join(page.content for page in pages) if pages is not None else ""
+        
+        return LazyConversionResult(
+            metadata=metadata,
+            pages=pages,
+            content_loader=load_content,
+            output_path=header.get("output_path")
+        )
+    
     def _deserialize_metadata(self, metadata_dict: Dict[str, Any]) -> ConversionMetadata:
         """
         反序列化 ConversionMetadata
@@ -125,7 +183,10 @@ class ConversionDeserializer:
                 row_count=table_dict["row_count"],
                 column_count=table_dict["column_count"],
                 start_line=table_dict["start_line"],
-                end_line=table_dict["end_line"]
+                end_line=table_dict["end_line"],
+                sheet_name=table_dict.get("sheet_name"),
+                first_row=table_dict.get("first_row"),
+                last_row=table_dict.get("last_row")
             )
             tables.append(table)
         
@@ -138,13 +199,33 @@ class ConversionDeserializer:
         Returns:
             Optional[ConversionResult]: 反序列化後的 ConversionResult，如果沒有文件則返回 None
         """
-        json_files = list(self.input_dir.glob("*.json"))
-        if not json_files:
+        return self._deserialize_latest(None)
+    
+    def deserialize_latest_by_source(self, source_file_path: str) -> Optional[ConversionResult]:
+        """
+        反序列化某個來源文件最新的序列化結果
+        
+        Args:
+            source_file_path: 來源文件路徑（ConversionMetadata.file_path）
+            
+        Returns:
+            Optional[ConversionResult]: 反序列化後的 ConversionResult，如果沒有文件則返回 None
+        """
+        return self._deserialize_latest(source_file_path)
+    
+    def _deserialize_latest(self, source_file_path: Optional[str]) -> Optional[ConversionResult]:
+        """依目錄索引查詢最新的有效文件並反序列化，略過已被刪除的文件"""
+        if not self.input_dir.exists():
             return None
         
-        # 按修改時間排序，獲取最新的文件
-        latest_file = max(json_files, key=lambda x: x.stat().st_mtime)
-        return self.deserialize(str(latest_file))
+        while True:
+            info = self.catalog.latest(source_file_path)
+            if info is None:
+                return None
+            try:
+                return self.deserialize(info["file_path"])
+            except FileNotFoundError:
+                self.catalog.remove(info["file_name"])
     
     def deserialize_by_filename(self, filename: str) -> ConversionResult:
         """
@@ -166,37 +247,72 @@ class ConversionDeserializer:
         Returns:
             List[Dict[str, Any]]: 文件信息列表
         """
-        json_files = list(self.input_dir.glob("*.json"))
-        file_info_list = []
+        if not self.input_dir.exists():
+            return []
+        return self.catalog.list_files()
         
-        for file_path in sorted(json_files, key=lambda x: x.stat().st_mtime, reverse=True):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                file_info = {
-                    "file_path": str(file_path),
-                    "file_name": file_path.name,
-                    "file_size": file_path.stat().st_size,
-                    "serialization_timestamp": data.get("serialization_timestamp"),
-                    "original_file_name": data.get("metadata", {}).get("file_name"),
-                    "converter_used": data.get("metadata", {}).get("converter_used"),
-                    "total_pages": data.get("metadata", {}).get("total_pages"),
-                    "has_pages": data.get("pages") is not None
-                }
-                file_info_list.append(file_info)
-            except Exception as e:
-                # 如果文件損壞，跳過
-                continue
-        
-        return file_info_list
+    def find_by_original_file_name(self, original_file_name: str) -> List[Dict[str, Any]]:
+        """
+        依原始文件名查詢序列化文件
+        
+        Args:
+            original_file_name: 原始文件名（ConversionMetadata.file_name）
+            
+        Returns:
+            List[Dict[str, Any]]: 文件信息列表（由新到舊）
+        """
+        if not self.input_dir.exists():
+            return []
+        return self.catalog.find_by_original_file_name(original_file_name)
+    
+    def sync_catalog(self) -> int:
+        """
+        重新同步目錄索引（用於手動複製或刪除序列化文件之後）
+        
+        Returns:
+            int: 更新的索引數量
+        """
+        return self.catalog.sync()
+    
+    def get_file_info(self, file_path: str) -> Dict[str, Any]:
+        """
+        獲取序列化文件的基本信息
+        
+        輸入目錄中的文件直接查詢目錄索引；其他文件才讀取文件（二進位容器只讀取標頭）。
+        
+        Args:
+            file_path: 序列化文件路徑
+            
+        Returns:
+            Dict[str, Any]: 文件信息
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        info = self.catalog.lookup(str(file_path))
+        if info is not None:
+            return info
+        
+        data = read_summary(file_path)
+        return {
+            "file_path": str(file_path),
+            "file_name": file_path.name,
+            "file_size": file_path.stat().st_size,
+            "serialization_timestamp": data.get("serialization_timestamp"),
+            "serialization_version": data.get("serialization_version"),
+            "original_file_name": data.get("metadata", {}).get("file_name"),
+            "converter_used": data.get("metadata", {}).get("converter_used"),
+            "total_pages": data.get("metadata", {}).get("total_pages"),
+            "has_pages": data.get("pages") is not None
+        }
     
     def validate_file(self, file_path: str) -> bool:
         """
         驗證序列化文件是否有效
         
         Args:
-            file_path: JSON 文件路徑
+            file_path: 序列化文件路徑
             
         Returns:
             bool: 文件是否有效
@@ -206,27 +322,13 @@ class ConversionDeserializer:
             if not file_path.exists():
                 return False
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 檢查必要的字段
-            required_fields = ["content", "metadata"]
-            for field in required_fields:
-                if field not in data:
-                    return False
-            
-            # 檢查元數據字段
-            metadata = data["metadata"]
-            required_metadata_fields = [
-                "file_name", "file_path", "file_type", "file_size",
-                "total_pages", "total_tables", "total_content_length",
-                "conversion_timestamp", "converter_used"
-            ]
-            for field in required_metadata_fields:
-                if field not in metadata:
-                    return False
+            # 輸入目錄中的文件直接查詢目錄索引
+            is_valid = self.catalog.is_valid(str(file_path))
+            if is_valid is not None:
+                return is_valid
             
-            return True
+            # 檢查必要的字段（二進位容器的內容可能由頁面重建，標頭中的 content 為 None）
+            return has_required_fields(read_summary(file_path))
             
         except Exception:
             return False
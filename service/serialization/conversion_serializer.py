@@ -2,15 +2,22 @@
 ConversionResult 序列化器
 
 將 ConversionResult 對象序列化為 JSON 格式，支援完整的元數據和頁面信息保存。
+也可以輸出壓縮的二進位容器（見 binary_format），讀取時只需解析標頭，頁面按需載入。
 """
 
 import json
 import os
+import tempfile
 from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
 from ..markdown_integrate.data_models import ConversionResult, ConversionMetadata, PageInfo, TableInfo
+from .binary_format import BINARY_EXTENSION, CONTENT_SEPARATOR, write_container
+from .serialization_catalog import SerializationCatalog, read_summary
+
+# 二進位容器的序列化版本
+BINARY_SERIALIZATION_VERSION = "2.0"
 
 
 class ConversionSerializer:
@@ -25,40 +32,74 @@ class ConversionSerializer:
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.catalog = SerializationCatalog(str(self.output_dir))
     
-    def serialize(self, conversion_result: ConversionResult, filename: Optional[str] = None) -> str:
+    def serialize(self, conversion_result: ConversionResult, filename: Optional[str] = None,
+                  binary: bool = False) -> str:
         """
-        序列化 ConversionResult 為 JSON
+        序列化 ConversionResult 為 JSON 或二進位容器
         
         Args:
             conversion_result: 要序列化的 ConversionResult 對象
-            filename: 自定義文件名，如果為 None 則自動生成
+            filename: 自定義文件名，如果為 None 則自動生成；以 .cvrb 結尾時輸出二進位容器
+            binary: 是否輸出壓縮的二進位容器（每頁獨立壓縮，可按需載入）
             
         Returns:
-            str: JSON 文件路徑
+            str: 序列化文件路徑
         """
+        if filename is not None and filename.endswith(BINARY_EXTENSION):
+            binary = True
+        extension = BINARY_EXTENSION if binary else '.json'
+        
         if filename is None:
             # 自動生成文件名
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             base_name = Path(conversion_result.metadata.file_name).stem
-            filename = f"{base_name}_{timestamp}.json"
+            filename = f"{base_name}_{timestamp}{extension}"
         
-        # 確保文件名以 .json 結尾
-        if not filename.endswith('.json'):
-            filename += '.json'
+        # 確保文件名以正確的副檔名結尾
+        if not filename.endswith(extension):
+            filename += extension
         
         # 構建完整路徑
         output_path = self.output_dir / filename
         
+        if binary:
+            header = self._write_binary(conversion_result, output_path)
+            self.catalog.record(output_path, header)
+            return str(output_path)
+        
         # 序列化數據
         serialized_data = self._convert_to_dict(conversion_result)
         
-        # 寫入 JSON 文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(serialized_data, f, ensure_ascii=False, indent=2)
+        # 寫入 JSON 文件（先寫入暫存檔再替換，索引不會指向寫到一半的文件）
+        fd, temp_path = tempfile.mkstemp(dir=str(self.output_dir), prefix=".tmp_", suffix=".json")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(serialized_data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        
+        # 更新目錄索引
+        self.catalog.record(output_path, serialized_data)
         
         return str(output_path)
     
+    def to_dict(self, conversion_result: ConversionResult) -> Dict[str, Any]:
+        """
+        將 ConversionResult 轉換為可 JSON 序列化的字典（不寫入文件）
+        
+        Args:
+            conversion_result: ConversionResult 對象
+            
+        Returns:
+            Dict[str, Any]: 序列化後的字典
+        """
+        return self._convert_to_dict(conversion_result)
+    
     def _convert_to_dict(self, conversion_result: ConversionResult) -> Dict[str, Any]:
         """
         將 ConversionResult 轉換為字典格式
@@ -78,6 +119,33 @@ class ConversionSerializer:
             "serialization_version": "1.0"
         }
     
+    def _write_binary(self, conversion_result: ConversionResult, output_path: Path) -> Dict[str, Any]:
+        """
+        寫入二進位容器
+        
+        完整內容等於各頁內容連接的結果時不另外保存，讀取時由頁面重建。
+        
+        Args:
+            conversion_result: ConversionResult 對象
+            output_path: 輸出文件路徑
+            
+        Returns:
+            Dict[str, Any]: 寫入的標頭
+        """
+        page_dicts = self._serialize_pages(conversion_result.pages) if conversion_result.pages else None
+        
+        content = conversion_result.content
+        if page_dicts is not None and content == CONTENT_SEPARATOR.join(page["content"] for page in page_dicts):
+            content = None
+        
+        header = {
+            "metadata": self._serialize_metadata(conversion_result.metadata),
+            "output_path": conversion_result.output_path,
+            "serialization_timestamp": datetime.now().isoformat(),
+            "serialization_version": BINARY_SERIALIZATION_VERSION
+        }
+        return write_container(output_path, header, page_dicts, content)
+    
     def _serialize_metadata(self, metadata: ConversionMetadata) -> Dict[str, Any]:
         """
         序列化 ConversionMetadata
@@ -148,7 +216,10 @@ class ConversionSerializer:
                 "row_count": table.row_count,
                 "column_count": table.column_count,
                 "start_line": table.start_line,
-                "end_line": table.end_line
+                "end_line": table.end_line,
+                "sheet_name": table.sheet_name,
+                "first_row": table.first_row,
+                "last_row": table.last_row
             }
             serialized_tables.append(table_dict)
         
@@ -159,17 +230,18 @@ class ConversionSerializer:
         獲取可用的序列化文件列表
         
         Returns:
-            list[str]: JSON 文件路徑列表
+            list[str]: 序列化文件路徑列表（JSON 和二進位容器，依修改時間由新到舊）
         """
-        json_files = list(self.output_dir.glob("*.json"))
-        return [str(f) for f in sorted(json_files, key=lambda x: x.stat().st_mtime, reverse=True)]
+        return [info["file_path"] for info in self.catalog.list_files()]
     
     def get_file_info(self, file_path: str) -> Dict[str, Any]:
         """
         獲取序列化文件的基本信息
         
+        輸出目錄中的文件直接查詢目錄索引；其他文件才讀取文件（二進位容器只讀取標頭）。
+        
         Args:
-            file_path: JSON 文件路徑
+            file_path: 序列化文件路徑
             
         Returns:
             Dict[str, Any]: 文件信息
@@ -178,8 +250,11 @@ class ConversionSerializer:
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        info = self.catalog.lookup(str(file_path))
+        if info is not None:
+            return info
+        
+        data = read_summary(file_path)
         
         return {
             "file_path": str(file_path),
@@ -0,0 +1,360 @@
+"""
+序列化文件目錄索引
+
+以 SQLite 記錄序列化目錄中每個文件的摘要（原始檔名、來源路徑、轉換器、頁數、
+序列化時間、是否有效等），序列化時在同一個交易中更新。
+列出文件、查詢某來源的最新結果、依原始檔名查詢和驗證文件都直接查詢索引，
+不需要掃描目錄、逐一 stat 或解析每個 JSON。
+
+索引檔不存在時（例如既有的序列化目錄）會掃描目錄建立一次；
+以其他方式放入或刪除的文件可呼叫 sync() 重新同步。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .binary_format import BINARY_EXTENSION, is_binary_file, read_header
+
+logger = logging.getLogger(__name__)
+
+# 索引檔名（以 . 開頭，不會被序列化文件的 glob 匹配）
+CATALOG_FILE_NAME = ".catalog.sqlite3"
+
+# 序列化文件的副檔名
+SERIALIZED_EXTENSIONS = ('.json', BINARY_EXTENSION)
+
+# 有效的序列化文件必須包含的欄位
+REQUIRED_FIELDS = ["content", "metadata"]
+REQUIRED_METADATA_FIELDS = [
+    "file_name", "file_path", "file_type", "file_size",
+    "total_pages", "total_tables", "total_content_length",
+    "conversion_timestamp", "converter_used"
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS serialized_files (
+    file_name TEXT PRIMARY KEY,
+    file_size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    readable INTEGER NOT NULL,
+    valid INTEGER NOT NULL,
+    serialization_timestamp TEXT,
+    serialization_version TEXT,
+    original_file_name TEXT,
+    source_path TEXT,
+    converter_used TEXT,
+    total_pages INTEGER,
+    has_pages INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_serialized_files_mtime ON serialized_files (mtime_ns);
+CREATE INDEX IF NOT EXISTS idx_serialized_files_original ON serialized_files (original_file_name, mtime_ns);
+CREATE INDEX IF NOT EXISTS idx_serialized_files_source ON serialized_files (source_path, mtime_ns);
+"""
+
+_COLUMNS = (
+    "file_name", "file_size", "mtime_ns", "readable", "valid",
+    "serialization_timestamp", "serialization_version", "original_file_name",
+    "source_path", "converter_used", "total_pages", "has_pages"
+)
+
+
+def read_summary(file_path: Path) -> Dict[str, Any]:
+    """
+    讀取序列化文件的摘要資料（二進位容器只讀取標頭）
+    
+    Args:
+        file_path: 序列化文件路徑
+    
+    Returns:
+        Dict[str, Any]: 含 metadata、pages、serialization_timestamp 等欄位的字典；
+                        二進位容器的 pages 為頁面偏移表
+    """
+    if is_binary_file(str(file_path)):
+        header, _ = read_header(str(file_path))
+        return header
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def has_required_fields(data: Dict[str, Any]) -> bool:
+    """
+    檢查摘要資料是否包含有效序列化文件的必要欄位
+    
+    Args:
+        data: read_summary 或 ConversionSerializer.to_dict 產生的字典
+    
+    Returns:
+        bool: 是否有效
+    """
+    if not isinstance(data, dict) or any(field not in data for field in REQUIRED_FIELDS):
+        return False
+    metadata = data["metadata"]
+    return isinstance(metadata, dict) and all(field in metadata for field in REQUIRED_METADATA_FIELDS)
+
+
+class SerializationCatalog:
+    """序列化目錄的 SQLite 索引"""
+    
+    def __init__(self, directory: str):
+        """
+        初始化目錄索引（第一次查詢時才開啟或建立索引檔）
+        
+        Args:
+            directory: 序列化文件所在目錄
+        """
+        self.directory = Path(directory)
+        self.db_path = self.directory / CATALOG_FILE_NAME
+    
+    def _connect(self) -> sqlite3.Connection:
+        """開啟索引；索引檔不存在時建立並掃描目錄中既有的文件"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        created = not self.db_path.exists()
+        
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(_SCHEMA)
+        if created:
+            self._sync(conn)
+        return conn
+    
+    def _owns(self, file_path: Path) -> bool:
+        """檢查文件是否位於此索引的目錄中"""
+        return file_path.parent.resolve() == self.directory.resolve()
+    
+    @staticmethod
+    def _make_row(file_path: Path, stat: os.stat_result, data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """由文件狀態和摘要資料建立索引列；data 為 None 表示文件無法讀取"""
+        if data is None:
+            data = {}
+        metadata = data.get("metadata") if isinstance(data.get("metadata"), dict) else {}
+        return {
+            "file_name": file_path.name,
+            "file_size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "readable": int(bool(data)),
+            "valid": int(has_required_fields(data)),
+            "serialization_timestamp": data.get("serialization_timestamp"),
+            "serialization_version": data.get("serialization_version"),
+            "original_file_name": metadata.get("file_name"),
+            "source_path": metadata.get("file_path"),
+            "converter_used": metadata.get("converter_used"),
+            "total_pages": metadata.get("total_pages"),
+            "has_pages": int(data.get("pages") is not None)
+        }
+    
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, row: Dict[str, Any]) -> None:
+        """寫入或取代一筆索引"""
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        conn.execute(
+            f"INSERT OR REPLACE INTO serialized_files ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+            [row[column] for column in _COLUMNS]
+        )
+    
+    def _to_info(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """將索引列轉換為與 get_file_info 相同格式的文件信息"""
+        return {
+            "file_path": str(self.directory / row["file_name"]),
+            "file_name": row["file_name"],
+            "file_size": row["file_size"],
+            "serialization_timestamp": row["serialization_timestamp"],
+            "serialization_version": row["serialization_version"],
+            "original_file_name": row["original_file_name"],
+            "converter_used": row["converter_used"],
+            "total_pages": row["total_pages"],
+            "has_pages": bool(row["has_pages"])
+        }
+    
+    def _index_file(self, conn: sqlite3.Connection, file_path: Path) -> Optional[sqlite3.Row]:
+        """讀取單一文件的摘要並寫入索引，文件不存在時移除索引"""
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            with conn:
+                conn.execute("DELETE FROM serialized_files WHERE file_name = ?", (file_path.name,))
+            return None
+        
+        try:
+            data = read_summary(file_path)
+        except Exception as e:
+            logger.warning(f"Unreadable serialized file {file_path.name}: {e}")
+            data = None
+        
+        with conn:
+            self._upsert(conn, self._make_row(file_path, stat, data))
+        return conn.execute("SELECT * FROM serialized_files WHERE file_name = ?", (file_path.name,)).fetchone()
+    
+    def _sync(self, conn: sqlite3.Connection) -> int:
+        """將目錄中新增、修改或刪除的文件同步到索引"""
+        indexed = {
+            row["file_name"]: (row["file_size"], row["mtime_ns"])
+            for row in conn.execute("SELECT file_name, file_size, mtime_ns FROM serialized_files")
+        }
+        
+        changed = 0
+        present = set()
+        for entry in os.scandir(self.directory):
+            # 略過索引檔與寫入中的暫存檔
+            if entry.name.startswith('.') or not entry.name.endswith(SERIALIZED_EXTENSIONS):
+                continue
+            if not entry.is_file():
+                continue
+            present.add(entry.name)
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if indexed.get(entry.name) != (stat.st_size, stat.st_mtime_ns):
+                self._index_file(conn, Path(entry.path))
+                changed += 1
+        
+        removed = [name for name in indexed if name not in present]
+        if removed:
+            with conn:
+                conn.executemany("DELETE FROM serialized_files WHERE file_name = ?", [(name,) for name in removed])
+        
+        if changed or removed:
+            logger.info(f"Catalog synced: {changed} indexed, {len(removed)} removed ({self.directory})")
+        return changed + len(removed)
+    
+    def sync(self) -> int:
+        """
+        掃描目錄，將不是經由 ConversionSerializer 新增、修改或刪除的文件同步到索引
+        
+        Returns:
+            int: 更新的索引數量
+        """
+        with closing(self._connect()) as conn:
+            return self._sync(conn)
+    
+    def record(self, file_path: Path, data: Dict[str, Any]) -> None:
+        """
+        記錄剛寫入的序列化文件（在單一交易中寫入，不需要重新讀取文件）
+        
+        Args:
+            file_path: 序列化文件路徑
+            data: 序列化的字典或二進位容器的標頭
+        """
+        file_path = Path(file_path)
+        if not self._owns(file_path):
+            return
+        with closing(self._connect()) as conn:
+            with conn:
+                self._upsert(conn, self._make_row(file_path, file_path.stat(), data))
+    
+    def remove(self, file_name: str) -> None:
+        """
+        移除一筆索引
+        
+        Args:
+            file_name: 序列化文件名（不含路徑）
+        """
+        if not self.db_path.exists():
+            return
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM serialized_files WHERE file_name = ?", (file_name,))
+    
+    def list_files(self) -> List[Dict[str, Any]]:
+        """
+        列出可讀取的序列化文件（依修改時間由新到舊）
+        
+        Returns:
+            List[Dict[str, Any]]: 文件信息列表
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM serialized_files WHERE readable = 1 ORDER BY mtime_ns DESC"
+            ).fetchall()
+        return [self._to_info(row) for row in rows]
+    
+    def latest(self, source_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        查詢最新的有效序列化文件
+        
+        Args:
+            source_path: 來源文件路徑（ConversionMetadata.file_path），None 表示不限來源
+        
+        Returns:
+            Optional[Dict[str, Any]]: 文件信息，沒有符合的文件時返回 None
+        """
+        with closing(self._connect()) as conn:
+            if source_path is None:
+                row = conn.execute(
+                    "SELECT * FROM serialized_files WHERE valid = 1 ORDER BY mtime_ns DESC LIMIT 1"
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT * FROM serialized_files WHERE valid = 1 AND source_path = ? "
+                    "ORDER BY mtime_ns DESC LIMIT 1",
+                    (source_path,)
+                ).fetchone()
+        return self._to_info(row) if row is not None else None
+    
+    def find_by_original_file_name(self, original_file_name: str) -> List[Dict[str, Any]]:
+        """
+        依原始文件名查詢序列化文件（依修改時間由新到舊）
+        
+        Args:
+            original_file_name: 原始文件名（ConversionMetadata.file_name）
+        
+        Returns:
+            List[Dict[str, Any]]: 文件信息列表
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM serialized_files WHERE original_file_name = ? ORDER BY mtime_ns DESC",
+                (original_file_name,)
+            ).fetchall()
+        return [self._to_info(row) for row in rows]
+    
+    def _lookup_row(self, file_path: Path) -> Optional[sqlite3.Row]:
+        """查詢單一文件的索引列；文件大小或修改時間與索引不符時重新讀取該文件"""
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            self.remove(file_path.name)
+            return None
+        
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM serialized_files WHERE file_name = ?", (file_path.name,)).fetchone()
+            if row is None or (row["file_size"], row["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+                row = self._index_file(conn, file_path)
+        return row
+    
+    def lookup(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        查詢單一文件的信息
+        
+        Args:
+            file_path: 序列化文件路徑
+        
+        Returns:
+            Optional[Dict[str, Any]]: 文件信息；文件不在此目錄、不存在或無法讀取時返回 None
+        """
+        file_path = Path(file_path)
+        if not self._owns(file_path):
+            return None
+        row = self._lookup_row(file_path)
+        return self._to_info(row) if row is not None and row["readable"] else None
+    
+    def is_valid(self, file_path: str) -> Optional[bool]:
+        """
+        查詢文件是否為有效的序列化文件
+        
+        Args:
+            file_path: 序列化文件路徑
+        
+        Returns:
+            Optional[bool]: 是否有效；文件不在此目錄時返回 None
+        """
+        file_path = Path(file_path)
+        if not self._owns(file_path):
+            return None
+        row = self._lookup_row(file_path)
+        return bool(row is not None and row["valid"])
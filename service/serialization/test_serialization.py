@@ -7,8 +7,9 @@ Serialization 模組測試
 import os
 import tempfile
 from pathlib import Path
+from unittest import mock
 from service.markdown_integrate.data_models import ConversionResult, ConversionMetadata, PageInfo, TableInfo
-from service.serialization import ConversionSerializer, ConversionDeserializer
+from service.serialization import ConversionSerializer, ConversionDeserializer, ConversionCache
 
 
 def test_basic_serialization():
@@ -197,6 +198,207 @@ def test_chunk_splitter_integration():
         print("跳過 ChunkSplitter 整合測試")
 
 
+def test_binary_serialization():
+    """測試二進位容器：標頭只含元數據與偏移表，頁面按需載入"""
+    print("\n測試二進位容器序列化...")
+    
+    metadata = ConversionMetadata(
+        file_name="binary_test.pdf",
+        file_path="/test/binary_test.pdf",
+        file_type=".pdf",
+        file_size=4096,
+        total_pages=3,
+        total_tables=1,
+        total_content_length=0,
+        conversion_timestamp=1234567890.0,
+        converter_used="marker",
+        additional_info={"page_engines": [{"page_number": 1, "engine": "text"}]}
+    )
+    table = TableInfo(
+        table_id="page_2_table_1", title="費率", content="| 年齡 | 費率 |\n|---|---|\n| 20 | 100 |",
+        row_count=3, column_count=2, start_line=2, end_line=4
+    )
+    pages = [
+        PageInfo(page_number=number, title=f"第{number}頁", content=f"# 第{number}頁\n\n內容 {number}" * 20,
+                 content_length=0, block_count=2, block_types={"title": 1, "paragraph": 1},
+                 table_count=1 if number == 2 else 0, tables=[table] if number == 2 else [])
+        for number in (1, 2, 3)
+    ]
+    content = "\n\n".join(page.content for page in pages)
+    conversion_result = ConversionResult(content=content, metadata=metadata, pages=pages)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        serializer = ConversionSerializer(output_dir=temp_dir)
+        deserializer = ConversionDeserializer(input_dir=temp_dir)
+        
+        binary_path = serializer.serialize(conversion_result, "binary_test", binary=True)
+        json_path = serializer.serialize(conversion_result, "binary_test")
+        assert binary_path.endswith(".cvrb")
+        assert os.path.getsize(binary_path) < os.path.getsize(json_path)
+        
+        # 只讀取標頭就能取得文件信息
+        info = serializer.get_file_info(binary_path)
+        assert info["serialization_version"] == "2.0"
+        assert info["original_file_name"] == "binary_test.pdf"
+        assert info["total_pages"] == 3
+        assert info["has_pages"] is True
+        assert deserializer.validate_file(binary_path)
+        assert len(deserializer.list_available_files()) == 2
+        
+        # 頁面在存取時才載入
+        restored = deserializer.deserialize(binary_path)
+        assert restored.pages.loaded_count == 0
+        assert restored.metadata == metadata
+        assert restored.pages[1] == pages[1]
+        assert restored.pages.loaded_count == 1
+        assert restored.pages[1].tables[0].content == table.content
+        
+        # 完整內容由頁面重建，與原始內容相同
+        assert restored.content == content
+        assert restored.materialize() == conversion_result
+        
+        # 完整內容與頁面不一致時另外保存
+        custom = ConversionResult(content="摘要", metadata=metadata, pages=pages)
+        custom_path = serializer.serialize(custom, "custom.cvrb")
+        assert deserializer.deserialize(custom_path).content == "摘要"
+        
+        # 沒有頁面信息
+        no_pages = ConversionResult(content="只有內容", metadata=metadata)
+        restored_no_pages = deserializer.deserialize(serializer.serialize(no_pages, "no_pages.cvrb"))
+        assert restored_no_pages.content == "只有內容"
+        assert list(restored_no_pages.pages) == []
+        
+        # 損壞的檔案無法通過驗證
+        broken_path = Path(temp_dir) / "broken.cvrb"
+        broken_path.write_bytes(b"CVRB\x01")
+        assert not deserializer.validate_file(str(broken_path))
+        
+        print("✓ 二進位容器測試通過")
+
+
+def test_serialization_catalog():
+    """測試目錄索引：列出、最新結果、依原始檔名查詢與驗證不需要解析文件"""
+    print("\n測試序列化目錄索引...")
+    
+    import json
+    from service.serialization.serialization_catalog import SerializationCatalog
+    
+    def make_result(file_name: str, source_path: str) -> ConversionResult:
+        metadata = ConversionMetadata(
+            file_name=file_name,
+            file_path=source_path,
+            file_type=".pdf",
+            file_size=100,
+            total_pages=1,
+            total_tables=0,
+            total_content_length=10,
+            conversion_timestamp=1234567890.0,
+            converter_used="marker"
+        )
+        page = PageInfo(page_number=1, title=None, content=f"# {file_name}", content_length=10,
+                        block_count=1, block_types={"title": 1}, table_count=0, tables=[])
+        return ConversionResult(content=f"# {file_name}", metadata=metadata, pages=[page])
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        
+        # 索引建立前就存在的文件會在第一次查詢時補進索引
+        legacy_path = temp_path / "legacy.json"
+        legacy_path.write_text(json.dumps(ConversionSerializer(output_dir=temp_dir).to_dict(
+            make_result("legacy.pdf", "/docs/legacy.pdf")), ensure_ascii=False), encoding='utf-8')
+        os.utime(legacy_path, ns=(1_000_000_000, 1_000_000_000))
+        
+        serializer = ConversionSerializer(output_dir=temp_dir)
+        deserializer = ConversionDeserializer(input_dir=temp_dir)
+        assert [info["file_name"] for info in deserializer.list_available_files()] == ["legacy.json"]
+        
+        first = serializer.serialize(make_result("a.pdf", "/docs/a.pdf"), "a_v1.json")
+        os.utime(first, ns=(2_000_000_000, 2_000_000_000))
+        serializer.catalog.sync()
+        serializer.serialize(make_result("a.pdf", "/docs/a.pdf"), "a_v2.cvrb")
+        serializer.serialize(make_result("b.pdf", "/docs/b.pdf"), "b.json")
+        
+        # 以下查詢都只讀取索引，不會再解析文件
+        with mock.patch("service.serialization.serialization_catalog.read_summary",
+                        side_effect=AssertionError("catalog should not parse files")):
+            listed = deserializer.list_available_files()
+            assert len(listed) == 4
+            assert listed[-1]["file_name"] == "legacy.json"
+            assert [info["file_name"] for info in deserializer.find_by_original_file_name("a.pdf")] == \
+                ["a_v2.cvrb", "a_v1.json"]
+            assert deserializer.catalog.latest("/docs/a.pdf")["file_name"] == "a_v2.cvrb"
+            assert serializer.get_file_info(first)["original_file_name"] == "a.pdf"
+            assert deserializer.validate_file(first)
+            assert serializer.get_available_files()[-1] == str(legacy_path)
+        
+        assert deserializer.deserialize_latest_by_source("/docs/a.pdf").metadata.file_name == "a.pdf"
+        assert deserializer.deserialize_latest_by_source("/docs/missing.pdf") is None
+        
+        # 文件被修改後重新讀取，被刪除後從索引移除
+        Path(first).write_text("{not json", encoding='utf-8')
+        assert not deserializer.validate_file(first)
+        assert len(deserializer.list_available_files()) == 3
+        (temp_path / "b.json").unlink()
+        assert deserializer.sync_catalog() == 1
+        assert len(deserializer.list_available_files()) == 2
+        
+        # 最新的文件已被刪除時改用下一個
+        latest = deserializer.list_available_files()[0]
+        Path(latest["file_path"]).unlink()
+        assert deserializer.deserialize_from_latest().metadata.file_name == "legacy.pdf"
+        
+        assert SerializationCatalog(temp_dir).list_files()[0]["file_name"] == "legacy.json"
+        
+        print("✓ 序列化目錄索引測試通過")
+
+
+def test_conversion_cache():
+    """測試內容定址轉換快取"""
+    print("\n測試內容定址轉換快取...")
+    
+    from service.markdown_integrate.unified_converter import UnifiedMarkdownConverter
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        cache = ConversionCache(cache_dir=str(temp_path / "cache"), max_entries=2)
+        converter = UnifiedMarkdownConverter(
+            markitdown_output_dir=str(temp_path / "converted"),
+            cache=cache
+        )
+        
+        source = temp_path / "original.txt"
+        source.write_text("# 標題\n\n快取測試內容。\n", encoding='utf-8')
+        
+        # 第一次轉換：未命中並寫入快取
+        first = converter.convert_file(str(source))
+        assert first.metadata.additional_info['conversion_cache']['hit'] is False
+        assert cache.get_stats()['entries'] == 1
+        
+        # 改名後內容相同：命中快取，元數據指向新路徑
+        renamed = temp_path / "renamed.txt"
+        source.rename(renamed)
+        second = converter.convert_file(str(renamed))
+        assert second.metadata.additional_info['conversion_cache']['hit'] is True
+        assert second.metadata.file_name == "renamed.txt"
+        assert second.content == first.content
+        
+        # 內容變更：產生新的鍵，不沿用舊結果
+        renamed.write_text("# 標題\n\n已修改的內容。\n", encoding='utf-8')
+        third = converter.convert_file(str(renamed))
+        assert third.metadata.additional_info['conversion_cache']['hit'] is False
+        assert third.metadata.additional_info['conversion_cache']['key'] != \
+            first.metadata.additional_info['conversion_cache']['key']
+        
+        # 超出 max_entries 時依 LRU 移除最舊的項目
+        extra = temp_path / "extra.txt"
+        extra.write_text("另一份文件", encoding='utf-8')
+        converter.convert_file(str(extra))
+        assert cache.get_stats()['entries'] == 2
+        assert not cache.contains(first.metadata.additional_info['conversion_cache']['key'])
+        
+        print("✓ 轉換快取測試通過")
+
+
 def main():
     """執行所有測試"""
     print("Serialization 模組測試")
@@ -205,6 +407,9 @@ def main():
     try:
         test_basic_serialization()
         test_chunk_splitter_integration()
+        test_binary_serialization()
+        test_serialization_catalog()
+        test_conversion_cache()
         print("\n🎉 所有測試完成！")
         
     except Exception as e: